@@ -160,6 +160,19 @@ register('behavior.addons-url', "https://raw.githubusercontent.com/gramps-projec
 
 register('database.backend', 'sqlite')
 register('database.compress-backup', True)
+register('database.fetch-size', 1000)
+register('database.object-cache', True)
+register('database.rebuild-processes', 1)
+register('database.sqlite-batch-synchronous', 'NORMAL')
+register('database.sqlite-cache-size', 65536)       # KiB
+register('database.sqlite-journal-mode', '')    # '' to keep, or 'WAL'
+register('database.sqlite-mmap-size', 268435456)    # bytes
+register('database.sqlite-statement-cache', 256)
+register('database.sqlite-synchronous', 'FULL')
+register('database.sqlite-temp-store', 'MEMORY')
+register('database.sqlite-wal-autocheckpoint', 1000) # pages
+register('database.undo-history-age', 0)       # minutes, 0 for no limit
+register('database.undo-history-size', 0)      # transactions, 0 for no limit
 register('database.backup-path', USER_HOME)
 register('database.backup-on-exit', True)
 register('database.autobackup', 0)
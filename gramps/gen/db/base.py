@@ -33,6 +33,7 @@ from this class.
 import re
 import time
 from operator import itemgetter
+from collections import deque
 import logging
 
 #-------------------------------------------------------------------------
@@ -47,6 +48,8 @@ from ..lib.childreftype import ChildRefType
 from ..lib.childref import ChildRef
 from .txn import DbTxn
 from .exceptions import DbTransactionCancel, DbException
+from .summary import get_person_summary as _get_person_summary
+from ..errors import HandleError
 
 _LOG = logging.getLogger(DBLOGNAME)
 
@@ -123,6 +126,153 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def select_handles(self, class_name, where, params, with_data=False):
+        """
+        Select the objects of a primary class with an SQL WHERE clause.
+
+        The clause may only refer to the secondary columns of the table of
+        the class and to the reference table.
+
+        Returns a list of the handles of the matching objects, or of
+        (handle, data) tuples if with_data is True.  Returns None if the
+        database cannot evaluate SQL, which is the default.
+
+        :param class_name: name of the primary class, eg 'Person'.
+        :type class_name: str
+        :param where: SQL expression with '?' placeholders.
+        :type where: str
+        :param params: values for the placeholders.
+        :type params: list
+        :param with_data: whether to return the raw data of the objects.
+        :type with_data: bool
+        """
+        return None
+
+    def iter_objects_by_handle(self, class_name):
+        """
+        Return an iterator over the objects of a primary class, in handle
+        order.
+
+        :param class_name: name of the primary class, eg 'Person'.
+        :type class_name: str
+        """
+        get_object = self.method('get_%s_from_handle', class_name)
+        handles = self.method('get_%s_handles', class_name)()
+        for handle in sorted(handles):
+            obj = get_object(handle)
+            if obj:
+                yield obj
+
+    def get_person_family_handles(self, handle):
+        """
+        Return the handles of the families in which the person with the
+        given handle is a parent.
+        """
+        person = self.get_person_from_handle(handle)
+        return person.get_family_handle_list() if person else []
+
+    def get_person_summary(self, handle):
+        """
+        Return the :py:class:`.PersonSummary` of the person with the given
+        handle, as shown in the people views, or None if there is no such
+        person.
+        """
+        try:
+            person = self.get_person_from_handle(handle)
+        except HandleError:
+            return None
+        return _get_person_summary(self, person) if person else None
+
+    def get_person_parent_family_handles(self, handle):
+        """
+        Return the handles of the families in which the person with the
+        given handle is a child, main family first.
+        """
+        person = self.get_person_from_handle(handle)
+        return person.get_parent_family_handle_list() if person else []
+
+    def get_family_parent_handles(self, handle):
+        """
+        Return a (father handle, mother handle) tuple for the family with the
+        given handle, or None if there is no such family.  A missing parent
+        is given as None.
+        """
+        family = self.get_family_from_handle(handle)
+        if family is None:
+            return None
+        return (family.get_father_handle() or None,
+                family.get_mother_handle() or None)
+
+    def get_family_child_handles(self, handle):
+        """
+        Return the handles of the children of the family with the given
+        handle.
+        """
+        family = self.get_family_from_handle(handle)
+        if family is None:
+            return []
+        return [child_ref.ref for child_ref in family.get_child_ref_list()]
+
+    def find_ancestors(self, handles, max_generations=None,
+                       all_families=False):
+        """
+        Return a dictionary mapping the handles of some people, and of their
+        ancestors, to their generation.  The people are generation 1, their
+        parents generation 2, and so on.
+
+        :param handles: handles of the people.
+        :type handles: list
+        :param max_generations: number of generations to include, or None to
+            include all.
+        :type max_generations: int
+        :param all_families: if True the parents in all the families of a
+            child are followed, otherwise only those in the main family.
+        :type all_families: bool
+        """
+        ancestors = dict.fromkeys(handles, 1)
+        queue = deque(ancestors)
+        while queue:
+            child = queue.popleft()
+            gen = ancestors[child] + 1
+            if max_generations is not None and gen > max_generations:
+                continue
+            families = self.get_person_parent_family_handles(child)
+            if not all_families:
+                families = families[:1]
+            for family_handle in families:
+                for parent in self.get_family_parent_handles(
+                        family_handle) or ():
+                    if parent and parent not in ancestors:
+                        ancestors[parent] = gen
+                        queue.append(parent)
+        return ancestors
+
+    def find_descendants(self, handles, max_generations=None):
+        """
+        Return a dictionary mapping the handles of some people, and of their
+        descendants, to their generation.  The people are generation 1, their
+        children generation 2, and so on.
+
+        :param handles: handles of the people.
+        :type handles: list
+        :param max_generations: number of generations to include, or None to
+            include all.
+        :type max_generations: int
+        """
+        descendants = dict.fromkeys(handles, 1)
+        queue = deque(descendants)
+        while queue:
+            parent = queue.popleft()
+            gen = descendants[parent] + 1
+            if max_generations is not None and gen > max_generations:
+                continue
+            for family_handle in self.get_person_family_handles(parent):
+                for child in self.get_family_child_handles(family_handle):
+                    if child not in descendants:
+                        descendants[child] = gen
+                        queue.append(child)
+        return descendants
+
     def find_initial_person(self):
         """
         Returns first person in the database
@@ -1271,6 +1421,24 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def open_reader(self):
+        """
+        Open another, read-only, instance of the database that can be read
+        while this one is being written, for use in a worker thread.  It
+        may be handed to another thread, but only one thread may use it at
+        a time, and it must be given back with close_reader when done.
+
+        Return None if the database does not support concurrent readers.
+        """
+        return None
+
+    def close_reader(self, reader):
+        """
+        Give back an instance opened by open_reader.  It may be kept open,
+        to be returned by open_reader again.
+        """
+        raise NotImplementedError
+
     def report_bm_change(self):
         """
         Add 1 to the number of bookmark changes during this session.
@@ -1641,6 +1809,13 @@ class DbWriteBase(DbReadBase):
         """
         raise NotImplementedError
 
+    def commit_many(self, objs, transaction, change_time=None):
+        """
+        Commit a sequence of primary objects to the database, storing the
+        changes as part of the transaction.
+        """
+        raise NotImplementedError
+
     def get_undodb(self):
         """
         Return the database that keeps track of Undo/Redo operations.
@@ -1785,6 +1960,23 @@ class DbWriteBase(DbReadBase):
         """
         raise NotImplementedError
 
+    def hold_signals(self, interval=None):
+        """
+        Collect the signals of the changes made by the following
+        transactions, and emit them coalesced when :meth:`release_signals`
+        is called, so that the clients see each changed object once.  If an
+        interval in seconds is given, the signals collected so far are also
+        emitted once that time has passed.  Calls can be nested.
+        """
+        raise NotImplementedError
+
+    def release_signals(self):
+        """
+        End a call of :meth:`hold_signals`, emitting the collected signals
+        when the outermost call ends.
+        """
+        raise NotImplementedError
+
     def undo(self, update_history=True):
         """
         Undo last transaction.
@@ -0,0 +1,89 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Cache of primary object records for the database backends.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..utils.lru import LRU
+
+#-------------------------------------------------------------------------
+#
+# ObjectCache class
+#
+#-------------------------------------------------------------------------
+class ObjectCache:
+    """
+    A bounded cache of primary object records, keyed by object type and
+    handle, with one least recently used list per object type.
+
+    The backend decides what a record is, but it must be immutable, such
+    as the encoded data, so that the objects created from it never share
+    state with the cache.  The backend writes through the cache whenever
+    it writes a record, and clears it when a transaction is rolled back.
+    """
+
+    def __init__(self, sizes):
+        """
+        :param sizes: the maximum number of records of each object type,
+                      keyed by object key.  Use 0 to disable.
+        :type sizes: dict
+        """
+        self.__lrus = {obj_key: LRU(size) for obj_key, size in sizes.items()}
+
+    def get(self, obj_key, handle):
+        """
+        Return the cached record, or None if it is not cached.
+        """
+        return self.__lrus[obj_key].get(handle)
+
+    def set(self, obj_key, handle, record):
+        """
+        Cache the current record of an object.
+        """
+        self.__lrus[obj_key][handle] = record
+
+    def discard(self, obj_key, handle):
+        """
+        Forget the record of an object, if it is cached.
+        """
+        lru = self.__lrus[obj_key]
+        if handle in lru:
+            del lru[handle]
+
+    def clear(self):
+        """
+        Forget all records.
+        """
+        for lru in self.__lrus.values():
+            lru.clear()
+
+    def get_stats(self):
+        """
+        Return the number of hits, misses, evictions and cached records of
+        each object type, as a dictionary of tuples keyed by object key.
+        """
+        return {obj_key: lru.get_stats() + (len(lru),)
+                for obj_key, lru in self.__lrus.items()}
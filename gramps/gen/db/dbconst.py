@@ -57,6 +57,8 @@ DBLOCKS = 100000          # Maximum number of locks supported
 DBOBJECTS = 100000          # Maximum number of simultaneously locked objects
 DBUNDO = 1000            # Maximum size of undo buffer
 ARRAYSIZE = 1000            # The arraysize for a SQL cursor
+BULKSIZE = 1000             # Objects buffered before a bulk write
+CLOSURE_CACHE_SIZE = 100    # Ancestor or descendant sets kept in memory
 
 PERSON_KEY = 0
 FAMILY_KEY = 1
@@ -72,6 +74,18 @@ CITATION_KEY = 10
 
 TXNADD, TXNUPD, TXNDEL = 0, 1, 2
 
+# Primary object records kept in memory, see ObjectCache
+CACHE_SIZES = {PERSON_KEY: 10000,
+               FAMILY_KEY: 5000,
+               SOURCE_KEY: 1000,
+               CITATION_KEY: 5000,
+               EVENT_KEY: 10000,
+               MEDIA_KEY: 1000,
+               PLACE_KEY: 5000,
+               REPOSITORY_KEY: 100,
+               NOTE_KEY: 2000,
+               TAG_KEY: 100}
+
 CLASS_TO_KEY_MAP = {"Person": PERSON_KEY,
                     "Family": FAMILY_KEY,
                     "Source": SOURCE_KEY,
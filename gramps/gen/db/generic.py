@@ -35,6 +35,7 @@ import ast
 import sys
 import datetime
 import glob
+import sqlite3
 from pathlib import Path
 
 #------------------------------------------------------------------------
@@ -47,10 +48,13 @@ from . import (DbReadBase, DbWriteBase, DbUndo, DBLOGNAME, DBUNDOFN,
                CITATION_KEY, SOURCE_KEY, EVENT_KEY, MEDIA_KEY, PLACE_KEY,
                REPOSITORY_KEY, NOTE_KEY, TAG_KEY, TXNADD, TXNUPD, TXNDEL,
                KEY_TO_NAME_MAP, DBMODE_R, DBMODE_W)
+from .dbconst import CACHE_SIZES
+from .cache import ObjectCache
 from .utils import write_lock_file, clear_lock_file
 from .exceptions import DbVersionError, DbUpgradeRequiredError
 from ..errors import HandleError
 from ..utils.callback import Callback
+from ..utils.callman import SIGNALS, SignalQueue
 from ..updatecallback import UpdateCallback
 from .bookmarks import DbBookmarks
 
@@ -65,54 +69,237 @@ _ = glocale.translation.gettext
 
 LOG = logging.getLogger(DBLOGNAME)
 
+# Suffix of the signal of each kind of change, and of its undo
+_SIGNAL = {TXNADD: '-add', TXNUPD: '-update', TXNDEL: '-delete'}
+_UNDO_SIGNAL = {TXNADD: '-delete', TXNUPD: '-update', TXNDEL: '-add'}
+
 SIGBASE = ('person', 'family', 'source', 'event', 'media',
            'place', 'repository', 'reference', 'note', 'tag', 'citation')
 
+def _encode_undo_record(record):
+    """
+    Encode an undo record.  The new data of an update is stored as the
+    fields that differ from the old data.
+    """
+    obj_key, trans_type, handle, old_data, new_data = record
+    if (isinstance(old_data, (tuple, list)) and
+            isinstance(new_data, (tuple, list)) and
+            len(old_data) == len(new_data)):
+        changes = tuple((index, value) for index, (old, value)
+                        in enumerate(zip(old_data, new_data)) if old != value)
+        record = (obj_key, trans_type, handle, old_data, changes, True)
+    else:
+        record = (obj_key, trans_type, handle, old_data, new_data, False)
+    return pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+
+def _decode_undo_record(blob):
+    """
+    Decode an undo record encoded by _encode_undo_record.
+    """
+    obj_key, trans_type, handle, old_data, new_data, is_diff = \
+        pickle.loads(blob)
+    if is_diff:
+        data = list(old_data)
+        for index, value in new_data:
+            data[index] = value
+        new_data = tuple(data)
+    return (obj_key, trans_type, handle, old_data, new_data)
+
 class DbGenericUndo(DbUndo):
+    """
+    Undo/redo manager that keeps the records of the transactions in an
+    SQLite database file, so that only the records being undone or redone
+    are held in memory.  The records of the current transaction are only
+    encoded and written when it is committed.
+
+    The oldest transactions are dropped from the history when there are
+    more than 'database.undo-history-size' of them, or when they are older
+    than 'database.undo-history-age' minutes.
+    """
     def __init__(self, grampsdb, path):
+        """
+        :param path: the file to store the records in.  If None, or if the
+                     file is used by another session, a temporary file is
+                     used.
+        """
         super(DbGenericUndo, self).__init__(grampsdb)
-        self.undodb = []
+        self.path = path
+        self.undodb = None
+        self.__count = 0
+        # records of the current transaction, see append
+        self.__pending = []
+        # whether the records are stored in path, see __connect
+        self.__owner = False
 
     def open(self, value=None):
         """
-        Open the backing storage.  Needs to be overridden in the derived
-        class.
+        Open the backing storage.  The file is only created when the first
+        record is added, so that read-only databases never touch it.
         """
-        pass
+        self.__count = 0
+        self.__pending = []
+
+    def __connect(self):
+        """
+        Create the file and the table of the records.  A file left by a
+        session that crashed is replaced.  A file that another session of
+        the database still uses is left alone.
+        """
+        self.__owner = False
+        if self.path:
+            try:
+                self.undodb = self.__create(self.path)
+                self.__owner = True
+            except sqlite3.OperationalError:
+                LOG.warning("Undo file %s is in use, using a temporary file",
+                            self.path)
+            except sqlite3.DatabaseError:
+                # damaged by a crash
+                os.remove(self.path)
+                self.undodb = self.__create(self.path)
+                self.__owner = True
+        if self.undodb is None:
+            self.undodb = self.__create("")
+
+    @staticmethod
+    def __create(path):
+        """
+        Open an SQLite database file, and lock it for the session.  Raise
+        sqlite3.OperationalError if another session has locked it.
+        """
+        undodb = sqlite3.connect(path, timeout=0)
+        try:
+            # The history does not survive the session, so it need not be
+            # safe from crashes.
+            undodb.execute("PRAGMA journal_mode = OFF")
+            undodb.execute("PRAGMA synchronous = OFF")
+            # The lock is held from the first write until the file is
+            # closed, which tells a live session from one that crashed.
+            undodb.execute("PRAGMA locking_mode = EXCLUSIVE")
+            undodb.execute("DROP TABLE IF EXISTS undo")
+            undodb.execute("CREATE TABLE undo "
+                           "(recno INTEGER PRIMARY KEY, record BLOB)")
+            undodb.commit()
+        except sqlite3.DatabaseError:
+            undodb.close()
+            raise
+        return undodb
 
     def close(self):
         """
-        Close the backing storage.  Needs to be overridden in the derived
-        class.
+        Close the backing storage, and remove the file if it was ours.
         """
-        pass
+        if self.undodb is None:
+            return
+        self.undodb.close()
+        self.undodb = None
+        if self.__owner and os.path.exists(self.path):
+            os.remove(self.path)
+        self.__owner = False
+
+    def clear(self):
+        """
+        Clear the undo/redo list and the backing storage.
+        """
+        super(DbGenericUndo, self).clear()
+        if self.undodb is not None:
+            self.undodb.execute("DELETE FROM undo")
+            self.undodb.commit()
+
+    def commit(self, txn, msg):
+        """
+        Commit the transaction to the undo/redo database, and drop the
+        transactions that no longer fit in the history.
+        """
+        super(DbGenericUndo, self).commit(txn, msg)
+        self.__write_pending()
+        size = config.get('database.undo-history-size')
+        age = config.get('database.undo-history-age')
+        limit = txn.timestamp - age * 60
+        while self.undoq and ((size and len(self.undoq) > size) or
+                              (age and self.undoq[0].timestamp < limit)):
+            self.__drop(self.undoq.popleft())
+
+    def abort(self):
+        """
+        Drop the records added since the last commit.
+        """
+        self.__count -= len(self.__pending)
+        self.__pending = []
+
+    def __write_pending(self):
+        """
+        Encode and write the records added since the last commit.
+        """
+        if not self.__pending:
+            return
+        if self.undodb is None:
+            self.__connect()
+        first = self.__count - len(self.__pending)
+        self.undodb.executemany("INSERT INTO undo (recno, record) "
+                                "VALUES (?, ?)",
+                                [(first + index, _encode_undo_record(value))
+                                 for index, value
+                                 in enumerate(self.__pending)])
+        self.undodb.commit()
+        self.__pending = []
+
+    def __drop(self, txn):
+        """
+        Remove the records of a transaction that left the history.
+        """
+        self.undo_history_timestamp = txn.timestamp
+        if txn.first is not None and self.undodb is not None:
+            self.undodb.execute("DELETE FROM undo "
+                                "WHERE recno BETWEEN ? AND ?",
+                                [txn.first, txn.last])
+            self.undodb.commit()
 
     def append(self, value):
         """
-        Add a new entry on the end.  Needs to be overridden in the derived
-        class.
+        Add a new record on the end, and return its number.
+
+        :param value: (object key, transaction type, handle, old data,
+                      new data) tuple.
         """
-        self.undodb.append(value)
+        self.__pending.append(value)
+        self.__count += 1
+        return self.__count - 1
 
     def __getitem__(self, index):
         """
-        Returns an entry by index number.  Needs to be overridden in the
-        derived class.
+        Returns a record by number.
         """
-        return self.undodb[index]
+        first = self.__count - len(self.__pending)
+        if first <= index < self.__count:
+            return self.__pending[index - first]
+        row = None
+        if self.undodb is not None:
+            row = self.undodb.execute("SELECT record FROM undo "
+                                      "WHERE recno = ?", [index]).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return _decode_undo_record(row[0])
 
     def __setitem__(self, index, value):
         """
-        Set an entry to a value.  Needs to be overridden in the derived class.
+        Set a record to a value.
         """
-        self.undodb[index] = value
+        first = self.__count - len(self.__pending)
+        if first <= index < self.__count:
+            self.__pending[index - first] = value
+            return
+        if self.undodb is None or index >= self.__count:
+            raise IndexError(index)
+        self.undodb.execute("INSERT OR REPLACE INTO undo (recno, record) "
+                            "VALUES (?, ?)",
+                            [index, _encode_undo_record(value)])
 
     def __len__(self):
         """
-        Returns the number of entries.  Needs to be overridden in the derived
-        class.
+        Returns the number of records added.
         """
-        return len(self.undodb)
+        return self.__count
 
     def _redo(self, update_history):
         """
@@ -124,23 +311,23 @@ class DbGenericUndo(DbUndo):
         transaction = txn
         db = self.db
         subitems = transaction.get_recnos()
-        # sigs[obj_type][trans_type]
-        sigs = [[[] for trans_type in range(3)] for key in range(11)]
+        signals = SignalQueue()
 
         # Process all records in the transaction
         try:
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = \
-                    pickle.loads(self.undodb[record_id])
+                    self[record_id]
 
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(new_data, handle)
                 else:
                     self.db.undo_data(new_data, handle, key)
-                    sigs[key][trans_type].append(handle)
+                    signals.push(KEY_TO_NAME_MAP[key] + _SIGNAL[trans_type],
+                                 ([handle], ))
             # now emit the signals
-            self.undo_sigs(sigs, False)
+            self.db.emit_signals(signals)
 
             self.db._txn_commit()
         except:
@@ -173,23 +360,23 @@ class DbGenericUndo(DbUndo):
         transaction = txn
         db = self.db
         subitems = transaction.get_recnos(reverse=True)
-        # sigs[obj_type][trans_type]
-        sigs = [[[] for trans_type in range(3)] for key in range(11)]
+        signals = SignalQueue()
 
         # Process all records in the transaction
         try:
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = \
-                        pickle.loads(self.undodb[record_id])
+                        self[record_id]
 
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(old_data, handle)
                 else:
                     self.db.undo_data(old_data, handle, key)
-                    sigs[key][trans_type].append(handle)
+                    signals.push(KEY_TO_NAME_MAP[key] +
+                                 _UNDO_SIGNAL[trans_type], ([handle], ))
             # now emit the signals
-            self.undo_sigs(sigs, True)
+            self.db.emit_signals(signals)
 
             self.db._txn_commit()
         except:
@@ -212,35 +399,6 @@ class DbGenericUndo(DbUndo):
             db.undo_history_callback()
         return True
 
-    def undo_sigs(self, sigs, undo):
-        """
-        Helper method to undo/redo the signals for changes made
-        We want to do deletes and adds first
-        Note that if 'undo' we swap emits
-        """
-        for trans_type in [TXNDEL, TXNADD, TXNUPD]:
-            for obj_type in range(11):
-                handles = sigs[obj_type][trans_type]
-                if handles:
-                    if not undo and trans_type == TXNDEL \
-                            or undo and trans_type == TXNADD:
-                        typ = '-delete'
-                    else:
-                        # don't update a handle if its been deleted, and note
-                        # that 'deleted' handles are in the 'add' list if we
-                        # are undoing
-                        handles = [handle for handle in handles
-                                   if handle not in
-                                   sigs[obj_type][TXNADD if undo else TXNDEL]]
-                        if ((not undo) and trans_type == TXNADD) \
-                                or (undo and trans_type == TXNDEL):
-                            typ = '-add'
-                        else:   # TXNUPD
-                            typ = '-update'
-                    if handles:
-                        self.db.emit(KEY_TO_NAME_MAP[obj_type] + typ,
-                                     (handles,))
-
 class Cursor:
     def __init__(self, iterator):
         self.iterator = iterator
@@ -302,7 +460,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     __callback_map = {}
 
-    VERSION = (20, 0, 0)
+    VERSION = (21, 0, 0)
 
     def __init__(self, directory=None):
         DbReadBase.__init__(self)
@@ -531,6 +689,13 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.surname_list = []
         self.genderStats = GenderStats() # can pass in loaded stats as dict
         self.owner = Researcher()
+        # Records of primary objects, maintained by the backend
+        self._cache = ObjectCache(CACHE_SIZES)
+        # Change signals collected while they are held, see hold_signals
+        self._signal_queue = SignalQueue()
+        self._signal_holds = 0
+        self._signal_interval = None
+        self._signal_time = None
         if directory:
             self.load(directory)
 
@@ -577,6 +742,11 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
         self.readonly = mode == DBMODE_R
 
+        if config.get('database.object-cache'):
+            self._cache = ObjectCache(CACHE_SIZES)
+        else:
+            self._cache = ObjectCache(dict.fromkeys(CACHE_SIZES, 0))
+
         if not self.readonly and directory != ':memory:':
             write_lock_file(directory)
 
@@ -626,7 +796,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
         self._set_save_path(directory)
 
-        if self._directory:
+        if self._directory and self._directory != ':memory:':
             self.undolog = os.path.join(self._directory, DBUNDOFN)
         else:
             self.undolog = None
@@ -661,6 +831,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                       dbversion, self.VERSION[0])
             if force_schema_upgrade:
                 self._gramps_upgrade(dbversion, directory, callback)
+                self._cache.clear()
             else:
                 self.close()
                 raise DbUpgradeRequiredError(dbversion, self.VERSION[0])
@@ -742,8 +913,12 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             except IOError:
                 pass
 
+        if self.undodb is not None:
+            self.undodb.close()
         self.db_is_open = False
         self._directory = None
+        self._cache.clear()
+        self._signal_queue.clear()
 
     def is_open(self):
         return self.db_is_open
@@ -2013,6 +2188,43 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             [str(attr.type) for attr in media.attribute_list
              if attr.type.is_custom() and str(attr.type)])
 
+    def commit_many(self, objs, trans, change_time=None):
+        """
+        Commit a sequence of primary objects to the database, storing the
+        changes as part of the transaction.
+
+        The objects may be of mixed types.  Backends that support it buffer
+        the writes and apply them in bulk, together with the reference map
+        updates, before returning.
+        """
+        started = self._bulk_begin(trans)
+        done = False
+        try:
+            for obj in objs:
+                commit_func = self._get_table_func(obj.__class__.__name__,
+                                                   "commit_func")
+                commit_func(obj, trans, change_time)
+            done = True
+        finally:
+            if started:
+                self._bulk_end(discard=not done)
+
+    def _bulk_begin(self, trans):
+        """
+        Start buffering object writes for the given transaction.
+
+        Return True if a new buffer was started, or False if the backend
+        does not buffer writes or a buffer is already active.
+        """
+        return False
+
+    def _bulk_end(self, discard=False):
+        """
+        Write out and stop buffering object writes.  If discard is True,
+        the buffered writes are dropped instead.
+        """
+        pass
+
     def _after_commit(self, transaction):
         """
         Post-transaction commit processing
@@ -2368,6 +2580,64 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.emit('note-rebuild')
         self.emit('tag-rebuild')
 
+    def hold_signals(self, interval=None):
+        """
+        Collect the signals of the changes made by the following
+        transactions, and emit them coalesced when :meth:`release_signals`
+        is called, so that the clients see each changed object once.  If an
+        interval in seconds is given, the signals collected so far are also
+        emitted once that time has passed.  Calls can be nested.
+        """
+        if interval is not None and (self._signal_interval is None or
+                                     interval < self._signal_interval):
+            self._signal_interval = interval
+        self._signal_holds += 1
+
+    def release_signals(self):
+        """
+        End a call of :meth:`hold_signals`, emitting the collected signals
+        when the outermost call ends.
+        """
+        if not self._signal_holds:
+            return
+        self._signal_holds -= 1
+        if not self._signal_holds:
+            self._signal_interval = None
+            self._emit_held_signals()
+
+    def emit_signals(self, signals):
+        """
+        Emit the signals of a :class:`.SignalQueue`, coalesced.
+        """
+        for (signal, args) in signals.pop():
+            self.emit(signal, args)
+
+    def _hold_signal(self, signal_name, args):
+        """
+        Collect the change signals while they are held.
+        """
+        if not self._signal_holds or signal_name not in SIGNALS:
+            return False
+        self._signal_queue.push(signal_name, args)
+        now = time.perf_counter()
+        if self._signal_time is None:
+            self._signal_time = now
+        elif (self._signal_interval is not None and
+              now - self._signal_time >= self._signal_interval):
+            self._emit_held_signals()
+        return True
+
+    def _emit_held_signals(self):
+        """
+        Emit the signals collected while they were held.
+        """
+        self._signal_time = None
+        holds, self._signal_holds = self._signal_holds, 0
+        try:
+            self.emit_signals(self._signal_queue)
+        finally:
+            self._signal_holds = holds
+
     def get_save_path(self):
         return self._directory
 
@@ -2403,6 +2673,15 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def redo(self, update_history=True):
         return self.undodb.redo(update_history)
 
+    def get_cache_stats(self):
+        """
+        Return the number of hits, misses, evictions and cached records of
+        each primary object type, as a dictionary of tuples keyed by table
+        name.
+        """
+        return {KEY_TO_NAME_MAP[obj_key]: stats
+                for obj_key, stats in self._cache.get_stats().items()}
+
     def get_summary(self):
         """
         Returns dictionary of summary item.
@@ -2482,7 +2761,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         from gramps.gen.db.upgrade import (
             gramps_upgrade_14, gramps_upgrade_15, gramps_upgrade_16,
             gramps_upgrade_17, gramps_upgrade_18, gramps_upgrade_19,
-            gramps_upgrade_20)
+            gramps_upgrade_20, gramps_upgrade_21)
 
         if version < 14:
             gramps_upgrade_14(self)
@@ -2498,6 +2777,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             gramps_upgrade_19(self)
         if version < 20:
             gramps_upgrade_20(self)
+        if version < 21:
+            gramps_upgrade_21(self)
 
         self.rebuild_secondary(callback)
         self.reindex_reference_map(callback)
@@ -0,0 +1,204 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Summary of a person, as shown in the columns of the people views.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from collections import namedtuple
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..lib.date import Date
+from ..lib.eventtype import EventType
+from ..lib.eventroletype import EventRoleType
+from ..lib.familyreltype import FamilyRelType
+from ..lib.childreftype import ChildRefType
+from ..lib.notetype import NoteType
+from ..errors import HandleError
+
+# The summary only holds values that do not depend on the display
+# preferences, such as the date format, so events and people are given by
+# their handles.  A *_fallback field is True when the event is a fallback
+# event, such as a baptism instead of a birth.
+PersonSummary = namedtuple('PersonSummary', [
+    'birth',                # handle of the event shown as birth date
+    'birth_fallback',
+    'birth_sortval',        # sort value of its date
+    'birth_valid',          # True if its date is valid
+    'death',                # handle of the event shown as death date
+    'death_fallback',
+    'death_sortval',
+    'death_valid',
+    'birth_place',          # handle of the event shown as birth place
+    'birth_place_fallback',
+    'death_place',          # handle of the event shown as death place
+    'death_place_fallback',
+    'spouses',              # handles of the spouses, in family order
+    'parents',              # number of parents
+    'marriages',            # number of families with a married relation
+    'children',             # number of birth children
+    'todo',                 # number of to do notes
+    ])
+
+BIRTH_FALLBACKS = (EventType.BAPTISM, EventType.CHRISTEN)
+DEATH_FALLBACKS = (EventType.BURIAL, EventType.CREMATION,
+                   EventType.CAUSE_DEATH)
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def _get_object(get_func, handle):
+    """
+    Return the object with the given handle, or None if it does not exist.
+    """
+    try:
+        return get_func(handle)
+    except HandleError:
+        return None
+
+def _has_date(event):
+    """
+    Return True if the date of the event is displayed as a non-empty string.
+    """
+    date = event.get_date_object()
+    if date.get_modifier() == Date.MOD_TEXTONLY:
+        return bool(date.get_text())
+    return date.get_start_date() != Date.EMPTY
+
+def _find_event(db, person, index, fallbacks, check):
+    """
+    Return (event, fallback) for the event at the given index of the event
+    references of the person, or else for the first event of one of the
+    fallback types in which the person has the primary role.  A fallback
+    event must pass the check, as must the indexed event unless it is None.
+    """
+    event_refs = person.get_event_ref_list()
+    if 0 <= index < len(event_refs):
+        event = _get_object(db.get_event_from_handle,
+                            event_refs[index].ref)
+        if event is None:
+            return None, False
+        if check is None or check(event):
+            return event, False
+    for event_ref in event_refs:
+        if event_ref.get_role() != EventRoleType.PRIMARY:
+            continue
+        event = _get_object(db.get_event_from_handle, event_ref.ref)
+        if (event and event.get_type() in fallbacks and
+                (check or _has_date)(event)):
+            return event, True
+    return None, False
+
+def _has_place(event):
+    """
+    Return True if the event has a place.
+    """
+    return bool(event.get_place_handle())
+
+def _date_values(event):
+    """
+    Return the sort value and validity of the date of an event.
+    """
+    if event is None:
+        return 0, True
+    date = event.get_date_object()
+    return date.get_sort_value(), date.get_valid()
+
+def _get_handle(event):
+    """
+    Return the handle of an event, or None.
+    """
+    return event.handle if event is not None else None
+
+def get_person_summary(db, person):
+    """
+    Compute the summary of a person of the given database.
+
+    :param person: the person.
+    :type person: :py:class:`.Person`
+    :returns: the summary of the person.
+    :rtype: PersonSummary
+    """
+    birth, birth_fallback = _find_event(db, person,
+                                        person.birth_ref_index,
+                                        BIRTH_FALLBACKS, None)
+    death, death_fallback = _find_event(db, person,
+                                        person.death_ref_index,
+                                        DEATH_FALLBACKS, None)
+    birth_place, birth_place_fallback = _find_event(
+        db, person, person.birth_ref_index, BIRTH_FALLBACKS,
+        _has_place)
+    death_place, death_place_fallback = _find_event(
+        db, person, person.death_ref_index, DEATH_FALLBACKS,
+        _has_place)
+
+    spouses = []
+    marriages = children = 0
+    for family_handle in person.get_family_handle_list():
+        family = _get_object(db.get_family_from_handle, family_handle)
+        if family is None:
+            continue
+        for spouse_handle in (family.get_father_handle(),
+                              family.get_mother_handle()):
+            if spouse_handle and spouse_handle != person.handle:
+                spouses.append(spouse_handle)
+        if int(family.get_relationship()) == FamilyRelType.MARRIED:
+            marriages += 1
+        for child_ref in family.get_child_ref_list():
+            if (child_ref.get_father_relation() == ChildRefType.BIRTH and
+                    child_ref.get_mother_relation() == ChildRefType.BIRTH):
+                children += 1
+
+    parents = 0
+    for family_handle in person.get_parent_family_handle_list():
+        family = _get_object(db.get_family_from_handle, family_handle)
+        if family is None:
+            continue
+        if family.get_father_handle():
+            parents += 1
+        if family.get_mother_handle():
+            parents += 1
+
+    todo = 0
+    for note_handle in person.get_note_list():
+        note = _get_object(db.get_note_from_handle, note_handle)
+        if note and int(note.get_type()) == NoteType.TODO:
+            todo += 1
+
+    birth_sortval, birth_valid = _date_values(birth)
+    death_sortval, death_valid = _date_values(death)
+    return PersonSummary(_get_handle(birth), birth_fallback,
+                         birth_sortval, birth_valid,
+                         _get_handle(death), death_fallback,
+                         death_sortval, death_valid,
+                         _get_handle(birth_place), birth_place_fallback,
+                         _get_handle(death_place), death_place_fallback,
+                         tuple(spouses), parents, marriages, children, todo)
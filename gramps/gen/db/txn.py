@@ -28,11 +28,10 @@ database.
 # Standard python modules
 #
 #-------------------------------------------------------------------------
-import pickle
 import logging
 from collections import defaultdict
 import time
-import inspect
+import sys
 import os
 
 #-------------------------------------------------------------------------
@@ -45,6 +44,17 @@ from .dbconst import DBLOGNAME
 _LOG = logging.getLogger(DBLOGNAME)
 
 
+def _get_caller(depth):
+    """
+    Return the file name, line number and function name of a caller, given
+    its depth relative to the caller of this function.
+    """
+    frame = sys._getframe(depth + 1)
+    code = frame.f_code
+    return (os.path.split(code.co_filename)[1], frame.f_lineno,
+            code.co_name)
+
+
 #-------------------------------------------------------------------------
 #
 # Gramps transaction class
@@ -62,7 +72,7 @@ class DbTxn(defaultdict):
         """
         Context manager entry method
         """
-        _LOG.debug("    DbTxn %s entered" % hex(id(self)))
+        _LOG.debug("    DbTxn %s entered", hex(id(self)))
         self.start_time = time.time()
         self.db.transaction_begin(self)
         return self
@@ -76,17 +86,12 @@ class DbTxn(defaultdict):
         else:
             self.db.transaction_abort(self)
 
-        elapsed_time = time.time() - self.start_time
-        if __debug__:
-            caller_frame = inspect.stack()[1]
+        # Tracing the caller is opt-in, by enabling debug logging
+        if _LOG.isEnabledFor(logging.DEBUG):
+            elapsed_time = time.time() - self.start_time
             _LOG.debug("    **** DbTxn %s exited. Called from file %s, "
-                       "line %s, in %s **** %.2f seconds" %
-                       ((hex(id(self)),)+
-                        (os.path.split(caller_frame[1])[1],)+
-                        tuple(caller_frame[i] for i in range(2, 4))+
-                        (elapsed_time,)
-                       )
-                      )
+                       "line %s, in %s **** %.2f seconds",
+                       hex(id(self)), *(_get_caller(1) + (elapsed_time,)))
 
         return False
 
@@ -123,26 +128,19 @@ class DbTxn(defaultdict):
                 data = pickled representation of the object
         """
 
-        # Conditional on __debug__ because all that frame stuff may be slow
-        if __debug__:
-            caller_frame = inspect.stack()[1]
+        # Tracing the caller is opt-in, by enabling debug logging
+        if _LOG.isEnabledFor(logging.DEBUG):
+            caller = _get_caller(1)
             # If the call comes from gramps.gen.db.generic.DbGenericTxn.__init__
             # then it is just a dummy redirect, so we need to go back another
             # frame to get any real information. The test does not accurately
             # check this, but seems to be good enough for the current diagnostic
             # purposes.
-            if os.path.split(caller_frame[1])[1] == "generic.py" and \
-               caller_frame[3] == "__init__":
-                caller_frame = inspect.stack()[2]
+            if caller[0] == "generic.py" and caller[2] == "__init__":
+                caller = _get_caller(2)
             _LOG.debug("%sDbTxn %s instantiated for '%s'. Called from file %s, "
-                       "line %s, in %s" %
-                       (("Batch " if batch else "",)+
-                        (hex(id(self)),)+
-                        (msg,)+
-                        (os.path.split(caller_frame[1])[1],)+
-                        (tuple(caller_frame[i] for i in range(2, 4)))
-                       )
-                      )
+                       "line %s, in %s", "Batch " if batch else "",
+                       hex(id(self)), msg, *caller)
         defaultdict.__init__(self, list, {})
 
         self.msg = msg
@@ -178,14 +176,13 @@ class DbTxn(defaultdict):
         data is the tuple returned by the object's serialize method.
         """
         self.last = self.commitdb.append(
-            pickle.dumps((obj_type, trans_type, handle, old_data, new_data), 1))
+            (obj_type, trans_type, handle, old_data, new_data))
         if self.last is None:
             self.last = len(self.commitdb) -1
         if self.first is None:
             self.first = self.last
-        _LOG.debug('added to trans: %d %d %s' % (obj_type, trans_type, handle))
-        self[(obj_type, trans_type)] += [(handle, new_data)]
-        return
+        _LOG.debug('added to trans: %d %d %s', obj_type, trans_type, handle)
+        self[(obj_type, trans_type)].append((handle, new_data))
 
     def get_recnos(self, reverse=False):
         """
@@ -208,7 +205,7 @@ class DbTxn(defaultdict):
         for the PrimaryObject, and a tuple representing the data created by
         the object's serialize method.
         """
-        return pickle.loads(self.commitdb[recno])
+        return self.commitdb[recno]
 
     def __len__(self):
         """
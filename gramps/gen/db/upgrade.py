@@ -37,7 +37,6 @@ from gramps.cli.clidbman import NAME_FILE
 from gramps.gen.lib import EventType, NameOriginType, Tag, MarkerType
 from gramps.gen.utils.file import create_checksum
 from gramps.gen.utils.id import create_id
-from gramps.gui.dialog import (InfoDialog)
 from .dbconst import (PERSON_KEY, FAMILY_KEY, EVENT_KEY, MEDIA_KEY, PLACE_KEY,
                       REPOSITORY_KEY, CITATION_KEY, SOURCE_KEY, NOTE_KEY,
                       TAG_KEY)
@@ -47,6 +46,41 @@ _ = glocale.translation.gettext
 LOG = logging.getLogger(".upgrade")
 
 
+def gramps_upgrade_21(self):
+    """
+    Upgrade database from version 20 to 21.
+    """
+    self._txn_begin()
+
+    # Recreate the reference table with class codes and a primary key,
+    # which is filled again by the caller
+    self.dbapi.execute("DROP TABLE reference")
+    self._create_reference_table()
+    self._set_class_codes(True)
+
+    # Add the tables of the parent/child graph, which are filled by the
+    # caller.  A tree converted from BSDDB has them already.
+    self._create_genealogy_tables()
+    self.dbapi.execute("DELETE FROM parent_family")
+    self.dbapi.execute("DELETE FROM family_child")
+    self._has_genealogy = True
+
+    # Add the person summary table, which is emptied and filled by the
+    # caller
+    self._create_person_summary_table()
+    self._has_person_summary = True
+
+    # Add the locale sort key columns, which are filled by the caller
+    self._create_sort_key_columns()
+    self._sort_keys = True
+
+    self._txn_commit()
+    self._set_sort_key_locale()
+
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata('version', 21)
+
+
 def gramps_upgrade_20(self):
     """
     Placeholder update.
@@ -734,6 +768,7 @@ def gramps_upgrade_16(self):
              "Tools -> Family Tree Processing -> Merge\n"
              "in order to merge citations that contain similar\n"
              "information")
+    from gramps.gui.dialog import InfoDialog
     InfoDialog(_('Upgrade Statistics'), txt, monospaced=True)  # TODO no-parent
 
 
@@ -22,19 +22,40 @@
 Package providing filtering framework for Gramps.
 """
 
+import threading
+
 CustomFilters = None
 
+# Copies of the custom filters used by a thread instead, see FilterJob
+_THREAD = threading.local()
+
 from ..const import CUSTOM_FILTERS
 from ._filterlist import FilterList
 from ._genericfilter import (GenericFilter, GenericFilterFactory,
                              DeferredFilter, DeferredFamilyFilter)
 from ._paramfilter import ParamFilter
 from ._searchfilter import SearchFilter, ExactSearchFilter
+from ._filterjob import FilterJob
 
 def reload_custom_filters():
     global CustomFilters
     CustomFilters = FilterList(CUSTOM_FILTERS)
     CustomFilters.load()
 
+def get_custom_filters():
+    """
+    Return the custom filters that the rules matching other filters look
+    up: the copies of the current thread if it has any, or CustomFilters.
+    """
+    filters = getattr(_THREAD, 'custom_filters', None)
+    return CustomFilters if filters is None else filters
+
+def set_thread_custom_filters(filters):
+    """
+    Make the rules applied by the current thread look up the given copies
+    of the custom filters, or CustomFilters again if filters is None.
+    """
+    _THREAD.custom_filters = filters
+
 # if not CustomFilters:  # moved to viewmanager
     # reload_custom_filters()
@@ -0,0 +1,182 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Apply a filter in a worker thread.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import copy
+import logging
+import threading
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+# CustomFilters is set after the import, see _matchesfilterbase
+import gramps.gen.filters
+
+LOG = logging.getLogger(".filter")
+
+# Number of objects checked before the matches are handed over
+CHUNK_SIZE = 500
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def _copy_filter(gfilter):
+    """
+    Return a copy of a filter with rules of its own, since prepared rules
+    keep state.
+    """
+    copied = copy.copy(gfilter)
+    copied.flist = [rule.__class__(rule.list, rule.use_regex)
+                    for rule in gfilter.flist]
+    return copied
+
+#-------------------------------------------------------------------------
+#
+# FilterCopies class
+#
+#-------------------------------------------------------------------------
+class FilterCopies:
+    """
+    Copies of the custom filters, for the rules that match other filters.
+    The filters of a namespace are copied when first looked up.
+    """
+
+    def __init__(self, custom_filters):
+        self.__custom_filters = custom_filters
+        self.__namespaces = {}
+
+    def get_filters_dict(self, namespace='generic'):
+        """
+        Return the copies of the filters of a namespace, by name.
+        """
+        if namespace not in self.__namespaces:
+            filters = self.__custom_filters.get_filters_dict(namespace)
+            self.__namespaces[namespace] = {
+                name: _copy_filter(filt) for name, filt in filters.items()}
+        return self.__namespaces[namespace]
+
+#-------------------------------------------------------------------------
+#
+# FilterJob class
+#
+#-------------------------------------------------------------------------
+class FilterJob:
+    """
+    Apply a filter in a worker thread, to a read-only instance of the
+    database, so that the caller can show the first matches while the
+    remaining objects are still being checked.
+
+    The matches are handed to the callback one chunk at a time, in the
+    order of the id_list, or of the cursor if no id_list is given.  The
+    callback is then called with None once the filter has been applied,
+    unless the job was cancelled.  It is called in the worker thread, so a
+    GUI must pass the matches on to its main loop.
+    """
+
+    def __init__(self, db, gfilter, callback, id_list=None, tupleind=None,
+                 tree=False, chunk_size=CHUNK_SIZE):
+        """
+        :param db: the database to read.
+        :param gfilter: the filter to apply.  The job applies a copy, and
+                        copies of the custom filters it refers to, so that
+                        the filters can still be used meanwhile.
+        :param callback: function called with the list of matches of each
+                         chunk, and with None when done.
+        :param id_list: the items to check, as in GenericFilter.apply.
+        """
+        self.__db = db
+        self.__filter = _copy_filter(gfilter)
+        custom_filters = gramps.gen.filters.get_custom_filters()
+        self.__custom_filters = (None if custom_filters is None
+                                 else FilterCopies(custom_filters))
+        self.__callback = callback
+        self.__id_list = id_list
+        self.__tupleind = tupleind
+        self.__tree = tree
+        self.__chunk_size = chunk_size
+        self.__cancelled = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """
+        Start applying the filter.  Return False, without starting, if the
+        database cannot be read by another thread.
+        """
+        reader = self.__db.open_reader()
+        if reader is None:
+            return False
+        self.__thread = threading.Thread(target=self.__run, args=(reader,),
+                                         name="FilterJob", daemon=True)
+        self.__thread.start()
+        return True
+
+    def cancel(self):
+        """
+        Stop applying the filter.  The callback is not called anymore once
+        this returns, except for a call that is in progress.
+        """
+        self.__cancelled.set()
+
+    def cancelled(self):
+        """
+        Return True if the job has been cancelled.
+        """
+        return self.__cancelled.is_set()
+
+    def join(self, timeout=None):
+        """
+        Wait until the worker thread has finished.
+        """
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+    def __run(self, reader):
+        """
+        Apply the filter, in the worker thread.
+        """
+        gramps.gen.filters.set_thread_custom_filters(self.__custom_filters)
+        chunks = self.__filter.iter_apply(reader, self.__id_list,
+                                          self.__tupleind, self.__tree,
+                                          self.__chunk_size)
+        try:
+            for matches in chunks:
+                if self.__cancelled.is_set():
+                    return
+                self.__callback(matches)
+        except Exception:
+            LOG.exception("Applying filter '%s' failed",
+                          self.__filter.get_name())
+        finally:
+            chunks.close()
+            self.__db.close_reader(reader)
+        if not self.__cancelled.is_set():
+            self.__callback(None)
@@ -30,6 +30,7 @@ Package providing filtering framework for Gramps.
 #
 #------------------------------------------------------------------------
 from ..lib.person import Person
+from ..lib.lazyperson import LazyPerson
 from ..lib.family import Family
 from ..lib.src import Source
 from ..lib.citation import Citation
@@ -130,6 +131,13 @@ class GenericFilter:
     def make_obj(self):
         return Person()
 
+    def make_lazy_obj(self, data):
+        """
+        Return an object built from the raw data, for rules to read from.
+        Its secondary objects may only be unserialized when accessed.
+        """
+        return LazyPerson(data)
+
     def find_from_handle(self, db, handle):
         return db.get_person_from_handle(handle)
 
@@ -146,8 +154,7 @@ class GenericFilter:
             with (self.get_tree_cursor(db) if tree else
                   self.get_cursor(db)) as cursor:
                 for handle, data in cursor:
-                    person = self.make_obj()
-                    person.unserialize(data)
+                    person = self.make_lazy_obj(data)
                     if user:
                         user.step_progress()
                     if task(db, person) != self.invert:
@@ -167,7 +174,81 @@ class GenericFilter:
             user.end_progress()
         return final_list
 
+    def get_sql_clause(self, rule, db):
+        """
+        Return the SQL expression of a rule, or None if it has none.
+
+        Subclasses that override apply, for example to test a related
+        object, do not inherit the expression of their base class.
+        """
+        cls = type(rule)
+        owner = next(base for base in cls.__mro__ if 'to_sql' in vars(base))
+        if vars(owner).get('apply') is not cls.apply:
+            return None
+        return rule.to_sql(db)
+
+    def check_sql(self, db, logical_op, user=None):
+        """
+        Apply the filter to all objects, evaluating rules in SQL.
+
+        Rules that have an SQL expression are combined into a WHERE clause,
+        and only the objects it selects are unserialized to apply the
+        remaining rules.  Return None if the database does not support
+        SQL, or if the rules cannot be split this way.
+        """
+        clauses = []
+        params = []
+        remaining = []
+        for rule in self.flist:
+            sql = self.get_sql_clause(rule, db)
+            if sql is None:
+                remaining.append(rule)
+            else:
+                clauses.append('(%s)' % sql[0])
+                params.extend(sql[1])
+        if not clauses or (remaining and logical_op != 'and'):
+            return None
+        if logical_op == 'and':
+            where = ' AND '.join(clauses)
+        elif logical_op == 'or':
+            where = ' OR '.join(clauses)
+        elif logical_op == 'one':
+            where = '%s = 1' % ' + '.join(clauses)
+        else:
+            where = '(%s) %% 2 = 1' % ' + '.join(clauses)
+
+        class_name = self.make_obj().__class__.__name__
+        if not remaining:
+            if self.invert:
+                where = 'NOT (%s)' % where
+            return db.select_handles(class_name, where, params)
+
+        rows = db.select_handles(class_name, where, params, with_data=True)
+        if rows is None:
+            return None
+        final_list = []
+        if user:
+            user.begin_progress(_('Filter'), _('Applying ...'), len(rows))
+        for handle, data in rows:
+            obj = self.make_lazy_obj(data)
+            if user:
+                user.step_progress()
+            val = all(rule.apply(db, obj) for rule in remaining)
+            if val != self.invert:
+                final_list.append(handle)
+        if self.invert:
+            # Objects rejected by the WHERE clause fail the filter
+            final_list.extend(db.select_handles(class_name,
+                                                'NOT (%s)' % where, params))
+        if user:
+            user.end_progress()
+        return final_list
+
     def check_and(self, db, id_list, user=None, tupleind=None, tree=False):
+        if id_list is None and not tree:
+            final_list = self.check_sql(db, 'and', user)
+            if final_list is not None:
+                return final_list
         final_list = []
         flist = self.flist
         if user:
@@ -177,8 +258,7 @@ class GenericFilter:
             with (self.get_tree_cursor(db) if tree else
                   self.get_cursor(db)) as cursor:
                 for handle, data in cursor:
-                    person = self.make_obj()
-                    person.unserialize(data)
+                    person = self.make_lazy_obj(data)
                     if user:
                         user.step_progress()
                     val = all(rule.apply(db, person) for rule in flist)
@@ -201,14 +281,26 @@ class GenericFilter:
         return final_list
 
     def check_or(self, db, id_list, user=None, tupleind=None, tree=False):
+        if id_list is None:
+            final_list = self.check_sql(db, 'or', user)
+            if final_list is not None:
+                return final_list
         return self.check_func(db, id_list, self.or_test, user, tupleind,
                                tree=False)
 
     def check_one(self, db, id_list, user=None, tupleind=None, tree=False):
+        if id_list is None:
+            final_list = self.check_sql(db, 'one', user)
+            if final_list is not None:
+                return final_list
         return self.check_func(db, id_list, self.one_test, user, tupleind,
                                tree=False)
 
     def check_xor(self, db, id_list, user=None, tupleind=None, tree=False):
+        if id_list is None:
+            final_list = self.check_sql(db, 'xor', user)
+            if final_list is not None:
+                return final_list
         return self.check_func(db, id_list, self.xor_test, user, tupleind,
                                tree=False)
 
@@ -265,6 +357,31 @@ class GenericFilter:
             rule.requestreset()
         return res
 
+    def iter_apply(self, db, id_list=None, tupleind=None, tree=False,
+                   chunk_size=1000):
+        """
+        Apply the filter using db, like apply does, but check the items in
+        chunks of chunk_size, and yield the items of each chunk that match
+        the filter as soon as it has been checked.  The chunks are in the
+        order of id_list, or of the cursor if id_list is not given.
+
+        The rules stay prepared until the generator is exhausted or closed.
+        """
+        if id_list is None:
+            with (self.get_tree_cursor(db) if tree else
+                  self.get_cursor(db)) as cursor:
+                id_list = [handle for handle, data in cursor]
+        m = self.get_check_func()
+        for rule in self.flist:
+            rule.requestprepare(db, None)
+        try:
+            for start in range(0, len(id_list), chunk_size):
+                yield m(db, id_list[start:start + chunk_size], None,
+                        tupleind, tree)
+        finally:
+            for rule in self.flist:
+                rule.requestreset()
+
 class GenericFamilyFilter(GenericFilter):
 
     def __init__(self, source=None):
@@ -276,6 +393,9 @@ class GenericFamilyFilter(GenericFilter):
     def make_obj(self):
         return Family()
 
+    def make_lazy_obj(self, data):
+        return Family().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_family_from_handle(handle)
 
@@ -293,6 +413,9 @@ class GenericEventFilter(GenericFilter):
     def make_obj(self):
         return Event()
 
+    def make_lazy_obj(self, data):
+        return Event().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_event_from_handle(handle)
 
@@ -310,6 +433,9 @@ class GenericSourceFilter(GenericFilter):
     def make_obj(self):
         return Source()
 
+    def make_lazy_obj(self, data):
+        return Source().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_source_from_handle(handle)
 
@@ -330,6 +456,9 @@ class GenericCitationFilter(GenericFilter):
     def make_obj(self):
         return Citation()
 
+    def make_lazy_obj(self, data):
+        return Citation().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_citation_from_handle(handle)
 
@@ -350,6 +479,9 @@ class GenericPlaceFilter(GenericFilter):
     def make_obj(self):
         return Place()
 
+    def make_lazy_obj(self, data):
+        return Place().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_place_from_handle(handle)
 
@@ -367,6 +499,9 @@ class GenericMediaFilter(GenericFilter):
     def make_obj(self):
         return Media()
 
+    def make_lazy_obj(self, data):
+        return Media().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_media_from_handle(handle)
 
@@ -384,6 +519,9 @@ class GenericRepoFilter(GenericFilter):
     def make_obj(self):
         return Repository()
 
+    def make_lazy_obj(self, data):
+        return Repository().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_repository_from_handle(handle)
 
@@ -401,6 +539,9 @@ class GenericNoteFilter(GenericFilter):
     def make_obj(self):
         return Note()
 
+    def make_lazy_obj(self, data):
+        return Note().unserialize(data)
+
     def find_from_handle(self, db, handle):
         return db.get_note_from_handle(handle)
 
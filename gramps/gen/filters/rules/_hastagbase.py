@@ -67,3 +67,9 @@ class HasTagBase(Rule):
         if self.tag_handle is None:
             return False
         return self.tag_handle in obj.get_tag_list()
+
+    def to_sql(self, db):
+        if self.tag_handle is None:
+            return ("0", [])
+        return ("handle IN (SELECT obj_handle FROM reference "
+                "WHERE ref_handle = ?)", [self.tag_handle])
@@ -33,6 +33,7 @@ LOG = logging.getLogger(".filter")
 #-------------------------------------------------------------------------
 # we need global variableCustomFilters, so we need to query gramps.gen.filters
 # when we need this variable, not import it at the start!
+# get_custom_filters returns it, or the copies that a FilterJob applies.
 import gramps.gen.filters
 from . import Rule
 from ...const import GRAMPS_LOCALE as glocale
@@ -57,8 +58,9 @@ class MatchesFilterBase(Rule):
     category = _('General filters')
 
     def prepare(self, db, user):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
+        custom_filters = gramps.gen.filters.get_custom_filters()
+        if custom_filters:
+            filters = custom_filters.get_filters_dict(self.namespace)
             if self.list[0] in filters:
                 filt = filters[self.list[0]]
                 for rule in filt.flist:
@@ -71,16 +73,18 @@ class MatchesFilterBase(Rule):
                                     % self.list[0])
 
     def reset(self):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
+        custom_filters = gramps.gen.filters.get_custom_filters()
+        if custom_filters:
+            filters = custom_filters.get_filters_dict(self.namespace)
             if self.list[0] in filters:
                 filt = filters[self.list[0]]
                 for rule in filt.flist:
                     rule.requestreset()
 
     def apply(self, db, obj):
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
+        custom_filters = gramps.gen.filters.get_custom_filters()
+        if custom_filters:
+            filters = custom_filters.get_filters_dict(self.namespace)
             if self.list[0] in filters:
                 filt = filters[self.list[0]]
                 return filt.check(db, obj.handle)
@@ -90,8 +94,9 @@ class MatchesFilterBase(Rule):
         """
         Return the selected filter or None.
         """
-        if gramps.gen.filters.CustomFilters:
-            filters = gramps.gen.filters.CustomFilters.get_filters_dict(self.namespace)
+        custom_filters = gramps.gen.filters.get_custom_filters()
+        if custom_filters:
+            filters = custom_filters.get_filters_dict(self.namespace)
             if self.list[0] in filters:
                 return filters[self.list[0]]
         return None
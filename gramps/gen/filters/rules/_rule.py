@@ -139,6 +139,22 @@ class Rule:
         """Apply the rule to some database entry; must be overwritten."""
         return True
 
+    def to_sql(self, db):
+        """
+        Return the rule as an SQL expression over the table of the objects
+        being filtered, or None if it cannot be expressed in SQL.
+
+        The expression is a (clause, params) tuple, with '?' placeholders for
+        the params.  It must be true exactly for the objects that apply would
+        accept, and never NULL.  It may only refer to the secondary columns of
+        the table and to the reference table.  It is called after prepare.
+
+        Besides the SQL functions, the backend provides regexp_i(pattern,
+        text) and contains_i(substring, text), which match the way
+        match_substring compares strings.
+        """
+        return None
+
     def display_values(self):
         """Return the labels and values of this rule."""
         l_v = ('%s="%s"' % (_(self.labels[ix][0] if
@@ -175,3 +191,15 @@ class Rule:
             return False
         else:
             return True
+
+    def sql_match_substring(self, param_index, column):
+        """
+        Return the SQL expression for match_substring applied to a column,
+        as a (clause, params) tuple for to_sql.
+        """
+        if not self.list[param_index]:
+            return ("1", [])
+        if self.use_regex:
+            return ("regexp_i(?, %s)" % column,
+                    [self.regex[param_index].pattern])
+        return ("contains_i(?, %s)" % column, [self.list[param_index]])
@@ -49,3 +49,6 @@ class MatchesPageSubstringOf(Rule):
     def apply(self, db, object):
         """ Apply the filter """
         return self.match_substring(0, object.get_page())
+
+    def to_sql(self, db):
+        return self.sql_match_substring(0, "page")
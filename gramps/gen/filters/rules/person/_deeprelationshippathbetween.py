@@ -46,23 +46,20 @@ _ = glocale.translation.gettext
 def get_family_handle_people(db, exclude_handle, family_handle):
     people = set()
 
-    family = db.get_family_from_handle(family_handle)
-
     def possibly_add_handle(h):
         if h is not None and h != exclude_handle:
             people.add(h)
 
-    possibly_add_handle(family.get_father_handle())
-    possibly_add_handle(family.get_mother_handle())
+    for parent_handle in db.get_family_parent_handles(family_handle) or ():
+        possibly_add_handle(parent_handle)
 
-    for child_ref in family.get_child_ref_list():
-        if child_ref:
-            possibly_add_handle(child_ref.get_reference_handle())
+    for child_handle in db.get_family_child_handles(family_handle):
+        possibly_add_handle(child_handle)
 
     return people
 
 
-def get_person_family_people(db, person, person_handle):
+def get_person_family_people(db, person_handle):
     people = set()
 
     def add_family_handle_list(fam_list):
@@ -70,8 +67,8 @@ def get_person_family_people(db, person, person_handle):
             people.update(get_family_handle_people(db, person_handle,
                                                    family_handle))
 
-    add_family_handle_list(person.get_family_handle_list())
-    add_family_handle_list(person.get_parent_family_handle_list())
+    add_family_handle_list(db.get_person_family_handles(person_handle))
+    add_family_handle_list(db.get_person_parent_family_handles(person_handle))
 
     return people
 
@@ -111,11 +108,7 @@ def find_deep_relations(db, user, person, target_people):
             if not target_people:  # Quit searching if all targets found
                 break
 
-        person = db.get_person_from_handle(handle)
-        if person is None:
-            continue
-
-        people = get_person_family_people(db, person, handle)
+        people = get_person_family_people(db, handle)
         for p_hndl in people:
             if p_hndl in done:     # check if we have already been here
                 continue           # and ignore if we have
@@ -63,30 +63,41 @@ class HasCommonAncestorWith(Rule):
             self.with_people = []
 
     def add_ancs(self, db, person):
-        if person and person.handle not in self.ancestor_cache:
-            self.ancestor_cache[person.handle] = set()
-            # We are going to compare ancestors of one person with that of
-            # another person; if that other person is an ancestor and itself
-            # has no ancestors is must be included, this is achieved by the
-            # little trick of making a person his own ancestor.
-            self.ancestor_cache[person.handle].add(person.handle)
-        else:
+        if not person or person.handle in self.ancestor_cache:
             return
 
-        for fam_handle in person.get_parent_family_handle_list():
-            parentless_fam = True
-            fam = db.get_family_from_handle(fam_handle)
-            if fam:
-                for par_handle in (fam.get_father_handle(), fam.get_mother_handle()):
+        # Parents are done before their children, without recursion so that
+        # deep pedigrees do not exceed the recursion limit.
+        todo = [(person.handle, False)]
+        while todo:
+            handle, parents_done = todo.pop()
+            if not parents_done:
+                if handle in self.ancestor_cache:
+                    continue
+                # We are going to compare ancestors of one person with that of
+                # another person; if that other person is an ancestor and
+                # itself has no ancestors is must be included, this is
+                # achieved by the little trick of making a person his own
+                # ancestor.
+                self.ancestor_cache[handle] = {handle}
+                todo.append((handle, True))
+                for fam_handle in db.get_person_parent_family_handles(handle):
+                    parents = db.get_family_parent_handles(fam_handle) or ()
+                    todo.extend((par_handle, False) for par_handle in parents
+                                if par_handle and
+                                par_handle not in self.ancestor_cache)
+                continue
+
+            ancestors = self.ancestor_cache[handle]
+            for fam_handle in db.get_person_parent_family_handles(handle):
+                parents = db.get_family_parent_handles(fam_handle)
+                if parents is None:
+                    continue
+                if not any(parents):
+                    ancestors.add(fam_handle)
+                for par_handle in parents:
                     if par_handle:
-                        parentless_fam = False
-                        par = db.get_person_from_handle(par_handle)
-                        if par and par.handle not in self.ancestor_cache:
-                            self.add_ancs(db, par)
-                        if par:
-                            self.ancestor_cache[person.handle] |= self.ancestor_cache[par.handle]
-                if parentless_fam:
-                    self.ancestor_cache[person.handle].add(fam_handle)
+                        ancestors |= self.ancestor_cache[par_handle]
 
     def reset(self):
         self.ancestor_cache = {}
@@ -56,7 +56,8 @@ class IsAncestorOf(Rule):
             first = 1
         try:
             root_person = db.get_person_from_gramps_id(self.list[0])
-            self.init_ancestor_list(db,root_person,first)
+            if root_person:
+                self.init_ancestor_list(db, [root_person.handle], first)
         except:
             pass
 
@@ -66,21 +67,13 @@ class IsAncestorOf(Rule):
     def apply(self, db, person):
         return person.handle in self.map
 
-    def init_ancestor_list(self, db, person,first):
-        if not person:
-            return
-        if person.handle in self.map:
-            return
-        if not first:
-            self.map.add(person.handle)
-        fam_id = person.get_main_parents_family_handle()
-        if fam_id:
-            fam = db.get_family_from_handle(fam_id)
-            if fam:
-                f_id = fam.get_father_handle()
-                m_id = fam.get_mother_handle()
-
-                if f_id:
-                    self.init_ancestor_list(db,db.get_person_from_handle(f_id),0)
-                if m_id:
-                    self.init_ancestor_list(db,db.get_person_from_handle(m_id),0)
+    def init_ancestor_list(self, db, handles, first):
+        if first:
+            # Start from the parents in the main families, so that people
+            # are only included if they are an ancestor of one of them
+            handles = [parent for handle in handles
+                       for fam_id in db.get_person_parent_family_handles(
+                           handle)[:1]
+                       for parent in db.get_family_parent_handles(fam_id)
+                       or () if parent]
+        self.map.update(db.find_ancestors(handles))
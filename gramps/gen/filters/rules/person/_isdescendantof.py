@@ -56,7 +56,8 @@ class IsDescendantOf(Rule):
             first = True
         try:
             root_person = db.get_person_from_gramps_id(self.list[0])
-            self.init_list(root_person,first)
+            if root_person:
+                self.init_list([root_person.handle], first)
         except:
             pass
 
@@ -66,16 +67,11 @@ class IsDescendantOf(Rule):
     def apply(self, db, person):
         return person.handle in self.map
 
-    def init_list(self, person, first):
-        if not person or person.handle in self.map:
-            # if we have been here before, skip
-            return
-        if not first:
-            self.map.add(person.handle)
-
-        for fam_id in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_id)
-            if fam:
-                for child_ref in fam.get_child_ref_list():
-                    self.init_list(
-                        self.db.get_person_from_handle(child_ref.ref), 0)
+    def init_list(self, handles, first):
+        if first:
+            # Start from the children, so that people are only included if
+            # they are a descendant of one of them
+            handles = [child for handle in handles
+                       for fam_id in self.db.get_person_family_handles(handle)
+                       for child in self.db.get_family_child_handles(fam_id)]
+        self.map.update(self.db.find_descendants(handles))
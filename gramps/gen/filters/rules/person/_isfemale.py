@@ -48,3 +48,6 @@ class IsFemale(Rule):
 
     def apply(self,db,person):
         return person.gender == Person.FEMALE
+
+    def to_sql(self, db):
+        return ("gender = ?", [Person.FEMALE])
@@ -48,3 +48,6 @@ class MatchesNameSubstringOf(Rule):
     def apply(self, db, repository):
         """ Apply the filter """
         return self.match_substring(0, repository.get_name())
+
+    def to_sql(self, db):
+        return self.sql_match_substring(0, "name")
@@ -49,3 +49,6 @@ class MatchesTitleSubstringOf(Rule):
     def apply(self, db, source):
         """ Apply the filter """
         return self.match_substring(0, source.get_title())
+
+    def to_sql(self, db):
+        return self.sql_match_substring(0, "title")
@@ -25,6 +25,7 @@ import unittest
 import os
 from time import perf_counter
 import inspect
+from unittest.mock import patch, Mock
 
 from ....filters import reload_custom_filters
 reload_custom_filters()
@@ -39,6 +40,7 @@ from ..person import (
     HasCommonAncestorWith, HasCommonAncestorWithFilterMatch,
     HasFamilyAttribute, HasFamilyEvent, HasIdOf, HasLDS,
     HasNameOf, HasNameOriginType, HasNameType, HasNickname, HasRelationship,
+    HasTag, ChangedSince, RegExpIdOf,
     HasSoundexName, HasSourceOf, HasTextMatchingRegexpOf, HasUnknownGender,
     HaveAltFamilies, HaveChildren, HavePhotos, IncompleteNames,
     IsAncestorOfFilterMatch, IsBookmarked, IsChildOfFilterMatch,
@@ -875,6 +877,46 @@ class BaseTest(unittest.TestCase):
         self.assertEqual(self.filter_with_rule(rule), set([
             'GNUJQCL9MD64AM56OH']))
 
+    def test_sql_pushdown(self):
+        """
+        Test that evaluating rules in SQL gives the same results as
+        evaluating them on the objects.
+        """
+        rule_lists = [
+            [IsMale([])],
+            [IsFemale([]), HasIdOf(['I0044'])],
+            [IsMale([]), HasBirth(['', '', 'Birth of Garner'])],
+            [HasTag(['ToDo']), HasUnknownGender([]), PeoplePublic([])],
+            [ChangedSince(['2010-01-01', '']), PeoplePrivate([]),
+             IsFemale([])],
+            [RegExpIdOf(['I00[0-4]'], use_regex=True), IsMale([])],
+            [RegExpIdOf(['i001'])],
+            [RegExpIdOf(['^i00[0-4]$'], use_regex=True), IsFemale([])],
+        ]
+        for rules in rule_lists:
+            for l_op in GenericFilter.logical_functions:
+                for invert in (False, True):
+                    results = self.filter_with_rule(rules, l_op, invert)
+                    with patch.object(self.db, 'select_handles',
+                                      return_value=None):
+                        expected = self.filter_with_rule(rules, l_op, invert)
+                    self.assertEqual(results, expected,
+                                     (rules, l_op, invert))
+
+    def test_sql_progress(self):
+        """
+        Test that the progress of a filter whose rules are partly evaluated
+        in SQL counts the objects selected by SQL.
+        """
+        user = Mock()
+        filter_ = GenericFilter()
+        filter_.set_rules([IsMale([]),
+                           HasBirth(['', '', 'Birth of Garner'])])
+        filter_.apply(self.db, user=user)
+        total = user.begin_progress.call_args[0][2]
+        self.assertEqual(total, len(self.filter_with_rule(IsMale([]))))
+        self.assertEqual(user.step_progress.call_count, total)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -121,6 +121,9 @@ class BaseTest(unittest.TestCase):
         rule = MatchesNameSubstringOf(['Martha'])
         self.assertEqual(self.filter_with_rule(rule),
                          set(['a701ead12841521cd4d']))
+        rule = MatchesNameSubstringOf(['MARTHA.S ATTIC$'], use_regex=True)
+        self.assertEqual(self.filter_with_rule(rule),
+                         set(['a701ead12841521cd4d']))
 
     def test_hastag(self):
         """
@@ -0,0 +1,163 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for applying filters in chunks and in a worker thread.
+"""
+
+import unittest
+import os
+
+from ... import filters
+from ...config import config
+from .. import GenericFilter, FilterJob
+from .._filterlist import FilterList
+from ..rules.person import IsMale, RegExpName, MatchesFilter
+from ...db import DbTxn
+from ...db.dbconst import DBLOCKFN
+from ...db.utils import make_database, import_from_filename, import_as_dict
+from ...lib import Note
+from ...const import DATA_DIR
+from ...user import User
+from ...utils.file import get_empty_tempdir
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class FilterJobTest(unittest.TestCase):
+    """
+    Filter the example database on disk.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # a reader needs the log to be written ahead
+        journal_mode = config.get('database.sqlite-journal-mode')
+        config.set('database.sqlite-journal-mode', 'WAL')
+        cls.db = make_database("sqlite")
+        try:
+            cls.db.load(get_empty_tempdir("filterjob_test"))
+        finally:
+            config.set('database.sqlite-journal-mode', journal_mode)
+        import_from_filename(cls.db, EXAMPLE, User())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def setUp(self):
+        self.filter = GenericFilter()
+        self.filter.add_rule(IsMale([]))
+        self.filter.add_rule(RegExpName(['^J'], use_regex=True))
+        self.matches = []
+
+    def callback(self, matches):
+        self.matches.append(matches)
+
+    def test_iter_apply(self):
+        handles = self.db.get_person_handles(sort_handles=True)
+        expected = self.filter.apply(self.db, handles)
+        chunks = list(self.filter.iter_apply(self.db, handles,
+                                             chunk_size=10))
+        self.assertEqual(len(chunks), (len(handles) + 9) // 10)
+        self.assertEqual(sum(chunks, []), expected)
+        self.assertEqual(self.filter.flist[0].nrprepare, 0)
+
+    def test_job(self):
+        keys = [(str(index), handle) for index, handle
+                in enumerate(self.db.get_person_handles())]
+        job = FilterJob(self.db, self.filter, self.callback, keys,
+                        tupleind=1, chunk_size=100)
+        self.assertTrue(job.start())
+        # the database can be written meanwhile
+        with DbTxn("Add note", self.db) as trans:
+            handle = self.db.add_note(Note("text"), trans)
+        job.join()
+        self.assertIsNone(self.matches.pop())
+        self.assertEqual(len(self.matches), (len(keys) + 99) // 100)
+        self.assertEqual(sum(self.matches, []),
+                         self.filter.apply(self.db, keys, tupleind=1))
+        with DbTxn("Remove note", self.db) as trans:
+            self.db.remove_note(handle, trans)
+
+    def test_reader(self):
+        reader = self.db.open_reader()
+        self.db.close_reader(reader)
+        # the reader is kept until the database changes
+        self.assertIs(self.db.open_reader(), reader)
+        self.db.close_reader(reader)
+        with DbTxn("Add note", self.db) as trans:
+            handle = self.db.add_note(Note("text"), trans)
+        new_reader = self.db.open_reader()
+        self.assertIsNot(new_reader, reader)
+        self.assertFalse(reader.is_open())
+        self.assertTrue(new_reader.has_note_handle(handle))
+        self.db.close_reader(new_reader)
+        with DbTxn("Remove note", self.db) as trans:
+            self.db.remove_note(handle, trans)
+        # the readers leave the lock of the database alone
+        self.assertTrue(os.path.exists(os.path.join(self.db.get_save_path(),
+                                                    DBLOCKFN)))
+
+    def test_custom_filters(self):
+        custom_filters = filters.CustomFilters
+        filters.CustomFilters = FilterList('')
+        self.filter.set_name("Males")
+        filters.CustomFilters.add('Person', self.filter)
+        gfilter = GenericFilter()
+        gfilter.add_rule(MatchesFilter(["Males"]))
+        try:
+            job = FilterJob(self.db, gfilter, self.callback)
+            self.assertTrue(job.start())
+            job.join()
+            # the job prepared copies of the custom filters
+            self.assertEqual(self.filter.flist[1].regex, [])
+            expected = gfilter.apply(self.db)
+        finally:
+            filters.CustomFilters = custom_filters
+        self.assertIsNone(self.matches.pop())
+        self.assertEqual(sorted(sum(self.matches, [])), sorted(expected))
+
+    def test_tree(self):
+        job = FilterJob(self.db, self.filter, self.callback, tree=True)
+        self.assertTrue(job.start())
+        job.join()
+        self.assertIsNone(self.matches.pop())
+        self.assertEqual(sorted(sum(self.matches, [])),
+                         sorted(self.filter.apply(self.db)))
+
+    def test_cancel(self):
+        job = FilterJob(self.db, self.filter, self.callback)
+        job.cancel()
+        self.assertTrue(job.start())
+        job.join()
+        self.assertTrue(job.cancelled())
+        self.assertEqual(self.matches, [])
+
+    def test_memory(self):
+        db = import_as_dict(EXAMPLE, User())
+        self.assertIsNone(db.open_reader())
+        self.assertFalse(FilterJob(db, self.filter, self.callback).start())
+        db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
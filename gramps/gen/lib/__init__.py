@@ -44,6 +44,7 @@ from .childref import ChildRef
 # Primary objects
 from .primaryobj import PrimaryObject
 from .person import Person
+from .lazyperson import LazyPerson
 from .personref import PersonRef
 from .family import Family
 from .event import Event
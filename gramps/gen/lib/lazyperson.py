@@ -0,0 +1,126 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Person object that unserializes its secondary objects on demand.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from .person import Person
+from .citationbase import CitationBase
+from .notebase import NoteBase
+from .mediabase import MediaBase
+from .attrbase import AttributeBase
+from .addressbase import AddressBase
+from .ldsordbase import LdsOrdBase
+from .urlbase import UrlBase
+from .tagbase import TagBase
+from .name import Name
+from .eventref import EventRef
+from .personref import PersonRef
+
+#-------------------------------------------------------------------------
+#
+# LazyPerson class
+#
+#-------------------------------------------------------------------------
+def _primary_name(person, data):
+    person.primary_name = Name().unserialize(data)
+
+def _alternate_names(person, data):
+    person.alternate_names = [Name().unserialize(name) for name in data]
+
+def _event_ref_list(person, data):
+    person.event_ref_list = [EventRef().unserialize(er) for er in data]
+
+def _person_ref_list(person, data):
+    person.person_ref_list = [PersonRef().unserialize(pr) for pr in data]
+
+
+class LazyPerson(Person):
+    """
+    A Person built from the raw data tuple, intended for read-only scans
+    such as filtering.
+
+    The handle, gramps_id, gender, birth and death reference indexes,
+    family lists, change time and privacy flag are set at once.  All other
+    attributes are unserialized from the raw data the first time they are
+    read, so that a rule that only looks at the gender does not pay for
+    names, events, addresses and so on.
+    """
+
+    # attribute: (index in the serialized tuple, unserialize function)
+    _LAZY_ATTRIBUTES = {
+        'primary_name': (3, _primary_name),
+        'alternate_names': (4, _alternate_names),
+        'event_ref_list': (7, _event_ref_list),
+        'media_list': (10, MediaBase.unserialize),
+        'address_list': (11, AddressBase.unserialize),
+        'attribute_list': (12, AttributeBase.unserialize),
+        'urls': (13, UrlBase.unserialize),
+        'lds_ord_list': (14, LdsOrdBase.unserialize),
+        'citation_list': (15, CitationBase.unserialize),
+        'note_list': (16, NoteBase.unserialize),
+        'tag_list': (18, TagBase.unserialize),
+        'person_ref_list': (20, _person_ref_list),
+    }
+
+    def __init__(self, data):
+        """
+        Create a new LazyPerson from the data held in a tuple created by the
+        serialize method of a Person.
+        """
+        self.unserialize(data)
+
+    def unserialize(self, data):
+        """
+        Set the scalar attributes from the serialized data, and keep the
+        data for the remaining ones.
+        """
+        self.__dict__.clear()
+        self._data = data
+        (self.handle,               #  0
+         self.gramps_id,            #  1
+         self._Person__gender,      #  2
+         self.death_ref_index,      #  5
+         self.birth_ref_index,      #  6
+         self.family_list,          #  8
+         self.parent_family_list,   #  9
+         self.change,               # 17
+         self.private,              # 19
+        ) = (data[0], data[1], data[2], data[5], data[6], data[8], data[9],
+             data[17], data[19])
+        return self
+
+    def __getattr__(self, name):
+        """
+        Unserialize a lazy attribute on first access.
+        """
+        try:
+            index, unserialize = self._LAZY_ATTRIBUTES[name]
+            data = self.__dict__['_data']
+        except KeyError:
+            raise AttributeError(name)
+        unserialize(self, data[index])
+        return self.__dict__[name]
@@ -46,6 +46,10 @@ from ..errors import HandleError
 #-------------------------------------------------------------------------
 from ..const import GRAMPS_LOCALE as glocale
 CODESET = glocale.encoding
+
+# Secondary fields of each class, see get_secondary_fields
+_SECONDARY_FIELDS = {}
+
 #-------------------------------------------------------------------------
 #
 # Table Object class
@@ -160,16 +164,20 @@ class TableObject(BaseObject):
         """
         Return all secondary fields and their types
         """
-        result = []
-        for (key, value) in cls.get_schema()["properties"].items():
-            schema_type = value.get("type")
-            if isinstance(schema_type, list):
-                schema_type.remove("null")
-                schema_type = schema_type[0]
-            elif isinstance(schema_type, dict):
-                schema_type = None
-            if schema_type in ("string", "integer", "number", "boolean"):
-                result.append((key.lower(),
-                               schema_type,
-                               value.get("maxLength")))
-        return result
+        # The schema is translated, so it is only built once per class
+        fields = _SECONDARY_FIELDS.get(cls)
+        if fields is None:
+            fields = []
+            for (key, value) in cls.get_schema()["properties"].items():
+                schema_type = value.get("type")
+                if isinstance(schema_type, list):
+                    schema_type.remove("null")
+                    schema_type = schema_type[0]
+                elif isinstance(schema_type, dict):
+                    schema_type = None
+                if schema_type in ("string", "integer", "number", "boolean"):
+                    fields.append((key.lower(),
+                                   schema_type,
+                                   value.get("maxLength")))
+            _SECONDARY_FIELDS[cls] = fields
+        return list(fields)
@@ -0,0 +1,71 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for LazyPerson """
+
+import unittest
+import os
+
+from .. import LazyPerson
+from ...db.utils import import_as_dict
+from ...const import DATA_DIR
+from ...user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+class LazyPersonTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def test_serialize(self):
+        for person in self.db.iter_people():
+            lazy = LazyPerson(person.serialize())
+            self.assertEqual(lazy.serialize(), person.serialize())
+
+    def test_on_demand(self):
+        person = self.db.get_person_from_gramps_id('I0044')
+        lazy = LazyPerson(person.serialize())
+        self.assertEqual(lazy.get_gender(), person.get_gender())
+        self.assertNotIn('primary_name', lazy.__dict__)
+        self.assertNotIn('event_ref_list', lazy.__dict__)
+        self.assertEqual(lazy.get_primary_name().get_first_name(),
+                         person.get_primary_name().get_first_name())
+        self.assertIn('primary_name', lazy.__dict__)
+        self.assertNotIn('event_ref_list', lazy.__dict__)
+        self.assertEqual(lazy.get_birth_ref().ref, person.get_birth_ref().ref)
+
+    def test_set_before_access(self):
+        person = self.db.get_person_from_gramps_id('I0044')
+        lazy = LazyPerson(person.serialize())
+        lazy.set_note_list(['note'])
+        self.assertEqual(lazy.get_note_list(), ['note'])
+
+    def test_missing_attribute(self):
+        lazy = LazyPerson(self.db.get_person_from_gramps_id('I0044')
+                          .serialize())
+        self.assertRaises(AttributeError, getattr, lazy, 'unknown')
+        self.assertFalse(hasattr(lazy, '__deepcopy__'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,6 +24,8 @@ Proxy class for the Gramps databases. Caches lookups from handles.
 
 from ..utils.lru import LRU
 
+_MISSING = object()
+
 class CacheProxyDb:
     """
     A Proxy for a database with cached lookups on handles.
@@ -40,9 +42,6 @@ class CacheProxyDb:
         proxies.
         """
         self.db = database
-        # Memory allocation is power of 2 where slots has to fit.
-        # LRU uses one extra slot in its work, so set max to 2^17-1
-        # otherwise we are just wasting memory
         self.cache_handle = LRU(131071)
 
     def __del__(self):
@@ -70,87 +69,107 @@ class CacheProxyDb:
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_person_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_person_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_event_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_event_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_event_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_family_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_family_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_family_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_repository_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_repository_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_repository_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_place_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_place_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_place_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_citation_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_citation_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_citation_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_source_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_source_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_source_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_note_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_note_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_note_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_media_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_media_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_media_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
 
     def get_tag_from_handle(self, handle):
         """
         Gets item from cache if it exists. Converts
         handles to string, for uniformity.
         """
-        if handle not in self.cache_handle:
-            self.cache_handle[handle] = self.db.get_tag_from_handle(handle)
-        return self.cache_handle[handle]
+        obj = self.cache_handle.get(handle, _MISSING)
+        if obj is _MISSING:
+            obj = self.db.get_tag_from_handle(handle)
+            self.cache_handle[handle] = obj
+        return obj
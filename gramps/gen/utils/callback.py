@@ -38,6 +38,7 @@ import types
 import traceback
 import inspect
 import copy
+from time import perf_counter
 
 log = sys.stderr.write
 
@@ -112,6 +113,12 @@ class Callback:
         r = R()
         t.connect('test-signal', r.cb_func)
 
+    Callbacks are called in the order in which they were connected, unless
+    a priority is given. Callbacks with a higher priority are called first,
+    the default priority is 0::
+
+        t.connect('test-signal', fn, priority=10)
+
 
     **Disconnecting callbacks**
 
@@ -182,6 +189,20 @@ class Callback:
     Any signals emitted whilst signals are blocked will be lost.
 
 
+    **Measuring signal callbacks**
+
+    To find out what a signal costs, statistics can be collected for an
+    instance with :meth:`enable_signal_stats`. :meth:`get_signal_stats` then
+    returns, for each signal, the number of emissions, the number of
+    callbacks called and the time they took, and the same figures for each
+    callback. e.g.::
+
+            t.enable_signal_stats()
+            t.emit('test-signal', (1, ))
+            stats = t.get_signal_stats()
+            emits, calls, seconds, callbacks = stats['test-signal']
+
+
     **Debugging signal callbacks**
 
 
@@ -222,6 +243,9 @@ class Callback:
                                    # being emitted by this instance. This is
                                    # used to prevent recursive emittion of the
                                    # same signal.
+        self.__priorities = {}   # priority of each callback key, if not 0
+        self.__stats = None      # statistics of each emitted signal, if
+                                 # collected, see enable_signal_stats
 
         # To speed up the signal type checking the signals declared by
         # each of the classes in the inheritance tree of this instance
@@ -263,11 +287,12 @@ class Callback:
                                 in list(self.__signal_map.items())]))
 
 
-    def connect(self, signal_name, callback):
+    def connect(self, signal_name, callback, priority=0):
         """
         Connect a callable to a signal_name. The callable will be called
         with the signal is emitted. The callable must accept the argument
-        types declared in the signals signature.
+        types declared in the signals signature. Callables with a higher
+        priority are called first.
 
         returns a unique key that can be passed to :meth:`disconnect`.
         """
@@ -285,7 +310,14 @@ class Callback:
         self._log("Connecting callback to signal: "
                   "%s with key: %s\n"
                   % (signal_name, str(self._current_key)))
-        self.__callback_map[signal_name].append((self._current_key, callback))
+        callbacks = self.__callback_map[signal_name]
+        index = len(callbacks)
+        if priority:
+            self.__priorities[self._current_key] = priority
+        while (index > 0 and
+               self.__priorities.get(callbacks[index - 1][0], 0) < priority):
+            index -= 1
+        callbacks.insert(index, (self._current_key, callback))
 
         return self._current_key
 
@@ -304,6 +336,7 @@ class Callback:
                               ": %s with key: %s\n" % (signal_name,
                                                        str(key)))
                     self.__callback_map[signal_name].remove(cb)
+                    self.__priorities.pop(key, None)
 
     def disconnect_all(self):# Find the key in the callback map.
         for signal_name in self.__callback_map:
@@ -312,6 +345,7 @@ class Callback:
                 self.__callback_map[signal_name].remove(key)
             self.__callback_map[signal_name] = None
         self.__callback_map = {}
+        self.__priorities = {}
 
     def emit(self, signal_name, args=tuple()):
         """
@@ -323,6 +357,9 @@ class Callback:
                self.__block_instance_signals:
             return
 
+        if self._hold_signal(signal_name, args):
+            return
+
         # Check signal exists
         if signal_name not in self.__signal_map:
             self._warn("Attempt to emit to unknown signal: %s\n"
@@ -394,11 +431,17 @@ class Callback:
                                        % ((str(signal_name), ) + inspect.stack()[1][1:4] +\
                                           (args[i], repr(type(args[i])), repr(arg_types[i]))))
                             return
+            stats = None
+            if self.__stats is not None:
+                stats = self.__stats.setdefault(signal_name, [0, 0, 0.0, {}])
+                stats[0] += 1
             if signal_name in self.__callback_map:
                 self._log("emitting signal: %s\n" % (signal_name, ))
                 # Don't bother if there are no callbacks.
                 for (key, fn) in self.__callback_map[signal_name]:
                     self._log("Calling callback with key: %s\n" % (key, ))
+                    if stats is not None:
+                        start = perf_counter()
                     try:
                         if isinstance(fn, types.FunctionType) or \
                                 isinstance(fn, types.MethodType): # call func
@@ -408,9 +451,19 @@ class Callback:
                     except:
                         self._warn("Exception occurred in callback function.\n"
                                    "%s" % ("".join(traceback.format_exception(*sys.exc_info())), ))
+                    if stats is not None:
+                        self.__add_stats(stats, fn, perf_counter() - start)
         finally:
             self._current_signals.remove(signal_name)
 
+    def _hold_signal(self, signal_name, args):
+        """
+        Return True if the signal is held, to be emitted later, instead of
+        being emitted now.  Derived classes can override this to collect
+        signals; the default is to hold none.
+        """
+        return False
+
     #
     # instance signals control methods
     #
@@ -420,6 +473,50 @@ class Callback:
     def enable_signals(self):
         self.__block_instance_signals = False
 
+    #
+    # instance statistics methods
+    #
+    def enable_signal_stats(self):
+        """
+        Start collecting statistics of the emitted signals, from scratch.
+        """
+        self.__stats = {}
+
+    def disable_signal_stats(self):
+        """
+        Stop collecting statistics, and drop the collected ones.
+        """
+        self.__stats = None
+
+    def get_signal_stats(self):
+        """
+        Return the statistics collected since :meth:`enable_signal_stats`
+        was called, as a dictionary with the signal names as keys.  The
+        values are tuples (emits, calls, seconds, callbacks): the number of
+        times the signal was emitted, the number of callbacks that were
+        called and the time they took in total, and a dictionary giving
+        (calls, seconds) for the name of each callback.
+        """
+        if self.__stats is None:
+            return {}
+        return {signal_name: (emits, calls, seconds, dict(
+                    (name, tuple(value)) for (name, value) in callbacks.items()))
+                for (signal_name, (emits, calls, seconds, callbacks))
+                in self.__stats.items()}
+
+    @staticmethod
+    def __add_stats(stats, fn, seconds):
+        """
+        Add the time of a callback to the statistics of a signal.
+        """
+        stats[1] += 1
+        stats[2] += seconds
+        name = "%s.%s" % (getattr(fn, '__module__', None),
+                          getattr(fn, '__qualname__', repr(fn)))
+        callback = stats[3].setdefault(name, [0, 0.0])
+        callback[0] += 1
+        callback[1] += seconds
+
     # logging methods
 
     def disable_logging(self):
@@ -24,6 +24,7 @@ Module providing support for callback handling in the GUI
   * track object handles
   * register new handles
   * manage callback functions
+  * coalesce the signals of database changes
 """
 
 #-------------------------------------------------------------------------
@@ -31,6 +32,10 @@ Module providing support for callback handling in the GUI
 # Python modules
 #
 #-------------------------------------------------------------------------
+from collections import OrderedDict
+import logging
+
+LOG = logging.getLogger(".callman")
 
 #-------------------------------------------------------------------------
 #
@@ -84,6 +89,21 @@ CLASS2KEY = {
     TAGCLASS: TAGKEY
     }
 
+# (key, method) of each signal of the primary objects
+SIGNALS = dict((key + method, (key, method))
+               for key in KEYS for method in METHODS)
+
+# Net change of a handle given its pending change and a new change, if it is
+# not the new change; None if there is no change left
+_MERGE = {
+    (ADD, UPDATE): ADD,
+    (ADD, DELETE): None,
+    (UPDATE, ADD): UPDATE,
+    (UPDATE, DELETE): DELETE,
+    (DELETE, ADD): UPDATE,
+    (DELETE, UPDATE): UPDATE,
+    }
+
 def _return(*args):
     """
     Function that does nothing with the arguments
@@ -105,6 +125,10 @@ class CallbackManager:
 
     Track changes to your relevant objects, calling callback functions as
     needed.
+
+    While the GUI element is hidden, the callbacks can be held, see
+    :meth:`hold`, so that the changes are delivered once, coalesced, when it
+    is shown again.
     """
     def __init__(self, database):
         """
@@ -128,6 +152,9 @@ class CallbackManager:
             }
         #no custom callbacks to do
         self.custom_signal_keys = []
+        self.__custom_callbacks = {}
+        #signals that are held, if any
+        self.__queue = None
         #set up callbacks to do nothing
         self.__callbacks = {}
         self.__init_callbacks()
@@ -149,6 +176,8 @@ class CallbackManager:
         """
         list(map(self.database.disconnect, self.custom_signal_keys))
         self.custom_signal_keys = []
+        self.__custom_callbacks = {}
+        self.__queue = None
         for key, value in self.__callbacks.items():
             if not value[1] is None:
                 self.database.disconnect(value[1])
@@ -268,6 +297,9 @@ class CallbackManager:
         For a DbBase that is that arg must be not given (rebuild
         methods), or arg[0] must be the list of handles affected.
         """
+        if self.__queue is not None:
+            self.__queue.push(signal, arg)
+            return
         key = signal.split('-')[0]
         if arg:
             handles = arg[0]
@@ -295,14 +327,71 @@ class CallbackManager:
         if oldconnectkey is not None:
             self.database.disconnect(oldconnectkey)
 
-    def add_db_signal(self, name, callback):
+    def add_db_signal(self, name, callback, priority=0):
         """
         Do a custom db connect signal outside of the primary object ones
-        managed automatically.
+        managed automatically.  Callbacks with a higher priority are called
+        first.
         """
         if self.database:
-            self.custom_signal_keys.append(self.database.connect(name,
-                                                                 callback))
+            self.custom_signal_keys.append(self.database.connect(
+                name, self.__customcreator(name, callback), priority))
+            self.__custom_callbacks.setdefault(name, []).append(callback)
+
+    def hold(self):
+        """
+        Hold the callbacks: the signals are collected until :meth:`release`
+        is called, instead of calling the callbacks.
+        """
+        if self.__queue is None:
+            self.__queue = SignalQueue()
+
+    def release(self, deliver=True):
+        """
+        Stop holding the callbacks, and call them for the signals that were
+        collected, coalesced.  If deliver is False, the signals are dropped,
+        as when the GUI element will be rebuilt anyway.
+        """
+        queue = self.__queue
+        if queue is None:
+            return
+        self.__queue = None
+        if not deliver:
+            return
+        for (signal, args) in queue.pop():
+            if (signal in self.__callbacks and
+                    self.__callbacks[signal][1] is not None):
+                self.__deliver(self.__do_callback, signal, *args)
+            for callback in self.__custom_callbacks.get(signal, []):
+                self.__deliver(callback, *args)
+
+    def is_held(self):
+        """
+        Return True if the callbacks are held.
+        """
+        return self.__queue is not None
+
+    def __deliver(self, callback, *args):
+        """
+        Call a callback for a signal that was held.  Like the database does
+        for signals, an exception does not stop the delivery of the others.
+        """
+        try:
+            callback(*args)
+        except Exception:
+            LOG.error("Exception in a held callback", exc_info=True)
+
+    def __customcreator(self, name, callback):
+        """
+        Create the function connected to the db for a custom signal, which
+        calls the callback unless the callbacks are held.
+        """
+        def custom(*args):
+            if self.__queue is not None:
+                self.__queue.push(name, args)
+            else:
+                callback(*args)
+        return custom
 
     def __callbackcreator(self, signal, noarg=False):
         """
@@ -331,6 +420,91 @@ class CallbackManager:
         else:
             raise AttributeError('Signal ' + signal + 'not supported.')
 
+#-------------------------------------------------------------------------
+#
+# SignalQueue class
+#
+#-------------------------------------------------------------------------
+
+class SignalQueue:
+    """
+    Collect database signals, to emit them later, coalesced.
+
+    The handles of the add, update and delete signals of each primary object
+    are merged into their net change, so that each handle is given once:
+    a handle that is added and then updated is only added, and a handle
+    that is added and then deleted is left out.  A rebuild signal replaces
+    the changes of its primary object, before and after it.  Other signals
+    are kept, without duplicates.
+    """
+    def __init__(self):
+        self.__changes = {}     # key -> OrderedDict of handle -> method
+        self.__rebuilt = set()  # keys with a rebuild signal
+        self.__signals = []     # list of (signal name, args) to emit first
+
+    def __len__(self):
+        """
+        Return the number of queued signals and handles.
+        """
+        return len(self.__signals) + sum(len(changes) for changes
+                                         in self.__changes.values())
+
+    def push(self, signal, args=()):
+        """
+        Add a signal to the queue.
+
+        :param signal: name of the signal
+        :param args: tuple of the arguments of the signal, as for emit.
+        """
+        key, method = SIGNALS.get(signal, (None, None))
+        if method in METHODS_LIST:
+            if key in self.__rebuilt:
+                return
+            changes = self.__changes.setdefault(key, OrderedDict())
+            for handle in args[0]:
+                if handle in changes:
+                    new = _MERGE.get((changes[handle], method), method)
+                    if new is None:
+                        del changes[handle]
+                    else:
+                        changes[handle] = new
+                else:
+                    changes[handle] = method
+            return
+        if method == REBUILD:
+            self.__changes.pop(key, None)
+            self.__rebuilt.add(key)
+        signal = (signal, tuple(args))
+        if signal not in self.__signals:
+            self.__signals.append(signal)
+
+    def pop(self):
+        """
+        Empty the queue, and return the coalesced signals as a list of
+        (signal name, args) tuples.  The other signals come first, followed
+        by the deletes, adds and updates of the primary objects, in this
+        order.
+        """
+        signals = self.__signals
+        for method in (DELETE, ADD, UPDATE):
+            for key in KEYS:
+                changes = self.__changes.get(key)
+                if changes:
+                    handles = [handle for (handle, change) in changes.items()
+                               if change == method]
+                    if handles:
+                        signals.append((key + method, (handles, )))
+        self.clear()
+        return signals
+
+    def clear(self):
+        """
+        Empty the queue.
+        """
+        self.__changes = {}
+        self.__rebuilt = set()
+        self.__signals = []
+
 def directhandledict(baseobj):
     """
     Build a handledict from baseobj with all directly referenced objects
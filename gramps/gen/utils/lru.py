@@ -5,6 +5,7 @@
 #
 # Copyright (C) 2003-2006  Josiah Carlson
 # Copyright (C) 2009       Gary Burton
+# Copyright (C) 2026       Gramps Development Team
 #
 # This program is free software; you can redistribute it and/or modify
 # it under the terms of the GNU General Public License as published by
@@ -25,27 +26,54 @@
 Least recently used algorithm
 """
 
-class Node:
-    """
-    Node to be stored in the LRU structure
-    """
-    def __init__(self, prev, value):
-        self.prev = prev
-        self.value = value
-        self.next = None
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from collections import OrderedDict
+from sys import getsizeof
 
+#-------------------------------------------------------------------------
+#
+# LRU class
+#
+#-------------------------------------------------------------------------
 class LRU:
     """
-    Implementation of a length-limited O(1) LRU cache
+    Implementation of a length-limited O(1) LRU cache.
+
+    The items are kept in an OrderedDict, least recently used first.  The
+    number of hits, misses and evictions is counted.
     """
-    def __init__(self, count):
+    def __init__(self, count, max_bytes=0, sizeof=getsizeof):
         """
         Set count to 0 or 1 to disable.
+
+        :param count: the maximum number of items.
+        :type count: int
+        :param max_bytes: if not 0, also evict items when the approximate
+                          size of the values exceeds this many bytes.
+        :type max_bytes: int
+        :param sizeof: the function that gives the approximate size of a
+                       value, only used with max_bytes.
+        :type sizeof: function
         """
         self.count = count
-        self.data = {}
-        self.first = None
-        self.last = None
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__sizeof = sizeof
+        self.__sizes = {}
+
+    def __len__(self):
+        """
+        Return the number of items in the LRU
+        """
+        return len(self.data)
 
     def __contains__(self, obj):
         """
@@ -57,127 +85,116 @@ class LRU:
         """
         Return item associated with Obj
         """
-        return self.data[obj].value[1]
+        try:
+            value = self.data[obj]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.data.move_to_end(obj)
+        self.hits += 1
+        return value
+
+    def get(self, obj, default=None):
+        """
+        Return item associated with Obj, or default if there is none
+        """
+        try:
+            value = self.data[obj]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.data.move_to_end(obj)
+        self.hits += 1
+        return value
 
     def __setitem__(self, obj, val):
         """
-        Set the item in the LRU, removing an old entry if needed
+        Set the item in the LRU, removing old entries if needed
         """
         if self.count <= 1: # Disabled
             return
-        if obj in self.data:
-            del self[obj]
-        nobj = Node(self.last, (obj, val))
-        if self.first is None:
-            self.first = nobj
-        if self.last:
-            self.last.next = nobj
-        self.last = nobj
-        self.data[obj] = nobj
-        if len(self.data) > self.count:
-            if self.first == self.last:
-                self.first = None
-                self.last = None
-                return
-            lnk = self.first
-            lnk.next.prev = None
-            self.first = lnk.next
-            lnk.next = None
-            if lnk.value[0] in self.data:
-                del self.data[lnk.value[0]]
-            del lnk
+        data = self.data
+        if obj in data:
+            data.move_to_end(obj)
+        data[obj] = val
+        if self.max_bytes:
+            size = self.__sizeof(val)
+            self.nbytes += size - self.__sizes.get(obj, 0)
+            self.__sizes[obj] = size
+            while self.nbytes > self.max_bytes and len(data) > 1:
+                self.__evict()
+        if len(data) > self.count:
+            self.__evict()
+
+    def __evict(self):
+        """
+        Remove the least recently used item
+        """
+        obj = self.data.popitem(last=False)[0]
+        if self.max_bytes:
+            self.nbytes -= self.__sizes.pop(obj)
+        self.evictions += 1
 
     def __delitem__(self, obj):
         """
         Delete the object from the LRU
         """
-        nobj = self.data[obj]
-        if nobj.prev:
-            nobj.prev.next = nobj.next
-        else:
-            self.first = nobj.next
-        if nobj.next:
-            nobj.next.prev = nobj.prev
-        else:
-            self.last = nobj.prev
         del self.data[obj]
+        if self.max_bytes:
+            self.nbytes -= self.__sizes.pop(obj)
 
     def __iter__(self):
         """
-        Iterate over the LRU
+        Iterate over the values of the LRU
         """
-        cur = self.first
-        while cur is not None:
-            cur2 = cur.next
-            yield cur.value[1]
-            cur = cur2
-        raise StopIteration
+        return iter(self.values())
 
     def iteritems(self):
         """
         Return items in the LRU using a generator
         """
-        cur = self.first
-        while cur is not None:
-            cur2 = cur.next
-            yield cur.value
-            cur = cur2
-        raise StopIteration
+        return iter(self.items())
 
     def iterkeys(self):
         """
         Return keys in the LRU using a generator
         """
-        return iter(self.data)
+        return iter(self.keys())
 
     def itervalues(self):
         """
-        Return items and keys in the LRU using a generator
+        Return values in the LRU using a generator
         """
-        for data in self.items():
-            yield data[1]
+        return iter(self.values())
 
     def keys(self):
         """
         Return all keys
         """
-        return [data[0] for data in self.items()]
+        return list(self.data.keys())
 
     def values(self):
         """
         Return all values
         """
-        return [data[1] for data in self.items()]
+        return list(self.data.values())
 
     def items(self):
         """
         Return all items
         """
-        return [data[0] for data in self.items()]
+        return list(self.data.items())
 
     def clear(self):
         """
         Empties LRU
         """
-        # Step through the doubly linked list, setting prev and next to None.
-        # This ensures that each node is unreachable and therefore eligible for
-        # garbage collection. "del" is also called for each node, but it is
-        # unclear whether this actually has any effect, of just removes the
-        # binding to nobj
-        nobj = self.first
-        # The references first and last are removed so that the nodes are not
-        # reachable from these
-        self.first = None
-        self.last = None
-        # The references from self.data are removed
         self.data.clear()
-        while nobj is not None and nobj.next is not None:
-            # each node except the last is processed
-            nobj.next.prev = None
-            nextobj = nobj.next
-            nobj.next = None
-            del nobj
-            nobj = nextobj
-        if nobj is not None:
-            # The last node is processed
-            del nobj
+        self.__sizes.clear()
+        self.nbytes = 0
+
+    def get_stats(self):
+        """
+        Return the number of hits, misses and evictions, as a tuple.
+        """
+        return (self.hits, self.misses, self.evictions)
@@ -320,6 +320,69 @@ class TestCallback(unittest.TestCase):
         self.assertEqual(res[0][0:6], "Signal",
                          "multisignal recursion not blocked")
 
+    def test_priority(self):
+
+        class TestSignals(Callback):
+
+            __signals__ = {
+                        'test-signal' : (int,)
+                        }
+
+        rl = []
+        t = TestSignals()
+        t.connect('test-signal', lambda i: rl.append('first'))
+        t.connect('test-signal', lambda i: rl.append('low'), priority=-1)
+        t.connect('test-signal', lambda i: rl.append('high'), priority=5)
+        key = t.connect('test-signal', lambda i: rl.append('higher'),
+                        priority=10)
+        t.connect('test-signal', lambda i: rl.append('last'))
+        t.emit('test-signal', (1,))
+        self.assertEqual(rl, ['higher', 'high', 'first', 'last', 'low'],
+                         "Callbacks not called by priority")
+
+        t.disconnect(key)
+        t.connect('test-signal', lambda i: rl.append('again'), priority=5)
+        rl[:] = []
+        t.emit('test-signal', (1,))
+        self.assertEqual(rl, ['high', 'again', 'first', 'last', 'low'],
+                         "Callbacks not called by priority")
+
+    def test_signal_stats(self):
+
+        class TestSignals(Callback):
+
+            __signals__ = {
+                        'test-signal' : (int,),
+                        'test-noarg' : None
+                        }
+
+        def fn(i):
+            pass
+
+        t = TestSignals()
+        t.connect('test-signal', fn)
+        t.connect('test-signal', fn)
+        t.emit('test-signal', (1,))
+        self.assertEqual(t.get_signal_stats(), {},
+                         "Statistics collected while disabled")
+
+        t.enable_signal_stats()
+        t.emit('test-signal', (1,))
+        t.emit('test-signal', (2,))
+        t.emit('test-noarg')
+        stats = t.get_signal_stats()
+        self.assertEqual(sorted(stats), ['test-noarg', 'test-signal'])
+        emits, calls, seconds, callbacks = stats['test-signal']
+        self.assertEqual((emits, calls), (2, 4), "Wrong fan-out")
+        self.assertGreaterEqual(seconds, 0.0)
+        name = __name__ + '.TestCallback.test_signal_stats.<locals>.fn'
+        self.assertEqual(list(callbacks), [name])
+        self.assertEqual(callbacks[name][0], 4)
+        self.assertEqual(stats['test-noarg'][:2], (1, 0))
+
+        t.disable_signal_stats()
+        self.assertEqual(t.get_signal_stats(), {})
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -0,0 +1,64 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for callman.py """
+
+import unittest
+
+from ..callman import SignalQueue
+
+
+class SignalQueueTest(unittest.TestCase):
+    """ Test the coalescing of signals """
+
+    def test_merge(self):
+        queue = SignalQueue()
+        queue.push('person-add', (['a', 'b', 'c'],))
+        queue.push('person-update', (['a', 'd', 'd'],))
+        queue.push('person-delete', (['b', 'e'],))
+        queue.push('family-delete', (['f'],))
+        queue.push('family-add', (['f'],))
+        self.assertEqual(len(queue), 5)
+        self.assertEqual(queue.pop(), [
+            ('person-delete', (['e'],)),
+            ('person-add', (['a', 'c'],)),
+            ('person-update', (['d'],)),
+            ('family-update', (['f'],))])
+        self.assertEqual(len(queue), 0)
+        self.assertEqual(queue.pop(), [])
+
+    def test_rebuild(self):
+        queue = SignalQueue()
+        queue.push('person-add', (['a'],))
+        queue.push('note-add', (['n'],))
+        queue.push('person-rebuild')
+        queue.push('person-update', (['a'],))
+        queue.push('person-rebuild')
+        queue.push('home-person-changed')
+        queue.push('person-groupname-rebuild', ('Smith', 'Smyth'))
+        self.assertEqual(queue.pop(), [
+            ('person-rebuild', ()),
+            ('home-person-changed', ()),
+            ('person-groupname-rebuild', ('Smith', 'Smyth')),
+            ('note-add', (['n'],))])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the LRU cache """
+
+import unittest
+
+from ..lru import LRU
+
+class LRUTest(unittest.TestCase):
+
+    def test_evict_least_recent(self):
+        lru = LRU(3)
+        for key in 'abc':
+            lru[key] = key.upper()
+        self.assertEqual(lru['a'], 'A')
+        lru['d'] = 'D'
+        self.assertEqual(lru.keys(), ['c', 'a', 'd'])
+        self.assertEqual(lru.get('b', 'missing'), 'missing')
+        self.assertEqual(lru.get('c'), 'C')
+        self.assertEqual(lru.get_stats(), (2, 1, 1))
+        self.assertEqual(list(lru), ['A', 'D', 'C'])
+
+    def test_update(self):
+        lru = LRU(2)
+        lru['a'] = 1
+        lru['b'] = 2
+        lru['a'] = 3
+        lru['c'] = 4
+        self.assertEqual(lru.items(), [('a', 3), ('c', 4)])
+        del lru['a']
+        self.assertNotIn('a', lru)
+        self.assertEqual(len(lru), 1)
+
+    def test_disabled(self):
+        lru = LRU(1)
+        lru['a'] = 1
+        self.assertEqual(len(lru), 0)
+        self.assertRaises(KeyError, lru.__getitem__, 'a')
+        self.assertEqual(lru.get_stats(), (0, 1, 0))
+
+    def test_max_bytes(self):
+        lru = LRU(100, max_bytes=10, sizeof=len)
+        lru['a'] = 'xxxx'
+        lru['b'] = 'xxxx'
+        lru['c'] = 'xxxx'
+        self.assertEqual(lru.keys(), ['b', 'c'])
+        self.assertEqual(lru.nbytes, 8)
+        lru['b'] = 'x'
+        self.assertEqual(lru.nbytes, 5)
+        del lru['c']
+        self.assertEqual(lru.nbytes, 1)
+        lru.clear()
+        self.assertEqual(lru.nbytes, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
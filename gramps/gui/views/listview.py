@@ -72,6 +72,7 @@ from ..ddtargets import DdTargets
 from ..plug.quick import create_quickreport_menu, create_web_connect_menu
 from ..utils import is_right_click
 from ..widgets.interactivesearchbox import InteractiveSearchBox
+from .treemodels.flatbasemodel import FlatBaseModel
 
 #----------------------------------------------------------------
 #
@@ -335,6 +336,7 @@ class ListView(NavigationView):
             self.build_columns(preserve_col)
             cput2 = perf_counter()
             self.list.set_model(self.model)
+            self.model.filter_progress = self.__filter_progress
             cput3 = perf_counter()
             self.__display_column_sort()
             self.goto_active(None)
@@ -355,6 +357,18 @@ class ListView(NavigationView):
         else:
             self.dirty = True
 
+    def __filter_progress(self):
+        """
+        Called while the model adds the rows that match the filter of the
+        sidebar, after each chunk of rows.
+        """
+        if self.active:
+            self.uistate.show_filter_results(self.dbstate,
+                                             self.model.displayed(),
+                                             self.model.total())
+            if not self.model.filter_running():
+                self.goto_active(None)
+
     def search_build_tree(self):
         self.build_tree()
 
@@ -553,36 +567,42 @@ class ListView(NavigationView):
 
         if not prompt:
             self.uistate.set_busy_cursor(True)
+            # each object is removed in a transaction of its own, update the
+            # views once at the end
+            self.dbstate.db.hold_signals()
+            try:
+                for handle in self.selected_handles():
+                    (query, is_used, object) = \
+                        self.remove_object_from_handle(handle)
+                    query.query_response()
+            finally:
+                self.dbstate.db.release_signals()
+                self.uistate.set_busy_cursor(False)
+            return
 
         for handle in self.selected_handles():
             (query, is_used, object) = self.remove_object_from_handle(handle)
-            if prompt:
-                if is_used:
-                    msg = _('This item is currently being used. '
-                            'Deleting it will remove it from the database and '
-                            'from all other items that reference it.')
-                else:
-                    msg = _('Deleting item will remove it from the database.')
-
-                msg += ' ' + data_recover_msg
-                #descr = object.get_description()
-                #if descr == "":
-                descr = object.get_gramps_id()
-                ques = QuestionDialog3(_('Delete %s?') % descr, msg,
-                                       _('_Yes'), _('_No'),
-                                       parent=self.uistate.window)
-                res = ques.run()
-                if res == -1:  # Cancel
-                    return
-                elif res:  # If true, perfom the delete
-                    self.uistate.set_busy_cursor(True)
-                    query.query_response()
-                    self.uistate.set_busy_cursor(False)
+            if is_used:
+                msg = _('This item is currently being used. '
+                        'Deleting it will remove it from the database and '
+                        'from all other items that reference it.')
             else:
+                msg = _('Deleting item will remove it from the database.')
+
+            msg += ' ' + data_recover_msg
+            #descr = object.get_description()
+            #if descr == "":
+            descr = object.get_gramps_id()
+            ques = QuestionDialog3(_('Delete %s?') % descr, msg,
+                                   _('_Yes'), _('_No'),
+                                   parent=self.uistate.window)
+            res = ques.run()
+            if res == -1:  # Cancel
+                return
+            elif res:  # If true, perfom the delete
+                self.uistate.set_busy_cursor(True)
                 query.query_response()
-
-        if not prompt:
-            self.uistate.set_busy_cursor(False)
+                self.uistate.set_busy_cursor(False)
 
     def blist(self, store, path, iter_, sel_list):
         '''GtkTreeSelectionForeachFunc
@@ -651,6 +671,12 @@ class ListView(NavigationView):
                 self.list.set_model(None)
                 self.model.reverse_order()
                 self.list.set_model(self.model)
+        elif isinstance(self.model, FlatBaseModel):
+            # the rows shown do not change, only their order
+            self.list.set_model(None)
+            self.model.set_sort_col(self.sort_col, self.sort_order,
+                                    sort_map=self.column_order())
+            self.list.set_model(self.model)
         else:
             self.model = self.make_model(
                 self.dbstate.db, self.uistate, self.sort_col, self.sort_order,
@@ -77,6 +77,8 @@ class PageView(DbGUIElement, metaclass=ABCMeta):
           it becomes active. In this case, this method returns True
       2. if the view is inactive, try to stay in sync with database. Only
          rebuild or other large changes make view dirty
+      In both cases, the signals are held while the view is inactive, and
+      delivered coalesced when it becomes active again.
     ..attribute:: title
       title of the view
     ..attribute:: dbstate
@@ -327,6 +329,9 @@ class PageView(DbGUIElement, metaclass=ABCMeta):
         self.sidebar.set_active()
         self.bottombar.set_active()
         self.active = True
+        # deliver the changes made while the page was hidden, unless it is
+        # rebuilt anyway
+        self.callman.release(deliver=not self.dirty)
         new_title = "%s - %s - Gramps" % (self.dbstate.db.get_dbname(),
                                       self.get_title())
         self.uistate.window.set_title(new_title)
@@ -342,6 +347,16 @@ class PageView(DbGUIElement, metaclass=ABCMeta):
         self.sidebar.set_inactive()
         self.bottombar.set_inactive()
         self.active = False
+        self.callman.hold()
+
+    def _change_db(self, database):
+        """
+        Change the database the page works on; the callbacks stay held while
+        the page is hidden.
+        """
+        DbGUIElement._change_db(self, database)
+        if not self.active:
+            self.callman.hold()
 
     @abstractmethod
     def build_tree(self):
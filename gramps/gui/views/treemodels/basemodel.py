@@ -20,6 +20,13 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 #
 
+#-------------------------------------------------------------------------
+#
+# GTK modules
+#
+#-------------------------------------------------------------------------
+from gi.repository import GLib
+
 #-------------------------------------------------------------------------
 #
 # Gramps modules
@@ -27,6 +34,7 @@
 #-------------------------------------------------------------------------
 from gramps.gen.utils.lru import LRU
 from gramps.gen.config import config
+from gramps.gen.filters import FilterJob
 
 class BaseModel:
 
@@ -36,14 +44,70 @@ class BaseModel:
     def __init__(self):
         self.lru_data = LRU(BaseModel._CACHE_SIZE)
         self.lru_path = LRU(BaseModel._CACHE_SIZE)
+        self._filter_job = None
+        # function called after the rows of a chunk of filter matches
+        # have been added, see start_filter_job
+        self.filter_progress = None
 
     def destroy(self):
         """
         Destroy the items in memory.
         """
+        self.cancel_filter_job()
+        self.filter_progress = None
         self.lru_data = None
         self.lru_path = None
 
+    def start_filter_job(self, gfilter, add_func, id_list=None, tupleind=None,
+                         tree=False):
+        """
+        Apply a filter in a worker thread, and call add_func with the
+        matches of each chunk in the main loop, so that the rows are shown
+        while the remaining objects are still being checked.  A job that is
+        still running is cancelled.
+
+        Return False if the database cannot be read by another thread, in
+        which case the caller must apply the filter itself.
+        """
+        self.cancel_filter_job()
+        job = FilterJob(self.db, gfilter,
+                        lambda matches: GLib.idle_add(self.__add_matches, job,
+                                                      add_func, matches),
+                        id_list, tupleind, tree)
+        if not job.start():
+            return False
+        self._filter_job = job
+        return True
+
+    def cancel_filter_job(self):
+        """
+        Stop applying the filter of start_filter_job.
+        """
+        if self._filter_job is not None:
+            self._filter_job.cancel()
+            self._filter_job = None
+
+    def filter_running(self):
+        """
+        Return True while the rows matching a filter are being added.
+        """
+        return self._filter_job is not None
+
+    def __add_matches(self, job, add_func, matches):
+        """
+        Add the rows of a chunk of filter matches, in the main loop.
+        """
+        if job is not self._filter_job:
+            # cancelled, the chunk was already queued
+            return False
+        if matches is None:
+            self._filter_job = None
+        else:
+            add_func(matches)
+        if self.filter_progress:
+            self.filter_progress()
+        return False
+
     def clear_cache(self, handle=None):
         """
         Clear the LRU cache. Always clear lru_path, because paths may have
@@ -62,10 +126,9 @@ class BaseModel:
         Get the value of a "col". col may be a number (position in a model)
         or a name (special value used by view).
         """
-        if handle in self.lru_data and col in self.lru_data[handle]:
-            #print("hit", handle, col)
-            return (True, self.lru_data[handle][col])
-        #print("MISS", handle, col)
+        values = self.lru_data.get(handle)
+        if values is not None and col in values:
+            return (True, values[col])
         return (False, None)
 
     def set_cached_value(self, handle, col, data):
@@ -74,17 +137,19 @@ class BaseModel:
         """
         if not self._in_build:
             if self.lru_data.count > 0:
-                if handle not in self.lru_data:
-                    self.lru_data[handle] = {}
-                self.lru_data[handle][col] = data
+                values = self.lru_data.get(handle)
+                if values is None:
+                    values = self.lru_data[handle] = {}
+                values[col] = data
 
     ## Cached Path's for TreeView:
     def get_cached_path(self, handle):
         """
         Saves the Gtk iter path.
         """
-        if handle in self.lru_path:
-            return (True, self.lru_path[handle])
+        path = self.lru_path.get(handle)
+        if path is not None:
+            return (True, path)
         return (False, None)
 
     def set_cached_path(self, handle, path):
@@ -29,17 +29,18 @@ Instead, it suffices to keep in memory the sortkey and the matching handle,
 as well as a map of sortkey,handle to treeview path, and vice versa.
 
 For a flat view, the index of sortkey,handle will be the path, so it suffices
-to keep in memory a map that given a sortkey,handle returns the path.
+to keep in memory the sorted list of sortkey,handle.
 As we need to be able to insert/delete/update objects, and for that the handle
-is all we know initially, and as sortkey,handle is uniquely determined by
-handle, instead of keeping a map of sortkey,handle to path, we keep a map of
-handle to path
+is all we know initially, we keep a map of handle to sortkey. The path of a
+handle is found by bisecting the sorted list, so that inserting or deleting a
+row does not need to renumber the rows after it.
 
-As a user selects another column to sort, the sortkey must be rebuild, and the
-map remade.
+As a user selects another column to sort, the sortkeys of that column are
+needed. The sorted lists of the columns used before are kept and updated, so
+that switching back to a column does not walk the database again.
 
 The class FlatNodeMap keeps a sortkeyhandle list with (sortkey, handle) entries,
-and a handle2path dictionary. As the Map is flat, the index in sortkeyhandle
+and a handle2sortkey dictionary. As the Map is flat, the index in sortkeyhandle
 corresponds to the path.
 
 The class FlatBaseModel, is the base class for all flat treeview models.
@@ -53,6 +54,7 @@ It keeps a FlatNodeMap, and obtains data from database as needed
 #-------------------------------------------------------------------------
 import logging
 import bisect
+from collections import OrderedDict
 from time import perf_counter
 
 _LOG = logging.getLogger(".gui.basetreemodel")
@@ -84,6 +86,9 @@ from gramps.gen.proxy.cache import CacheProxyDb
 
 UEMPTY = ""
 
+# Number of columns, besides the sorted one, whose sorted list is kept
+SORT_INDEXES = 3
+
 class FlatNodeMap:
     """
     A NodeMap for a flat treeview. In such a TreeView, the paths possible are
@@ -104,10 +109,12 @@ class FlatNodeMap:
         * index2hndl : list of (srtkey, hndl) tuples. The index gives the
                         (srtkey, hndl) it belongs to.
                        This normally is only a part of all possible data
-        * hndl2index : dictionary of *hndl: index* values
+        * hndl2key   : dictionary of *hndl: srtkey* values of all possible
+                       data
 
     The implementation provides a list of (srtkey, hndl) of which the index is
-    the path, and a dictionary mapping hndl to index.
+    the path, and a dictionary mapping hndl to srtkey. The index of a hndl is
+    found by bisecting the list.
     To obtain index given a path, method real_index() is available
 
     ..Note: glocale.sort_key is applied to the underlying sort key,
@@ -121,7 +128,7 @@ class FlatNodeMap:
         self._index2hndl = []
         self._fullhndl = self._index2hndl
         self._identical = True
-        self._hndl2index = {}
+        self._hndl2key = {}
         self._reverse = False
         self.__corr = (0, 1)
         #We create a stamp to recognize invalid iterators. From the docs:
@@ -138,15 +145,15 @@ class FlatNodeMap:
         """
         self._index2hndl = None
         self._fullhndl = None
-        self._hndl2index = None
+        self._hndl2key = None
 
     def set_path_map(self, index2hndllist, fullhndllist, identical=True,
-                     reverse=False):
+                     reverse=False, hndl2key=None):
         """
         This is the core method to set up the FlatNodeMap
         Input is a list of (srtkey, handle), of which the index is the path
-        Calling this method sets the index2hndllist, and creates the hndl2index
-        map.
+        Calling this method sets the index2hndllist, and creates the hndl2key
+        map, unless it is given.
         fullhndllist is the entire list of (srtkey, handle) that is possible,
         normally index2hndllist is only part of this list as determined by
         filtering. To avoid memory, if both lists are the same, pass only one
@@ -165,14 +172,18 @@ class FlatNodeMap:
         :param identical: identify if index2hndllist and fullhndllist are the
                         same list, so only one is kept in memory.
         :type identical: bool
+        :param hndl2key: the sortkey of each handle in fullhndllist.
+        :type hndl2key: dict
         """
         self.stamp += 1
         self._index2hndl = index2hndllist
-        self._hndl2index = {}
         self._identical = identical
         self._fullhndl = self._index2hndl if identical else fullhndllist
+        if hndl2key is None:
+            hndl2key = dict((hndl, srtkey) for srtkey, hndl in self._fullhndl)
+        self._hndl2key = hndl2key
         self._reverse = reverse
-        self.reverse_order()
+        self.__set_corr()
 
     def full_srtkey_hndl_map(self):
         """
@@ -182,25 +193,52 @@ class FlatNodeMap:
         """
         return self._fullhndl
 
+    def full_srtkey_map(self):
+        """
+        The dictionary of the sortkey of each handle in the list of all
+        possible (sortkey, handle) tuples.
+        """
+        return self._hndl2key
+
+    def shown_handles(self):
+        """
+        Return the set of handles in the map, or None if all possible
+        handles are in the map.
+        """
+        if self._identical:
+            return None
+        return set(hndl for dummy_srtkey, hndl in self._index2hndl)
+
     def reverse_order(self):
         """
         This method keeps the index2hndl map, but sets it up the index in
-        reverse order. If the hndl2index map does not exist yet, it is created
-        in the acending order as given in index2hndl
-        The result is always a hndl2index map wich is correct, so or ascending
-        order, or reverse order.
-        """
-        if self._hndl2index:
-            #if hndl2index is build already, invert order, otherwise keep
-            # requested order
-            self._reverse = not self._reverse
+        reverse order.
+        """
+        self._reverse = not self._reverse
+        self.__set_corr()
+
+    def __set_corr(self):
+        """
+        Set the correction from index to path for the current order.
+        """
         if self._reverse:
             self.__corr = (len(self._index2hndl) - 1, -1)
         else:
             self.__corr = (0, 1)
-        if not self._hndl2index:
-            self._hndl2index = dict((key[1], index)
-                for index, key in enumerate(self._index2hndl))
+
+    def _get_index(self, handle):
+        """
+        Return the index of the handle in index2hndl, or None if it is not
+        in the map.
+        """
+        srtkey = self._hndl2key.get(handle)
+        if srtkey is None:
+            return None
+        index = bisect.bisect_left(self._index2hndl, (srtkey, handle))
+        if index < len(self._index2hndl) and \
+                self._index2hndl[index][1] == handle:
+            return index
+        return None
 
     def real_path(self, index):
         """
@@ -223,7 +261,7 @@ class FlatNodeMap:
         Clears out the index2hndl and the hndl2index
         """
         self._index2hndl = []
-        self._hndl2index = {}
+        self._hndl2key = {}
         self._fullhndl = self._index2hndl
         self._identical = True
 
@@ -254,7 +292,7 @@ class FlatNodeMap:
         :type handle: an object handle
         :Returns: the path, or None if handle does not link to a path
         """
-        index = self._hndl2index.get(handle)
+        index = self._get_index(handle)
         if index is None:
             return None
 
@@ -269,20 +307,25 @@ class FlatNodeMap:
         :type handle: an object handle
         :Returns: the sortkey, or None if handle is not present
         """
-        index = self._hndl2index.get(handle)
-        return None if index is None else self._index2hndl[index][0]
+        return self._hndl2key.get(handle)
 
     def new_iter(self, handle):
         """
         Return a new iter containing the handle
         """
+        return self.__new_iter(self._get_index(handle))
+
+    def __new_iter(self, index):
+        """
+        Return a new iter containing the index
+        """
         iter = Gtk.TreeIter()
         iter.stamp = self.stamp
         ##GTK3: user data may only be an integer, we store the index
         ##PROBLEM: pygobject 3.8 stores 0 as None, we need to correct
         ##        when using user_data for that!
         ##upstream bug: https://bugzilla.gnome.org/show_bug.cgi?id=698366
-        iter.user_data = self._hndl2index[handle]
+        iter.user_data = index
         return iter
 
     def get_iter(self, path):
@@ -297,8 +340,10 @@ class FlatNodeMap:
         :param path: path as it appears in the treeview
         :type path: integer
         """
-        iter = self.new_iter(self._index2hndl[self.real_index(path)][1])
-        return iter
+        index = self.real_index(path)
+        if index < 0 or index >= len(self._index2hndl):
+            raise IndexError(path)
+        return self.__new_iter(index)
 
     def get_handle(self, path):
         """
@@ -368,7 +413,7 @@ class FlatNodeMap:
     def insert(self, srtkey_hndl, allkeyonly=False):
         """
         Insert a node. Given is a tuple (sortkey, handle), and this is added
-        in the correct place, while the hndl2index map is updated.
+        in the correct place, while the hndl2key map is updated.
         Returns the path of the inserted row
 
         :param srtkey_hndl: the (sortkey, handle) tuple that must be inserted
@@ -377,60 +422,65 @@ class FlatNodeMap:
         :Returns: path of the row inserted in the treeview
         :Returns type: Gtk.TreePath or None
         """
-        if srtkey_hndl[1] in self._hndl2index:
+        srtkey, hndl = srtkey_hndl
+        if self._get_index(hndl) is not None:
             print(('WARNING: Attempt to add row twice to the model (%s)' %
-                    srtkey_hndl[1]))
+                    hndl))
             return
         if not self._identical:
-            bisect.insort_left(self._fullhndl, srtkey_hndl)
+            if self._hndl2key.get(hndl) != srtkey:
+                # the row may be known but not shown, with another sortkey
+                self.__delete_full(hndl)
+                bisect.insort_left(self._fullhndl, srtkey_hndl)
+                self._hndl2key[hndl] = srtkey
             if allkeyonly:
                 #key is not part of the view
                 return None
+        self._hndl2key[hndl] = srtkey
         insert_pos = bisect.bisect_left(self._index2hndl, srtkey_hndl)
         self._index2hndl.insert(insert_pos, srtkey_hndl)
-        #make sure the index map is updated
-        for srt_key,hndl in self._index2hndl[insert_pos+1:]:
-            self._hndl2index[hndl] += 1
-        self._hndl2index[srtkey_hndl[1]] = insert_pos
         #update self.__corr so it remains correct
         if self._reverse:
             self.__corr = (len(self._index2hndl) - 1, -1)
         return Gtk.TreePath((self.real_path(insert_pos),))
 
+    def __delete_full(self, handle):
+        """
+        Delete the handle from the list of all possible (sortkey, handle)
+        tuples, if it is present there.
+        """
+        srtkey = self._hndl2key.get(handle)
+        if srtkey is None:
+            return
+        index = bisect.bisect_left(self._fullhndl, (srtkey, handle))
+        if index < len(self._fullhndl) and self._fullhndl[index][1] == handle:
+            del self._fullhndl[index]
+
     def delete(self, handle):
         """
         Delete the row with the given (handle).
-        This then rebuilds the hndl2index, subtracting one from each item
-        greater than the deleted index.
         path of deleted row is returned
         If handle is not present, None is returned
 
-        :param srtkey_hndl: the (sortkey, handle) tuple that must be inserted
+        :param handle: the handle of the row that must be deleted
 
         :Returns: path of the row deleted from the treeview
         :Returns type: Gtk.TreePath or None
         """
+        index = self._get_index(handle)
         #remove it from the full list first
         if not self._identical:
-            for indx in range(len(self._fullhndl)):
-                if self._fullhndl[indx][1] == handle:
-                    del self._fullhndl[indx]
-                    break
-        #now remove it from the index maps
-        try:
-            index = self._hndl2index[handle]
-        except KeyError:
+            self.__delete_full(handle)
+        self._hndl2key.pop(handle, None)
+        #now remove it from the index map
+        if index is None:
             # key not present in the treeview
             return None
         del self._index2hndl[index]
-        del self._hndl2index[handle]
         #update self.__corr so it remains correct
         delpath = self.real_path(index)
         if self._reverse:
             self.__corr = (len(self._index2hndl) - 1, -1)
-        #update the handle2path map so it remains correct
-        for dummy_srt_key, hndl in self._index2hndl[index:]:
-            self._hndl2index[hndl] -= 1
         return Gtk.TreePath((delpath,))
 
 
@@ -464,6 +514,27 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
 
         self.db = db
         #normally sort on first column, so scol=0
+        self.__set_sort_col(scol, sort_map)
+        # sorted (sortkey, handle) lists and sortkey maps of the model
+        # columns sorted on before, most recently used last
+        self._sort_indexes = OrderedDict()
+        self.skip = skip
+        self._in_build = False
+
+        self.node_map = FlatNodeMap()
+        self.set_search(search)
+
+        self._reverse = (order == Gtk.SortType.DESCENDING)
+
+        self.rebuild_data()
+        _LOG.debug(self.__class__.__name__ + ' __init__ ' +
+                    str(perf_counter() - cput) + ' sec')
+
+    def __set_sort_col(self, scol, sort_map):
+        """
+        Set the column to sort on, and the function that maps data to
+        sort_keys.
+        """
         if sort_map:
             #sort_map is the stored order of the columns and if they are
             #enabled or not. We need to store on scol of that map
@@ -472,21 +543,70 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             col = self.sort_map[scol][1]
         else:
             col = scol
-        # get the function that maps data to sort_keys
-        self.sort_func = lambda x: glocale.sort_key(self.smap[col](x))
+        self.sort_func = self.__get_sort_func(col)
         self.sort_col = scol
-        self.skip = skip
-        self._in_build = False
+        self._sort_model_col = col
 
-        self.node_map = FlatNodeMap()
-        self.set_search(search)
+    def __get_sort_func(self, col):
+        """
+        Return the function that maps data to the sort_key of a model column
+        """
+        return lambda x: glocale.sort_key(self.smap[col](x))
 
-        self._reverse = (order == Gtk.SortType.DESCENDING)
+    def set_sort_col(self, scol, order=Gtk.SortType.ASCENDING, sort_map=None):
+        """
+        Sort on another column, keeping the rows that are shown.
 
-        self.rebuild_data()
-        _LOG.debug(self.__class__.__name__ + ' __init__ ' +
+        The sorted list of the previous column is kept, and kept up to date,
+        so that sorting on it again does not walk the database.
+        """
+        cput = perf_counter()
+        old_col = self._sort_model_col
+        self.__set_sort_col(scol, sort_map)
+        if self._sort_model_col == old_col:
+            if self._reverse != (order == Gtk.SortType.DESCENDING):
+                self.reverse_order()
+            return
+        self._reverse = (order == Gtk.SortType.DESCENDING)
+        allkeys = self.node_map.full_srtkey_hndl_map()
+        hndl2key = self.node_map.full_srtkey_map()
+        shown = self.node_map.shown_handles()
+        self._sort_indexes[old_col] = (allkeys, hndl2key)
+        if self._sort_model_col in self._sort_indexes:
+            allkeys, hndl2key = self._sort_indexes.pop(self._sort_model_col)
+        elif (self.db is not None) and self.db.is_open():
+            allkeys = self.sort_keys()
+            hndl2key = None
+        else:
+            allkeys = []
+            hndl2key = None
+        while len(self._sort_indexes) > SORT_INDEXES:
+            self._sort_indexes.popitem(last=False)
+        if shown is None:
+            dlist = allkeys
+        else:
+            dlist = [key for key in allkeys if key[1] in shown]
+        self.node_map.set_path_map(dlist, allkeys, identical=shown is None,
+                                   reverse=self._reverse, hndl2key=hndl2key)
+        _LOG.debug(self.__class__.__name__ + ' set_sort_col ' +
                     str(perf_counter() - cput) + ' sec')
 
+    def __update_sort_indexes(self, handle, data=None):
+        """
+        Update the sorted lists of the other columns for a changed object.
+        The object is deleted from them if data is None.
+        """
+        for col, (allkeys, hndl2key) in self._sort_indexes.items():
+            srtkey = hndl2key.pop(handle, None)
+            if srtkey is not None:
+                index = bisect.bisect_left(allkeys, (srtkey, handle))
+                if index < len(allkeys) and allkeys[index][1] == handle:
+                    del allkeys[index]
+            if data is not None:
+                srtkey = self.__get_sort_func(col)(data)
+                hndl2key[handle] = srtkey
+                bisect.insort_left(allkeys, (srtkey, handle))
+
     def destroy(self):
         """
         Unset all elements that prevent garbage collection
@@ -494,6 +614,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         BaseModel.destroy(self)
         self.db = None
         self.sort_func = None
+        self._sort_indexes = None
         if self.node_map:
             self.node_map.destroy()
         self.node_map = None
@@ -575,6 +696,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """ function called when view must be build, given a search text
             in the top search bar
         """
+        self.cancel_filter_job()
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
@@ -604,6 +726,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """ function called when view must be build, given filter options
             in the filter sidebar
         """
+        self.cancel_filter_job()
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
@@ -613,7 +736,12 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                 allkeys = self.sort_keys()
             if self.search:
                 ident = False
-                if ignore is None:
+                if ignore is None and self.start_filter_job(
+                        self.search, self.__add_matches, list(allkeys),
+                        tupleind=1):
+                    # the rows are added as they are found
+                    dlist = []
+                elif ignore is None:
                     dlist = self.search.apply(cdb, allkeys, tupleind=1,
                                               user=self.user)
                 else:
@@ -632,6 +760,24 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self.node_map.clear_map()
         self._in_build = False
 
+    def __add_matches(self, matches):
+        """
+        Show the rows of a chunk of (sortkey, handle) tuples matching the
+        filter of the sidebar.
+        """
+        hndl2key = self.node_map.full_srtkey_map()
+        for srtkey, handle in matches:
+            # the object may have changed or gone since the filter started
+            srtkey = hndl2key.get(handle)
+            if srtkey is None or handle in self.skip:
+                continue
+            if self.node_map.get_path_from_handle(handle) is not None:
+                continue
+            insert_path = self.node_map.insert((srtkey, handle))
+            if insert_path is not None:
+                node = self.do_get_iter(insert_path)[1]
+                self.row_inserted(insert_path, node)
+
     def add_row_by_handle(self, handle):
         """
         Add a row. This is called after object with handle is created.
@@ -642,6 +788,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             return # row is already displayed
         data = self.map(handle)
         insert_val = (self.sort_func(data), handle)
+        self.__update_sort_indexes(handle, data)
         if not self.search or \
                 (self.search and self.search.match(handle, self.db)):
             #row needs to be added to the model
@@ -658,6 +805,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Delete a row, called after the object with handle is deleted
         """
         delete_path = self.node_map.delete(handle)
+        self.__update_sort_indexes(handle)
         #delete_path is an integer from 0 to n-1
         if delete_path is not None:
             self.clear_cache(handle)
@@ -668,10 +816,19 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Update a row, called after the object with handle is changed
         """
         if self.node_map.get_path_from_handle(handle) is None:
+            if handle in self.node_map.full_srtkey_map():
+                # row is hidden by the filter, but must sort correctly
+                # once it is shown again
+                self.clear_cache(handle)
+                data = self.map(handle)
+                self.__update_sort_indexes(handle, data)
+                self.node_map.insert((self.sort_func(data), handle),
+                                     allkeyonly=True)
             return # row is not currently displayed
         self.clear_cache(handle)
         oldsortkey = self.node_map.get_sortkey(handle)
-        newsortkey = self.sort_func(self.map(handle))
+        data = self.map(handle)
+        newsortkey = self.sort_func(data)
         if oldsortkey is None or oldsortkey != newsortkey:
             #or the changed object is not present in the view due to filtering
             #or the order of the object must change.
@@ -679,6 +836,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self.add_row_by_handle(handle)
         else:
             #the row is visible in the view, is changed, but the order is fixed
+            self.__update_sort_indexes(handle, data)
             path = self.node_map.get_path_from_handle(handle)
             node = self.do_get_iter(path)[1]
             self.row_changed(path, node)
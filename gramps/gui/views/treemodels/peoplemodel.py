@@ -55,11 +55,10 @@ _LOG = logging.getLogger(".")
 #-------------------------------------------------------------------------
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
-from gramps.gen.lib import (Name, EventRef, EventType, EventRoleType,
-                            FamilyRelType, ChildRefType, NoteType)
 from gramps.gen.display.name import displayer as name_displayer
 from gramps.gen.display.place import displayer as place_displayer
-from gramps.gen.datehandler import format_time, get_date, get_date_valid
+from gramps.gen.datehandler import format_time, get_date
+from gramps.gen.db.summary import PersonSummary
 from .flatbasemodel import FlatBaseModel
 from .treebasemodel import TreeBaseModel
 from .basemodel import BaseModel
@@ -85,6 +84,10 @@ COLUMN_PRIV = 19
 
 invalid_date_format = config.get('preferences.invalid-date-format')
 
+# Summary of a person that is not in the database
+NO_SUMMARY = PersonSummary(None, False, 0, True, None, False, 0, True,
+                           None, False, None, False, (), 0, 0, 0, 0)
+
 #-------------------------------------------------------------------------
 #
 # PeopleBaseModel
@@ -194,20 +197,25 @@ class PeopleBaseModel(BaseModel):
             # There is a problem returning None here.
             return ''
 
+    def _get_summary(self, data):
+        """
+        Return the summary of the person, from which the values of the
+        event, family and note columns are taken.
+        """
+        handle = data[0]
+        cached, summary = self.get_cached_value(handle, "SUMMARY")
+        if not cached:
+            summary = self.db.get_person_summary(handle) or NO_SUMMARY
+            self.set_cached_value(handle, "SUMMARY", summary)
+        return summary
+
     def _get_spouse_data(self, data):
         spouses_names = ""
-        for family_handle in data[COLUMN_FAMILY]:
-            family = self.db.get_family_from_handle(family_handle)
-            for spouse_id in [family.get_father_handle(),
-                              family.get_mother_handle()]:
-                if not spouse_id:
-                    continue
-                if spouse_id == data[0]:
-                    continue
-                spouse = self.db.get_person_from_handle(spouse_id)
-                if spouses_names:
-                    spouses_names += ", "
-                spouses_names += name_displayer.display(spouse)
+        for spouse_id in self._get_summary(data).spouses:
+            spouse = self.db.get_person_from_handle(spouse_id)
+            if spouses_names:
+                spouses_names += ", "
+            spouses_names += name_displayer.display(spouse)
         return spouses_names
 
     def column_id(self, data):
@@ -239,45 +247,32 @@ class PeopleBaseModel(BaseModel):
         return value
 
     def _get_birth_data(self, data, sort_mode):
-        index = data[COLUMN_BIRTH]
-        if index != -1:
-            try:
-                local = data[COLUMN_EVENT][index]
-                b = EventRef()
-                b.unserialize(local)
-                birth = self.db.get_event_from_handle(b.ref)
-                if sort_mode:
-                    retval = "%09d" % birth.get_date_object().get_sort_value()
-                else:
-                    date_str = get_date(birth)
-                    if date_str != "":
-                        retval = escape(date_str)
-                if not get_date_valid(birth):
-                    return invalid_date_format % retval
-                else:
-                    return retval
-            except:
-                return ''
-
-        for event_ref in data[COLUMN_EVENT]:
-            er = EventRef()
-            er.unserialize(event_ref)
-            event = self.db.get_event_from_handle(er.ref)
-            etype = event.get_type()
-            date_str = get_date(event)
-            if (etype in [EventType.BAPTISM, EventType.CHRISTEN]
-                and er.get_role() == EventRoleType.PRIMARY
-                and date_str != ""):
-                if sort_mode:
-                    retval = "%09d" % event.get_date_object().get_sort_value()
-                else:
-                    retval = "<i>%s</i>" % escape(date_str)
-                if not get_date_valid(event):
-                    return invalid_date_format % retval
-                else:
-                    return retval
-
-        return ""
+        summary = self._get_summary(data)
+        return self._get_date_data(summary.birth, summary.birth_fallback,
+                                   summary.birth_sortval,
+                                   summary.birth_valid, sort_mode)
+
+    def _get_date_data(self, event_handle, fallback, sortval, valid,
+                       sort_mode):
+        """
+        Return the value of a date column, given the event of the summary
+        and the sort value and validity of its date.
+        """
+        if event_handle is None:
+            return ""
+        if sort_mode:
+            retval = "%09d" % sortval
+        else:
+            date_str = get_date(self.db.get_event_from_handle(event_handle))
+            if date_str == "":
+                return ""
+            retval = escape(date_str)
+            if fallback:
+                retval = "<i>%s</i>" % retval
+        if not valid:
+            return invalid_date_format % retval
+        else:
+            return retval
 
     def column_death_day(self, data):
         handle = data[0]
@@ -296,167 +291,56 @@ class PeopleBaseModel(BaseModel):
         return value
 
     def _get_death_data(self, data, sort_mode):
-        index = data[COLUMN_DEATH]
-        if index != -1:
-            try:
-                local = data[COLUMN_EVENT][index]
-                ref = EventRef()
-                ref.unserialize(local)
-                event = self.db.get_event_from_handle(ref.ref)
-                if sort_mode:
-                    retval = "%09d" % event.get_date_object().get_sort_value()
-                else:
-                    date_str = get_date(event)
-                    if date_str != "":
-                        retval = escape(date_str)
-                if not get_date_valid(event):
-                    return invalid_date_format % retval
-                else:
-                    return retval
-            except:
-                return ''
-
-        for event_ref in data[COLUMN_EVENT]:
-            er = EventRef()
-            er.unserialize(event_ref)
-            event = self.db.get_event_from_handle(er.ref)
-            etype = event.get_type()
-            date_str = get_date(event)
-            if (etype in [EventType.BURIAL,
-                          EventType.CREMATION,
-                          EventType.CAUSE_DEATH]
-                and er.get_role() == EventRoleType.PRIMARY
-                and date_str):
-                if sort_mode:
-                    retval = "%09d" % event.get_date_object().get_sort_value()
-                else:
-                    retval = "<i>%s</i>" % escape(date_str)
-                if not get_date_valid(event):
-                    return invalid_date_format % retval
-                else:
-                    return retval
-        return ""
+        summary = self._get_summary(data)
+        return self._get_date_data(summary.death, summary.death_fallback,
+                                   summary.death_sortval,
+                                   summary.death_valid, sort_mode)
 
     def column_birth_place(self, data):
         handle = data[0]
         cached, value = self.get_cached_value(handle, "BIRTH_PLACE")
-        if cached:
-            return value
-        else:
-            index = data[COLUMN_BIRTH]
-            if index != -1:
-                try:
-                    local = data[COLUMN_EVENT][index]
-                    br = EventRef()
-                    br.unserialize(local)
-                    event = self.db.get_event_from_handle(br.ref)
-                    if event:
-                        place_title = place_displayer.display_event(self.db, event)
-                        if place_title:
-                            value = escape(place_title)
-                            self.set_cached_value(handle, "BIRTH_PLACE", value)
-                            return value
-                except:
-                    value = ''
-                    self.set_cached_value(handle, "BIRTH_PLACE", value)
-                    return value
-
-            for event_ref in data[COLUMN_EVENT]:
-                er = EventRef()
-                er.unserialize(event_ref)
-                event = self.db.get_event_from_handle(er.ref)
-                etype = event.get_type()
-                if (etype in [EventType.BAPTISM, EventType.CHRISTEN] and
-                    er.get_role() == EventRoleType.PRIMARY):
-                        place_title = place_displayer.display_event(self.db, event)
-                        if place_title:
-                            value = "<i>%s</i>" % escape(place_title)
-                            self.set_cached_value(handle, "BIRTH_PLACE", value)
-                            return value
-            value = ""
+        if not cached:
+            summary = self._get_summary(data)
+            value = self._get_place_data(summary.birth_place,
+                                         summary.birth_place_fallback)
             self.set_cached_value(handle, "BIRTH_PLACE", value)
-            return value
+        return value
 
     def column_death_place(self, data):
         handle = data[0]
         cached, value = self.get_cached_value(handle, "DEATH_PLACE")
-        if cached:
-            return value
-        else:
-            index = data[COLUMN_DEATH]
-            if index != -1:
-                try:
-                    local = data[COLUMN_EVENT][index]
-                    dr = EventRef()
-                    dr.unserialize(local)
-                    event = self.db.get_event_from_handle(dr.ref)
-                    if event:
-                        place_title = place_displayer.display_event(self.db, event)
-                        if place_title:
-                            value = escape(place_title)
-                            self.set_cached_value(handle, "DEATH_PLACE", value)
-                            return value
-                except:
-                    value = ''
-                    self.set_cached_value(handle, "DEATH_PLACE", value)
-                    return value
-
-            for event_ref in data[COLUMN_EVENT]:
-                er = EventRef()
-                er.unserialize(event_ref)
-                event = self.db.get_event_from_handle(er.ref)
-                etype = event.get_type()
-                if (etype in [EventType.BURIAL, EventType.CREMATION,
-                              EventType.CAUSE_DEATH]
-                    and er.get_role() == EventRoleType.PRIMARY):
-
-                        place_title = place_displayer.display_event(self.db, event)
-                        if place_title:
-                            value = "<i>%s</i>" % escape(place_title)
-                            self.set_cached_value(handle, "DEATH_PLACE", value)
-                            return value
-            value = ""
+        if not cached:
+            summary = self._get_summary(data)
+            value = self._get_place_data(summary.death_place,
+                                         summary.death_place_fallback)
             self.set_cached_value(handle, "DEATH_PLACE", value)
-            return value
+        return value
+
+    def _get_place_data(self, event_handle, fallback):
+        """
+        Return the value of a place column, given the event of the summary.
+        """
+        if event_handle is None:
+            return ""
+        event = self.db.get_event_from_handle(event_handle)
+        place_title = place_displayer.display_event(self.db, event)
+        if not place_title:
+            return ""
+        if fallback:
+            return "<i>%s</i>" % escape(place_title)
+        return escape(place_title)
 
     def _get_parents_data(self, data):
-        parents = 0
-        if data[COLUMN_PARENT]:
-            person = self.db.get_person_from_gramps_id(data[COLUMN_ID])
-            family_list = person.get_parent_family_handle_list()
-            for fam_hdle in family_list:
-                family = self.db.get_family_from_handle(fam_hdle)
-                if family.get_father_handle():
-                    parents += 1
-                if family.get_mother_handle():
-                    parents += 1
-        return parents
+        return self._get_summary(data).parents
 
     def _get_marriages_data(self, data):
-        marriages = 0
-        for family_handle in data[COLUMN_FAMILY]:
-            family = self.db.get_family_from_handle(family_handle)
-            if int(family.get_relationship()) == FamilyRelType.MARRIED:
-                marriages += 1
-        return marriages
+        return self._get_summary(data).marriages
 
     def _get_children_data(self, data):
-        children = 0
-        for family_handle in data[COLUMN_FAMILY]:
-            family = self.db.get_family_from_handle(family_handle)
-            for child_ref in family.get_child_ref_list():
-                if (child_ref.get_father_relation() == ChildRefType.BIRTH and
-                    child_ref.get_mother_relation() == ChildRefType.BIRTH):
-                    children += 1
-        return children
+        return self._get_summary(data).children
 
     def _get_todo_data(self, data):
-        todo = 0
-        for note_handle in data[COLUMN_NOTES]:
-            note = self.db.get_note_from_handle(note_handle)
-            if int(note.get_type()) == NoteType.TODO:
-                todo += 1
-        return todo
+        return self._get_summary(data).todo
 
     def column_parents(self, data):
         handle = data[0]
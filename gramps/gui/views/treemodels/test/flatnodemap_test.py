@@ -0,0 +1,87 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+import unittest
+from ..flatbasemodel import FlatNodeMap
+
+class FlatNodeMapTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keys = [('a', 'h1'), ('b', 'h2'), ('c', 'h3'), ('d', 'h4')]
+        self.nm = FlatNodeMap()
+
+    def paths(self):
+        return [self.nm.get_handle(path) for path in range(len(self.nm))]
+
+    def test_insertdelete(self):
+        self.nm.set_path_map(self.keys[:], None)
+        self.nm.insert(('bb', 'h5'))
+        self.assertEqual(self.paths(), ['h1', 'h2', 'h5', 'h3', 'h4'])
+        self.assertEqual(self.nm.get_path_from_handle('h3').get_indices(),
+                         [3])
+        self.nm.delete('h2')
+        self.assertEqual(self.paths(), ['h1', 'h5', 'h3', 'h4'])
+        self.assertEqual(self.nm.get_path_from_handle('h3').get_indices(),
+                         [2])
+        self.assertIsNone(self.nm.get_path_from_handle('h2'))
+        self.assertIsNone(self.nm.delete('h2'))
+
+    def test_reverse(self):
+        self.nm.set_path_map(self.keys[:], None, reverse=True)
+        self.assertEqual(self.paths(), ['h4', 'h3', 'h2', 'h1'])
+        self.nm.insert(('bb', 'h5'))
+        self.assertEqual(self.paths(), ['h4', 'h3', 'h5', 'h2', 'h1'])
+        self.nm.reverse_order()
+        self.assertEqual(self.paths(), ['h1', 'h2', 'h5', 'h3', 'h4'])
+
+    def test_filtered(self):
+        full = self.keys[:]
+        self.nm.set_path_map([full[0], full[2]], full, identical=False)
+        self.assertEqual(self.nm.shown_handles(), {'h1', 'h3'})
+        self.nm.insert(('bb', 'h5'), allkeyonly=True)
+        self.assertEqual(self.paths(), ['h1', 'h3'])
+        self.assertEqual(self.nm.max_rows(), 5)
+        self.nm.insert(('e', 'h6'))
+        self.assertEqual(self.paths(), ['h1', 'h3', 'h6'])
+        self.nm.delete('h5')
+        self.nm.delete('h1')
+        self.assertEqual(self.paths(), ['h3', 'h6'])
+        self.assertEqual([hndl for key, hndl in
+                          self.nm.full_srtkey_hndl_map()],
+                         ['h2', 'h3', 'h4', 'h6'])
+
+    def test_filtered_known(self):
+        full = self.keys[:]
+        self.nm.set_path_map([full[0]], full, identical=False)
+        # known and hidden, with the same sortkey
+        self.nm.insert(('b', 'h2'), allkeyonly=True)
+        self.assertEqual(self.paths(), ['h1'])
+        self.assertEqual(self.nm.max_rows(), 4)
+        # known and hidden, with another sortkey
+        self.nm.insert(('e', 'h2'), allkeyonly=True)
+        self.assertEqual(self.paths(), ['h1'])
+        self.assertEqual(self.nm.get_sortkey('h2'), 'e')
+        self.assertEqual([hndl for key, hndl in
+                          self.nm.full_srtkey_hndl_map()],
+                         ['h1', 'h3', 'h4', 'h2'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -42,6 +42,28 @@ class NodeTest(unittest.TestCase):
         nm.del_node(n2)
         self.assertEqual(len(n.children), 0)
 
+    def test_childindex(self):
+        nm = NodeMap()
+        root = Node(None, None, None, None, None)
+        nm.add_node(root)
+        nodes = [Node(str(i), root.nodeid, key, None, None)
+                 for i, key in enumerate(['b', 'a', 'c', 'a'])]
+        for node in nodes:
+            root.add_child(node, nm)
+        self.assertEqual([nm.node(i) for i in root.children],
+                         [nodes[1], nodes[3], nodes[0], nodes[2]])
+        self.assertEqual(root.child_index(nodes[3]), 1)
+        self.assertEqual(root.child_position(nodes[3]), 1)
+        root.remove_child(nodes[1], nm)
+        nodeid = nm.del_node(nodes[1])
+        self.assertEqual(root.child_index(nodes[3]), 0)
+        self.assertEqual(root.child_position(nodes[3]), 0)
+        self.assertRaises(ValueError, root.child_position, nodes[1])
+        self.assertRaises(KeyError, nm.node, nodeid)
+        self.assertRaises(ValueError, root.child_index, nodes[1])
+        # ids are reused
+        self.assertEqual(nm.add_node(nodes[1]), nodeid)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -33,6 +33,7 @@ This module provides the model that is used for all hierarchical treeviews.
 #
 #-------------------------------------------------------------------------
 from time import perf_counter
+from functools import partial
 import logging
 
 _LOG = logging.getLogger(".gui.treebasemodel")
@@ -54,11 +55,14 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 import gramps.gui.widgets.progressdialog as progressdlg
 from ...user import User
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right
 from gramps.gen.filters import SearchFilter, ExactSearchFilter
 from .basemodel import BaseModel
 from gramps.gen.proxy.cache import CacheProxyDb
 
+# shared by all nodes without a sortkey
+EMPTY_SORTKEY = glocale.sort_key('')
+
 #-------------------------------------------------------------------------
 #
 # Node
@@ -75,32 +79,35 @@ class Node:
     handle      A Gramps handle.  Can be None if no Gramps object is
                 associated with the node.
     parent      id of the parent node.
-    prev        Link to the previous sibling via id.
-    next        Link to the next sibling via id.
-
-    children    A list of (sortkey, nodeid) tuples for the children of the node.
-                This list is always kept sorted.
+    nodeid      id of the node in the NodeMap, None until it is added.
+
+    children    A list of the ids of the children of the node, in the sort
+                order of the node.  An empty tuple if there are none yet.
+    childkeys   A list of the sortkeys of the children, in the same order,
+                so that the position of a child is found by bisection.
+    childpos    A dictionary of the position of each child id, built when
+                the children are walked and dropped when they change.
     """
     __slots__ = ('name', 'sortkey', 'ref', 'handle', 'secondary', 'parent',
-                 'prev', 'next', 'children')#, '__weakref__')
+                 'nodeid', 'children', 'childkeys', 'childpos')
 
     def __init__(self, ref, parent, sortkey, handle, secondary):
         if sortkey:
             self.name = sortkey
             #sortkey must be localized sort, so
-            self.sortkey = glocale.sort_key(sortkey)
-            if not self.sortkey:
-                self.sortkey = glocale.sort_key('')
+            self.sortkey = glocale.sort_key(sortkey) or EMPTY_SORTKEY
         else:
             self.name = ''
-            self.sortkey = glocale.sort_key('')
+            self.sortkey = EMPTY_SORTKEY
         self.ref = ref
         self.handle = handle
         self.secondary = secondary
         self.parent = parent
-        self.prev = None
-        self.next = None
-        self.children = []
+        self.nodeid = None
+        # most nodes are leaves, which share the empty tuples
+        self.children = ()
+        self.childkeys = ()
+        self.childpos = None
 
     def set_handle(self, handle, secondary=False):
         """
@@ -118,58 +125,52 @@ class Node:
         Add a node to the list of children for this node using the id's in
         nodemap.
         """
-        nodeid = id(node)
-        if len(self.children):
-            index = bisect_right(self.children, (node.sortkey, nodeid))
-            if index == 0:
-                node.prev = None
-                next_nodeid = self.children[0][1]
-                next_node = nodemap.node(next_nodeid)
-                next_node.prev = nodeid
-                node.next = next_nodeid
-            elif index == len(self.children):
-                prev_nodeid = self.children[-1][1]
-                prev_node = nodemap.node(prev_nodeid)
-                prev_node.next = nodeid
-                node.prev = prev_nodeid
-                node.next = None
-            else:
-                prev_nodeid = self.children[index - 1][1]
-                next_nodeid = self.children[index][1]
-                prev_node = nodemap.node(prev_nodeid)
-                next_node = nodemap.node(next_nodeid)
-                prev_node.next = nodeid
-                next_node.prev = nodeid
-                node.prev = prev_nodeid
-                node.next = next_nodeid
-
-            self.children.insert(index, (node.sortkey, nodeid))
-
+        nodeid = nodemap.add_node(node)
+        self.childpos = None
+        if not self.children:
+            self.children = [nodeid]
+            self.childkeys = [node.sortkey]
         else:
-            self.children.append((node.sortkey, nodeid))
+            index = bisect_right(self.childkeys, node.sortkey)
+            self.children.insert(index, nodeid)
+            self.childkeys.insert(index, node.sortkey)
 
     def remove_child(self, node, nodemap):
         """
         Remove a node from the list of children for this node, using nodemap.
         """
-        nodeid = id(node)
-        index = bisect_right(self.children, (node.sortkey, nodeid)) - 1
-        if not (self.children[index] == (node.sortkey, nodeid)):
+        index = self.child_index(node)
+        del self.children[index]
+        del self.childkeys[index]
+        self.childpos = None
+
+    def child_index(self, node):
+        """
+        Return the position of a node in the list of children of this node.
+        """
+        index = bisect_left(self.childkeys, node.sortkey)
+        # children with the same sortkey are in the order they were added
+        end = len(self.children)
+        while index < end and self.children[index] != node.nodeid:
+            index += 1
+        if index == end or self.childkeys[index] != node.sortkey:
             raise ValueError(str(node.name) + \
-                        ' not present in self.children: ' + str(self.children)\
-                        + ' at index ' + str(index))
-        if index == 0:
-            if len(self.children) > 1:
-                nodemap.node(self.children[index+1][1]).prev = None
-        elif index == len(self.children)-1:
-            nodemap.node(self.children[index - 1][1]).next = None
-        else:
-            nodemap.node(self.children[index - 1][1]).next = \
-                        self.children[index + 1][1]
-            nodemap.node(self.children[index + 1][1]).prev = \
-                        self.children[index - 1][1]
+                        ' not present in self.children: ' + str(self.children))
+        return index
 
-        self.children.pop(index)
+    def child_position(self, node):
+        """
+        Return the position of a node in the list of children of this node,
+        in constant time when walking the children.
+        """
+        if self.childpos is None:
+            self.childpos = {nodeid: index
+                             for index, nodeid in enumerate(self.children)}
+        try:
+            return self.childpos[node.nodeid]
+        except KeyError:
+            raise ValueError(str(node.name) + \
+                        ' not present in self.children: ' + str(self.children))
 
 #-------------------------------------------------------------------------
 #
@@ -178,55 +179,71 @@ class Node:
 #-------------------------------------------------------------------------
 class NodeMap:
     """
-    Map of id of Node classes to real object
+    Map of the ids of Node classes to the real objects.
+
+    The ids are small integers, positions in a list, which are reused
+    once a node is deleted.  Id 0 is never used, so that an id is true.
     """
     def __init__(self):
-        self.id2node = {}
+        self.id2node = [None]
+        self.__free = []
 
     def destroy(self):
         """
         Unset all elements that can prevent garbage collection
         """
-##        for key, item in self.id2node.iteritems():
-##            item.prev = None
-##            item.next = None
-##            item.parent = None
-##            item.children = []
-        self.id2node.clear()
+        self.clear()
 
     def add_node(self, node):
         """
-        Add a Node object to the map and return id of this node
+        Add a Node object to the map and return id of this node.  A node
+        that is in the map already keeps its id.
         """
-        nodeid = id(node)
-        self.id2node[nodeid] = node
+        nodeid = node.nodeid
+        if nodeid is not None and self.id2node[nodeid] is node:
+            return nodeid
+        if self.__free:
+            nodeid = self.__free.pop()
+            self.id2node[nodeid] = node
+        else:
+            nodeid = len(self.id2node)
+            self.id2node.append(node)
+        node.nodeid = nodeid
         return nodeid
 
     def del_node(self, node):
         """
         Remove a Node object from the map and return nodeid
         """
-        nodeid = id(node)
-        del self.id2node[nodeid]
+        nodeid = node.nodeid
+        self.del_nodeid(nodeid)
+        node.nodeid = None
         return nodeid
 
     def del_nodeid(self, nodeid):
         """
         Remove Node with id nodeid from the map
         """
-        del self.id2node[nodeid]
+        if self.id2node[nodeid] is None:
+            raise KeyError(nodeid)
+        self.id2node[nodeid] = None
+        self.__free.append(nodeid)
 
     def node(self, nodeid):
         """
         Obtain the node object from it's id
         """
-        return self.id2node[nodeid]
+        node = self.id2node[nodeid]
+        if node is None:
+            raise KeyError(nodeid)
+        return node
 
     def clear(self):
         """
         clear the map
         """
-        self.id2node.clear()
+        self.id2node = [None]
+        self.__free = []
 
 #-------------------------------------------------------------------------
 #
@@ -248,7 +265,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                 the hierarchy.  Each entry is a node object.
     handle2node A dictionary of gramps handles.  Each entry is a node object.
     nodemap     A NodeMap, mapping id's of the nodes to the node objects. Node
-                refer to other nodes via id's in a linked list form.
+                refer to their parent and children via id's.
 
     The model obtains data from database as needed and holds a cache of most
     recently used data.
@@ -486,6 +503,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         data_filter and data_filter2 will have been set from set_search
         """
         cput = perf_counter()
+        self.cancel_filter_job()
         self.clear_cache()
         self._in_build = True
 
@@ -585,14 +603,19 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.__total += items
         assert not skip
         if dfilter:
-            cdb = CacheProxyDb(self.db)
-            for handle in dfilter.apply(cdb, tree=True,
-                                        user=User(parent=self.uistate.window,
+            # the rows are added as they are found, if the database can be
+            # read by a worker thread
+            if not self.start_filter_job(
+                    dfilter, partial(self.__add_matches, data_map, add_func),
+                    tree=True):
+                cdb = CacheProxyDb(self.db)
+                for handle in dfilter.apply(
+                        cdb, tree=True, user=User(parent=self.uistate.window,
                                                   uistate=self.uistate)):
-                status_ppl.heartbeat()
-                data = data_map(handle)
-                add_func(handle, data)
-                self.__displayed += 1
+                    status_ppl.heartbeat()
+                    data = data_map(handle)
+                    add_func(handle, data)
+                    self.__displayed += 1
         else:
             with gen_cursor() as cursor:
                 for handle, data in cursor:
@@ -602,6 +625,22 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
 
         status_ppl.end()
 
+    def __add_matches(self, data_map, add_func, matches):
+        """
+        Show the rows of a chunk of handles matching the filter of the
+        sidebar.
+        """
+        # the total includes the rows of the filter already
+        total = self.__total
+        for handle in matches:
+            if self._get_node(handle) is not None:
+                continue
+            # the object may have gone since the filter started
+            data = data_map(handle)
+            if data:
+                add_func(handle, data)
+        self.__total = total
+
     def add_node(self, parent, child, sortkey, handle, add_parent=True,
                  secondary=False):
         """
@@ -631,11 +670,10 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                                secondary)
         else:
             parent_node = self.tree[parent]
-            child_node = Node(child, id(parent_node), sortkey, handle,
+            child_node = Node(child, parent_node.nodeid, sortkey, handle,
                               secondary)
             parent_node.add_child(child_node, self.nodemap)
             self.tree[child] = child_node
-            self.nodemap.add_node(child_node)
 
             if not self._in_build:
                 # emit row_inserted signal
@@ -722,8 +760,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             if False:
                 self.rows_reordered(path, iter, rows)
             if self.nrgroups > 1:
-                for child in node.children:
-                    self._reverse_level(self.nodemap.node(child[1]))
+                for nodeid in node.children:
+                    self._reverse_level(self.nodemap.node(nodeid))
 
     def get_tree_levels(self):
         """
@@ -840,7 +878,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         if node is None:
             raise Exception('Not allowed to add None as node')
-        iter = self._new_iter(id(node))
+        iter = self._new_iter(node.nodeid)
         return iter
 
     def _get_node(self, handle):
@@ -964,10 +1002,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         for index in pathlist:
             _index = (-index - 1) if self.__reverse else index
             try:
-                if len(node.children[_index]) > 0:
-                    node = self.nodemap.node(node.children[_index][1])
-                else:
-                    return False, Gtk.TreeIter()
+                node = self.nodemap.node(node.children[_index])
             except IndexError:
                 return False, Gtk.TreeIter()
         return True, self._get_iter(node)
@@ -985,42 +1020,22 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         cached, path = self.get_cached_path(iter.user_data)
         if cached:
-            (treepath, pathtup) = path
-            return treepath
+            return path
         node = self.get_node_from_iter(iter)
         pathlist = []
         while node.parent is not None:
             parent = self.nodemap.node(node.parent)
-            index = -1
-            while node is not None:
-                # Step backwards
-                nodeid = node.next if self.__reverse else node.prev
-                # Let's see if sibling is cached:
-                cached,  sib_path = self.get_cached_path(nodeid)
-                if cached:
-                    (sib_treepath, sib_pathtup) = sib_path
-                    # Does it have an actual path?
-                    if sib_pathtup:
-                        # Compute path to here from sibling:
-                        # parent_path + sib_path + offset
-                        newtup = (sib_pathtup[:-1] +
-                                  (sib_pathtup[-1] + index + 2, ) +
-                                  tuple(reversed(pathlist)))
-                        #print("computed path:", iter.user_data, newtup)
-                        retval = Gtk.TreePath(newtup)
-                        self.set_cached_path(iter.user_data, (retval, newtup))
-                        return retval
-                node = nodeid and self.nodemap.node(nodeid)
-                index += 1
+            index = parent.child_index(node)
+            if self.__reverse:
+                index = len(parent.children) - 1 - index
             pathlist.append(index)
             node = parent
         if pathlist:
             pathlist.reverse()
-            #print("actual path :", iter.user_data, tuple(pathlist))
             retval = Gtk.TreePath(tuple(pathlist))
         else:
             retval = None
-        self.set_cached_path(iter.user_data, (retval, tuple(pathlist) if pathlist else None))
+        self.set_cached_path(iter.user_data, retval)
         return retval
 
     def do_iter_next(self, iter):
@@ -1030,10 +1045,13 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the next node with the same parent as the given node.
         """
         node = self.get_node_from_iter(iter)
-        val = node.prev if self.__reverse else node.next
-        if val:
+        if node.parent is None:
+            return False
+        parent = self.nodemap.node(node.parent)
+        index = parent.child_position(node) + (-1 if self.__reverse else 1)
+        if 0 <= index < len(parent.children):
             #user_data contains the nodeid
-            iter.user_data = val
+            iter.user_data = parent.children[index]
             return True
         else:
             return False
@@ -1043,11 +1061,11 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the first child of the given node.
         """
         if iterparent is None:
-            nodeid = id(self.tree[None])
+            nodeid = self.tree[None].nodeid
         else:
             nodeparent = self.get_node_from_iter(iterparent)
             if nodeparent.children:
-                nodeid = nodeparent.children[-1 if self.__reverse else 0][1]
+                nodeid = nodeparent.children[-1 if self.__reverse else 0]
             else:
                 return False, None
         return True, self._new_iter(nodeid)
@@ -1080,7 +1098,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         if node.children:
             if len(node.children) > index:
                 _index = (-index - 1) if self.__reverse else index
-                return True, self._new_iter(node.children[_index][1])
+                return True, self._new_iter(node.children[_index])
             else:
                 return False, None
         else:
@@ -0,0 +1,81 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Codecs for the blob_data column of the DB-API backends.
+
+The first byte of a blob identifies the codec that wrote it, so blobs
+written by different codecs can live in the same database.  The codec
+named in the 'blob-codec' metadata setting is used for writing, while
+:func:`decode` reads any of them.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import pickle
+
+#-------------------------------------------------------------------------
+#
+# Codec classes
+#
+#-------------------------------------------------------------------------
+class PickleCodec:
+    """
+    The original format: a pickle of the serialized object.
+    """
+    name = 'pickle'
+    tags = (0x80,)      # PROTO opcode, the first byte of every pickle we write
+
+    @staticmethod
+    def encode(data):
+        return pickle.dumps(data)
+
+    @staticmethod
+    def decode(blob):
+        return pickle.loads(blob)
+
+
+CODECS = {codec.name: codec for codec in (PickleCodec,)}
+_DECODERS = {tag: codec.decode
+             for codec in CODECS.values() for tag in codec.tags}
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_codec(name):
+    """
+    Return the codec with the given name.
+
+    :raises KeyError: if there is no such codec.
+    """
+    return CODECS[name]
+
+def decode(blob):
+    """
+    Decode a blob written by any of the codecs.
+
+    Untagged blobs are pickles written with protocol 0 or 1.
+    """
+    return _DECODERS.get(blob[0], pickle.loads)(blob)
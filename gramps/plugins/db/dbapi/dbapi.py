@@ -28,6 +28,8 @@ import os
 import time
 import pickle
 import logging
+from collections import defaultdict, namedtuple
+from functools import partial
 
 #------------------------------------------------------------------------
 #
@@ -35,28 +37,179 @@ import logging
 #
 #------------------------------------------------------------------------
 from gramps.gen.db.dbconst import (DBLOGNAME, DBBACKEND, KEY_TO_NAME_MAP,
-                                   KEY_TO_CLASS_MAP, TXNADD, TXNUPD, TXNDEL,
+                                   KEY_TO_CLASS_MAP, CLASS_TO_KEY_MAP,
+                                   TXNADD, TXNUPD, TXNDEL,
                                    PERSON_KEY, FAMILY_KEY, SOURCE_KEY,
                                    EVENT_KEY, MEDIA_KEY, PLACE_KEY, NOTE_KEY,
                                    TAG_KEY, CITATION_KEY, REPOSITORY_KEY,
-                                   REFERENCE_KEY)
+                                   REFERENCE_KEY, BULKSIZE, ARRAYSIZE,
+                                   CLOSURE_CACHE_SIZE)
 from gramps.gen.db.generic import DbGeneric
+from gramps.gen.db.summary import PersonSummary, get_person_summary
+from gramps.gen.utils.callman import SignalQueue
+from gramps.gen.utils.lru import LRU
 from gramps.gen.updatecallback import UpdateCallback
 from gramps.gen.lib import (Tag, Media, Person, Family, Source,
                             Citation, Event, Place, Repository, Note)
 from gramps.gen.lib.genderstats import GenderStats
+from gramps.gen.errors import DbError
 from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gen.config import config
+from gramps.plugins.db.dbapi.codec import get_codec, decode as decode_blob
+from gramps.plugins.db.dbapi.rebuild import (CLASSES, SORT_KEY_FIELDS,
+                                             get_secondary_values,
+                                             get_genealogy_links,
+                                             get_references,
+                                             get_secondary_rows, map_chunks,
+                                             get_sort_key,
+                                             get_sort_key_locale)
+
+_ = glocale.translation.gettext
 
 LOG = logging.getLogger(".dbapi")
 _LOG = logging.getLogger(DBLOGNAME)
 
+# Tables of the parent/child graph: (table, column of the person or family,
+# column of the linked family or child), see get_genealogy_links
+GENEALOGY_TABLES = {PERSON_KEY: ('parent_family', 'person_handle',
+                                 'family_handle'),
+                    FAMILY_KEY: ('family_child', 'family_handle',
+                                 'child_handle')}
+
+# In-memory parent/child graph, see DBAPI._get_genealogy
+Genealogy = namedtuple('Genealogy', ['parent_families', 'family_children',
+                                     'family_parents', 'person_families'])
+
+# Columns of the person_summary table, after the handle
+SUMMARY_COLUMNS = ", ".join(PersonSummary._fields)
+
+# The lookups that get_person_summary makes, see DBAPI._summary_reader
+SummaryReader = namedtuple('SummaryReader', ['get_event_from_handle',
+                                             'get_family_from_handle',
+                                             'get_note_from_handle'])
+
 class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
+    def __init__(self, directory=None):
+        # Buffered writes, see _bulk_begin
+        self._bulk = None
+        self._bulk_gids = {}
+        self._bulk_size = 0
+        self._bulk_trans = None
+        # Used to encode blob_data, see _load_blob_codec
+        self._blob_codec = get_codec('pickle')
+        # Parent/child graph, see _get_genealogy
+        self._has_genealogy = False
+        self._genealogy = None
+        self._closures = LRU(CLOSURE_CACHE_SIZE)
+        # Person summaries to recompute, see _update_person_summaries
+        self._has_person_summary = False
+        self._summary_people = set()
+        self._summary_refs = set()
+        # Rows fetched at a time by _iter_rows
+        self._fetch_size = ARRAYSIZE
+        # Class codes of the reference table, see _set_class_codes
+        self._class_code = CLASS_TO_KEY_MAP
+        self._class_name = KEY_TO_CLASS_MAP
+        # True if the sort key columns are up to date, see _load_sort_keys
+        self._sort_keys = False
+        super().__init__(directory)
+
     def _initialize(self, directory, username, password):
         raise NotImplementedError
 
+    def load(self, directory, callback=None, *args, **kwargs):
+        self._sort_keys = False
+        # Databases before schema version 21 only have pickled data, and
+        # store class names in the reference table
+        self._set_blob_codec('pickle')
+        self._set_class_codes(False)
+        self._has_genealogy = False
+        self._has_person_summary = False
+        super().load(directory, callback, *args, **kwargs)
+        self._fetch_size = max(1, config.get('database.fetch-size'))
+        self._load_blob_codec()
+        self._set_class_codes(self.get_schema_version() >= 21)
+        self._load_genealogy()
+        self._load_person_summary()
+        self._load_sort_keys()
+
+    def _load_blob_codec(self):
+        """
+        Select the codec used to write blob_data, which is the one the
+        database uses.
+        """
+        self._set_blob_codec(self._get_metadata('blob-codec', 'pickle'))
+
+    def _set_class_codes(self, codes):
+        """
+        Select how classes are stored in the reference table: as their
+        object key if codes is True, see CLASS_TO_KEY_MAP, or as their name,
+        as in databases before schema version 21.
+        """
+        if codes:
+            self._class_code = CLASS_TO_KEY_MAP
+            self._class_name = KEY_TO_CLASS_MAP
+        else:
+            self._class_code = {name: name for name in CLASS_TO_KEY_MAP}
+            self._class_name = self._class_code
+
+    def _load_genealogy(self):
+        """
+        Use the tables of the parent/child graph, which databases before
+        schema version 21 do not have.  Those walk the objects instead.
+        """
+        self._genealogy_changed()
+        self._has_genealogy = self.get_schema_version() >= 21
+
+    def _load_person_summary(self):
+        """
+        Use the person_summary table, which databases before schema version
+        21 do not have.  Those compute the summaries when asked.
+        """
+        self._summary_people = set()
+        self._summary_refs = set()
+        self._has_person_summary = self.get_schema_version() >= 21
+
+    def _load_sort_keys(self):
+        """
+        Use the sort key columns, which databases before schema version 21
+        do not have.  The keys are recomputed when the collation of the
+        locale differs from the one they were computed in.  Read-only
+        databases with stale keys sort with a collation instead.
+        """
+        if self.get_schema_version() < 21:
+            return
+        if self._get_metadata('sort-keys', None) == get_sort_key_locale():
+            self._sort_keys = True
+        elif not self.readonly:
+            self._rebuild_sort_keys()
+            self._sort_keys = True
+        if self._sort_keys:
+            self.surname_list = self.get_surname_list()
+
+    def get_summary(self):
+        """
+        Return a dictionary of information about this database backend.
+        """
+        summary = super().get_summary()
+        summary.update({
+            _("Data format"): self._blob_codec.name,
+        })
+        return summary
+
+    def _set_blob_codec(self, name):
+        """
+        Set the codec used to write blob_data.  Blobs already written with
+        another codec remain readable.
+        """
+        try:
+            self._blob_codec = get_codec(name)
+        except KeyError:
+            raise DbError(_("Unknown data format '%s'") % name)
+
     def _schema_exists(self):
         """
         Check to see if the schema exists.
@@ -127,13 +280,7 @@ class DBAPI(DbGeneric):
                            'blob_data BLOB'
                            ')')
         # Secondary:
-        self.dbapi.execute('CREATE TABLE reference '
-                           '('
-                           'obj_handle VARCHAR(50), '
-                           'obj_class TEXT, '
-                           'ref_handle VARCHAR(50), '
-                           'ref_class TEXT'
-                           ')')
+        self._create_reference_table()
         self.dbapi.execute('CREATE TABLE name_group '
                            '('
                            'name VARCHAR(50) PRIMARY KEY NOT NULL, '
@@ -151,8 +298,11 @@ class DBAPI(DbGeneric):
                            'male INTEGER, '
                            'unknown INTEGER'
                            ')')
+        self._create_genealogy_tables()
+        self._create_person_summary_table()
 
         self._create_secondary_columns()
+        self._create_sort_key_columns()
 
         ## Indices:
         self.dbapi.execute('CREATE INDEX person_gramps_id '
@@ -181,8 +331,6 @@ class DBAPI(DbGeneric):
                            'ON place(gramps_id)')
         self.dbapi.execute('CREATE INDEX tag_name '
                            'ON tag(name)')
-        self.dbapi.execute('CREATE INDEX reference_ref_handle '
-                           'ON reference(ref_handle)')
         self.dbapi.execute('CREATE INDEX family_gramps_id '
                            'ON family(gramps_id)')
         self.dbapi.execute('CREATE INDEX event_gramps_id '
@@ -191,10 +339,81 @@ class DBAPI(DbGeneric):
                            'ON repository(gramps_id)')
         self.dbapi.execute('CREATE INDEX note_gramps_id '
                            'ON note(gramps_id)')
-        self.dbapi.execute('CREATE INDEX reference_obj_handle '
-                           'ON reference(obj_handle)')
 
         self.dbapi.commit()
+        self._set_metadata('blob-codec', self._blob_codec.name)
+        self._set_sort_key_locale()
+
+    def _create_reference_table(self):
+        """
+        Create the table of references between primary objects.  Classes are
+        stored as their object key, see CLASS_TO_KEY_MAP.
+        """
+        self.dbapi.execute('CREATE TABLE reference '
+                           '('
+                           'obj_handle VARCHAR(50) NOT NULL, '
+                           'obj_class INTEGER, '
+                           'ref_handle VARCHAR(50) NOT NULL, '
+                           'ref_class INTEGER, '
+                           'PRIMARY KEY (obj_handle, ref_handle)'
+                           ')')
+        # Covers find_backlink_handles, the primary key covers lookups by
+        # obj_handle.
+        self.dbapi.execute('CREATE INDEX reference_ref_handle '
+                           'ON reference(ref_handle, obj_class, obj_handle)')
+
+    def _create_genealogy_tables(self):
+        """
+        Create the tables of the parent/child graph: the families in which
+        each person is a child, and the children of each family.  Tables
+        that exist already, as in a tree converted from BSDDB, are kept.
+        """
+        self.dbapi.execute('CREATE TABLE IF NOT EXISTS parent_family '
+                           '('
+                           'person_handle VARCHAR(50), '
+                           'family_handle VARCHAR(50), '
+                           'position INTEGER'
+                           ')')
+        self.dbapi.execute('CREATE INDEX IF NOT EXISTS '
+                           'parent_family_person_handle '
+                           'ON parent_family(person_handle)')
+        self.dbapi.execute('CREATE TABLE IF NOT EXISTS family_child '
+                           '('
+                           'family_handle VARCHAR(50), '
+                           'child_handle VARCHAR(50), '
+                           'position INTEGER'
+                           ')')
+        self.dbapi.execute('CREATE INDEX IF NOT EXISTS '
+                           'family_child_family_handle '
+                           'ON family_child(family_handle)')
+
+    def _create_person_summary_table(self):
+        """
+        Create the table of the person summaries shown in the people views,
+        see PersonSummary.  A table that exists already, as in a tree
+        converted from BSDDB, is kept.
+        """
+        self.dbapi.execute('CREATE TABLE IF NOT EXISTS person_summary '
+                           '('
+                           'handle VARCHAR(50) PRIMARY KEY NOT NULL, '
+                           'birth VARCHAR(50), '
+                           'birth_fallback INTEGER, '
+                           'birth_sortval INTEGER, '
+                           'birth_valid INTEGER, '
+                           'death VARCHAR(50), '
+                           'death_fallback INTEGER, '
+                           'death_sortval INTEGER, '
+                           'death_valid INTEGER, '
+                           'birth_place VARCHAR(50), '
+                           'birth_place_fallback INTEGER, '
+                           'death_place VARCHAR(50), '
+                           'death_place_fallback INTEGER, '
+                           'spouses TEXT, '
+                           'parents INTEGER, '
+                           'marriages INTEGER, '
+                           'children INTEGER, '
+                           'todo INTEGER'
+                           ')')
 
     def _close(self):
         self.dbapi.close()
@@ -215,6 +434,7 @@ class DBAPI(DbGeneric):
         """
         if self.transaction == None:
             _LOG.debug("    DBAPI %s transaction commit", hex(id(self)))
+            self._update_person_summaries()
             self.dbapi.commit()
 
     def _txn_abort(self):
@@ -224,6 +444,9 @@ class DBAPI(DbGeneric):
         """
         if self.transaction == None:
             self.dbapi.rollback()
+            self._cache.clear()
+            self._summary_people = set()
+            self._summary_refs = set()
 
     def transaction_begin(self, transaction):
         """
@@ -236,6 +459,7 @@ class DBAPI(DbGeneric):
             # A batch transaction does not store the commits
             # Aborting the session completely will become impossible.
             self.abort_possible = False
+            self._bulk_begin(transaction)
         self.transaction = transaction
         self.dbapi.begin()
         return transaction
@@ -248,33 +472,25 @@ class DBAPI(DbGeneric):
                    "Batch " if txn.batch else "",
                    hex(id(self)), txn.get_description())
 
-        action = {TXNADD: "-add",
-                  TXNUPD: "-update",
-                  TXNDEL: "-delete",
-                  None: "-delete"}
         if txn.batch:
+            self._bulk_end()
             # FIXME: need a User GUI update callback here:
             self.reindex_reference_map(lambda percent: percent)
+        self._update_person_summaries()
         self.dbapi.commit()
         if not txn.batch:
-            # Now, emit signals:
-            # do deletes and adds first
-            for trans_type in [TXNDEL, TXNADD, TXNUPD]:
-                for obj_type in range(11):
-                    if obj_type != REFERENCE_KEY and \
-                            (obj_type, trans_type) in txn:
-                        if trans_type == TXNDEL:
-                            handles = [handle for (handle, data) in
-                                       txn[(obj_type, trans_type)]]
-                        else:
-                            handles = [handle for (handle, data) in
-                                       txn[(obj_type, trans_type)]
-                                       if (handle, None)
-                                       not in txn[(obj_type, TXNDEL)]]
-                        if handles:
-                            signal = KEY_TO_NAME_MAP[
-                                obj_type] + action[trans_type]
-                            self.emit(signal, (handles, ))
+            # Now, emit the signals, coalesced.  They are queued in the
+            # order of the changes, which gives the net change of a handle.
+            action = {TXNADD: "-add",
+                      TXNUPD: "-update",
+                      TXNDEL: "-delete"}
+            signals = SignalQueue()
+            for recno in txn.get_recnos():
+                (obj_type, trans_type, handle) = txn.get_record(recno)[:3]
+                if obj_type != REFERENCE_KEY:
+                    signals.push(KEY_TO_NAME_MAP[obj_type] +
+                                 action[trans_type], ([handle], ))
+            self.emit_signals(signals)
         self.transaction = None
         msg = txn.get_description()
         self.undodb.commit(txn, msg)
@@ -286,7 +502,13 @@ class DBAPI(DbGeneric):
         """
         Executed after a batch operation abort.
         """
+        self._bulk_end(discard=True)
         self.dbapi.rollback()
+        self.undodb.abort()
+        self._cache.clear()
+        self._genealogy_changed()
+        self._summary_people = set()
+        self._summary_refs = set()
         self.transaction = None
         txn.clear()
         txn.first = None
@@ -354,6 +576,14 @@ class DBAPI(DbGeneric):
         else:
             return key
 
+    def _has_sort_keys(self, locale):
+        """
+        Return True if the sort key columns can be used to sort in the
+        collation of the locale.
+        """
+        return (self._sort_keys and
+                locale.get_collation() == glocale.get_collation())
+
     def get_person_handles(self, sort_handles=False, locale=glocale):
         """
         Return a list of database handles, one handle for each Person in
@@ -364,17 +594,19 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM person ORDER BY surname_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM person '
-                               'ORDER BY surname '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM person '
+                   'ORDER BY surname '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle FROM person")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM person"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_family_handles(self, sort_handles=False, locale=glocale):
         """
@@ -386,7 +618,23 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = ('SELECT family.handle '
+                   'FROM family '
+                   'LEFT JOIN person AS father '
+                   'ON family.father_handle = father.handle '
+                   'LEFT JOIN person AS mother '
+                   'ON family.mother_handle = mother.handle '
+                   'ORDER BY (CASE WHEN father.handle IS NULL '
+                   'THEN mother.surname_key '
+                   'ELSE father.surname_key '
+                   'END), '
+                   '(CASE WHEN father.handle IS NULL '
+                   'THEN mother.given_name_key '
+                   'ELSE father.given_name_key '
+                   'END)')
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
@@ -405,20 +653,18 @@ class DBAPI(DbGeneric):
                    'ELSE father.given_name ' +
                    'END) ' +
                    'COLLATE "%s"' % locale.get_collation())
-            self.dbapi.execute(sql)
         else:
-            self.dbapi.execute("SELECT handle FROM family")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM family"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_event_handles(self):
         """
         Return a list of database handles, one handle for each Event in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM event")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        self._flush_bulk()
+        sql = "SELECT handle FROM event"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_citation_handles(self, sort_handles=False, locale=glocale):
         """
@@ -430,17 +676,19 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM citation ORDER BY page_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM citation '
-                               'ORDER BY page '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM citation '
+                   'ORDER BY page '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle FROM citation")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM citation"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_source_handles(self, sort_handles=False, locale=glocale):
         """
@@ -452,17 +700,19 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM source ORDER BY title_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM source '
-                               'ORDER BY title '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM source '
+                   'ORDER BY title '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle from source")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle from source"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_place_handles(self, sort_handles=False, locale=glocale):
         """
@@ -474,26 +724,28 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM place ORDER BY title_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM place '
-                               'ORDER BY title '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM place '
+                   'ORDER BY title '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle FROM place")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM place"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_repository_handles(self):
         """
         Return a list of database handles, one handle for each Repository in
         the database.
         """
-        self.dbapi.execute("SELECT handle FROM repository")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        self._flush_bulk()
+        sql = "SELECT handle FROM repository"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_media_handles(self, sort_handles=False, locale=glocale):
         """
@@ -505,26 +757,28 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM media ORDER BY desc_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM media '
-                               'ORDER BY desc '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM media '
+                   'ORDER BY desc '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle FROM media")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM media"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_note_handles(self):
         """
         Return a list of database handles, one handle for each Note in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM note")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        self._flush_bulk()
+        sql = "SELECT handle FROM note"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_tag_handles(self, sort_handles=False, locale=glocale):
         """
@@ -536,17 +790,19 @@ class DBAPI(DbGeneric):
         :param locale: The locale to use for collation.
         :type locale: A GrampsLocale object.
         """
-        if sort_handles:
+        self._flush_bulk()
+        if sort_handles and self._has_sort_keys(locale):
+            sql = "SELECT handle FROM tag ORDER BY name_key"
+        elif sort_handles:
             if locale != glocale:
                 self.dbapi.check_collation(locale)
 
-            self.dbapi.execute('SELECT handle FROM tag '
-                               'ORDER BY name '
-                               'COLLATE "%s"' % locale.get_collation())
+            sql = ('SELECT handle FROM tag '
+                   'ORDER BY name '
+                   'COLLATE "%s"' % locale.get_collation())
         else:
-            self.dbapi.execute("SELECT handle FROM tag")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            sql = "SELECT handle FROM tag"
+        return [row[0] for row in self._iter_rows(sql)]
 
     def get_tag_from_name(self, name):
         """
@@ -554,13 +810,15 @@ class DBAPI(DbGeneric):
 
         If no such Tag exists, None is returned.
         """
+        self._flush_bulk()
         self.dbapi.execute("SELECT blob_data FROM tag WHERE name = ?", [name])
         row = self.dbapi.fetchone()
         if row:
-            return Tag.create(pickle.loads(row[0]))
+            return Tag.create(decode_blob(row[0]))
         return None
 
     def _get_number_of(self, obj_key):
+        self._flush_bulk()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT count(1) FROM %s" % table
         self.dbapi.execute(sql)
@@ -602,37 +860,140 @@ class DBAPI(DbGeneric):
         Commit the specified object to the database, storing the changes as
         part of the transaction.
         """
-        old_data = None
         obj.change = int(change_time or time.time())
         table = KEY_TO_NAME_MAP[obj_key]
-
-        if self._has_handle(obj_key, obj.handle):
-            old_data = self._get_raw_data(obj_key, obj.handle)
-            # update the object:
-            sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql,
-                               [pickle.dumps(obj.serialize()),
-                                obj.handle])
+        data = obj.serialize()
+        old_data = self._get_raw_data(obj_key, obj.handle)
+        encode = self._blob_codec.encode
+        self._person_summary_changed(obj_key, obj.handle)
+
+        if self._bulk is not None:
+            # Written out, with the backlinks, by _flush_bulk
+            self._queue_bulk(obj_key, obj, data)
         else:
-            # Insert the object:
-            sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql,
-                               [obj.handle,
-                                pickle.dumps(obj.serialize())])
-        self._update_secondary_values(obj)
+            blob = encode(data)
+            if old_data:
+                # update the object:
+                sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
+                self.dbapi.execute(sql, [blob, obj.handle])
+            else:
+                # Insert the object:
+                sql = ("INSERT INTO %s (handle, blob_data) "
+                       "VALUES (?, ?)") % table
+                self.dbapi.execute(sql, [obj.handle, blob])
+            self._cache.set(obj_key, obj.handle, blob)
+            self._update_secondary_values(obj)
+            if not trans.batch:
+                self._update_backlinks(obj, trans)
         if not trans.batch:
-            self._update_backlinks(obj, trans)
             if old_data:
-                trans.add(obj_key, TXNUPD, obj.handle,
-                          old_data,
-                          obj.serialize())
+                trans.add(obj_key, TXNUPD, obj.handle, old_data, data)
             else:
-                trans.add(obj_key, TXNADD, obj.handle,
-                          None,
-                          obj.serialize())
+                trans.add(obj_key, TXNADD, obj.handle, None, data)
 
         return old_data
 
+    def _bulk_begin(self, trans):
+        """
+        Start buffering object writes for the given transaction.
+
+        Buffered objects are written with one UPSERT statement per table
+        when the buffer is full, before any query that could see them, and
+        at the end of the bulk operation.
+        """
+        if self._bulk is not None:
+            return False
+        self._bulk = {}
+        self._bulk_gids = {}
+        self._bulk_size = 0
+        self._bulk_trans = trans
+        return True
+
+    def _bulk_end(self, discard=False):
+        """
+        Write out and stop buffering object writes.  If discard is True,
+        the buffered writes are dropped instead.
+        """
+        if self._bulk is None:
+            return
+        if not discard:
+            self._flush_bulk()
+        self._bulk = None
+        self._bulk_gids = {}
+        self._bulk_size = 0
+        self._bulk_trans = None
+
+    def _queue_bulk(self, obj_key, obj, data):
+        """
+        Add a serialized object to the write buffer.
+
+        The object is encoded, and its secondary values and references are
+        taken, now since the caller is free to modify the object once it has
+        been committed.
+        """
+        pending = self._bulk.setdefault(obj_key, {})
+        gids = self._bulk_gids.setdefault(obj_key, {})
+        if obj.handle in pending:
+            old_gid = pending[obj.handle][1]
+            if gids.get(old_gid) == obj.handle:
+                del gids[old_gid]
+        else:
+            self._bulk_size += 1
+        gramps_id = getattr(obj, 'gramps_id', None)
+        fields, values = self._get_secondary_values(obj)
+        if self._bulk_trans.batch:
+            references = None
+        else:
+            references = set(obj.get_referenced_handles_recursively())
+        links = get_genealogy_links(obj)
+        blob = self._blob_codec.encode(data)
+        pending[obj.handle] = (blob, gramps_id,
+                               fields, values, references, links)
+        self._cache.set(obj_key, obj.handle, blob)
+        if gramps_id is not None:
+            gids[gramps_id] = obj.handle
+        if self._bulk_size >= BULKSIZE:
+            self._flush_bulk()
+
+    def _flush_bulk(self):
+        """
+        Write the buffered objects, and their secondary values, to the
+        database.  Unless the transaction is a batch transaction, the
+        reference map is also updated.
+        """
+        if not self._bulk:
+            return
+        pending = self._bulk
+        self._bulk = {}
+        self._bulk_gids = {}
+        self._bulk_size = 0
+        for obj_key, objects in pending.items():
+            table = KEY_TO_NAME_MAP[obj_key]
+            columns = None
+            rows = []
+            for handle, (blob, gramps_id, fields, values,
+                         references, links) in objects.items():
+                if columns is None:
+                    columns = ['handle', 'blob_data'] + fields
+                rows.append([handle, blob] +
+                            self._sql_cast_list(values))
+            sql = ("INSERT INTO %s (%s) VALUES (%s) "
+                   "ON CONFLICT (handle) DO UPDATE SET %s"
+                   % (table, ", ".join(columns),
+                      ", ".join(["?"] * len(columns)),
+                      ", ".join(["%s = excluded.%s" % (column, column)
+                                 for column in columns[1:]])))
+            self.dbapi.executemany(sql, rows)
+            if obj_key in GENEALOGY_TABLES:
+                self._update_genealogy(
+                    obj_key,
+                    [(handle, entry[5]) for handle, entry in objects.items()])
+        if not self._bulk_trans.batch:
+            self._update_backlinks_many(
+                [(handle, KEY_TO_CLASS_MAP[obj_key], entry[4])
+                 for obj_key, objects in pending.items()
+                 for handle, entry in objects.items()], self._bulk_trans)
+
     def _commit_raw(self, data, obj_key):
         """
         Commit a serialized primary object to the database, storing the
@@ -640,21 +1001,17 @@ class DBAPI(DbGeneric):
         """
         table = KEY_TO_NAME_MAP[obj_key]
         handle = data[0]
+        blob = self._blob_codec.encode(data)
 
         if self._has_handle(obj_key, handle):
             # update the object:
             sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql,
-                               [pickle.dumps(data),
-                                handle])
+            self.dbapi.execute(sql, [blob, handle])
         else:
             # Insert the object:
             sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql,
-                               [handle,
-                                pickle.dumps(data)])
-
-        return
+            self.dbapi.execute(sql, [handle, blob])
+        self._cache.set(obj_key, handle, blob)
 
     def _update_backlinks(self, obj, transaction):
 
@@ -662,7 +1019,9 @@ class DBAPI(DbGeneric):
         sql = ("SELECT ref_class, ref_handle " +
                "FROM reference WHERE obj_handle = ?")
         self.dbapi.execute(sql, [obj.handle])
-        existing_references = set(self.dbapi.fetchall())
+        existing_references = set((self._class_name[ref_class], ref_handle)
+                                  for (ref_class, ref_handle)
+                                  in self.dbapi.fetchall())
 
         # Once we have the list of rows that already have a reference
         # we need to compare it with the list of objects that are
@@ -672,17 +1031,12 @@ class DBAPI(DbGeneric):
                                                             current_references)
         new_references = current_references.difference(existing_references)
 
-        # Delete the existing references
-        self.dbapi.execute("DELETE FROM reference WHERE obj_handle = ?",
-                           [obj.handle])
-
-        # Now, add the current ones
-        for (ref_class_name, ref_handle) in current_references:
-            sql = ("INSERT INTO reference " +
-                   "(obj_handle, obj_class, ref_handle, ref_class)" +
-                   "VALUES(?, ?, ?, ?)")
-            self.dbapi.execute(sql, [obj.handle, obj.__class__.__name__,
-                                     ref_handle, ref_class_name])
+        # Only write the differences
+        self._apply_references(
+            [(obj.handle, ref_handle) for (ref_class_name, ref_handle)
+             in no_longer_required_references],
+            [(obj.handle, obj.__class__.__name__, ref_handle, ref_class_name)
+             for (ref_class_name, ref_handle) in new_references])
 
         if not transaction.batch:
             # Add new references to the transaction
@@ -699,9 +1053,80 @@ class DBAPI(DbGeneric):
                             ref_handle, ref_class_name)
                 transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
 
+    def _update_backlinks_many(self, objs, transaction):
+        """
+        Set-wise version of _update_backlinks.
+
+        :param objs: (handle, class name, current references) of each object
+        :type objs: list
+        """
+        existing_references = defaultdict(set)
+        handles = [obj[0] for obj in objs]
+        for start in range(0, len(handles), 500):
+            chunk = handles[start:start + 500]
+            sql = ("SELECT obj_handle, ref_class, ref_handle "
+                   "FROM reference WHERE obj_handle IN (%s)"
+                   % ", ".join(["?"] * len(chunk)))
+            self.dbapi.execute(sql, chunk)
+            for obj_handle, ref_class, ref_handle in self.dbapi.fetchall():
+                existing_references[obj_handle].add(
+                    (self._class_name[ref_class], ref_handle))
+
+        deletes = []
+        inserts = []
+        for obj_handle, obj_class_name, current_references in objs:
+            old_references = existing_references[obj_handle]
+            for (ref_class_name, ref_handle) in \
+                    current_references.difference(old_references):
+                data = (obj_handle, obj_class_name,
+                        ref_handle, ref_class_name)
+                inserts.append(data)
+                # Add new references to the transaction
+                key = (obj_handle, ref_handle)
+                transaction.add(REFERENCE_KEY, TXNADD, key, None, data)
+            for (ref_class_name, ref_handle) in \
+                    old_references.difference(current_references):
+                key = (obj_handle, ref_handle)
+                deletes.append(key)
+                # Add old references to the transaction
+                old_data = (obj_handle, obj_class_name,
+                            ref_handle, ref_class_name)
+                transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
+        self._apply_references(deletes, inserts)
+
+    def _apply_references(self, deletes, inserts):
+        """
+        Delete and insert rows of the reference table.
+
+        :param deletes: (obj_handle, ref_handle) of the rows to delete
+        :type deletes: list
+        :param inserts: (obj_handle, obj_class, ref_handle, ref_class) of the
+                        rows to insert, with class names
+        :type inserts: list
+        """
+        if deletes:
+            self.dbapi.executemany("DELETE FROM reference "
+                                   "WHERE obj_handle = ? AND ref_handle = ?",
+                                   deletes)
+        if inserts:
+            code = self._class_code
+            # Objects can refer to a handle that is not set, and the table
+            # keeps one row for each pair of handles.
+            rows = {}
+            for (obj_handle, obj_class, ref_handle, ref_class) in inserts:
+                if ref_handle:
+                    rows[obj_handle, ref_handle] = (
+                        obj_handle, code[obj_class],
+                        ref_handle, code[ref_class])
+            self.dbapi.executemany(
+                "INSERT INTO reference "
+                "(obj_handle, obj_class, ref_handle, ref_class) "
+                "VALUES (?, ?, ?, ?)", list(rows.values()))
+
     def _do_remove(self, handle, transaction, obj_key):
         if self.readonly or not handle:
             return
+        self._flush_bulk()
         if self._has_handle(obj_key, handle):
             data = self._get_raw_data(obj_key, handle)
             obj_class = KEY_TO_CLASS_MAP[obj_key]
@@ -709,6 +1134,9 @@ class DBAPI(DbGeneric):
             table = KEY_TO_NAME_MAP[obj_key]
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._cache.discard(obj_key, handle)
+            self._remove_genealogy(obj_key, handle)
+            self._person_summary_changed(obj_key, handle)
             if not transaction.batch:
                 transaction.add(obj_key, TXNDEL, handle, data, None)
 
@@ -725,11 +1153,272 @@ class DBAPI(DbGeneric):
                            [obj_handle])
         # Add old references to the transaction
         if not transaction.batch:
-            for (ref_class_name, ref_handle) in rows:
+            for (ref_class, ref_handle) in rows:
                 key = (obj_handle, ref_handle)
-                old_data = (obj_handle, obj_class, ref_handle, ref_class_name)
+                old_data = (obj_handle, obj_class, ref_handle,
+                            self._class_name[ref_class])
                 transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
 
+    def _update_genealogy(self, obj_key, objects):
+        """
+        Replace the rows of the parent/child graph tables of some people or
+        families.
+
+        :param objects: (handle, linked handles) of each object, see
+                        get_genealogy_links
+        :type objects: list
+        """
+        if self._has_genealogy:
+            table, column, link_column = GENEALOGY_TABLES[obj_key]
+            self.dbapi.executemany("DELETE FROM %s WHERE %s = ?"
+                                   % (table, column),
+                                   [[handle] for handle, links in objects])
+            self.dbapi.executemany("INSERT INTO %s (%s, %s, position) "
+                                   "VALUES (?, ?, ?)"
+                                   % (table, column, link_column),
+                                   [[handle, link, position]
+                                    for handle, links in objects
+                                    for position, link
+                                    in enumerate(links)])
+        self._genealogy_changed()
+
+    def _remove_genealogy(self, obj_key, handle):
+        """
+        Update the parent/child graph for a removed object.
+        """
+        if obj_key in GENEALOGY_TABLES:
+            self._update_genealogy(obj_key, [(handle, [])])
+
+    def _genealogy_changed(self):
+        """
+        Drop the cached parent/child graph and closures.
+        """
+        self._genealogy = None
+        self._closures.clear()
+
+    def _get_genealogy(self):
+        """
+        Return the parent/child graph, loading it from the parent_family
+        and family_child tables and the parent columns of the family table
+        if needed.
+
+        Returns None if the database has no parent/child graph tables.
+        """
+        if not self._has_genealogy:
+            return None
+        if self._genealogy is None:
+            self._flush_bulk()
+            genealogy = Genealogy(defaultdict(list), defaultdict(list),
+                                  {}, defaultdict(list))
+            self.dbapi.execute("SELECT person_handle, family_handle "
+                               "FROM parent_family "
+                               "ORDER BY person_handle, position")
+            for person_handle, family_handle in self.dbapi.fetchall():
+                genealogy.parent_families[person_handle].append(family_handle)
+            self.dbapi.execute("SELECT family_handle, child_handle "
+                               "FROM family_child "
+                               "ORDER BY family_handle, position")
+            for family_handle, child_handle in self.dbapi.fetchall():
+                genealogy.family_children[family_handle].append(child_handle)
+            self.dbapi.execute("SELECT handle, father_handle, mother_handle "
+                               "FROM family")
+            for family_handle, father_handle, mother_handle in \
+                    self.dbapi.fetchall():
+                genealogy.family_parents[family_handle] = (
+                    father_handle or None, mother_handle or None)
+                for parent_handle in (father_handle, mother_handle):
+                    if parent_handle:
+                        genealogy.person_families[parent_handle].append(
+                            family_handle)
+            self._genealogy = genealogy
+        return self._genealogy
+
+    def get_person_family_handles(self, handle):
+        genealogy = self._get_genealogy()
+        if genealogy is None:
+            return super().get_person_family_handles(handle)
+        return list(genealogy.person_families.get(handle, []))
+
+    def get_person_parent_family_handles(self, handle):
+        genealogy = self._get_genealogy()
+        if genealogy is None:
+            return super().get_person_parent_family_handles(handle)
+        return list(genealogy.parent_families.get(handle, []))
+
+    def get_family_parent_handles(self, handle):
+        genealogy = self._get_genealogy()
+        if genealogy is None:
+            return super().get_family_parent_handles(handle)
+        return genealogy.family_parents.get(handle)
+
+    def get_family_child_handles(self, handle):
+        genealogy = self._get_genealogy()
+        if genealogy is None:
+            return super().get_family_child_handles(handle)
+        return list(genealogy.family_children.get(handle, []))
+
+    def find_ancestors(self, handles, max_generations=None,
+                       all_families=False):
+        """
+        Return a dictionary mapping the handles of some people, and of their
+        ancestors, to their generation.  Results are cached until a person
+        or family changes.
+        """
+        handles = tuple(handles)
+        key = ('ancestors', handles, max_generations, all_families)
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = super().find_ancestors(handles, max_generations,
+                                             all_families)
+            self._closures[key] = closure
+        return dict(closure)
+
+    def find_descendants(self, handles, max_generations=None):
+        """
+        Return a dictionary mapping the handles of some people, and of their
+        descendants, to their generation.  Results are cached until a person
+        or family changes.
+        """
+        handles = tuple(handles)
+        key = ('descendants', handles, max_generations)
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = super().find_descendants(handles, max_generations)
+            self._closures[key] = closure
+        return dict(closure)
+
+    def _person_summary_changed(self, obj_key, handle):
+        """
+        Note that an object has changed, so that the summaries of the people
+        that depend on it are recomputed at the end of the transaction.
+        """
+        if not self._has_person_summary:
+            return
+        if obj_key == PERSON_KEY:
+            self._summary_people.add(handle)
+        elif obj_key in (EVENT_KEY, FAMILY_KEY, NOTE_KEY):
+            self._summary_refs.add(handle)
+
+    def _update_person_summaries(self):
+        """
+        Recompute the summaries of the people that have changed, and of the
+        people that refer to the events, families and notes that have
+        changed.  Does not commit.
+        """
+        if not (self._summary_people or self._summary_refs):
+            return
+        self._flush_bulk()
+        people = self._summary_people
+        refs = list(self._summary_refs)
+        self._summary_people = set()
+        self._summary_refs = set()
+        person_class = self._class_code['Person']
+        for start in range(0, len(refs), 500):
+            chunk = refs[start:start + 500]
+            sql = ("SELECT obj_handle FROM reference "
+                   "WHERE ref_handle IN (%s) AND obj_class = ?"
+                   % ", ".join(["?"] * len(chunk)))
+            self.dbapi.execute(sql, chunk + [person_class])
+            people.update(row[0] for row in self.dbapi.fetchall())
+        self._write_person_summaries(sorted(people))
+
+    def _write_person_summaries(self, handles):
+        """
+        Compute and write the summaries of the people with the given
+        handles, deleting those of people that no longer exist.
+        Does not commit.
+        """
+        sql = ("INSERT INTO person_summary (handle, %s) VALUES (?, %s)"
+               % (SUMMARY_COLUMNS,
+                  ", ".join(["?"] * len(PersonSummary._fields))))
+        for start in range(0, len(handles), 500):
+            chunk = handles[start:start + 500]
+            self.dbapi.execute("SELECT handle, blob_data FROM person "
+                               "WHERE handle IN (%s)"
+                               % ", ".join(["?"] * len(chunk)), chunk)
+            people = [(handle, Person.create(decode_blob(blob)))
+                      for handle, blob in self.dbapi.fetchall()]
+            reader = self._summary_reader([person for handle, person
+                                           in people])
+            rows = []
+            for handle, person in people:
+                summary = get_person_summary(reader, person)
+                summary = summary._replace(spouses=" ".join(summary.spouses))
+                rows.append([handle] + self._sql_cast_list(summary))
+            self.dbapi.executemany("DELETE FROM person_summary "
+                                   "WHERE handle = ?",
+                                   [[handle] for handle in chunk])
+            self.dbapi.executemany(sql, rows)
+
+    def _summary_reader(self, people):
+        """
+        Return a SummaryReader over the events, families and notes that the
+        given people refer to, which are read with one query per table.
+        """
+        events = set()
+        families = set()
+        notes = set()
+        for person in people:
+            events.update(ref.ref for ref in person.event_ref_list)
+            families.update(person.family_list)
+            families.update(person.parent_family_list)
+            notes.update(person.note_list)
+        return SummaryReader(self._get_objects(EVENT_KEY, Event, events).get,
+                             self._get_objects(FAMILY_KEY, Family,
+                                               families).get,
+                             self._get_objects(NOTE_KEY, Note, notes).get)
+
+    def _get_objects(self, obj_key, obj_class, handles):
+        """
+        Return a dictionary of the objects with the given handles, leaving
+        out those that do not exist.
+        """
+        table = KEY_TO_NAME_MAP[obj_key]
+        handles = list(handles)
+        objects = {}
+        for start in range(0, len(handles), 500):
+            chunk = handles[start:start + 500]
+            self.dbapi.execute("SELECT handle, blob_data FROM %s "
+                               "WHERE handle IN (%s)"
+                               % (table, ", ".join(["?"] * len(chunk))),
+                               chunk)
+            for handle, blob in self.dbapi.fetchall():
+                objects[handle] = obj_class.create(decode_blob(blob))
+        return objects
+
+    def _rebuild_person_summaries(self):
+        """
+        Recompute the summaries of all people.  Does not commit.
+        """
+        self._flush_bulk()
+        self._summary_people = set()
+        self._summary_refs = set()
+        self.dbapi.execute("DELETE FROM person_summary")
+        self._write_person_summaries(list(self._iter_handles(PERSON_KEY)))
+
+    def get_person_summary(self, handle):
+        """
+        Return the :py:class:`.PersonSummary` of the person with the given
+        handle, as shown in the people views, or None if there is no such
+        person.
+        """
+        if (not self._has_person_summary or
+                (self.transaction and self.transaction.batch)):
+            # The reference map is only rebuilt at the end of a batch
+            return super().get_person_summary(handle)
+        if self._summary_people or self._summary_refs:
+            self._update_person_summaries()
+        self.dbapi.execute("SELECT %s FROM person_summary WHERE handle = ?"
+                           % SUMMARY_COLUMNS, [handle])
+        row = self.dbapi.fetchone()
+        if row is None:
+            return None
+        return PersonSummary(row[0], bool(row[1]), row[2], bool(row[3]),
+                             row[4], bool(row[5]), row[6], bool(row[7]),
+                             row[8], bool(row[9]), row[10], bool(row[11]),
+                             tuple((row[12] or "").split()),
+                             row[13], row[14], row[15], row[16])
+
     def find_backlink_handles(self, handle, include_classes=None):
         """
         Find all objects that hold a reference to the object handle.
@@ -747,19 +1436,31 @@ class DBAPI(DbGeneric):
 
             result_list = list(find_backlink_handles(handle))
         """
-        self.dbapi.execute("SELECT obj_class, obj_handle "
-                           "FROM reference "
-                           "WHERE ref_handle = ?",
-                           [handle])
+        self._flush_bulk()
+        sql = ("SELECT obj_class, obj_handle "
+               "FROM reference "
+               "WHERE ref_handle = ?")
+        params = [handle]
+        if include_classes is not None:
+            params += [self._class_code[class_name]
+                       for class_name in include_classes
+                       if class_name in self._class_code]
+            if len(params) == 1:
+                return
+            sql += " AND obj_class IN (%s)" % ", ".join(["?"] *
+                                                        (len(params) - 1))
+        # The rows are all read first, since callers often change the
+        # referring objects, and so the reference table, as they go.
+        self.dbapi.execute(sql, params)
         rows = self.dbapi.fetchall()
         for row in rows:
-            if (include_classes is None) or (row[0] in include_classes):
-                yield (row[0], row[1])
+            yield (self._class_name[row[0]], row[1])
 
     def find_initial_person(self):
         """
         Returns first person in the database
         """
+        self._flush_bulk()
         handle = self.get_default_handle()
         person = None
         if handle:
@@ -773,8 +1474,12 @@ class DBAPI(DbGeneric):
 
     def _iter_handles(self, obj_key):
         """
-        Return an iterator over handles in the database
+        Return an iterator over handles in the database.
+
+        The handles are all read first, since callers often change the
+        objects as they go.
         """
+        self._flush_bulk()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle FROM %s" % table
         self.dbapi.execute(sql)
@@ -786,73 +1491,86 @@ class DBAPI(DbGeneric):
         """
         Return an iterator over raw data in the database.
         """
+        self._flush_bulk()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle, blob_data FROM %s" % table
+        for row in self._iter_rows(sql):
+            yield (row[0], decode_blob(row[1]))
+
+    def select_handles(self, class_name, where, params, with_data=False):
+        """
+        Select the objects of a primary class with an SQL WHERE clause.
+        """
+        self._flush_bulk()
+        table = class_name.lower()
+        if with_data:
+            self.dbapi.execute("SELECT handle, blob_data FROM %s WHERE %s"
+                               % (table, where), params)
+            return [(row[0], decode_blob(row[1]))
+                    for row in self.dbapi.fetchall()]
+        self.dbapi.execute("SELECT handle FROM %s WHERE %s" % (table, where),
+                           params)
+        return [row[0] for row in self.dbapi.fetchall()]
+
+    def iter_objects_by_handle(self, class_name):
+        """
+        Return an iterator over the objects of a primary class, in handle
+        order.
+        """
+        self._flush_bulk()
+        class_ = self._get_table_func(class_name, "class_func")
+        sql = "SELECT blob_data FROM %s ORDER BY handle" % class_name.lower()
+        for row in self._iter_rows(sql):
+            yield class_.create(decode_blob(row[0]))
+
+    def _iter_rows(self, sql, params=()):
+        """
+        Return an iterator over the rows selected by an SQL statement.
+
+        The rows are fetched in batches of 'database.fetch-size' through a
+        cursor of their own, so iterators may be nested and interleaved
+        with other queries.  The table must not be changed until the
+        iterator is done, so it is only used for the lists of handles, which
+        are complete when returned, and for data that callers only read:
+        the raw data and object iterators, and the place tree.
+        """
         with self.dbapi.cursor() as cursor:
-            cursor.execute(sql)
-            rows = cursor.fetchmany()
+            cursor.execute(sql, params)
+            rows = cursor.fetchmany(self._fetch_size)
             while rows:
-                for row in rows:
-                    yield (row[0], pickle.loads(row[1]))
-                rows = cursor.fetchmany()
+                yield from rows
+                rows = cursor.fetchmany(self._fetch_size)
 
     def _iter_raw_place_tree_data(self):
         """
         Return an iterator over raw data in the place hierarchy.
         """
-        to_do = ['']
-        sql = 'SELECT handle, blob_data FROM place WHERE enclosed_by = ?'
-        while to_do:
-            handle = to_do.pop()
-            self.dbapi.execute(sql, [handle])
-            rows = self.dbapi.fetchall()
-            for row in rows:
-                to_do.append(row[0])
-                yield (row[0], pickle.loads(row[1]))
+        self._flush_bulk()
+        # Places are returned breadth first, so each place follows the
+        # place that encloses it.
+        sql = ("WITH RECURSIVE tree(handle, blob_data) AS ("
+               "SELECT handle, blob_data FROM place WHERE enclosed_by = '' "
+               "UNION ALL "
+               "SELECT place.handle, place.blob_data "
+               "FROM place JOIN tree ON place.enclosed_by = tree.handle) "
+               "SELECT handle, blob_data FROM tree")
+        for row in self._iter_rows(sql):
+            yield (row[0], decode_blob(row[1]))
 
     def reindex_reference_map(self, callback):
         """
         Reindex all primary records in the database.
         """
+        self._flush_bulk()
         self._txn_begin()
         self.dbapi.execute("DELETE FROM reference")
-        total = 0
-        for tbl in ('people', 'families', 'events', 'places', 'sources',
-                    'citations', 'media', 'repositories', 'notes', 'tags'):
-            total += self.method("get_number_of_%s", tbl)()
         UpdateCallback.__init__(self, callback)
-        self.set_total(total)
-        primary_table = (
-            (self.get_person_cursor, Person),
-            (self.get_family_cursor, Family),
-            (self.get_event_cursor, Event),
-            (self.get_place_cursor, Place),
-            (self.get_source_cursor, Source),
-            (self.get_citation_cursor, Citation),
-            (self.get_media_cursor, Media),
-            (self.get_repository_cursor, Repository),
-            (self.get_note_cursor, Note),
-            (self.get_tag_cursor, Tag),
-        )
-        # Now we use the functions and classes defined above
-        # to loop through each of the primary object tables.
-        for cursor_func, class_func in primary_table:
-            logging.info("Rebuilding %s reference map", class_func.__name__)
-            with cursor_func() as cursor:
-                for found_handle, val in cursor:
-                    obj = class_func.create(val)
-                    references = set(obj.get_referenced_handles_recursively())
-                    # handle addition of new references
-                    for (ref_class_name, ref_handle) in references:
-                        self.dbapi.execute(
-                            "INSERT INTO reference "
-                            "(obj_handle, obj_class, ref_handle, ref_class) "
-                            "VALUES (?, ?, ?, ?)",
-                            [obj.handle,
-                             obj.__class__.__name__,
-                             ref_handle,
-                             ref_class_name])
-                    self.update()
+        self.set_total(self._get_total())
+        done = 0
+        for obj_key, size, references in self._map_chunks(get_references):
+            self._apply_references([], references)
+            done += size
+            self.update(done)
         self._txn_commit()
 
     def rebuild_secondary(self, callback=None):
@@ -862,28 +1580,75 @@ class DBAPI(DbGeneric):
         if self.readonly:
             return
 
-        total = 0
-        for tbl in ('people', 'families', 'events', 'places', 'sources',
-                    'citations', 'media', 'repositories', 'notes', 'tags'):
-            total += self.method("get_number_of_%s", tbl)()
         UpdateCallback.__init__(self, callback)
-        self.set_total(total)
+        self.set_total(self._get_total())
 
         # First, expand blob to individual fields:
         self._txn_begin()
-        for obj_type in ('Person', 'Family', 'Event', 'Place', 'Repository',
-                         'Source', 'Citation', 'Media', 'Note', 'Tag'):
-            for handle in self.method('get_%s_handles', obj_type)():
-                obj = self.method('get_%s_from_handle', obj_type)(handle)
-                self._update_secondary_values(obj)
-                self.update()
+        done = 0
+        for obj_key, size, (fields, rows) in self._map_chunks(
+                partial(get_secondary_rows, sort_keys=self._sort_keys)):
+            sql = ("UPDATE %s SET %s WHERE handle = ?"
+                   % (KEY_TO_NAME_MAP[obj_key],
+                      ", ".join(["%s = ?" % field for field in fields])))
+            self.dbapi.executemany(sql, [self._sql_cast_list(values) +
+                                         [handle]
+                                         for handle, values, dummy in rows])
+            if obj_key in GENEALOGY_TABLES:
+                self._update_genealogy(
+                    obj_key, [(handle, links)
+                              for handle, dummy, links in rows])
+            done += size
+            self.update(done)
+        self._genealogy_changed()
+        if self._has_person_summary:
+            self._rebuild_person_summaries()
         self._txn_commit()
 
         # Next, rebuild stats:
         gstats = self.get_gender_stats()
         self.genderStats = GenderStats(gstats)
 
+    def _get_total(self):
+        """
+        Return the number of primary objects in the database.
+        """
+        return sum(self._get_number_of(obj_key) for obj_key in CLASSES)
+
+    def _map_chunks(self, func):
+        """
+        Apply one of the functions of the rebuild module to every primary
+        table, using 'database.rebuild-processes' processes.
+
+        The rows are read in chunks of 'database.fetch-size' rows, in
+        handle order.  Each chunk is a separate query, so the tables may be
+        written between chunks.
+        """
+        return map_chunks(func, self._iter_chunks(),
+                          config.get('database.rebuild-processes'))
+
+    def _iter_chunks(self):
+        """
+        Return an iterator over (obj_key, raw rows) chunks of every primary
+        table.
+        """
+        for obj_key in CLASSES:
+            LOG.info("Rebuilding %s", KEY_TO_NAME_MAP[obj_key])
+            sql = ("SELECT handle, blob_data FROM %s WHERE handle > ? "
+                   "ORDER BY handle LIMIT %d"
+                   % (KEY_TO_NAME_MAP[obj_key], self._fetch_size))
+            last = ''
+            while True:
+                self.dbapi.execute(sql, [last])
+                rows = self.dbapi.fetchall()
+                if not rows:
+                    break
+                yield obj_key, rows
+                last = rows[-1][0]
+
     def _has_handle(self, obj_key, handle):
+        if self._bulk and handle in self._bulk.get(obj_key, ()):
+            return True
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT 1 FROM %s WHERE handle = ?" % table
         self.dbapi.execute(sql, [handle])
@@ -891,11 +1656,20 @@ class DBAPI(DbGeneric):
 
     def _has_gramps_id(self, obj_key, gramps_id):
         table = KEY_TO_NAME_MAP[obj_key]
+        if self._bulk:
+            if gramps_id in self._bulk_gids.get(obj_key, ()):
+                return True
+            # Ignore rows whose buffered version has another Gramps ID
+            pending = self._bulk.get(obj_key, ())
+            sql = "SELECT handle FROM %s WHERE gramps_id = ?" % table
+            self.dbapi.execute(sql, [gramps_id])
+            return any(row[0] not in pending for row in self.dbapi.fetchall())
         sql = "SELECT 1 FROM %s WHERE gramps_id = ?" % table
         self.dbapi.execute(sql, [gramps_id])
         return self.dbapi.fetchone() != None
 
     def _get_gramps_ids(self, obj_key):
+        self._flush_bulk()
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT gramps_id FROM %s" % table
         self.dbapi.execute(sql)
@@ -903,20 +1677,42 @@ class DBAPI(DbGeneric):
         return [row[0] for row in rows]
 
     def _get_raw_data(self, obj_key, handle):
-        table = KEY_TO_NAME_MAP[obj_key]
-        sql = "SELECT blob_data FROM %s WHERE handle = ?" % table
-        self.dbapi.execute(sql, [handle])
-        row = self.dbapi.fetchone()
-        if row:
-            return pickle.loads(row[0])
+        if self._bulk and handle in self._bulk.get(obj_key, ()):
+            return decode_blob(self._bulk[obj_key][handle][0])
+        # The cache holds the encoded blob, so every caller gets its own
+        # copy of the data
+        blob = self._cache.get(obj_key, handle)
+        if blob is None:
+            table = KEY_TO_NAME_MAP[obj_key]
+            sql = "SELECT blob_data FROM %s WHERE handle = ?" % table
+            self.dbapi.execute(sql, [handle])
+            row = self.dbapi.fetchone()
+            if not row:
+                return None
+            blob = row[0]
+            self._cache.set(obj_key, handle, blob)
+        return decode_blob(blob)
 
     def _get_raw_from_id_data(self, obj_key, gramps_id):
         table = KEY_TO_NAME_MAP[obj_key]
+        if self._bulk:
+            handle = self._bulk_gids.get(obj_key, {}).get(gramps_id)
+            if handle is not None:
+                return decode_blob(self._bulk[obj_key][handle][0])
+            # Ignore rows whose buffered version has another Gramps ID
+            pending = self._bulk.get(obj_key, ())
+            sql = ("SELECT handle, blob_data FROM %s WHERE gramps_id = ?"
+                   % table)
+            self.dbapi.execute(sql, [gramps_id])
+            for row in self.dbapi.fetchall():
+                if row[0] not in pending:
+                    return decode_blob(row[1])
+            return None
         sql = "SELECT blob_data FROM %s WHERE gramps_id = ?" % table
         self.dbapi.execute(sql, [gramps_id])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return decode_blob(row[0])
 
     def get_gender_stats(self):
         """
@@ -950,10 +1746,7 @@ class DBAPI(DbGeneric):
                    "WHERE obj_handle = ? AND ref_handle = ?")
             self.dbapi.execute(sql, [handle[0], handle[1]])
         else:
-            sql = ("INSERT INTO reference " +
-                   "(obj_handle, obj_class, ref_handle, ref_class) " +
-                   "VALUES(?, ?, ?, ?)")
-            self.dbapi.execute(sql, data)
+            self._apply_references([], [data])
 
     def undo_data(self, data, handle, obj_key):
         """
@@ -961,16 +1754,21 @@ class DBAPI(DbGeneric):
         """
         cls = KEY_TO_CLASS_MAP[obj_key]
         table = cls.lower()
+        self._person_summary_changed(obj_key, handle)
         if data is None:
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._cache.discard(obj_key, handle)
+            self._remove_genealogy(obj_key, handle)
         else:
+            blob = self._blob_codec.encode(data)
             if self._has_handle(obj_key, handle):
                 sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-                self.dbapi.execute(sql, [pickle.dumps(data), handle])
+                self.dbapi.execute(sql, [blob, handle])
             else:
                 sql = "INSERT INTO %s (handle, blob_data) VALUES (?, ?)" % table
-                self.dbapi.execute(sql, [handle, pickle.dumps(data)])
+                self.dbapi.execute(sql, [handle, blob])
+            self._cache.set(obj_key, handle, blob)
             obj = self._get_table_func(cls)["class_func"].create(data)
             self._update_secondary_values(obj)
 
@@ -978,6 +1776,12 @@ class DBAPI(DbGeneric):
         """
         Return the list of locale-sorted surnames contained in the database.
         """
+        self._flush_bulk()
+        if self._sort_keys:
+            self.dbapi.execute("SELECT DISTINCT surname_key, surname "
+                               "FROM person "
+                               "ORDER BY surname_key")
+            return [row[1] for row in self.dbapi.fetchall()]
         self.dbapi.execute("SELECT DISTINCT surname "
                            "FROM person "
                            "ORDER BY surname")
@@ -1017,38 +1821,87 @@ class DBAPI(DbGeneric):
                     self.dbapi.execute("ALTER TABLE %s ADD COLUMN %s %s"
                                        % (table_name, field, sql_type))
 
+    def _create_sort_key_columns(self):
+        """
+        Create the columns holding the locale sort keys of the columns that
+        are used for sorting, see SORT_KEY_FIELDS.  Columns that exist
+        already, as in a tree converted from BSDDB, are kept.
+        """
+        for class_name, fields in SORT_KEY_FIELDS.items():
+            table_name = class_name.lower()
+            for field in fields:
+                column = "%s_key" % field
+                if not self.dbapi.column_exists(table_name, column):
+                    self.dbapi.execute("ALTER TABLE %s ADD COLUMN %s %s"
+                                       % (table_name, column,
+                                          self._sql_type('blob', 0)))
+            # The surname list is read from the index
+            columns = "surname_key, surname" if table_name == 'person' \
+                else "%s_key" % fields[0]
+            self.dbapi.execute("CREATE INDEX IF NOT EXISTS %s_%s_key "
+                               "ON %s(%s)"
+                               % (table_name, fields[0], table_name, columns))
+
+    def _set_sort_key_locale(self):
+        """
+        Record that the sort keys are computed in the collation of the
+        current locale.
+        """
+        self._set_metadata('sort-keys', get_sort_key_locale())
+
+    def _rebuild_sort_keys(self):
+        """
+        Recompute the sort key columns in the collation of the current
+        locale.
+        """
+        LOG.info("Rebuilding sort keys for %s", get_sort_key_locale())
+        self._txn_begin()
+        self._update_sort_keys()
+        self._txn_commit()
+        # Separate transaction to save metadata.
+        self._set_sort_key_locale()
+
+    def _update_sort_keys(self):
+        """
+        Compute the sort key columns from the columns they sort.
+        Does not commit.
+        """
+        for class_name, fields in SORT_KEY_FIELDS.items():
+            table_name = class_name.lower()
+            rows = list(self._iter_rows("SELECT %s, handle FROM %s"
+                                        % (", ".join(fields), table_name)))
+            sql = ("UPDATE %s SET %s WHERE handle = ?"
+                   % (table_name, ", ".join(["%s_key = ?" % field
+                                             for field in fields])))
+            self.dbapi.executemany(sql, [[get_sort_key(value)
+                                          for value in row[:-1]] + [row[-1]]
+                                         for row in rows])
+
     def _update_secondary_values(self, obj):
         """
         Given a primary object update its secondary field values
         in the database.
         Does not commit.
         """
-        table = obj.__class__.__name__
-        fields = [field[0] for field in obj.get_secondary_fields()]
-        sets = []
-        values = []
-        for field in fields:
-            sets.append("%s = ?" % field)
-            values.append(getattr(obj, field))
-
-        # Derived fields
-        if table == 'Person':
-            given_name, surname = self._get_person_data(obj)
-            sets.append("given_name = ?")
-            values.append(given_name)
-            sets.append("surname = ?")
-            values.append(surname)
-        if table == 'Place':
-            handle = self._get_place_data(obj)
-            sets.append("enclosed_by = ?")
-            values.append(handle)
-
+        fields, values = self._get_secondary_values(obj)
         if len(values) > 0:
-            table_name = table.lower()
+            table_name = obj.__class__.__name__.lower()
+            sets = ["%s = ?" % field for field in fields]
             self.dbapi.execute("UPDATE %s SET %s where handle = ?"
                                % (table_name, ", ".join(sets)),
                                self._sql_cast_list(values)
                                + [obj.handle])
+        links = get_genealogy_links(obj)
+        if links is not None:
+            self._update_genealogy(CLASS_TO_KEY_MAP[obj.__class__.__name__],
+                                   [(obj.handle, links)])
+
+    def _get_secondary_values(self, obj):
+        """
+        Given a primary object return the names and values of its
+        secondary columns, excluding the handle.
+        """
+        return get_secondary_values(obj, self._sort_keys)
 
     def _sql_cast_list(self, values):
         """
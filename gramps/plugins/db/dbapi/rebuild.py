@@ -0,0 +1,193 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Rebuild the reference map and secondary columns of the DB-API backends.
+
+The raw rows of the primary tables are read in chunks.  Decoding the
+blobs and computing the references or secondary values of a chunk is done
+by the functions below, which only use their arguments, so that they can
+run in worker processes.  The database process writes the results.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db.dbconst import (KEY_TO_CLASS_MAP, PERSON_KEY, FAMILY_KEY,
+                                   SOURCE_KEY, EVENT_KEY, MEDIA_KEY,
+                                   PLACE_KEY, NOTE_KEY, TAG_KEY, CITATION_KEY,
+                                   REPOSITORY_KEY)
+from gramps.gen.lib import (Person, Family, Event, Place, Source, Citation,
+                            Media, Repository, Note, Tag)
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.plugins.db.dbapi.codec import decode
+
+CLASSES = {PERSON_KEY: Person,
+           FAMILY_KEY: Family,
+           EVENT_KEY: Event,
+           PLACE_KEY: Place,
+           SOURCE_KEY: Source,
+           CITATION_KEY: Citation,
+           MEDIA_KEY: Media,
+           REPOSITORY_KEY: Repository,
+           NOTE_KEY: Note,
+           TAG_KEY: Tag}
+
+# Secondary columns used for sorting, which have a <field>_key column that
+# holds their locale sort key.
+SORT_KEY_FIELDS = {'Person': ('surname', 'given_name'),
+                   'Place': ('title',),
+                   'Source': ('title',),
+                   'Citation': ('page',),
+                   'Media': ('desc',),
+                   'Tag': ('name',)}
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_sort_key_locale():
+    """
+    Return the name of the collation used by get_sort_key.
+    """
+    return "%s (%s)" % (glocale.get_collation(),
+                        "ICU" if getattr(glocale, 'collator', None)
+                        else "strxfrm")
+
+def get_sort_key(text):
+    """
+    Return the locale sort key of a string, as bytes that compare in the
+    same order as the strings do in the locale.
+    """
+    # strxfrm keys may contain surrogate code points
+    return glocale.sort_key(text or "").encode('utf-8', 'surrogatepass')
+
+def get_secondary_values(obj, sort_keys=False):
+    """
+    Given a primary object return the names and values of its secondary
+    columns, excluding the handle.  If sort_keys is True the sort key
+    columns are included.
+    """
+    table = obj.__class__.__name__
+    fields = [field[0] for field in obj.get_secondary_fields()
+              if field[0] != 'handle']
+    values = [getattr(obj, field) for field in fields]
+
+    # Derived fields
+    if table == 'Person':
+        given_name = surname = ""
+        primary_name = obj.get_primary_name()
+        if primary_name:
+            given_name = primary_name.get_first_name()
+            surname_list = primary_name.get_surname_list()
+            if surname_list and surname_list[0]:
+                surname = surname_list[0].surname
+        fields += ['given_name', 'surname']
+        values += [given_name, surname]
+    if table == 'Place':
+        enclosed_by = ""
+        for placeref in obj.get_placeref_list():
+            enclosed_by = placeref.ref
+            break
+        fields.append('enclosed_by')
+        values.append(enclosed_by)
+    if sort_keys:
+        for field in SORT_KEY_FIELDS.get(table, ()):
+            values.append(get_sort_key(values[fields.index(field)]))
+            fields.append(field + '_key')
+    return fields, values
+
+def get_genealogy_links(obj):
+    """
+    Return the handles of the families in which a person is a child, or of
+    the children of a family, in order.  Returns None for other objects.
+    """
+    if isinstance(obj, Person):
+        return list(obj.parent_family_list)
+    if isinstance(obj, Family):
+        return [child_ref.ref for child_ref in obj.child_ref_list]
+    return None
+
+def get_references(obj_key, rows):
+    """
+    Return the rows of the reference table for a chunk of raw rows, as
+    (obj_handle, obj_class, ref_handle, ref_class) tuples with class names.
+    """
+    class_func = CLASSES[obj_key]
+    obj_class = KEY_TO_CLASS_MAP[obj_key]
+    references = []
+    for handle, blob in rows:
+        obj = class_func.create(decode(blob))
+        references.extend(
+            (handle, obj_class, ref_handle, ref_class)
+            for (ref_class, ref_handle)
+            in set(obj.get_referenced_handles_recursively()))
+    return references
+
+def get_secondary_rows(obj_key, rows, sort_keys=False):
+    """
+    Return the secondary values for a chunk of raw rows, as the list of
+    column names, followed by a list of (handle, values, linked handles)
+    tuples, see get_genealogy_links.
+    """
+    class_func = CLASSES[obj_key]
+    fields = None
+    result = []
+    for handle, blob in rows:
+        obj = class_func.create(decode(blob))
+        fields, values = get_secondary_values(obj, sort_keys)
+        result.append((handle, values, get_genealogy_links(obj)))
+    return fields, result
+
+def map_chunks(func, chunks, processes=1):
+    """
+    Yield (obj_key, number of rows, func(obj_key, rows)) for each
+    (obj_key, rows) chunk, in the order of the chunks.
+
+    With more than one process, the chunks are handed to a pool of worker
+    processes, with at most two chunks per process in flight so that the
+    memory use stays bounded.
+    """
+    if processes <= 1:
+        for obj_key, rows in chunks:
+            yield obj_key, len(rows), func(obj_key, rows)
+        return
+    with ProcessPoolExecutor(processes) as pool:
+        pending = deque()
+        for obj_key, rows in chunks:
+            pending.append((obj_key, len(rows),
+                            pool.submit(func, obj_key, rows)))
+            if len(pending) >= 2 * processes:
+                obj_key, size, future = pending.popleft()
+                yield obj_key, size, future.result()
+        while pending:
+            obj_key, size, future = pending.popleft()
+            yield obj_key, size, future.result()
@@ -32,6 +32,8 @@ import sqlite3
 import os
 import re
 import logging
+import threading
+from functools import lru_cache
 
 #-------------------------------------------------------------------------
 #
@@ -39,12 +41,18 @@ import logging
 #
 #-------------------------------------------------------------------------
 from gramps.plugins.db.dbapi.dbapi import DBAPI
-from gramps.gen.db.dbconst import ARRAYSIZE
+from gramps.gen.db.dbconst import ARRAYSIZE, DBMODE_R
+from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 
 sqlite3.paramstyle = 'qmark'
 
+LOG = logging.getLogger(".sqlite")
+
+# Number of compiled patterns kept by the regular expression functions
+PATTERN_CACHE_SIZE = 256
+
 #-------------------------------------------------------------------------
 #
 # SQLite class
@@ -52,6 +60,15 @@ sqlite3.paramstyle = 'qmark'
 #-------------------------------------------------------------------------
 class SQLite(DBAPI):
 
+    def __init__(self, directory=None):
+        super().__init__(directory)
+        # The reader kept for the next call of open_reader
+        self.__reader = None
+        self.__keep_reader = False
+        self.__reader_lock = threading.Lock()
+        # The data_version of a reader when it was loaded
+        self.__data_version = None
+
     def get_summary(self):
         """
         Return a dictionary of information about this database backend.
@@ -61,6 +78,10 @@ class SQLite(DBAPI):
             _("Database version"): sqlite3.sqlite_version,
             _("Database module version"): sqlite3.version,
             _("Database module location"): sqlite3.__file__,
+            _("Journal mode"): self.dbapi.pragma('journal_mode'),
+            _("Synchronous"): self.dbapi.pragma('synchronous'),
+            _("Page cache size"): self.dbapi.pragma('cache_size'),
+            _("Memory-mapped I/O size"): self.dbapi.pragma('mmap_size'),
         })
         return summary
 
@@ -69,7 +90,129 @@ class SQLite(DBAPI):
             path_to_db = ':memory:'
         else:
             path_to_db = os.path.join(directory, 'sqlite.db')
-        self.dbapi = Connection(path_to_db)
+        # read-only instances may be handed to a worker thread, see
+        # open_reader
+        self.dbapi = Connection(
+            path_to_db,
+            cached_statements=config.get('database.sqlite-statement-cache'),
+            check_same_thread=not self.readonly)
+        self._set_profile()
+        self.__keep_reader = True
+
+    def _set_profile(self):
+        """
+        Apply the performance settings of the configuration.  The journal
+        mode is only changed when one is configured, which is an opt-in,
+        and never for read-only databases, since changing it needs write
+        access.
+        """
+        # cache_size is negative to give the size in KiB, not in pages
+        settings = [
+            ('cache_size', -config.get('database.sqlite-cache-size')),
+            ('mmap_size', config.get('database.sqlite-mmap-size')),
+            ('temp_store', config.get('database.sqlite-temp-store')),
+            ('synchronous', config.get('database.sqlite-synchronous'))]
+        journal_mode = config.get('database.sqlite-journal-mode')
+        if journal_mode and not self.readonly:
+            settings.append(('journal_mode', journal_mode))
+        if not self.readonly:
+            settings.append(('wal_autocheckpoint',
+                             config.get('database.sqlite-wal-autocheckpoint')))
+        for name, value in settings:
+            self._set_pragma(name, value)
+        self._journal_mode = self.dbapi.pragma('journal_mode')
+
+    def open_reader(self):
+        """
+        A reader does not block the writer, nor the other way round, when
+        the log is written ahead.  Read-only databases are never written.
+        """
+        directory = self.get_save_path()
+        if (not self.is_open() or directory in (None, ':memory:') or
+                not (self.readonly or self._journal_mode == 'wal')):
+            return None
+        with self.__reader_lock:
+            reader, self.__reader = self.__reader, None
+        if (reader is not None and
+                reader.dbapi.pragma('data_version') != reader.__data_version):
+            # the database has changed since the reader was loaded
+            self.__discard_reader(reader)
+            reader = None
+        if reader is None:
+            reader = self.__class__()
+            reader.load(directory, mode=DBMODE_R, update=False)
+            reader.__data_version = reader.dbapi.pragma('data_version')
+        return reader
+
+    def close_reader(self, reader):
+        """
+        The reader is kept, unless another one is kept already, so that
+        open_reader only loads the database again once it has changed.
+        """
+        with self.__reader_lock:
+            if self.__keep_reader and self.__reader is None:
+                self.__reader, reader = reader, None
+        if reader is not None:
+            self.__discard_reader(reader)
+
+    @staticmethod
+    def __discard_reader(reader):
+        """
+        Close a reader.  It does not go through close, which clears the
+        lock of the database, since the lock is not the reader's.
+        """
+        reader._close()
+        reader.db_is_open = False
+
+    def _close(self):
+        with self.__reader_lock:
+            reader, self.__reader = self.__reader, None
+            self.__keep_reader = False
+        if reader is not None:
+            self.__discard_reader(reader)
+        super()._close()
+
+    def _set_pragma(self, name, value):
+        """
+        Set a pragma, logging a warning if the value is not accepted.
+        """
+        try:
+            self.dbapi.pragma(name, value)
+        except (sqlite3.Error, ValueError) as err:
+            LOG.warning("Cannot set PRAGMA %s to %s: %s", name, value, err)
+
+    def transaction_begin(self, transaction):
+        """
+        Batch transactions use the 'database.sqlite-batch-synchronous'
+        setting, which must be set outside of an SQL transaction.
+        """
+        if transaction.batch:
+            self._set_pragma('synchronous',
+                             config.get('database.sqlite-batch-synchronous'))
+        return super().transaction_begin(transaction)
+
+    def transaction_commit(self, txn):
+        super().transaction_commit(txn)
+        if txn.batch:
+            self._end_batch()
+
+    def transaction_abort(self, txn):
+        super().transaction_abort(txn)
+        if txn.batch:
+            self._end_batch()
+
+    def _end_batch(self):
+        """
+        Restore the synchronous setting after a batch transaction, and
+        write the log back into the database so that the log of a large
+        import does not stay on disk.
+        """
+        self._set_pragma('synchronous',
+                         config.get('database.sqlite-synchronous'))
+        try:
+            self.dbapi.checkpoint()
+        except sqlite3.Error as err:
+            LOG.warning("Cannot checkpoint the database: %s", err)
 
 
 #-------------------------------------------------------------------------
@@ -100,6 +243,8 @@ class Connection:
         self.__connection = sqlite3.connect(*args, **kwargs)
         self.__cursor = self.__connection.cursor()
         self.__connection.create_function("regexp", 2, regexp)
+        self.__connection.create_function("regexp_i", 2, regexp_i)
+        self.__connection.create_function("contains_i", 2, contains_i)
         self.__collations = []
         self.__tmap = str.maketrans('-.@=;', '_____')
         self.check_collation(glocale)
@@ -130,6 +275,18 @@ class Connection:
         self.log.debug(args)
         self.__cursor.execute(*args, **kwargs)
 
+    def executemany(self, sql, seq_of_params):
+        """
+        Executes an SQL statement once for each set of parameters.
+
+        :param sql: the SQL statement to execute
+        :type sql: str
+        :param seq_of_params: sequence of parameter lists
+        :type seq_of_params: list
+        """
+        self.log.debug(sql)
+        self.__cursor.executemany(sql, seq_of_params)
+
     def fetchone(self):
         """
         Fetches the next row of a query result set, returning a single sequence,
@@ -144,6 +301,33 @@ class Connection:
         """
         return self.__cursor.fetchall()
 
+    def pragma(self, name, value=None):
+        """
+        Return the value of a pragma, after setting it if a value is given.
+
+        :param name: the name of the pragma.
+        :type name: str
+        :param value: the new value, a number or a keyword.
+        :type value: int or str
+        :raises ValueError: if the value is neither a number nor a keyword.
+        """
+        if value is not None:
+            value = str(value)
+            if not value.lstrip('-').isalnum():
+                raise ValueError("invalid value '%s'" % value)
+            self.execute("PRAGMA %s = %s" % (name, value))
+        self.execute("PRAGMA %s" % name)
+        row = self.fetchone()
+        return row[0] if row else None
+
+    def checkpoint(self):
+        """
+        Copy the write-ahead log into the database and truncate it.  Does
+        nothing unless the journal mode is WAL.
+        """
+        self.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.fetchone()
+
     def begin(self):
         """
         Start a transaction manually. This transactions usually persist until
@@ -180,6 +364,20 @@ class Connection:
                      "WHERE type='table' AND name='%s';" % table)
         return self.fetchone()[0] != 0
 
+    def column_exists(self, table, column):
+        """
+        Test whether the specified SQL database table has a column.
+
+        :param table: table name to check.
+        :type table: str
+        :param column: column name to check.
+        :type column: str
+        :returns: True if the column exists, false otherwise.
+        :rtype: bool
+        """
+        self.execute("PRAGMA table_info(%s)" % table)
+        return any(row[1] == column for row in self.fetchall())
+
     def close(self):
         """
         Close the current database.
@@ -222,25 +420,74 @@ class Cursor:
         """
         self.__cursor.execute(*args, **kwargs)
 
-    def fetchmany(self):
+    def fetchmany(self, size=None):
         """
         Fetches the next set of rows of a query result, returning a list. An
         empty list is returned when no more rows are available.
+
+        :param size: the number of rows to fetch, by default the arraysize.
+        :type size: int
         """
-        return self.__cursor.fetchmany()
+        if size is None:
+            return self.__cursor.fetchmany()
+        return self.__cursor.fetchmany(size)
 
 
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _compile(expr, flags):
+    """
+    Return the compiled pattern, which is only compiled once for all the
+    rows of a query.
+    """
+    return re.compile(expr, flags)
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def _upper(text):
+    """
+    Return the upper case version of a search string.
+    """
+    return text.upper()
+
 def regexp(expr, value):
     """
-    A user defined function that can be called from within an SQL statement.
+    A user defined function that can be called from within an SQL statement,
+    as "value REGEXP expr".
 
     This function has two parameters.
 
     :param expr: pattern to look for.
     :type expr: str
     :param value: the string to search.
-    :type value: list
-    :returns: True if the expr exists within the value, false otherwise.
+    :type value: str
+    :returns: True if the expr exists within the value, false otherwise,
+              also if the value is NULL.
     :rtype: bool
     """
-    return re.search(expr, value, re.MULTILINE) is not None
+    if expr is None or value is None:
+        return False
+    return _compile(expr, re.MULTILINE).search(str(value)) is not None
+
+def regexp_i(expr, value):
+    """
+    A user defined function that can be called from within an SQL statement,
+    as "regexp_i(expr, value)".
+
+    Like :func:`regexp`, but ignoring case, as the regular expressions of
+    the filter rules do.
+    """
+    if expr is None or value is None:
+        return False
+    return _compile(expr, re.IGNORECASE).search(str(value)) is not None
+
+def contains_i(text, value):
+    """
+    A user defined function that can be called from within an SQL statement,
+    as "contains_i(text, value)".
+
+    Return True if the value contains the text, ignoring case.  Unlike the
+    SQL LIKE operator, the comparison also ignores the case of non-ASCII
+    letters, as the substring search of the filter rules does.
+    """
+    if text is None or value is None:
+        return False
+    return _upper(text) in str(value).upper()
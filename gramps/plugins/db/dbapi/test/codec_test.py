@@ -0,0 +1,144 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the blob codecs of the DB-API backends.
+
+The decode benchmark is part of the performance suite:
+python3 -m gramps.test.regrtest -p gramps/plugins/db/dbapi/test
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import pickle
+import unittest
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database, import_as_dict
+from gramps.gen.lib import Person, Surname
+from gramps.gen.user import User
+from gramps.plugins.db.dbapi.codec import CODECS, get_codec, decode
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+#-------------------------------------------------------------------------
+#
+# CodecTest class
+#
+#-------------------------------------------------------------------------
+class CodecTest(unittest.TestCase):
+    '''
+    Round trip tests for each codec.
+    '''
+
+    def setUp(self):
+        person = Person()
+        person.set_handle('handle')
+        person.set_gramps_id('I0001')
+        surname = Surname()
+        surname.surname = 'Allen'
+        person.primary_name.set_surname_list([surname])
+        person.add_family_handle('family')
+        self.data = person.serialize()
+
+    def test_round_trip(self):
+        for codec in CODECS.values():
+            blob = codec.encode(self.data)
+            self.assertIn(blob[0], codec.tags)
+            # Lists and tuples must not be interchanged
+            self.assertEqual(repr(codec.decode(blob)), repr(self.data))
+            self.assertEqual(repr(decode(blob)), repr(self.data))
+
+    def test_legacy_pickle(self):
+        blob = pickle.dumps(self.data, 1)
+        self.assertEqual(decode(blob), self.data)
+
+    def test_unknown_codec(self):
+        self.assertRaises(KeyError, get_codec, 'unknown')
+
+    def test_mixed_database(self):
+        db = make_database("sqlite")
+        db.load(":memory:")
+        with DbTxn('Add person', db) as trans:
+            db.add_person(Person(), trans)
+            handle = db.add_person(Person(), trans)
+        # Written by a version of Gramps before the codecs
+        data = db.get_raw_person_data(handle)
+        db.dbapi.execute("UPDATE person SET blob_data = ? WHERE handle = ?",
+                         [pickle.dumps(data, 1), handle])
+        db.dbapi.commit()
+        self.assertEqual(len(list(db.iter_people())), 2)
+        self.assertEqual(db.get_raw_person_data(handle), data)
+        db.close()
+
+#-------------------------------------------------------------------------
+#
+# CodecPerfTest class
+#
+#-------------------------------------------------------------------------
+class CodecPerfTest(unittest.TestCase):
+    '''
+    Compare the decode throughput of the codecs on the example tree.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        db = import_as_dict(EXAMPLE, User())
+        cls.rows = []
+        for table in ('person', 'family', 'event', 'place', 'source',
+                      'citation', 'note'):
+            with db.method('get_%s_cursor', table)() as cursor:
+                cls.rows.extend(data for handle, data in cursor)
+        db.close()
+
+    def perf_decode(self):
+        print()
+        for codec in CODECS.values():
+            blobs = [codec.encode(data) for data in self.rows]
+            start = perf_counter()
+            for dummy in range(10):
+                for blob in blobs:
+                    decode(blob)
+            elapsed = perf_counter() - start
+            print("%-8s %8d bytes %9.0f rows/s" %
+                  (codec.name, sum(len(blob) for blob in blobs),
+                   10 * len(blobs) / elapsed))
+
+
+def perfSuite():
+    loader = unittest.TestLoader()
+    loader.testMethodPrefix = 'perf'
+    return loader.loadTestsFromTestCase(CodecPerfTest)
+
+
+if __name__ == "__main__":
+    unittest.main()
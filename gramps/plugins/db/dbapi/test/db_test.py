@@ -23,6 +23,9 @@
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+import os
+import pickle
+import sqlite3
 import unittest
 
 #-------------------------------------------------------------------------
@@ -30,10 +33,19 @@ import unittest
 # Gramps modules
 #
 #-------------------------------------------------------------------------
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gen.config import config
 from gramps.gen.db import DbTxn
 from gramps.gen.db.utils import make_database
+from gramps.gen.db.base import DbReadBase
+from gramps.gen.db.dbconst import (PERSON_KEY, EVENT_KEY, NOTE_KEY, DBUNDOFN,
+                                   CLOSURE_CACHE_SIZE)
+from gramps.gen.utils.file import get_empty_tempdir
+from gramps.gen.errors import HandleError
 from gramps.gen.lib import (Person, Family, Event, Place, Repository, Source,
-                            Citation, Media, Note, Tag, Researcher, Surname)
+                            Citation, Media, Note, Tag, Researcher, Surname,
+                            ChildRef, PlaceRef, EventRef, EventType, NoteType,
+                            FamilyRelType, Date)
 
 #-------------------------------------------------------------------------
 #
@@ -246,6 +258,20 @@ class DbRandomTest(unittest.TestCase):
                                 self.db.get_number_of_tags,
                                 sort_handles=True)
 
+    ################################################################
+    #
+    # Test iter_objects_by_handle method
+    #
+    ################################################################
+    def test_iter_objects_by_handle(self):
+        for obj_type, handles in self.handles.items():
+            objects = list(self.db.iter_objects_by_handle(obj_type))
+            self.assertEqual([obj.handle for obj in objects], sorted(handles))
+            self.assertEqual([obj.serialize() for obj in objects],
+                             [obj.serialize() for obj in
+                              DbReadBase.iter_objects_by_handle(self.db,
+                                                                obj_type)])
+
     ################################################################
     #
     # Test get_*_gramps_ids methods
@@ -865,6 +891,723 @@ class DbPersonTest(unittest.TestCase):
         self.assertEqual(saved['John'], (3, 1, 1))
         self.assertEqual(saved['Mary'], (1, 4, 0))
 
+#-------------------------------------------------------------------------
+#
+# DbBulkTest class
+#
+#-------------------------------------------------------------------------
+class DbBulkTest(unittest.TestCase):
+    '''
+    Tests for buffered bulk writes.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def __make_family(self):
+        father = Person()
+        father.set_handle('father')
+        father.set_gramps_id('I0001')
+        father.gender = Person.MALE
+        name = father.primary_name
+        name.first_name = 'John'
+        surname = Surname()
+        surname.surname = 'Allen'
+        name.set_surname_list([surname])
+        family = Family()
+        family.set_handle('family')
+        family.set_gramps_id('F0001')
+        family.set_father_handle('father')
+        father.add_family_handle('family')
+        return father, family
+
+    def test_commit_many(self):
+        father, family = self.__make_family()
+        with DbTxn('Bulk add', self.db) as trans:
+            self.db.commit_many([father, family], trans)
+        self.assertEqual(self.db.get_number_of_people(), 1)
+        self.assertEqual(self.db.get_person_from_gramps_id('I0001').handle,
+                         'father')
+        self.assertEqual(list(self.db.find_backlink_handles('father')),
+                         [('Family', 'family')])
+        self.assertEqual(self.db.genderStats.name_stats('John'), (1, 0, 0))
+        self.assertEqual(self.db.get_surname_list(), ['Allen'])
+
+    def test_commit_many_undo(self):
+        father, family = self.__make_family()
+        with DbTxn('Bulk add', self.db) as trans:
+            self.db.commit_many([father, family], trans)
+        self.db.undo()
+        self.assertEqual(self.db.get_number_of_people(), 0)
+        self.assertEqual(list(self.db.find_backlink_handles('father')), [])
+        self.db.redo()
+        self.assertEqual(list(self.db.find_backlink_handles('father')),
+                         [('Family', 'family')])
+
+    def test_batch_read_own_writes(self):
+        father, family = self.__make_family()
+        with DbTxn('Batch add', self.db, batch=True) as trans:
+            self.db.add_person(father, trans)
+            self.assertTrue(self.db.has_person_handle('father'))
+            self.assertTrue(self.db.has_person_gramps_id('I0001'))
+            father.set_gramps_id('I0002')
+            self.db.commit_person(father, trans)
+            self.assertFalse(self.db.has_person_gramps_id('I0001'))
+            self.assertEqual(self.db.get_person_from_handle('father')
+                             .gramps_id, 'I0002')
+            self.db.add_family(family, trans)
+            self.assertEqual(self.db.get_family_handles(), ['family'])
+        self.assertEqual(self.db.get_person_gramps_ids(), ['I0002'])
+        self.assertEqual(self.db.genderStats.name_stats('John'), (1, 0, 0))
+        self.assertEqual(list(self.db.find_backlink_handles('father')),
+                         [('Family', 'family')])
+
+    def test_batch_modify_after_commit(self):
+        father, family = self.__make_family()
+        with DbTxn('Batch add', self.db, batch=True) as trans:
+            self.db.add_person(father, trans)
+            father.add_family_handle('other')
+        self.assertEqual(self.db.get_person_from_handle('father')
+                         .get_family_handle_list(), ['family'])
+
+#-------------------------------------------------------------------------
+#
+# DbGenealogyTest class
+#
+#-------------------------------------------------------------------------
+class DbGenealogyTest(unittest.TestCase):
+    '''
+    Tests for the parent/child graph.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        # Three generations: I0 is the parent of I1, who is the parent of I2
+        with DbTxn('Add people', self.db) as trans:
+            for gen in range(3):
+                person = Person()
+                person.set_handle('I%d' % gen)
+                self.db.add_person(person, trans)
+            for gen in range(2):
+                self.add_family('F%d' % gen, 'I%d' % gen, 'I%d' % (gen + 1),
+                                trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_family(self, handle, father_handle, child_handle, trans):
+        family = Family()
+        family.set_handle(handle)
+        family.set_father_handle(father_handle)
+        child_ref = ChildRef()
+        child_ref.ref = child_handle
+        family.add_child_ref(child_ref)
+        self.db.add_family(family, trans)
+        father = self.db.get_person_from_handle(father_handle)
+        father.add_family_handle(handle)
+        self.db.commit_person(father, trans)
+        child = self.db.get_person_from_handle(child_handle)
+        child.add_parent_family_handle(handle)
+        self.db.commit_person(child, trans)
+
+    def test_closures(self):
+        self.assertEqual(self.db.find_ancestors(['I2']),
+                         {'I2': 1, 'I1': 2, 'I0': 3})
+        self.assertEqual(self.db.find_ancestors(['I2'], 2),
+                         {'I2': 1, 'I1': 2})
+        self.assertEqual(self.db.find_descendants(['I0']),
+                         {'I0': 1, 'I1': 2, 'I2': 3})
+        self.assertEqual(self.db.get_family_parent_handles('F0'),
+                         ('I0', None))
+        self.assertEqual(self.db.get_family_child_handles('F0'), ['I1'])
+
+    def test_closure_cache(self):
+        self.db.find_ancestors(['I2'])
+        for index in range(CLOSURE_CACHE_SIZE - 1):
+            self.db.find_descendants(['X%d' % index])
+        self.db.find_ancestors(['I2'])
+        # Evicts the least recently used closure only
+        self.db.find_descendants(['Y'])
+        self.assertEqual(len(self.db._closures), CLOSURE_CACHE_SIZE)
+        self.assertIn(('ancestors', ('I2',), None, False), self.db._closures)
+        self.assertNotIn(('descendants', ('X0',), None), self.db._closures)
+
+    def test_child_order(self):
+        # The children are those of the child reference list, in its order,
+        # even if a child does not list the family
+        with DbTxn('Add child', self.db) as trans:
+            family = self.db.get_family_from_handle('F0')
+            child_ref = ChildRef()
+            child_ref.ref = 'I2'
+            family.child_ref_list.insert(0, child_ref)
+            self.db.commit_family(family, trans)
+        self.assertEqual(self.db.get_family_child_handles('F0'), ['I2', 'I1'])
+        self.assertEqual(self.db.get_person_parent_family_handles('I2'),
+                         ['F1'])
+
+    def test_changes(self):
+        self.assertEqual(len(self.db.find_ancestors(['I2'])), 3)
+        with DbTxn('Remove family', self.db) as trans:
+            self.db.remove_family_relationships('F0', trans)
+        self.assertEqual(self.db.find_ancestors(['I2']), {'I2': 1, 'I1': 2})
+        self.db.undo()
+        self.assertEqual(len(self.db.find_ancestors(['I2'])), 3)
+        with DbTxn('Add family', self.db, batch=True) as trans:
+            person = Person()
+            person.set_handle('I3')
+            self.db.add_person(person, trans)
+            self.add_family('F2', 'I2', 'I3', trans)
+        self.assertEqual(self.db.find_descendants(['I0'])['I3'], 4)
+
+    def test_generic(self):
+        for handle in self.db.get_person_handles():
+            for method in ('get_person_family_handles',
+                           'get_person_parent_family_handles',
+                           'find_ancestors', 'find_descendants'):
+                arg = [handle] if method.startswith('find') else handle
+                self.assertEqual(getattr(self.db, method)(arg),
+                                 getattr(DbReadBase, method)(self.db, arg))
+        for handle in self.db.get_family_handles():
+            for method in ('get_family_parent_handles',
+                           'get_family_child_handles'):
+                self.assertEqual(getattr(self.db, method)(handle),
+                                 getattr(DbReadBase, method)(self.db, handle))
+
+#-------------------------------------------------------------------------
+#
+# DbReferenceTest class
+#
+#-------------------------------------------------------------------------
+class DbReferenceTest(unittest.TestCase):
+    '''
+    Tests for the reference table.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add objects', self.db) as trans:
+            for handle in ('N1', 'N2'):
+                note = Note()
+                note.set_handle(handle)
+                self.db.add_note(note, trans)
+            self.person = Person()
+            self.person.set_handle('P1')
+            self.person.add_note('N1')
+            self.db.add_person(self.person, trans)
+            event = Event()
+            event.set_handle('E1')
+            event.add_note('N1')
+            self.db.add_event(event, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def references(self):
+        self.db.dbapi.execute("SELECT obj_handle, obj_class, "
+                              "ref_handle, ref_class FROM reference")
+        return sorted(self.db.dbapi.fetchall())
+
+    def test_include_classes(self):
+        self.assertEqual(sorted(self.db.find_backlink_handles('N1')),
+                         [('Event', 'E1'), ('Person', 'P1')])
+        self.assertEqual(list(self.db.find_backlink_handles('N1', ['Event'])),
+                         [('Event', 'E1')])
+        self.assertEqual(list(self.db.find_backlink_handles('N1', ['Tag'])),
+                         [])
+        self.assertEqual(list(self.db.find_backlink_handles('N1', [])), [])
+        self.assertEqual(self.references(),
+                         [('E1', EVENT_KEY, 'N1', NOTE_KEY),
+                          ('P1', PERSON_KEY, 'N1', NOTE_KEY)])
+
+    def test_diff(self):
+        before = self.references()
+        with DbTxn('Edit person', self.db) as trans:
+            self.person.add_note('N2')
+            self.db.commit_person(self.person, trans)
+        self.assertEqual(list(self.db.find_backlink_handles('N2')),
+                         [('Person', 'P1')])
+        with DbTxn('Edit person', self.db) as trans:
+            self.person.set_note_list(['N2'])
+            self.db.commit_person(self.person, trans)
+        self.assertEqual(list(self.db.find_backlink_handles('N1')),
+                         [('Event', 'E1')])
+        self.db.undo()
+        self.db.undo()
+        self.assertEqual(self.references(), before)
+        self.db.redo()
+        self.assertEqual(list(self.db.find_backlink_handles('N2')),
+                         [('Person', 'P1')])
+
+    def test_reindex(self):
+        before = self.references()
+        self.db.reindex_reference_map(None)
+        self.assertEqual(self.references(), before)
+
+
+#-------------------------------------------------------------------------
+#
+# DbCacheTest class
+#
+#-------------------------------------------------------------------------
+class DbCacheTest(unittest.TestCase):
+    '''
+    Tests for the cache of object records.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            person.set_gramps_id('I0001')
+            self.db.add_person(person, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_hits(self):
+        self.db.get_person_from_handle('P1')
+        self.db.get_person_from_handle('P1')
+        hits, misses, evictions, size = self.db.get_cache_stats()['person']
+        self.assertEqual(size, 1)
+        self.assertEqual(hits, 2)
+
+    def test_not_shared(self):
+        person = self.db.get_person_from_handle('P1')
+        person.add_family_handle('F1')
+        self.assertEqual(self.db.get_person_from_handle('P1')
+                         .get_family_handle_list(), [])
+
+    def test_write_through(self):
+        person = self.db.get_person_from_handle('P1')
+        with DbTxn('Edit person', self.db) as trans:
+            person.set_gramps_id('I0002')
+            self.db.commit_person(person, trans)
+        self.assertEqual(self.db.get_person_from_handle('P1').gramps_id,
+                         'I0002')
+        self.db.undo()
+        self.assertEqual(self.db.get_person_from_handle('P1').gramps_id,
+                         'I0001')
+        with DbTxn('Remove person', self.db) as trans:
+            self.db.remove_person('P1', trans)
+        self.assertRaises(HandleError, self.db.get_person_from_handle, 'P1')
+        self.db.undo()
+        self.assertEqual(self.db.get_person_from_handle('P1').gramps_id,
+                         'I0001')
+
+    def test_abort(self):
+        person = self.db.get_person_from_handle('P1')
+        try:
+            with DbTxn('Edit person', self.db) as trans:
+                person.set_gramps_id('I0002')
+                self.db.commit_person(person, trans)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.db.get_person_from_handle('P1').gramps_id,
+                         'I0001')
+
+
+#-------------------------------------------------------------------------
+#
+# DbIterTest class
+#
+#-------------------------------------------------------------------------
+class DbIterTest(unittest.TestCase):
+    '''
+    Tests for iteration over rows fetched in batches.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        # Smaller than the number of rows, to fetch several batches
+        self.db._fetch_size = 2
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_nested(self):
+        with DbTxn('Add notes', self.db) as trans:
+            for dummy in range(5):
+                self.db.add_note(Note(), trans)
+        pairs = [(outer, inner)
+                 for outer in self.db.iter_note_handles()
+                 for inner in self.db.iter_note_handles()]
+        self.assertEqual(len(pairs), 25)
+        self.assertEqual(len(set(pairs)), 25)
+        self.assertEqual(sorted(self.db.get_note_handles()),
+                         sorted(self.db.iter_note_handles()))
+
+    def test_change_while_iterating(self):
+        with DbTxn('Add notes', self.db) as trans:
+            handles = [self.db.add_note(Note(), trans) for dummy in range(5)]
+            event = Event()
+            for handle in handles:
+                event.add_note(handle)
+            self.db.add_event(event, trans)
+        with DbTxn('Change notes', self.db) as trans:
+            # the notes added meanwhile are not given
+            seen = []
+            for handle in self.db.iter_note_handles():
+                seen.append(handle)
+                if len(seen) > len(handles):
+                    break
+                self.db.add_note(Note(), trans)
+            self.assertEqual(sorted(seen), sorted(handles))
+            # the references of the event change as it is given
+            seen = []
+            for (obj_class, obj_handle) in \
+                    self.db.find_backlink_handles(handles[0]):
+                seen.append(obj_handle)
+                event.set_note_list(handles[1:])
+                self.db.commit_event(event, trans)
+            self.assertEqual(seen, [event.handle])
+
+    def test_place_tree(self):
+        # Two roots, one of them enclosing a chain of five places
+        with DbTxn('Add places', self.db) as trans:
+            enclosed_by = None
+            for index in range(6):
+                place = Place()
+                place.set_handle('P%d' % index)
+                if enclosed_by:
+                    placeref = PlaceRef()
+                    placeref.ref = enclosed_by
+                    place.add_placeref(placeref)
+                self.db.add_place(place, trans)
+                enclosed_by = place.handle
+            place = Place()
+            place.set_handle('root')
+            self.db.add_place(place, trans)
+        with self.db.get_place_tree_cursor() as cursor:
+            handles = [handle for handle, data in cursor]
+        self.assertEqual(sorted(handles),
+                         ['P0', 'P1', 'P2', 'P3', 'P4', 'P5', 'root'])
+        self.assertEqual([handle for handle in handles if handle != 'root'],
+                         ['P0', 'P1', 'P2', 'P3', 'P4', 'P5'])
+
+
+#-------------------------------------------------------------------------
+#
+# DbSortKeyTest class
+#
+#-------------------------------------------------------------------------
+class DbSortKeyTest(unittest.TestCase):
+    '''
+    Tests for the locale sort key columns.
+    '''
+
+    SURNAMES = ['b', 'A', '\u00c9mile', 'c', 'a', '']
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        with DbTxn('Add people', self.db) as trans:
+            for index, surname in enumerate(self.SURNAMES):
+                person = Person()
+                person.set_handle('P%d' % index)
+                name = Surname()
+                name.set_surname(surname)
+                person.get_primary_name().set_surname_list([name])
+                self.db.add_person(person, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def sorted_surnames(self):
+        return [self.db.get_person_from_handle(handle)
+                .get_primary_name().get_surname()
+                for handle in self.db.get_person_handles(sort_handles=True)]
+
+    def expected(self, surnames):
+        return sorted(surnames, key=glocale.sort_key)
+
+    def test_sort(self):
+        self.assertEqual(self.sorted_surnames(), self.expected(self.SURNAMES))
+        self.assertEqual(self.db.get_surname_list(),
+                         self.expected(self.SURNAMES))
+        self.db._sort_keys = False
+        self.assertEqual(self.sorted_surnames(), self.expected(self.SURNAMES))
+
+    def test_update(self):
+        person = self.db.get_person_from_handle('P1')
+        person.get_primary_name().get_primary_surname().set_surname('z')
+        with DbTxn('Edit person', self.db) as trans:
+            self.db.commit_person(person, trans)
+        surnames = self.SURNAMES[:]
+        surnames[1] = 'z'
+        self.assertEqual(self.sorted_surnames(), self.expected(surnames))
+
+    def test_update_sort_keys(self):
+        self.db.dbapi.execute("UPDATE person SET surname_key = NULL")
+        self.db.dbapi.commit()
+        self.db._txn_begin()
+        self.db._update_sort_keys()
+        self.db._txn_commit()
+        self.assertEqual(self.sorted_surnames(), self.expected(self.SURNAMES))
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person "
+                              "WHERE surname_key IS NULL")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 0)
+
+#-------------------------------------------------------------------------
+#
+# DbPersonSummaryTest class
+#
+#-------------------------------------------------------------------------
+class DbPersonSummaryTest(unittest.TestCase):
+    '''
+    Tests for the person summary table.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        # P0 and P1 are married, with a child P2 who only has a baptism
+        with DbTxn('Add people', self.db) as trans:
+            for index in range(3):
+                person = Person()
+                person.set_handle('P%d' % index)
+                self.db.add_person(person, trans)
+            self.add_event('E0', 'P0', EventType.BIRTH, 1900, trans)
+            self.add_event('E1', 'P2', EventType.BAPTISM, 1930, trans)
+            family = Family()
+            family.set_handle('F0')
+            family.set_father_handle('P0')
+            family.set_mother_handle('P1')
+            family.set_relationship(FamilyRelType.MARRIED)
+            child_ref = ChildRef()
+            child_ref.ref = 'P2'
+            family.add_child_ref(child_ref)
+            self.db.add_family(family, trans)
+            for handle in ('P0', 'P1'):
+                person = self.db.get_person_from_handle(handle)
+                person.add_family_handle('F0')
+                self.db.commit_person(person, trans)
+            person = self.db.get_person_from_handle('P2')
+            person.add_parent_family_handle('F0')
+            self.db.commit_person(person, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_event(self, handle, person_handle, event_type, year, trans):
+        event = Event()
+        event.set_handle(handle)
+        event.set_type(event_type)
+        event.set_date_object(Date(year))
+        self.db.add_event(event, trans)
+        person = self.db.get_person_from_handle(person_handle)
+        event_ref = EventRef()
+        event_ref.ref = handle
+        person.add_event_ref(event_ref)
+        if event_type == EventType.BIRTH:
+            person.set_birth_ref(event_ref)
+        self.db.commit_person(person, trans)
+
+    def assert_generic(self):
+        for handle in self.db.get_person_handles():
+            self.assertEqual(self.db.get_person_summary(handle),
+                             DbReadBase.get_person_summary(self.db, handle))
+
+    def test_summary(self):
+        summary = self.db.get_person_summary('P0')
+        self.assertEqual(summary.birth, 'E0')
+        self.assertFalse(summary.birth_fallback)
+        self.assertEqual(summary.birth_sortval, Date(1900).get_sort_value())
+        self.assertIsNone(summary.death)
+        self.assertEqual(summary.spouses, ('P1',))
+        self.assertEqual((summary.marriages, summary.children), (1, 1))
+        summary = self.db.get_person_summary('P2')
+        self.assertEqual(summary.birth, 'E1')
+        self.assertTrue(summary.birth_fallback)
+        self.assertEqual(summary.parents, 2)
+        self.assertIsNone(self.db.get_person_summary('P9'))
+        self.assert_generic()
+
+    def test_changes(self):
+        event = self.db.get_event_from_handle('E0')
+        event.set_date_object(Date(1901))
+        note = Note()
+        note.set_handle('N0')
+        note.set_type(NoteType.TODO)
+        with DbTxn('Edit', self.db) as trans:
+            self.db.commit_event(event, trans)
+            self.db.add_note(note, trans)
+            person = self.db.get_person_from_handle('P1')
+            person.add_note('N0')
+            self.db.commit_person(person, trans)
+        self.assertEqual(self.db.get_person_summary('P0').birth_sortval,
+                         Date(1901).get_sort_value())
+        self.assertEqual(self.db.get_person_summary('P1').todo, 1)
+        with DbTxn('Remove family', self.db) as trans:
+            self.db.remove_family_relationships('F0', trans)
+        self.assertEqual(self.db.get_person_summary('P0').spouses, ())
+        self.assertEqual(self.db.get_person_summary('P2').parents, 0)
+        self.db.undo()
+        self.assertEqual(self.db.get_person_summary('P0').spouses, ('P1',))
+        self.assert_generic()
+
+    def test_batch(self):
+        with DbTxn('Add person', self.db, batch=True) as trans:
+            person = Person()
+            person.set_handle('P3')
+            self.db.add_person(person, trans)
+            self.add_event('E2', 'P3', EventType.BIRTH, 1950, trans)
+            self.assertEqual(self.db.get_person_summary('P3').birth, 'E2')
+        self.assertEqual(self.db.get_person_summary('P3').birth, 'E2')
+        with DbTxn('Remove person', self.db) as trans:
+            self.db.remove_person('P3', trans)
+        self.assertIsNone(self.db.get_person_summary('P3'))
+        self.assert_generic()
+
+    def test_rebuild(self):
+        self.db.dbapi.execute("DELETE FROM person_summary")
+        self.db.dbapi.commit()
+        self.db.rebuild_secondary()
+        self.assert_generic()
+        self.assertEqual(self.db.get_person_summary('P0').birth, 'E0')
+
+#-------------------------------------------------------------------------
+#
+# DbUndoTest class
+#
+#-------------------------------------------------------------------------
+class DbUndoTest(unittest.TestCase):
+    '''
+    Tests for the undo log.
+    '''
+
+    def setUp(self):
+        self.size = config.get('database.undo-history-size')
+        self.directory = get_empty_tempdir("undo_test")
+        self.db = make_database("sqlite")
+        self.db.load(self.directory)
+        self.undolog = os.path.join(self.directory, DBUNDOFN)
+
+    def tearDown(self):
+        config.set('database.undo-history-size', self.size)
+        if self.db.is_open():
+            self.db.close()
+
+    def rename(self, handle, surname):
+        person = self.db.get_person_from_handle(handle)
+        person.get_primary_name().get_primary_surname().set_surname(surname)
+        with DbTxn('Rename', self.db) as trans:
+            self.db.commit_person(person, trans)
+
+    def surname(self, handle):
+        return self.db.get_person_from_handle(handle).get_primary_name() \
+            .get_surname()
+
+    def test_undo_redo(self):
+        self.assertFalse(os.path.exists(self.undolog))
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            self.db.add_person(person, trans)
+        self.rename('P1', 'Smith')
+        self.assertTrue(os.path.exists(self.undolog))
+        # the record of an update holds the changed fields only
+        recno = len(self.db.undodb) - 1
+        self.assertEqual(self.db.undodb[recno][4],
+                         self.db.get_raw_person_data('P1'))
+        record = self.db.undodb.undodb.execute(
+            "SELECT record FROM undo WHERE recno = ?", [recno]).fetchone()[0]
+        self.assertLess(len(record), len(pickle.dumps(
+            self.db.undodb[recno], pickle.HIGHEST_PROTOCOL)))
+        self.db.undo()
+        self.assertEqual(self.surname('P1'), '')
+        self.db.undo()
+        self.assertFalse(self.db.has_person_handle('P1'))
+        self.db.redo()
+        self.db.redo()
+        self.assertEqual(self.surname('P1'), 'Smith')
+        self.db.close()
+        self.assertFalse(os.path.exists(self.undolog))
+
+    def test_history_size(self):
+        config.set('database.undo-history-size', 2)
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            self.db.add_person(person, trans)
+        self.rename('P1', 'Smith')
+        self.rename('P1', 'Jones')
+        self.assertEqual(self.db.undodb.undo_count, 2)
+        self.assertRaises(IndexError, self.db.undodb.__getitem__, 0)
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.undo())
+        self.assertEqual(self.surname('P1'), '')
+        self.assertTrue(self.db.has_person_handle('P1'))
+
+    def test_stale_file(self):
+        # left by a session that crashed
+        stale = sqlite3.connect(self.undolog)
+        stale.execute("CREATE TABLE undo "
+                      "(recno INTEGER PRIMARY KEY, record BLOB)")
+        stale.execute("INSERT INTO undo VALUES (0, 'x')")
+        stale.commit()
+        stale.close()
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            self.db.add_person(person, trans)
+        self.rename('P1', 'Smith')
+        self.assertEqual(self.db.undodb.undodb.execute(
+            "SELECT COUNT(*) FROM undo").fetchone()[0], 2)
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.surname('P1'), '')
+        self.db.close()
+        self.assertFalse(os.path.exists(self.undolog))
+
+    def test_other_session(self):
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            self.db.add_person(person, trans)
+        other = make_database("sqlite")
+        other.load(self.directory)
+        self.rename('P1', 'Smith')
+        person = other.get_person_from_handle('P1')
+        person.set_gender(Person.MALE)
+        with DbTxn('Set gender', other) as trans:
+            other.commit_person(person, trans)
+        # the other session uses a file of its own
+        self.assertTrue(other.undo())
+        other.close()
+        self.assertTrue(os.path.exists(self.undolog))
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.has_person_handle('P1'))
+
+    def test_readonly(self):
+        # a reader needs the log to be written ahead
+        self.db.close()
+        journal_mode = config.get('database.sqlite-journal-mode')
+        config.set('database.sqlite-journal-mode', 'WAL')
+        try:
+            self.db.load(self.directory)
+        finally:
+            config.set('database.sqlite-journal-mode', journal_mode)
+        reader = self.db.open_reader()
+        self.assertIsNotNone(reader)
+        with DbTxn('Add person', self.db) as trans:
+            person = Person()
+            person.set_handle('P1')
+            self.db.add_person(person, trans)
+        self.db.close_reader(reader)
+        self.assertTrue(os.path.exists(self.undolog))
+        self.assertTrue(self.db.undo())
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,114 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for rebuilding the reference map and secondary columns.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.config import config
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db.utils import import_as_dict
+from gramps.gen.user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+#-------------------------------------------------------------------------
+#
+# RebuildTest class
+#
+#-------------------------------------------------------------------------
+class RebuildTest(unittest.TestCase):
+    '''
+    Compare rebuilt tables with those maintained by the commits.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+        cls.db._fetch_size = 100
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def setUp(self):
+        self.processes = config.get('database.rebuild-processes')
+
+    def tearDown(self):
+        config.set('database.rebuild-processes', self.processes)
+
+    def select(self, sql):
+        self.db.dbapi.execute(sql)
+        return sorted(self.db.dbapi.fetchall())
+
+    def check_reference_map(self, processes):
+        config.set('database.rebuild-processes', processes)
+        sql = "SELECT * FROM reference"
+        before = self.select(sql)
+        percent = []
+        self.db.reindex_reference_map(percent.append)
+        self.assertEqual(self.select(sql), before)
+        self.assertEqual(percent[-1], 100)
+
+    def check_secondary(self, processes):
+        config.set('database.rebuild-processes', processes)
+        queries = ("SELECT handle, gramps_id, gender, surname, given_name, "
+                   "private, change FROM person",
+                   "SELECT handle, enclosed_by, title FROM place",
+                   "SELECT * FROM parent_family",
+                   "SELECT * FROM family_child")
+        before = [self.select(sql) for sql in queries]
+        self.db.dbapi.execute("UPDATE person SET surname = '', gender = 9")
+        self.db.dbapi.execute("UPDATE place SET enclosed_by = NULL")
+        self.db.dbapi.execute("DELETE FROM parent_family")
+        self.db.dbapi.execute("DELETE FROM family_child")
+        self.db.dbapi.commit()
+        self.db.rebuild_secondary()
+        self.assertEqual([self.select(sql) for sql in queries], before)
+
+    def test_reference_map(self):
+        self.check_reference_map(1)
+
+    def test_reference_map_pool(self):
+        self.check_reference_map(2)
+
+    def test_secondary(self):
+        self.check_secondary(1)
+
+    def test_secondary_pool(self):
+        self.check_secondary(2)
+
+
+if __name__ == "__main__":
+    unittest.main()
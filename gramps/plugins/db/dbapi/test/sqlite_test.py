@@ -0,0 +1,159 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+
+"""
+Unittest for the performance settings of the SQLite backend.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.config import config
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Note
+from gramps.gen.utils.file import get_empty_tempdir
+from gramps.plugins.db.dbapi.sqlite import Connection, regexp
+
+#-------------------------------------------------------------------------
+#
+# FunctionTest class
+#
+#-------------------------------------------------------------------------
+class FunctionTest(unittest.TestCase):
+    '''
+    Test the functions that the backend adds to SQL.
+    '''
+
+    def setUp(self):
+        self.connection = Connection(':memory:')
+
+    def tearDown(self):
+        self.connection.close()
+
+    def evaluate(self, expression, *params):
+        self.connection.execute("SELECT " + expression, params)
+        return self.connection.fetchone()[0]
+
+    def test_regexp(self):
+        self.assertEqual(self.evaluate("'I0044' REGEXP '^I00'"), 1)
+        self.assertEqual(self.evaluate("'I0044' REGEXP '^i00'"), 0)
+        self.assertEqual(self.evaluate("'a\nb' REGEXP '^b'"), 1)
+        self.assertEqual(self.evaluate("regexp_i('^i00', 'I0044')"), 1)
+        self.assertEqual(self.evaluate("regexp_i('^x', 'I0044')"), 0)
+
+    def test_contains(self):
+        self.assertEqual(self.evaluate("contains_i('ärt', 'MÄRTHA')"), 1)
+        self.assertEqual(self.evaluate("contains_i('ärt', 'Martha')"), 0)
+
+    def test_null(self):
+        for function in ('regexp', 'regexp_i', 'contains_i'):
+            self.assertEqual(
+                self.evaluate("%s(?, NULL)" % function, 'a'), 0)
+            self.assertEqual(
+                self.evaluate("%s(NULL, ?)" % function, 'a'), 0)
+            self.assertEqual(
+                self.evaluate("NOT %s(?, NULL)" % function, 'a'), 1)
+
+    def test_pattern_cache(self):
+        self.assertTrue(regexp('^[a-z]+$', 'text'))
+        self.assertFalse(regexp('^[a-z]+$', 'Text'))
+        self.assertTrue(regexp(r'\d', 42))
+
+#-------------------------------------------------------------------------
+#
+# SQLiteProfileTest class
+#
+#-------------------------------------------------------------------------
+class SQLiteProfileTest(unittest.TestCase):
+    '''
+    Check that the configured pragmas are applied to a database on disk.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(get_empty_tempdir("sqlite_profile_test"))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_profile(self):
+        dbapi = self.db.dbapi
+        # the journal mode is left alone unless one is configured
+        self.assertEqual(dbapi.pragma('journal_mode'), 'delete')
+        self.assertEqual(dbapi.pragma('cache_size'),
+                         -config.get('database.sqlite-cache-size'))
+        self.assertEqual(dbapi.pragma('wal_autocheckpoint'),
+                         config.get('database.sqlite-wal-autocheckpoint'))
+        self.assertEqual(dbapi.pragma('temp_store'), 2)   # MEMORY
+        self.assertEqual(dbapi.pragma('synchronous'), 2)  # FULL
+
+    def test_batch_synchronous(self):
+        dbapi = self.db.dbapi
+        with DbTxn("Batch", self.db, batch=True) as trans:
+            self.assertEqual(dbapi.pragma('synchronous'), 1)  # NORMAL
+            self.db.add_note(Note("text"), trans)
+        self.assertEqual(dbapi.pragma('synchronous'), 2)  # FULL
+        with DbTxn("Single", self.db) as trans:
+            self.assertEqual(dbapi.pragma('synchronous'), 2)
+            self.db.add_note(Note("text"), trans)
+        self.assertEqual(self.db.get_number_of_notes(), 2)
+
+    def test_summary(self):
+        summary = self.db.get_summary()
+        self.assertEqual(summary["Journal mode"], "delete")
+        self.assertIn("Memory-mapped I/O size", summary)
+
+    def test_journal_mode(self):
+        directory = self.db.get_save_path()
+        self.db.close()
+        journal_mode = config.get('database.sqlite-journal-mode')
+        config.set('database.sqlite-journal-mode', 'WAL')
+        try:
+            self.db.load(directory)
+        finally:
+            config.set('database.sqlite-journal-mode', journal_mode)
+        self.assertEqual(self.db.get_summary()["Journal mode"], "wal")
+        self.assertIsNotNone(self.db.open_reader())
+        self.db.close()
+        # the database keeps the mode that it was given
+        self.db.load(directory)
+        self.assertEqual(self.db.dbapi.pragma('journal_mode'), 'wal')
+
+    def test_invalid_value(self):
+        connection = Connection(':memory:')
+        self.assertRaises(ValueError, connection.pragma,
+                          'cache_size', '1; DROP TABLE person')
+        self.assertEqual(connection.pragma('cache_size', -1024), -1024)
+        connection.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest for the schema upgrade of the DB-API backends.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import pickle
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.db.dbconst import (DBMODE_R, KEY_TO_NAME_MAP,
+                                   KEY_TO_CLASS_MAP)
+from gramps.gen.db.exceptions import DbUpgradeRequiredError
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import (Person, Family, ChildRef, Event, EventRef,
+                            EventType, Note, Surname)
+from gramps.gen.utils.file import get_empty_tempdir
+from gramps.plugins.db.dbapi.codec import decode
+from gramps.plugins.db.dbapi.rebuild import (CLASSES, SORT_KEY_FIELDS,
+                                             get_sort_key_locale)
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def add_objects(db):
+    """
+    Add a family of a father and a child with a birth, and a note.  Return
+    the handles of the father, the child, the family and the birth.
+    """
+    with DbTxn("Add objects", db) as trans:
+        father = Person()
+        surname = Surname()
+        surname.set_surname("Smith")
+        father.primary_name.add_surname(surname)
+        child = Person()
+        db.add_person(father, trans)
+        db.add_person(child, trans)
+        birth = Event()
+        birth.set_type(EventType.BIRTH)
+        db.add_event(birth, trans)
+        event_ref = EventRef()
+        event_ref.set_reference_handle(birth.handle)
+        child.add_event_ref(event_ref)
+        child.set_birth_ref(event_ref)
+        family = Family()
+        family.set_father_handle(father.handle)
+        child_ref = ChildRef()
+        child_ref.set_reference_handle(child.handle)
+        family.add_child_ref(child_ref)
+        db.add_family(family, trans)
+        father.add_family_handle(family.handle)
+        child.add_parent_family_handle(family.handle)
+        db.commit_person(father, trans)
+        db.commit_person(child, trans)
+        db.add_note(Note("text"), trans)
+    return father.handle, child.handle, family.handle, birth.handle
+
+
+def downgrade(db):
+    """
+    Turn a database into one of schema version 20, as the previous version
+    of Gramps wrote it.
+    """
+    dbapi = db.dbapi
+    dbapi.begin()
+    for obj_key in CLASSES:
+        table = KEY_TO_NAME_MAP[obj_key]
+        dbapi.execute("SELECT handle, blob_data FROM %s" % table)
+        for handle, blob in dbapi.fetchall():
+            dbapi.execute("UPDATE %s SET blob_data = ? WHERE handle = ?"
+                          % table, [pickle.dumps(decode(blob)), handle])
+    dbapi.execute("DELETE FROM metadata WHERE setting = 'blob-codec'")
+    dbapi.execute("SELECT obj_handle, obj_class, ref_handle, ref_class "
+                  "FROM reference")
+    references = [(obj_handle, KEY_TO_CLASS_MAP[obj_class],
+                   ref_handle, KEY_TO_CLASS_MAP[ref_class])
+                  for (obj_handle, obj_class, ref_handle, ref_class)
+                  in dbapi.fetchall()]
+    dbapi.execute("DROP TABLE reference")
+    dbapi.execute("CREATE TABLE reference "
+                  "(obj_handle VARCHAR(50), obj_class TEXT, "
+                  "ref_handle VARCHAR(50), ref_class TEXT)")
+    dbapi.execute("CREATE INDEX reference_ref_handle "
+                  "ON reference(ref_handle)")
+    dbapi.execute("CREATE INDEX reference_obj_handle "
+                  "ON reference(obj_handle)")
+    dbapi.executemany("INSERT INTO reference VALUES (?, ?, ?, ?)",
+                      references)
+    dbapi.execute("DROP TABLE parent_family")
+    dbapi.execute("DROP TABLE family_child")
+    dbapi.execute("DROP TABLE person_summary")
+    for class_name, fields in SORT_KEY_FIELDS.items():
+        table = class_name.lower()
+        dbapi.execute("DROP INDEX %s_%s_key" % (table, fields[0]))
+        for field in fields:
+            dbapi.execute("ALTER TABLE %s DROP COLUMN %s_key"
+                          % (table, field))
+    dbapi.execute("DELETE FROM metadata WHERE setting = 'sort-keys'")
+    dbapi.commit()
+    db._set_metadata('version', '20')
+
+#-------------------------------------------------------------------------
+#
+# UpgradeTest class
+#
+#-------------------------------------------------------------------------
+class UpgradeTest(unittest.TestCase):
+    '''
+    Upgrade a database of schema version 20.
+    '''
+
+    def setUp(self):
+        self.dirname = get_empty_tempdir("upgrade_test")
+        db = make_database("sqlite")
+        db.load(self.dirname)
+        (self.father, self.child, self.family,
+         self.birth) = add_objects(db)
+        downgrade(db)
+        db.close()
+        self.db = make_database("sqlite")
+
+    def tearDown(self):
+        if self.db.is_open():
+            self.db.close()
+
+    def test_upgrade_required(self):
+        with self.assertRaises(DbUpgradeRequiredError):
+            self.db.load(self.dirname)
+
+    def test_read_only(self):
+        self.db.load(self.dirname, mode=DBMODE_R)
+        self.assertEqual(self.db.get_schema_version(), 20)
+        self.assertEqual(self.db.get_number_of_people(), 2)
+        self.assertEqual(self.db.get_person_from_handle(self.child)
+                         .get_parent_family_handle_list(), [self.family])
+        self.assertEqual(set(self.db.find_backlink_handles(self.child)),
+                         {('Family', self.family)})
+        self.assertEqual(self.db.find_descendants([self.father]),
+                         {self.father: 1, self.child: 2})
+        self.assertEqual(self.db.get_person_summary(self.child).birth,
+                         self.birth)
+
+    def test_upgrade(self):
+        self.db.load(self.dirname, force_schema_upgrade=True)
+        self.assertEqual(self.db.get_schema_version(), 21)
+        self.assertEqual(self.db.get_number_of_people(), 2)
+        self.assertEqual(self.db.get_person_from_handle(self.child)
+                         .get_parent_family_handle_list(), [self.family])
+        self.assertEqual(set(self.db.find_backlink_handles(self.child)),
+                         {('Family', self.family)})
+        self.assertEqual(self.db.find_descendants([self.father]),
+                         {self.father: 1, self.child: 2})
+        self.assertEqual(self.db.get_surname_list(), ['', 'Smith'])
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person_summary")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 2)
+        self.assertEqual(self.db.get_person_summary(self.child).birth,
+                         self.birth)
+        self.db.dbapi.execute("SELECT DISTINCT obj_class FROM reference")
+        self.assertTrue(all(isinstance(row[0], int)
+                            for row in self.db.dbapi.fetchall()))
+        self.db.close()
+        # Opening it again needs no upgrade
+        self.db.load(self.dirname)
+        self.assertEqual(self.db.get_schema_version(), 21)
+
+    def test_sort_key_locale(self):
+        self.db.load(self.dirname, force_schema_upgrade=True)
+        self.assertEqual(self.db._get_metadata('sort-keys'),
+                         get_sort_key_locale())
+        self.assertTrue(self.db._sort_keys)
+        # Keys computed in another locale
+        self.db.dbapi.execute("UPDATE person SET surname_key = NULL")
+        self.db.dbapi.commit()
+        self.db._set_metadata('sort-keys', 'other')
+        self.db.close()
+        self.db.load(self.dirname, mode=DBMODE_R)
+        self.assertFalse(self.db._sort_keys)
+        self.assertEqual(self.db.get_surname_list(), ['', 'Smith'])
+        self.db.close()
+        self.db.load(self.dirname)
+        self.assertTrue(self.db._sort_keys)
+        self.assertEqual(self.db._get_metadata('sort-keys'),
+                         get_sort_key_locale())
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person "
+                              "WHERE surname_key IS NULL")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 0)
+
+
+#-------------------------------------------------------------------------
+#
+# ConvertTest class
+#
+#-------------------------------------------------------------------------
+class ConvertTest(unittest.TestCase):
+    '''
+    Upgrade a database converted from BSDDB, which has the tables of the
+    current schema but the version of the BSDDB tree.
+    '''
+
+    def setUp(self):
+        self.dirname = get_empty_tempdir("upgrade_test")
+        db = make_database("sqlite")
+        db.load(self.dirname)
+        (self.father, self.child, self.family,
+         self.birth) = add_objects(db)
+        db._set_metadata('version', 18)
+        db.close()
+        self.db = make_database("sqlite")
+
+    def tearDown(self):
+        if self.db.is_open():
+            self.db.close()
+
+    def test_upgrade(self):
+        self.db.load(self.dirname, force_schema_upgrade=True)
+        self.assertEqual(self.db.get_schema_version(), 21)
+        self.assertEqual(self.db.get_person_from_handle(self.child)
+                         .get_parent_family_handle_list(), [self.family])
+        self.assertEqual(self.db.find_descendants([self.father]),
+                         {self.father: 1, self.child: 2})
+        self.db.dbapi.execute("SELECT COUNT(*) FROM family_child")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 1)
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person_summary")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 2)
+        self.assertEqual(self.db.get_person_summary(self.child).birth,
+                         self.birth)
+        self.assertEqual(self.db.get_surname_list(), ['', 'Smith'])
+
+
+if __name__ == "__main__":
+    unittest.main()
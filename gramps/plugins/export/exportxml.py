@@ -38,7 +38,7 @@ Gramps' XML file format.
 import time
 import shutil
 import os
-import codecs
+import re
 from xml.sax.saxutils import escape
 
 #------------------------------------------------------------------------
@@ -80,12 +80,43 @@ except:
 # table for skipping control chars from XML except 09, 0A, 0D
 strip_dict = dict.fromkeys(list(range(9))+list(range(11,13))+list(range(14, 32)))
 
+# characters that escxml replaces
+escape_re = re.compile('[&<>"]')
+
 def escxml(d):
+    if not d:
+        return ""
+    if not escape_re.search(d):
+        return d
     return escape(d,
                   {'"' : '&quot;',
                    '<' : '&lt;',
                    '>' : '&gt;',
-                   }) if d else ""
+                   })
+
+# number of strings collected before they are encoded and written
+BUFFER_PARTS = 4096
+
+class TextBuffer:
+    """
+    Collects the many small strings of the XML output, and writes them to a
+    binary file as UTF-8 in large blocks.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.parts = []
+
+    def write(self, text):
+        parts = self.parts
+        parts.append(text)
+        if len(parts) >= BUFFER_PARTS:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.fileobj.write(''.join(self.parts).encode('utf-8'))
+            self.parts = []
 
 #-------------------------------------------------------------------------
 #
@@ -174,7 +205,7 @@ class GrampsXmlWriter(UpdateCallback):
                                         str(msg))
                 return 0
 
-        self.g = codecs.getwriter("utf8")(g)
+        self.g = TextBuffer(g)
 
         self.write_xml_data()
         if filename != '-':
@@ -194,7 +225,7 @@ class GrampsXmlWriter(UpdateCallback):
         else:
             g = handle
 
-        self.g = codecs.getwriter("utf8")(g)
+        self.g = TextBuffer(g)
 
         self.write_xml_data()
         g.close()
@@ -256,20 +287,16 @@ class GrampsXmlWriter(UpdateCallback):
         # Write table objects
         if tag_len > 0:
             self.g.write("  <tags>\n")
-            for key in sorted(self.db.get_tag_handles()):
-                tag = self.db.get_tag_from_handle(key)
-                if tag:
-                    self.write_tag(tag, 2)
+            for tag in self.db.iter_objects_by_handle('Tag'):
+                self.write_tag(tag, 2)
                 self.update()
             self.g.write("  </tags>\n")
 
         # Write primary objects
         if event_len > 0:
             self.g.write("  <events>\n")
-            for handle in sorted(self.db.get_event_handles()):
-                event = self.db.get_event_from_handle(handle)
-                if event:
-                    self.write_event(event,2)
+            for event in self.db.iter_objects_by_handle('Event'):
+                self.write_event(event,2)
                 self.update()
             self.g.write("  </events>\n")
 
@@ -280,74 +307,57 @@ class GrampsXmlWriter(UpdateCallback):
                 self.g.write(' home="_%s"' % person.handle)
             self.g.write('>\n')
 
-            for handle in sorted(self.db.get_person_handles()):
-                person = self.db.get_person_from_handle(handle)
-                if person:
-                    self.write_person(person, 2)
+            for person in self.db.iter_objects_by_handle('Person'):
+                self.write_person(person, 2)
                 self.update()
             self.g.write("  </people>\n")
 
         if family_len > 0:
             self.g.write("  <families>\n")
-            for handle in sorted(self.db.iter_family_handles()):
-                family = self.db.get_family_from_handle(handle)
-                if family:
-                    self.write_family(family,2)
+            for family in self.db.iter_objects_by_handle('Family'):
+                self.write_family(family,2)
                 self.update()
             self.g.write("  </families>\n")
 
         if citation_len > 0:
             self.g.write("  <citations>\n")
-            for handle in sorted(self.db.get_citation_handles()):
-                citation = self.db.get_citation_from_handle(handle)
-                if citation:
-                    self.write_citation(citation,2)
+            for citation in self.db.iter_objects_by_handle('Citation'):
+                self.write_citation(citation,2)
                 self.update()
             self.g.write("  </citations>\n")
 
         if source_len > 0:
             self.g.write("  <sources>\n")
-            for handle in sorted(self.db.get_source_handles()):
-                source = self.db.get_source_from_handle(handle)
-                if source:
-                    self.write_source(source,2)
+            for source in self.db.iter_objects_by_handle('Source'):
+                self.write_source(source,2)
                 self.update()
             self.g.write("  </sources>\n")
 
         if place_len > 0:
             self.g.write("  <places>\n")
-            for key in sorted(self.db.get_place_handles()):
-                # try:
-                place = self.db.get_place_from_handle(key)
-                if place:
-                    self.write_place_obj(place,2)
+            for place in self.db.iter_objects_by_handle('Place'):
+                self.write_place_obj(place,2)
                 self.update()
             self.g.write("  </places>\n")
 
         if obj_len > 0:
             self.g.write("  <objects>\n")
-            for handle in sorted(self.db.get_media_handles()):
-                obj = self.db.get_media_from_handle(handle)
-                if obj:
-                    self.write_object(obj,2)
+            for obj in self.db.iter_objects_by_handle('Media'):
+                self.write_object(obj,2)
                 self.update()
             self.g.write("  </objects>\n")
 
         if repo_len > 0:
             self.g.write("  <repositories>\n")
-            for key in sorted(self.db.get_repository_handles()):
-                repo = self.db.get_repository_from_handle(key)
-                if repo:
-                    self.write_repository(repo,2)
+            for repo in self.db.iter_objects_by_handle('Repository'):
+                self.write_repository(repo,2)
                 self.update()
             self.g.write("  </repositories>\n")
 
         if note_len > 0:
             self.g.write("  <notes>\n")
-            for key in sorted(self.db.get_note_handles()):
-                note = self.db.get_note_from_handle(key)
-                if note:
-                    self.write_note(note, 2)
+            for note in self.db.iter_objects_by_handle('Note'):
+                self.write_note(note, 2)
                 self.update()
             self.g.write("  </notes>\n")
 
@@ -356,6 +366,7 @@ class GrampsXmlWriter(UpdateCallback):
         self.write_namemaps()
 
         self.g.write("</database>\n")
+        self.g.flush()
 
 #        self.status.end()
 #        self.status = None
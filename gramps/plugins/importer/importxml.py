@@ -717,9 +717,10 @@ class GrampsParser(UpdateCallback):
 
         This method can be called with an object instance or with a
         class object. Be aware that in the first case the side effect of this
-        function is to fill the object instance with the data read from the db.
-        In the second case, an empty object with the correct handle will be
-        created.
+        function is to fill the object instance with the data read from the db,
+        if an earlier start_<primary_object> method wrote any, and that the
+        caller must commit the instance.  In the second case, an empty object
+        with the correct handle will be created and added to the database.
 
         :param handle: The handle of the primary object, typically as read
                        directly from the XML attributes.
@@ -739,6 +740,12 @@ class GrampsParser(UpdateCallback):
             handle = self.import_handles[handle][target][HANDLE]
             if not isinstance(prim_obj, abc.Callable):
                 # This method is called by a start_<primary_object> method.
+                if not self.import_handles[orig_handle][target][INSTANTIATED]:
+                    # The database holds the empty object added for a
+                    # reference, so there is nothing to read back.
+                    prim_obj.set_handle(handle)
+                    self.import_handles[orig_handle][target][INSTANTIATED] = True
+                    return handle
                 get_raw_obj_data = {"person": self.db.get_raw_person_data,
                                     "family": self.db.get_raw_family_data,
                                     "event": self.db.get_raw_event_data,
@@ -784,7 +791,10 @@ class GrampsParser(UpdateCallback):
         if isinstance(prim_obj, abc.Callable):
             prim_obj = prim_obj()
         else:
+            # The object is written by the stop_<primary_object> method.
             self.import_handles[orig_handle][target][INSTANTIATED] = True
+            prim_obj.set_handle(handle)
+            return handle
         prim_obj.set_handle(handle)
         if target == "tag":
             self.db.add_tag(prim_obj, self.trans)
@@ -933,6 +943,7 @@ class GrampsParser(UpdateCallback):
             self.p.StartElementHandler = self.startElement
             self.p.EndElementHandler = self.endElement
             self.p.CharacterDataHandler = self.characters
+            self.p.buffer_text = True
             self.p.ParseFile(ifile)
 
             if len(self.name_formats) > 0:
@@ -0,0 +1,114 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unit test of the GrampsParser
+"""
+import io
+import unittest
+
+from ..importxml import GrampsParser
+from ....cli.user import User
+from ....gen.db.utils import make_database
+from ....gen.lib import EventRoleType
+
+XML = b"""<?xml version="1.0" encoding="UTF-8"?>
+<database xmlns="http://gramps-project.org/xml/1.7.1/">
+  <events>
+    <event handle="_e1" change="1" id="E1">
+      <type>Birth</type>
+      <place hlink="_pl1"/>
+      <witness hlink="_p2"/>
+    </event>
+  </events>
+  <people>
+    <person handle="_p1" change="2" id="I1">
+      <gender>M</gender>
+      <eventref hlink="_e1" role="Primary"/>
+      <parentin hlink="_f1"/>
+      <noteref hlink="_n1"/>
+    </person>
+    <person handle="_p2" change="3" id="I2">
+      <gender>F</gender>
+      <parentin hlink="_f1"/>
+    </person>
+  </people>
+  <families>
+    <family handle="_f1" change="4" id="F1">
+      <father hlink="_p1"/>
+      <mother hlink="_p2"/>
+      <childref hlink="_p3"/>
+    </family>
+  </families>
+  <places>
+    <placeobj handle="_pl1" change="5" id="P1" type="City">
+      <pname value="Town"/>
+    </placeobj>
+  </places>
+</database>
+"""
+
+class GrampsParserTest(unittest.TestCase):
+    """
+    Test the import of references to objects that come later in the file,
+    or not at all.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        parser = GrampsParser(self.db, User(quiet=True), 0)
+        self.info = parser.parse(io.BytesIO(XML))
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_forward_references(self):
+        person = self.db.get_person_from_handle('p1')
+        self.assertEqual((person.gramps_id, person.change), ('I0001', 2))
+        self.assertEqual(person.get_family_handle_list(), ['f1'])
+        self.assertEqual(person.get_birth_ref().ref, 'e1')
+        family = self.db.get_family_from_handle('f1')
+        self.assertEqual((family.father_handle, family.mother_handle),
+                         ('p1', 'p2'))
+        place = self.db.get_place_from_handle('pl1')
+        self.assertEqual((place.gramps_id, place.get_name().get_value()),
+                         ('P0001', 'Town'))
+        self.assertEqual(self.db.get_number_of_places(), 1)
+
+    def test_witness(self):
+        person = self.db.get_person_from_handle('p2')
+        self.assertEqual(person.gramps_id, 'I0002')
+        self.assertEqual([(ref.ref, ref.get_role())
+                          for ref in person.get_event_ref_list()],
+                         [('e1', EventRoleType.WITNESS)])
+
+    def test_missing_objects(self):
+        child = self.db.get_person_from_handle('p3')
+        self.assertEqual(child.get_parent_family_handle_list(), ['f1'])
+        self.assertTrue(self.db.has_note_handle('n1'))
+        self.assertEqual(self.info.data_unknownobject[0], 1)
+        self.assertEqual(sorted(handle for (obj_type, handle) in
+                                self.db.find_backlink_handles('f1')),
+                         ['p1', 'p2', 'p3'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,435 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2016       Paul R. Culley
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+ANSEL codec, registered with the codecs module as 'ansel'.
+
+ANSEL references:
+http://lcweb2.loc.gov/diglib/codetables/45.html
+http://www.gymel.com/charsets/ANSEL.html
+
+Of the ASCII control characters only LF, CR, Esc, GS, RS and US are
+accepted; the spec allows others, but Gramps does not use them.  The
+control characters 0x98 and 0x9c (start and end of string, or sort
+sequence) are not supported either.
+
+The decoder works on whole buffers: the bytes are mapped one to one to
+characters, the runs of plain ASCII are copied as they are, and only the
+other bytes are looked up in the tables.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import codecs
+import re
+import unicodedata
+
+#-------------------------------------------------------------------------
+#
+# Tables
+#
+#-------------------------------------------------------------------------
+# mappings of single byte ANSEL codes to unicode
+_ONEBYTE = {
+    b'\xA1' : '\u0141', b'\xA2' : '\u00d8', b'\xA3' : '\u0110',
+    b'\xA4' : '\u00de', b'\xA5' : '\u00c6', b'\xA6' : '\u0152',
+    b'\xA7' : '\u02b9', b'\xA8' : '\u00b7', b'\xA9' : '\u266d',
+    b'\xAA' : '\u00ae', b'\xAB' : '\u00b1', b'\xAC' : '\u01a0',
+    b'\xAD' : '\u01af', b'\xAE' : '\u02bc', b'\xB0' : '\u02bb',
+    b'\xB1' : '\u0142', b'\xB2' : '\u00f8', b'\xB3' : '\u0111',
+    b'\xB4' : '\u00fe', b'\xB5' : '\u00e6', b'\xB6' : '\u0153',
+    b'\xB7' : '\u02ba', b'\xB8' : '\u0131', b'\xB9' : '\u00a3',
+    b'\xBA' : '\u00f0', b'\xBC' : '\u01a1', b'\xBD' : '\u01b0',
+    b'\xBE' : '\u25a1', b'\xBF' : '\u25a0',
+    b'\xC0' : '\u00b0', b'\xC1' : '\u2113', b'\xC2' : '\u2117',
+    b'\xC3' : '\u00a9', b'\xC4' : '\u266f', b'\xC5' : '\u00bf',
+    b'\xC6' : '\u00a1', b'\xC7' : '\u00df', b'\xC8' : '\u20ac',
+    b'\xCD' : '\u0065', b'\xCE' : '\u006f', b'\xCF' : '\u00df', }
+
+# combining forms (in ANSEL, they precede the modified ASCII character
+# whereas the unicode combining term follows the character modified
+# Note: unicode allows multiple modifiers, but ANSEL may not (TDB?),
+# so we ignore multiple combining forms in this module
+#  8d & 8e are zero-width joiner (ZWJ), and zero-width non-joiner ZWNJ
+#  (strange things) probably not commonly found in our needs, unless one
+#   starts writing persian (or???) poetry in ANSEL
+_COMBINERS = {
+    b'\x8D' : '\u200d', b'\x8E' : '\u200c', b'\xE0' : '\u0309',
+    b'\xE1' : '\u0300', b'\xE2' : '\u0301', b'\xE3' : '\u0302',
+    b'\xE4' : '\u0303', b'\xE5' : '\u0304', b'\xE6' : '\u0306',
+    b'\xE7' : '\u0307', b'\xE8' : '\u0308', b'\xE9' : '\u030c',
+    b'\xEA' : '\u030a', b'\xEB' : '\ufe20', b'\xEC' : '\ufe21',
+    b'\xED' : '\u0315', b'\xEE' : '\u030b', b'\xEF' : '\u0310',
+    b'\xF0' : '\u0327', b'\xF1' : '\u0328', b'\xF2' : '\u0323',
+    b'\xF3' : '\u0324', b'\xF4' : '\u0325', b'\xF5' : '\u0333',
+    b'\xF6' : '\u0332', b'\xF7' : '\u0326', b'\xF8' : '\u031c',
+    b'\xF9' : '\u032e', b'\xFA' : '\ufe22', b'\xFB' : '\ufe23',
+    b'\xFC' : '\u0338',
+    b'\xFE' : '\u0313', }
+
+# mappings of two byte (precomposed forms) ANSEL codes to unicode
+_TWOBYTE = {
+    b'\xE0\x41' : '\u1ea2', b'\xE0\x45' : '\u1eba',
+    b'\xE0\x49' : '\u1ec8', b'\xE0\x4F' : '\u1ece',
+    b'\xE0\x55' : '\u1ee6', b'\xE0\x59' : '\u1ef6',
+    b'\xE0\x61' : '\u1ea3', b'\xE0\x65' : '\u1ebb',
+    b'\xE0\x69' : '\u1ec9', b'\xE0\x6F' : '\u1ecf',
+    b'\xE0\x75' : '\u1ee7', b'\xE0\x79' : '\u1ef7',
+    b'\xE1\x41' : '\u00c0', b'\xE1\x45' : '\u00c8',
+    b'\xE1\x49' : '\u00cc', b'\xE1\x4F' : '\u00d2',
+    b'\xE1\x55' : '\u00d9', b'\xE1\x57' : '\u1e80',
+    b'\xE1\x59' : '\u1ef2', b'\xE1\x61' : '\u00e0',
+    b'\xE1\x65' : '\u00e8', b'\xE1\x69' : '\u00ec',
+    b'\xE1\x6F' : '\u00f2', b'\xE1\x75' : '\u00f9',
+    b'\xE1\x77' : '\u1e81', b'\xE1\x79' : '\u1ef3',
+    b'\xE2\x41' : '\u00c1', b'\xE2\x43' : '\u0106',
+    b'\xE2\x45' : '\u00c9', b'\xE2\x47' : '\u01f4',
+    b'\xE2\x49' : '\u00cd', b'\xE2\x4B' : '\u1e30',
+    b'\xE2\x4C' : '\u0139', b'\xE2\x4D' : '\u1e3e',
+    b'\xE2\x4E' : '\u0143', b'\xE2\x4F' : '\u00d3',
+    b'\xE2\x50' : '\u1e54', b'\xE2\x52' : '\u0154',
+    b'\xE2\x53' : '\u015a', b'\xE2\x55' : '\u00da',
+    b'\xE2\x57' : '\u1e82', b'\xE2\x59' : '\u00dd',
+    b'\xE2\x5A' : '\u0179', b'\xE2\x61' : '\u00e1',
+    b'\xE2\x63' : '\u0107', b'\xE2\x65' : '\u00e9',
+    b'\xE2\x67' : '\u01f5', b'\xE2\x69' : '\u00ed',
+    b'\xE2\x6B' : '\u1e31', b'\xE2\x6C' : '\u013a',
+    b'\xE2\x6D' : '\u1e3f', b'\xE2\x6E' : '\u0144',
+    b'\xE2\x6F' : '\u00f3', b'\xE2\x70' : '\u1e55',
+    b'\xE2\x72' : '\u0155', b'\xE2\x73' : '\u015b',
+    b'\xE2\x75' : '\u00fa', b'\xE2\x77' : '\u1e83',
+    b'\xE2\x79' : '\u00fd', b'\xE2\x7A' : '\u017a',
+    b'\xE2\xA5' : '\u01fc', b'\xE2\xB5' : '\u01fd',
+    b'\xE3\x41' : '\u00c2', b'\xE3\x43' : '\u0108',
+    b'\xE3\x45' : '\u00ca', b'\xE3\x47' : '\u011c',
+    b'\xE3\x48' : '\u0124', b'\xE3\x49' : '\u00ce',
+    b'\xE3\x4A' : '\u0134', b'\xE3\x4F' : '\u00d4',
+    b'\xE3\x53' : '\u015c', b'\xE3\x55' : '\u00db',
+    b'\xE3\x57' : '\u0174', b'\xE3\x59' : '\u0176',
+    b'\xE3\x5A' : '\u1e90', b'\xE3\x61' : '\u00e2',
+    b'\xE3\x63' : '\u0109', b'\xE3\x65' : '\u00ea',
+    b'\xE3\x67' : '\u011d', b'\xE3\x68' : '\u0125',
+    b'\xE3\x69' : '\u00ee', b'\xE3\x6A' : '\u0135',
+    b'\xE3\x6F' : '\u00f4', b'\xE3\x73' : '\u015d',
+    b'\xE3\x75' : '\u00fb', b'\xE3\x77' : '\u0175',
+    b'\xE3\x79' : '\u0177', b'\xE3\x7A' : '\u1e91',
+    b'\xE4\x41' : '\u00c3', b'\xE4\x45' : '\u1ebc',
+    b'\xE4\x49' : '\u0128', b'\xE4\x4E' : '\u00d1',
+    b'\xE4\x4F' : '\u00d5', b'\xE4\x55' : '\u0168',
+    b'\xE4\x56' : '\u1e7c', b'\xE4\x59' : '\u1ef8',
+    b'\xE4\x61' : '\u00e3', b'\xE4\x65' : '\u1ebd',
+    b'\xE4\x69' : '\u0129', b'\xE4\x6E' : '\u00f1',
+    b'\xE4\x6F' : '\u00f5', b'\xE4\x75' : '\u0169',
+    b'\xE4\x76' : '\u1e7d', b'\xE4\x79' : '\u1ef9',
+    b'\xE5\x41' : '\u0100', b'\xE5\x45' : '\u0112',
+    b'\xE5\x47' : '\u1e20', b'\xE5\x49' : '\u012a',
+    b'\xE5\x4F' : '\u014c', b'\xE5\x55' : '\u016a',
+    b'\xE5\x61' : '\u0101', b'\xE5\x65' : '\u0113',
+    b'\xE5\x67' : '\u1e21', b'\xE5\x69' : '\u012b',
+    b'\xE5\x6F' : '\u014d', b'\xE5\x75' : '\u016b',
+    b'\xE5\xA5' : '\u01e2', b'\xE5\xB5' : '\u01e3',
+    b'\xE6\x41' : '\u0102', b'\xE6\x45' : '\u0114',
+    b'\xE6\x47' : '\u011e', b'\xE6\x49' : '\u012c',
+    b'\xE6\x4F' : '\u014e', b'\xE6\x55' : '\u016c',
+    b'\xE6\x61' : '\u0103', b'\xE6\x65' : '\u0115',
+    b'\xE6\x67' : '\u011f', b'\xE6\x69' : '\u012d',
+    b'\xE6\x6F' : '\u014f', b'\xE6\x75' : '\u016d',
+    b'\xE7\x42' : '\u1e02', b'\xE7\x43' : '\u010a',
+    b'\xE7\x44' : '\u1e0a', b'\xE7\x45' : '\u0116',
+    b'\xE7\x46' : '\u1e1e', b'\xE7\x47' : '\u0120',
+    b'\xE7\x48' : '\u1e22', b'\xE7\x49' : '\u0130',
+    b'\xE7\x4D' : '\u1e40', b'\xE7\x4E' : '\u1e44',
+    b'\xE7\x50' : '\u1e56', b'\xE7\x52' : '\u1e58',
+    b'\xE7\x53' : '\u1e60', b'\xE7\x54' : '\u1e6a',
+    b'\xE7\x57' : '\u1e86', b'\xE7\x58' : '\u1e8a',
+    b'\xE7\x59' : '\u1e8e', b'\xE7\x5A' : '\u017b',
+    b'\xE7\x62' : '\u1e03', b'\xE7\x63' : '\u010b',
+    b'\xE7\x64' : '\u1e0b', b'\xE7\x65' : '\u0117',
+    b'\xE7\x66' : '\u1e1f', b'\xE7\x67' : '\u0121',
+    b'\xE7\x68' : '\u1e23', b'\xE7\x6D' : '\u1e41',
+    b'\xE7\x6E' : '\u1e45', b'\xE7\x70' : '\u1e57',
+    b'\xE7\x72' : '\u1e59', b'\xE7\x73' : '\u1e61',
+    b'\xE7\x74' : '\u1e6b', b'\xE7\x77' : '\u1e87',
+    b'\xE7\x78' : '\u1e8b', b'\xE7\x79' : '\u1e8f',
+    b'\xE7\x7A' : '\u017c', b'\xE8\x41' : '\u00c4',
+    b'\xE8\x45' : '\u00cb', b'\xE8\x48' : '\u1e26',
+    b'\xE8\x49' : '\u00cf', b'\xE8\x4F' : '\u00d6',
+    b'\xE8\x55' : '\u00dc', b'\xE8\x57' : '\u1e84',
+    b'\xE8\x58' : '\u1e8c', b'\xE8\x59' : '\u0178',
+    b'\xE8\x61' : '\u00e4', b'\xE8\x65' : '\u00eb',
+    b'\xE8\x68' : '\u1e27', b'\xE8\x69' : '\u00ef',
+    b'\xE8\x6F' : '\u00f6', b'\xE8\x74' : '\u1e97',
+    b'\xE8\x75' : '\u00fc', b'\xE8\x77' : '\u1e85',
+    b'\xE8\x78' : '\u1e8d', b'\xE8\x79' : '\u00ff',
+    b'\xE9\x41' : '\u01cd', b'\xE9\x43' : '\u010c',
+    b'\xE9\x44' : '\u010e', b'\xE9\x45' : '\u011a',
+    b'\xE9\x47' : '\u01e6', b'\xE9\x49' : '\u01cf',
+    b'\xE9\x4B' : '\u01e8', b'\xE9\x4C' : '\u013d',
+    b'\xE9\x4E' : '\u0147', b'\xE9\x4F' : '\u01d1',
+    b'\xE9\x52' : '\u0158', b'\xE9\x53' : '\u0160',
+    b'\xE9\x54' : '\u0164', b'\xE9\x55' : '\u01d3',
+    b'\xE9\x5A' : '\u017d', b'\xE9\x61' : '\u01ce',
+    b'\xE9\x63' : '\u010d', b'\xE9\x64' : '\u010f',
+    b'\xE9\x65' : '\u011b', b'\xE9\x67' : '\u01e7',
+    b'\xE9\x69' : '\u01d0', b'\xE9\x6A' : '\u01f0',
+    b'\xE9\x6B' : '\u01e9', b'\xE9\x6C' : '\u013e',
+    b'\xE9\x6E' : '\u0148', b'\xE9\x6F' : '\u01d2',
+    b'\xE9\x72' : '\u0159', b'\xE9\x73' : '\u0161',
+    b'\xE9\x74' : '\u0165', b'\xE9\x75' : '\u01d4',
+    b'\xE9\x7A' : '\u017e', b'\xEA\x41' : '\u00c5',
+    b'\xEA\x61' : '\u00e5', b'\xEA\x75' : '\u016f',
+    b'\xEA\x77' : '\u1e98', b'\xEA\x79' : '\u1e99',
+    b'\xEA\xAD' : '\u016e', b'\xEE\x4F' : '\u0150',
+    b'\xEE\x55' : '\u0170', b'\xEE\x6F' : '\u0151',
+    b'\xEE\x75' : '\u0171', b'\xF0\x20' : '\u00b8',
+    b'\xF0\x43' : '\u00c7', b'\xF0\x44' : '\u1e10',
+    b'\xF0\x47' : '\u0122', b'\xF0\x48' : '\u1e28',
+    b'\xF0\x4B' : '\u0136', b'\xF0\x4C' : '\u013b',
+    b'\xF0\x4E' : '\u0145', b'\xF0\x52' : '\u0156',
+    b'\xF0\x53' : '\u015e', b'\xF0\x54' : '\u0162',
+    b'\xF0\x63' : '\u00e7', b'\xF0\x64' : '\u1e11',
+    b'\xF0\x67' : '\u0123', b'\xF0\x68' : '\u1e29',
+    b'\xF0\x6B' : '\u0137', b'\xF0\x6C' : '\u013c',
+    b'\xF0\x6E' : '\u0146', b'\xF0\x72' : '\u0157',
+    b'\xF0\x73' : '\u015f', b'\xF0\x74' : '\u0163',
+    b'\xF1\x41' : '\u0104', b'\xF1\x45' : '\u0118',
+    b'\xF1\x49' : '\u012e', b'\xF1\x4F' : '\u01ea',
+    b'\xF1\x55' : '\u0172', b'\xF1\x61' : '\u0105',
+    b'\xF1\x65' : '\u0119', b'\xF1\x69' : '\u012f',
+    b'\xF1\x6F' : '\u01eb', b'\xF1\x75' : '\u0173',
+    b'\xF2\x41' : '\u1ea0', b'\xF2\x42' : '\u1e04',
+    b'\xF2\x44' : '\u1e0c', b'\xF2\x45' : '\u1eb8',
+    b'\xF2\x48' : '\u1e24', b'\xF2\x49' : '\u1eca',
+    b'\xF2\x4B' : '\u1e32', b'\xF2\x4C' : '\u1e36',
+    b'\xF2\x4D' : '\u1e42', b'\xF2\x4E' : '\u1e46',
+    b'\xF2\x4F' : '\u1ecc', b'\xF2\x52' : '\u1e5a',
+    b'\xF2\x53' : '\u1e62', b'\xF2\x54' : '\u1e6c',
+    b'\xF2\x55' : '\u1ee4', b'\xF2\x56' : '\u1e7e',
+    b'\xF2\x57' : '\u1e88', b'\xF2\x59' : '\u1ef4',
+    b'\xF2\x5A' : '\u1e92', b'\xF2\x61' : '\u1ea1',
+    b'\xF2\x62' : '\u1e05', b'\xF2\x64' : '\u1e0d',
+    b'\xF2\x65' : '\u1eb9', b'\xF2\x68' : '\u1e25',
+    b'\xF2\x69' : '\u1ecb', b'\xF2\x6B' : '\u1e33',
+    b'\xF2\x6C' : '\u1e37', b'\xF2\x6D' : '\u1e43',
+    b'\xF2\x6E' : '\u1e47', b'\xF2\x6F' : '\u1ecd',
+    b'\xF2\x72' : '\u1e5b', b'\xF2\x73' : '\u1e63',
+    b'\xF2\x74' : '\u1e6d', b'\xF2\x75' : '\u1ee5',
+    b'\xF2\x76' : '\u1e7f', b'\xF2\x77' : '\u1e89',
+    b'\xF2\x79' : '\u1ef5', b'\xF2\x7A' : '\u1e93',
+    b'\xF3\x55' : '\u1e72', b'\xF3\x75' : '\u1e73',
+    b'\xF4\x41' : '\u1e00', b'\xF4\x61' : '\u1e01',
+    b'\xF9\x48' : '\u1e2a', b'\xF9\x68' : '\u1e2b', }
+
+# The tables above, keyed by the bytes decoded as latin-1, which maps each
+# byte to the character with the same code
+_DECODE_ONE = dict((key.decode('latin-1'), value)
+                   for (key, value) in _ONEBYTE.items())
+_DECODE_COMBINER = dict((key.decode('latin-1'), value)
+                        for (key, value) in _COMBINERS.items())
+_DECODE_TWO = dict((key.decode('latin-1'), value)
+                   for (key, value) in _TWOBYTE.items())
+
+# Printable ASCII, which is what a combining form can modify
+_PRINTABLE = frozenset(map(chr, range(32, 127)))
+
+# Bytes other than the accepted ASCII: printable, LF, CR, Esc, GS, RS, US
+_SPECIAL = re.compile('[^\x20-\x7e\n\r\x1b\x1d-\x1f]')
+
+# The encoding tables, in which the plain ASCII and the first of several
+# codes for the same character win
+_ENCODE = dict((chr(code), bytes([code]))
+               for code in list(range(32, 127)) + [10, 13, 27, 29, 30, 31])
+for _table in (_ONEBYTE, _TWOBYTE, _COMBINERS):
+    for (_key, _value) in sorted(_table.items()):
+        _ENCODE.setdefault(_value, _key)
+del _table, _key, _value
+
+# Unicode combining forms, which follow the character they modify
+_COMBINING = frozenset(_COMBINERS.values())
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def ansel_decode(data, errors='strict', final=True, report=None):
+    """
+    Decode ANSEL encoded bytes.
+
+    :param data: the bytes to decode.
+    :param errors: the name of the codec error handler for illegal bytes.
+    :param final: False if more bytes follow, in which case a combining
+                  form at the end is left for the next call.
+    :param report: if a list is given, illegal bytes are handled as in the
+                   GEDCOM import instead: control characters become spaces,
+                   other bytes the replacement character, and combining
+                   forms that are not followed by printable ASCII are
+                   dropped.
+                   (offset, byte) is added to the list for each, where
+                   offset is the position in the decoded text.
+    :returns: (text, number of bytes consumed)
+    """
+    text = bytes(data).decode('latin-1')
+    length = len(text)
+    parts = []
+    size = 0
+    pos = 0
+    search = _SPECIAL.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            parts.append(text[pos:])
+            pos = length
+            break
+        index = match.start()
+        if index > pos:
+            parts.append(text[pos:index])
+            size += index - pos
+        char = text[index]
+        if char in _DECODE_COMBINER:
+            end = index + 1
+            while end < length and text[end] in _DECODE_COMBINER:
+                end += 1
+            if end == length and not final:
+                pos = index
+                break
+            pair = text[index:index + 2]
+            if pair in _DECODE_TWO:
+                part = _DECODE_TWO[pair]
+                pos = index + 2
+            elif text[end:end + 1] in _PRINTABLE:
+                # unicode: combiners follow base-char
+                part = text[end] + ''.join(_DECODE_COMBINER[combiner]
+                                           for combiner in text[index:end])
+                pos = end + 1
+            else:
+                part, pos = _error(text, index, errors, report, size, '')
+        elif char in _DECODE_ONE:
+            part = _DECODE_ONE[char]
+            pos = index + 1
+        else:
+            part, pos = _error(text, index, errors, report, size,
+                               ' ' if char < '\x80' else '\ufffd')
+        parts.append(part)
+        size += len(part)
+    return ''.join(parts), pos
+
+def _error(text, index, errors, report, size, replacement):
+    """
+    Handle the illegal byte at the index, and return (replacement, position
+    to resume decoding at).
+    """
+    if report is not None:
+        report.append((size, ord(text[index])))
+        return replacement, index + 1
+    exc = UnicodeDecodeError('ansel', text.encode('latin-1'), index,
+                             index + 1, 'illegal ANSEL code')
+    return codecs.lookup_error(errors)(exc)
+
+def ansel_encode(text, errors='strict'):
+    """
+    Encode text as ANSEL.
+
+    Characters without a code of their own are decomposed into a base
+    character and combining forms, which precede the base in ANSEL.
+
+    :returns: (bytes, number of characters consumed)
+    """
+    parts = []
+    pos = 0
+    length = len(text)
+    while pos < length:
+        char = text[pos]
+        code = _ENCODE.get(char)
+        if code is None:
+            decomposed = unicodedata.normalize('NFD', char)
+            if len(decomposed) > 1 and all(part in _ENCODE
+                                           for part in decomposed):
+                code = b''.join(_ENCODE[part] for part in decomposed[1:])
+                code += _ENCODE[decomposed[0]]
+        if code is not None:
+            if char in _COMBINING and parts:
+                parts.insert(-1, code)
+            else:
+                parts.append(code)
+            pos += 1
+            continue
+        exc = UnicodeEncodeError('ansel', text, pos, pos + 1,
+                                 'character has no ANSEL code')
+        replacement, pos = codecs.lookup_error(errors)(exc)
+        if isinstance(replacement, str):
+            replacement = ansel_encode(replacement)[0]
+        parts.append(replacement)
+    return b''.join(parts), length
+
+#-------------------------------------------------------------------------
+#
+# Codec classes
+#
+#-------------------------------------------------------------------------
+class IncrementalDecoder(codecs.BufferedIncrementalDecoder):
+    """
+    ANSEL decoder for a stream, which keeps a combining form at the end of a
+    buffer until the character it modifies is read.
+    """
+    def _buffer_decode(self, data, errors, final):
+        return ansel_decode(data, errors, final)
+
+
+class IncrementalEncoder(codecs.IncrementalEncoder):
+    """
+    ANSEL encoder for a stream.  A combining form must be given with the
+    character it modifies.
+    """
+    def encode(self, text, final=False):
+        return ansel_encode(text, self.errors)[0]
+
+
+class StreamReader(codecs.StreamReader):
+    """ ANSEL stream reader """
+    def decode(self, data, errors='strict'):
+        return ansel_decode(data, errors, False)
+
+
+class StreamWriter(codecs.StreamWriter):
+    """ ANSEL stream writer """
+    def encode(self, text, errors='strict'):
+        return ansel_encode(text, errors)
+
+
+def _search(name):
+    """
+    Codec search function, for the 'ansel' encoding.
+    """
+    if name != 'ansel':
+        return None
+    return codecs.CodecInfo(name='ansel',
+                            encode=ansel_encode,
+                            decode=ansel_decode,
+                            incrementalencoder=IncrementalEncoder,
+                            incrementaldecoder=IncrementalDecoder,
+                            streamreader=StreamReader,
+                            streamwriter=StreamWriter)
+
+codecs.register(_search)
@@ -91,11 +91,12 @@ all lines until the next level 2 token is found (in this case, skipping the
 import os
 import re
 import time
+import bisect
 # from xml.parsers.expat import ParserCreate
 from collections import defaultdict, OrderedDict
 import string
 import mimetypes
-from io import StringIO, TextIOWrapper
+from io import TextIOWrapper
 from urllib.parse import urlparse
 
 #------------------------------------------------------------------------
@@ -134,6 +135,7 @@ from gramps.gen.lib.const import IDENTICAL
 from gramps.gen.lib import (StyledText, StyledTextTag, StyledTextTagType)
 from gramps.gen.lib.urlbase import UrlBase
 from gramps.plugins.lib.libplaceimport import PlaceImport
+from gramps.plugins.lib.libansel import ansel_decode
 from gramps.gen.display.place import displayer as _pd
 from gramps.gen.utils.grampslocale import GrampsLocale
 
@@ -717,10 +719,20 @@ CUSTOMEVENTTAGS = {
 # Only 09, 0A, 0D are allowed.
 STRIP_DICT = dict.fromkeys(list(range(9)) + list(range(11, 13)) +
                            list(range(14, 32)))
+STRIP_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
 # The C1 Control characters are not treated in Latin-1 (ISO-8859-1) as
 # undefined, but if they have been used, the file is probably supposed to be
 # cp1252
 DEL_AND_C1 = dict.fromkeys(list(range(0x7F, 0x9F)))
+DEL_AND_C1_CHARS = re.compile('[\x7f-\x9e]')
+# The ANSEL reader decodes the file in buffers of this size, and splits the
+# lines itself
+ANSEL_BUFFER_SIZE = 1 << 20
+LINE_END = re.compile('\r\n|\r|\n')
+# The lexer reads blocks of whole lines of about this many characters
+LEXER_BLOCK_SIZE = 1 << 16
+# The number of parsed dates kept by the lexer
+DATE_CACHE_SIZE = 10000
 
 #-------------------------------------------------------------------------
 #
@@ -812,6 +824,10 @@ SPAN1 = re.compile(r"\s*FROM\s+\s*(.*)\s+TO\s+@#D?([^@]+)@\s*(.*)$")
 SPAN2 = re.compile(r"\s*FROM\s+@#D?([^@]+)@\s*(.*)\s+TO\s+\s*(.*)$")
 NAME_RE = re.compile(r"/?([^/]*)(/([^/]*)(/([^/]*))?)?")
 SURNAME_RE = re.compile(r"/([^/]*)/([^/]*)")
+# A line with a level, a tag and a value, or any other line, which is then
+# split by the slower Lexer.__split_line
+GEDCOM_LINE = re.compile(r" *([0-9]+) +([^ @\n][^ \n]*)(?: ([^\n]*))?\n"
+                         r"|([^\n]*)\n")
 
 
 #-----------------------------------------------------------------------
@@ -839,125 +855,163 @@ class GedcomDateParser(DateParser):
 #
 #-------------------------------------------------------------------------
 class Lexer:
-    """ low level line reading and early parsing """
+    """
+    low level line reading and early parsing
+
+    The lines are read in blocks from the reader and split into level, tag
+    and value by a single regular expression.  CONT and CONC lines are
+    merged into the line they continue, so the last line of a block is held
+    back until the next block has been read.
+    """
     def __init__(self, ifile, __add_msg):
         self.ifile = ifile
-        self.current_list = []
+        self.current_list = []  # tokenized lines, in file order
+        self.pos = 0            # index of the next line to return
+        self.parts = None       # pieces of the value of the last line
+        self.length = 0         # length of those pieces
         self.eof = False
         self.cnv = None
         self.cnt = 0
         self.index = 0
-        self.func_map = {TOKEN_CONT : self.__fix_token_cont,
-                         TOKEN_CONC : self.__fix_token_conc}
         self.__add_msg = __add_msg
 
     def readline(self):
         """ read a line from file with possibility of putting it back """
-        if len(self.current_list) <= 1 and not self.eof:
+        while not self.eof and self.pos >= len(self.current_list) - 1:
             self.__readahead()
         try:
-            return GedLine(self.current_list.pop())
+            data = self.current_list[self.pos]
+            self.pos += 1
+            return GedLine(data)
         except:
             LOG.debug('Error in reading Gedcom line', exc_info=True)
             return None
 
-    def __fix_token_cont(self, data):
-        line = self.current_list[0]
-        new_value = line[2] + '\n' + data[2]
-        self.current_list[0] = (line[0], line[1], new_value, line[3], line[4])
-
-    def __fix_token_conc(self, data):
-        line = self.current_list[0]
-        if len(line[2]) == 4:
-            # This deals with lines of the form
-            # 0 @<XREF:NOTE>@ NOTE
-            #   1 CONC <SUBMITTER TEXT>
-            # The previous line contains only a tag and no data so concat a
-            # space to separate the new line from the tag. This prevents the
-            # first letter of the new line being lost later
-            # in _GedcomParse.__parse_record
-            new_value = line[2] + ' ' + data[2]
-        else:
-            new_value = line[2] + data[2]
-        self.current_list[0] = (line[0], line[1], new_value, line[3], line[4])
-
-    def __readahead(self):
-        while len(self.current_list) < 5:
-            line = self.ifile.readline()
-            self.index += 1
-            if not line:
-                self.eof = True
-                return
-
-            original_line = line
-            try:
-                # According to the GEDCOM 5.5 standard,
-                # Chapter 1 subsection Grammar "leading whitespace preceeding
-                # a GEDCOM line should be ignored"
-                # We will also strip the terminator which is any combination
-                # of carriage_return and line_feed
-                line = line.lstrip(' ').rstrip('\n\r')
-                # split into level+delim+rest
-                line = line.partition(' ')
-                level = int(line[0])
-                # there should only be one space after the level,
-                # but we can ignore more,
-                line = line[2].lstrip(' ')
-                # then split into tag+delim+line_value
-                # or xfef_id+delim+rest
-                # the xref_id can have spaces in it
-                if line.startswith('@'):
-                    line = line.split('@', 2)
-                    # line is now [None, alphanum+pointer_string, rest]
-                    tag = '@' + line[1] + '@'
-                    line_value = line[2].lstrip()
-                    # Ignore meaningless @IDENT@ on CONT or CONC line
-                    # as noted at http://www.tamurajones.net/IdentCONT.xhtml
-                    if (line_value.lstrip().startswith("CONT ") or
-                            line_value.lstrip().startswith("CONC ")):
-                        line = line_value.lstrip().partition(' ')
-                        tag = line[0]
-                        line_value = line[2]
-                else:
-                    line = line.partition(' ')
+    def __split_line(self, line):
+        """
+        Split a line that is not of the usual form into level, tag and
+        value, or report it and return None if it cannot be parsed.
+        """
+        original_line = line
+        try:
+            # According to the GEDCOM 5.5 standard,
+            # Chapter 1 subsection Grammar "leading whitespace preceeding
+            # a GEDCOM line should be ignored"
+            # The terminator has already been removed
+            # split into level+delim+rest
+            line = line.lstrip(' ').partition(' ')
+            level = int(line[0])
+            # there should only be one space after the level,
+            # but we can ignore more,
+            line = line[2].lstrip(' ')
+            # then split into tag+delim+line_value
+            # or xfef_id+delim+rest
+            # the xref_id can have spaces in it
+            if line.startswith('@'):
+                line = line.split('@', 2)
+                # line is now [None, alphanum+pointer_string, rest]
+                tag = '@' + line[1] + '@'
+                line_value = line[2].lstrip()
+                # Ignore meaningless @IDENT@ on CONT or CONC line
+                # as noted at http://www.tamurajones.net/IdentCONT.xhtml
+                if (line_value.lstrip().startswith("CONT ") or
+                        line_value.lstrip().startswith("CONC ")):
+                    line = line_value.lstrip().partition(' ')
                     tag = line[0]
                     line_value = line[2]
-            except:
-                problem = _("Line ignored ")
-                text = original_line.rstrip('\n\r')
-                prob_width = 66
-                problem = problem.ljust(prob_width)[0:(prob_width - 1)]
-                text = text.replace("\n", "\n".ljust(prob_width + 22))
-                message = "%s              %s" % (problem, text)
-                self.__add_msg(message)
-                continue
+            else:
+                line = line.partition(' ')
+                tag = line[0]
+                line_value = line[2]
+        except:
+            problem = _("Line ignored ")
+            text = original_line
+            prob_width = 66
+            problem = problem.ljust(prob_width)[0:(prob_width - 1)]
+            text = text.replace("\n", "\n".ljust(prob_width + 22))
+            message = "%s              %s" % (problem, text)
+            self.__add_msg(message)
+            return None
+        return level, tag, line_value
 
-            # Need to un-double '@' See Gedcom 5.5 spec 'any_char'
-            line_value = line_value.replace('@@', '@')
-            token = TOKENS.get(tag, TOKEN_UNKNOWN)
-            data = (level, token, line_value, tag, self.index)
+    def __readahead(self):
+        """ Tokenize the next block of lines """
+        del self.current_list[:self.pos]
+        self.pos = 0
+        lines = self.current_list
+        text = self.ifile.readblock()
+        if not text:
+            self.eof = True
+            if self.parts is not None:
+                lines[-1][2] = ''.join(self.parts)
+                self.parts = None
+            return
+        if text[-1] != '\n':
+            text += '\n'
+
+        get_token = TOKENS.get
+        index = self.index
+        parts = self.parts
+        length = self.length
+        for match in GEDCOM_LINE.finditer(text):
+            index += 1
+            level, tag, line_value, other = match.groups()
+            if other is not None:
+                data = self.__split_line(other)
+                if data is None:
+                    continue
+                level, tag, line_value = data
+            else:
+                level = int(level)
+                if line_value is None:
+                    line_value = ''
 
-            func = self.func_map.get(data[1])
-            if func:
-                func(data)
+            # Need to un-double '@' See Gedcom 5.5 spec 'any_char'
+            if '@@' in line_value:
+                line_value = line_value.replace('@@', '@')
+            token = get_token(tag, TOKEN_UNKNOWN)
+
+            if (token == TOKEN_CONT or token == TOKEN_CONC) and lines:
+                if parts is None:
+                    parts = [lines[-1][2]]
+                    length = len(parts[0])
+                if token == TOKEN_CONT:
+                    parts.append('\n')
+                    length += 1
+                elif length == 4:
+                    # This deals with lines of the form
+                    # 0 @<XREF:NOTE>@ NOTE
+                    #   1 CONC <SUBMITTER TEXT>
+                    # The previous line contains only a tag and no data so
+                    # concat a space to separate the new line from the tag.
+                    # This prevents the first letter of the new line being
+                    # lost later in _GedcomParse.__parse_record
+                    parts.append(' ')
+                    length += 1
+                parts.append(line_value)
+                length += len(line_value)
             else:
+                if parts is not None:
+                    lines[-1][2] = ''.join(parts)
+                    parts = None
                 # There will normally only be one space between tag and
                 # line_value, but in case there is more then one, remove extra
                 # spaces after CONC/CONT processing
                 # Also, Gedcom spec says there should be no spaces at end of
                 # line, however some programs put them there (FTM), so let's
                 # leave them in place.
-                data = data[:2] + (data[2].lstrip(),) + data[3:]
-                self.current_list.insert(0, data)
+                lines.append([level, token, line_value.lstrip(), tag, index])
+        self.index = index
+        self.parts = parts
+        self.length = length
 
     def clean_up(self):
         """
-        Break circular references to parsing methods stored in dictionaries
-        to aid garbage collection
+        Release the lines that are still buffered
         """
-        for key in list(self.func_map.keys()):
-            del self.func_map[key]
-        del self.func_map
+        self.current_list = []
+        self.pos = 0
+        self.parts = None
 
 
 #-----------------------------------------------------------------------
@@ -984,7 +1038,11 @@ class GedLine:
     TOKEN_SEX    - Person gender item
     TOEKN_UKNOWN - Check to see if this is a known event
     """
+    __slots__ = ('line', 'level', 'token', 'token_text', 'data')
     __DATE_CNV = GedcomDateParser()
+    # The same dates are found many times in a file, so the parsed dates
+    # are kept, and copies of them are given to the lines
+    __DATE_CACHE = {}
 
     @staticmethod
     def __extract_date(text):
@@ -1097,19 +1155,19 @@ class GedLine:
         there is a conversion function for the data.
         """
         self.line = data[4]
-        self.level = data[0]
-        self.token = data[1]
-        self.token_text = data[3].strip()
-        self.data = str(data[2])
-
-        if self.level == 0:
-            if (self.token_text and self.token_text[0] == '@' and
-                    self.token_text[-1] == '@'):
+        self.level = level = data[0]
+        self.token = token = data[1]
+        self.token_text = token_text = data[3].strip()
+        self.data = data[2]
+
+        if level == 0:
+            if (token_text and token_text[0] == '@' and
+                    token_text[-1] == '@'):
                 self.token = TOKEN_ID
-                self.token_text = self.token_text[1:-1]
+                self.token_text = token_text[1:-1]
                 self.data = self.data.strip()
         else:
-            func = _MAP_DATA.get(self.token)
+            func = _MAP_DATA_GET(token)
             if func:
                 func(self)
 
@@ -1127,7 +1185,13 @@ class GedLine:
         """
         Converts the data field to a Date object
         """
-        self.data = self.__extract_date(self.data)
+        cache = GedLine.__DATE_CACHE
+        date = cache.get(self.data)
+        if date is None:
+            if len(cache) >= DATE_CACHE_SIZE:
+                cache.clear()
+            date = cache[self.data] = self.__extract_date(self.data)
+        self.data = Date(date)
         self.token = TOKEN_DATE
 
     def calc_unknown(self):
@@ -1190,6 +1254,7 @@ _MAP_DATA = {
     TOKEN__UID    : GedLine.calc_attr,
     TOKEN_AFN     : GedLine.calc_attr,
     TOKEN__FSFTID : GedLine.calc_attr, }
+_MAP_DATA_GET = _MAP_DATA.get
 
 
 #-------------------------------------------------------------------------
@@ -1212,6 +1277,35 @@ class BaseReader:
         """ Read a single line """
         raise NotImplementedError()
 
+    def readblock(self):
+        """
+        Read a block of whole lines, of about LEXER_BLOCK_SIZE characters.
+        Return an empty string at the end of the file.
+        """
+        lines = []
+        size = 0
+        while size < LEXER_BLOCK_SIZE:
+            line = self.readline()
+            if not line:
+                break
+            lines.append(line)
+            size += len(line)
+        return ''.join(lines)
+
+    def _read_text(self):
+        """ Read a block of whole lines from the text file """
+        text = self.ifile.read(LEXER_BLOCK_SIZE)
+        if text and text[-1] != '\n':
+            text += self.ifile.readline()
+        return text
+
+    @staticmethod
+    def _strip(text):
+        """ Remove the illegal control characters from the text """
+        if STRIP_CHARS.search(text):
+            return text.translate(STRIP_DICT)
+        return text
+
     def report_error(self, problem, line):
         """ Create an error message """
         line = line.rstrip('\n\r')
@@ -1238,6 +1332,9 @@ class UTF8Reader(BaseReader):
         line = self.ifile.readline()
         return line.translate(STRIP_DICT)
 
+    def readblock(self):
+        return self._strip(self._read_text())
+
 
 class UTF16Reader(BaseReader):
     """ The main UTF-16 reader, uses Python for char handling """
@@ -1251,6 +1348,9 @@ class UTF16Reader(BaseReader):
         line = self.ifile.readline()
         return line.translate(STRIP_DICT)
 
+    def readblock(self):
+        return self._strip(self._read_text())
+
 
 class AnsiReader(BaseReader):
     """ The main ANSI (latin1) reader, uses Python for char handling """
@@ -1266,6 +1366,15 @@ class AnsiReader(BaseReader):
                               "CHAR cp1252??", line)
         return line.translate(STRIP_DICT)
 
+    def readblock(self):
+        text = self._read_text()
+        if DEL_AND_C1_CHARS.search(text):
+            for line in text.split('\n'):
+                if DEL_AND_C1_CHARS.search(line):
+                    self.report_error("DEL or C1 control chars in line did "
+                                      "you mean CHAR cp1252??", line)
+        return self._strip(text)
+
 
 class CP1252Reader(BaseReader):
     """ The extra credit CP1252 reader, uses Python for char handling """
@@ -1278,281 +1387,74 @@ class CP1252Reader(BaseReader):
         line = self.ifile.readline()
         return line.translate(STRIP_DICT)
 
+    def readblock(self):
+        return self._strip(self._read_text())
+
 
 class AnselReader(BaseReader):
     """
     ANSEL to Unicode Conversion
 
-    ANSEL references:
-    http://lcweb2.loc.gov/diglib/codetables/45.html
-    http://www.gymel.com/charsets/ANSEL.html
-
-    list of ANSEL codes that replicate ASCII
-    note that DEL (127=0x7F) is a control char
-    Note: spec allows control-chars that Gramps probably doesn't use
-    but 10=0x0A _is_ needed (!)
-    ---
-    Also: there are two additional control chars 0x98,0x9c (unicode same)
-    which we also ignore for now (start/emd of string (or sort sequence)
-    ---
-    ?: should we allow TAB, as a Gramps extension?
+    The file is read and decoded in large buffers by the ANSEL codec, and
+    then split into lines, with universal newlines.  Illegal characters are
+    reported with the line they are found in.
     """
-    __printable_ascii = list(map(chr, list(range(32, 127))))  # up thru 126
-    #                            LF  CR  Esc GS  RS  US
-    __use_ASCII = list(map(chr, [10, 13, 27, 29, 30, 31])) + __printable_ascii
-
-    # mappings of single byte ANSEL codes to unicode
-    __onebyte = {
-        b'\xA1' : '\u0141', b'\xA2' : '\u00d8', b'\xA3' : '\u0110',
-        b'\xA4' : '\u00de', b'\xA5' : '\u00c6', b'\xA6' : '\u0152',
-        b'\xA7' : '\u02b9', b'\xA8' : '\u00b7', b'\xA9' : '\u266d',
-        b'\xAA' : '\u00ae', b'\xAB' : '\u00b1', b'\xAC' : '\u01a0',
-        b'\xAD' : '\u01af', b'\xAE' : '\u02bc', b'\xB0' : '\u02bb',
-        b'\xB1' : '\u0142', b'\xB2' : '\u00f8', b'\xB3' : '\u0111',
-        b'\xB4' : '\u00fe', b'\xB5' : '\u00e6', b'\xB6' : '\u0153',
-        b'\xB7' : '\u02ba', b'\xB8' : '\u0131', b'\xB9' : '\u00a3',
-        b'\xBA' : '\u00f0', b'\xBC' : '\u01a1', b'\xBD' : '\u01b0',
-        b'\xBE' : '\u25a1', b'\xBF' : '\u25a0',
-        b'\xC0' : '\u00b0', b'\xC1' : '\u2113', b'\xC2' : '\u2117',
-        b'\xC3' : '\u00a9', b'\xC4' : '\u266f', b'\xC5' : '\u00bf',
-        b'\xC6' : '\u00a1', b'\xC7' : '\u00df', b'\xC8' : '\u20ac',
-        b'\xCD' : '\u0065', b'\xCE' : '\u006f', b'\xCF' : '\u00df', }
-
-    # combining forms (in ANSEL, they precede the modified ASCII character
-    # whereas the unicode combining term follows the character modified
-    # Note: unicode allows multiple modifiers, but ANSEL may not (TDB?),
-    # so we ignore multiple combining forms in this module
-    #  8d & 8e are zero-width joiner (ZWJ), and zero-width non-joiner ZWNJ
-    #  (strange things) probably not commonly found in our needs, unless one
-    #   starts writing persian (or???) poetry in ANSEL
-    __acombiners = {
-        b'\x8D' : '\u200d', b'\x8E' : '\u200c', b'\xE0' : '\u0309',
-        b'\xE1' : '\u0300', b'\xE2' : '\u0301', b'\xE3' : '\u0302',
-        b'\xE4' : '\u0303', b'\xE5' : '\u0304', b'\xE6' : '\u0306',
-        b'\xE7' : '\u0307', b'\xE8' : '\u0308', b'\xE9' : '\u030c',
-        b'\xEA' : '\u030a', b'\xEB' : '\ufe20', b'\xEC' : '\ufe21',
-        b'\xED' : '\u0315', b'\xEE' : '\u030b', b'\xEF' : '\u0310',
-        b'\xF0' : '\u0327', b'\xF1' : '\u0328', b'\xF2' : '\u0323',
-        b'\xF3' : '\u0324', b'\xF4' : '\u0325', b'\xF5' : '\u0333',
-        b'\xF6' : '\u0332', b'\xF7' : '\u0326', b'\xF8' : '\u031c',
-        b'\xF9' : '\u032e', b'\xFA' : '\ufe22', b'\xFB' : '\ufe23',
-        b'\xFC' : '\u0338',
-        b'\xFE' : '\u0313', }
-
-    # mappings of two byte (precomposed forms) ANSEL codes to unicode
-    __twobyte = {
-        b'\xE0\x41' : '\u1ea2', b'\xE0\x45' : '\u1eba',
-        b'\xE0\x49' : '\u1ec8', b'\xE0\x4F' : '\u1ece',
-        b'\xE0\x55' : '\u1ee6', b'\xE0\x59' : '\u1ef6',
-        b'\xE0\x61' : '\u1ea3', b'\xE0\x65' : '\u1ebb',
-        b'\xE0\x69' : '\u1ec9', b'\xE0\x6F' : '\u1ecf',
-        b'\xE0\x75' : '\u1ee7', b'\xE0\x79' : '\u1ef7',
-        b'\xE1\x41' : '\u00c0', b'\xE1\x45' : '\u00c8',
-        b'\xE1\x49' : '\u00cc', b'\xE1\x4F' : '\u00d2',
-        b'\xE1\x55' : '\u00d9', b'\xE1\x57' : '\u1e80',
-        b'\xE1\x59' : '\u1ef2', b'\xE1\x61' : '\u00e0',
-        b'\xE1\x65' : '\u00e8', b'\xE1\x69' : '\u00ec',
-        b'\xE1\x6F' : '\u00f2', b'\xE1\x75' : '\u00f9',
-        b'\xE1\x77' : '\u1e81', b'\xE1\x79' : '\u1ef3',
-        b'\xE2\x41' : '\u00c1', b'\xE2\x43' : '\u0106',
-        b'\xE2\x45' : '\u00c9', b'\xE2\x47' : '\u01f4',
-        b'\xE2\x49' : '\u00cd', b'\xE2\x4B' : '\u1e30',
-        b'\xE2\x4C' : '\u0139', b'\xE2\x4D' : '\u1e3e',
-        b'\xE2\x4E' : '\u0143', b'\xE2\x4F' : '\u00d3',
-        b'\xE2\x50' : '\u1e54', b'\xE2\x52' : '\u0154',
-        b'\xE2\x53' : '\u015a', b'\xE2\x55' : '\u00da',
-        b'\xE2\x57' : '\u1e82', b'\xE2\x59' : '\u00dd',
-        b'\xE2\x5A' : '\u0179', b'\xE2\x61' : '\u00e1',
-        b'\xE2\x63' : '\u0107', b'\xE2\x65' : '\u00e9',
-        b'\xE2\x67' : '\u01f5', b'\xE2\x69' : '\u00ed',
-        b'\xE2\x6B' : '\u1e31', b'\xE2\x6C' : '\u013a',
-        b'\xE2\x6D' : '\u1e3f', b'\xE2\x6E' : '\u0144',
-        b'\xE2\x6F' : '\u00f3', b'\xE2\x70' : '\u1e55',
-        b'\xE2\x72' : '\u0155', b'\xE2\x73' : '\u015b',
-        b'\xE2\x75' : '\u00fa', b'\xE2\x77' : '\u1e83',
-        b'\xE2\x79' : '\u00fd', b'\xE2\x7A' : '\u017a',
-        b'\xE2\xA5' : '\u01fc', b'\xE2\xB5' : '\u01fd',
-        b'\xE3\x41' : '\u00c2', b'\xE3\x43' : '\u0108',
-        b'\xE3\x45' : '\u00ca', b'\xE3\x47' : '\u011c',
-        b'\xE3\x48' : '\u0124', b'\xE3\x49' : '\u00ce',
-        b'\xE3\x4A' : '\u0134', b'\xE3\x4F' : '\u00d4',
-        b'\xE3\x53' : '\u015c', b'\xE3\x55' : '\u00db',
-        b'\xE3\x57' : '\u0174', b'\xE3\x59' : '\u0176',
-        b'\xE3\x5A' : '\u1e90', b'\xE3\x61' : '\u00e2',
-        b'\xE3\x63' : '\u0109', b'\xE3\x65' : '\u00ea',
-        b'\xE3\x67' : '\u011d', b'\xE3\x68' : '\u0125',
-        b'\xE3\x69' : '\u00ee', b'\xE3\x6A' : '\u0135',
-        b'\xE3\x6F' : '\u00f4', b'\xE3\x73' : '\u015d',
-        b'\xE3\x75' : '\u00fb', b'\xE3\x77' : '\u0175',
-        b'\xE3\x79' : '\u0177', b'\xE3\x7A' : '\u1e91',
-        b'\xE4\x41' : '\u00c3', b'\xE4\x45' : '\u1ebc',
-        b'\xE4\x49' : '\u0128', b'\xE4\x4E' : '\u00d1',
-        b'\xE4\x4F' : '\u00d5', b'\xE4\x55' : '\u0168',
-        b'\xE4\x56' : '\u1e7c', b'\xE4\x59' : '\u1ef8',
-        b'\xE4\x61' : '\u00e3', b'\xE4\x65' : '\u1ebd',
-        b'\xE4\x69' : '\u0129', b'\xE4\x6E' : '\u00f1',
-        b'\xE4\x6F' : '\u00f5', b'\xE4\x75' : '\u0169',
-        b'\xE4\x76' : '\u1e7d', b'\xE4\x79' : '\u1ef9',
-        b'\xE5\x41' : '\u0100', b'\xE5\x45' : '\u0112',
-        b'\xE5\x47' : '\u1e20', b'\xE5\x49' : '\u012a',
-        b'\xE5\x4F' : '\u014c', b'\xE5\x55' : '\u016a',
-        b'\xE5\x61' : '\u0101', b'\xE5\x65' : '\u0113',
-        b'\xE5\x67' : '\u1e21', b'\xE5\x69' : '\u012b',
-        b'\xE5\x6F' : '\u014d', b'\xE5\x75' : '\u016b',
-        b'\xE5\xA5' : '\u01e2', b'\xE5\xB5' : '\u01e3',
-        b'\xE6\x41' : '\u0102', b'\xE6\x45' : '\u0114',
-        b'\xE6\x47' : '\u011e', b'\xE6\x49' : '\u012c',
-        b'\xE6\x4F' : '\u014e', b'\xE6\x55' : '\u016c',
-        b'\xE6\x61' : '\u0103', b'\xE6\x65' : '\u0115',
-        b'\xE6\x67' : '\u011f', b'\xE6\x69' : '\u012d',
-        b'\xE6\x6F' : '\u014f', b'\xE6\x75' : '\u016d',
-        b'\xE7\x42' : '\u1e02', b'\xE7\x43' : '\u010a',
-        b'\xE7\x44' : '\u1e0a', b'\xE7\x45' : '\u0116',
-        b'\xE7\x46' : '\u1e1e', b'\xE7\x47' : '\u0120',
-        b'\xE7\x48' : '\u1e22', b'\xE7\x49' : '\u0130',
-        b'\xE7\x4D' : '\u1e40', b'\xE7\x4E' : '\u1e44',
-        b'\xE7\x50' : '\u1e56', b'\xE7\x52' : '\u1e58',
-        b'\xE7\x53' : '\u1e60', b'\xE7\x54' : '\u1e6a',
-        b'\xE7\x57' : '\u1e86', b'\xE7\x58' : '\u1e8a',
-        b'\xE7\x59' : '\u1e8e', b'\xE7\x5A' : '\u017b',
-        b'\xE7\x62' : '\u1e03', b'\xE7\x63' : '\u010b',
-        b'\xE7\x64' : '\u1e0b', b'\xE7\x65' : '\u0117',
-        b'\xE7\x66' : '\u1e1f', b'\xE7\x67' : '\u0121',
-        b'\xE7\x68' : '\u1e23', b'\xE7\x6D' : '\u1e41',
-        b'\xE7\x6E' : '\u1e45', b'\xE7\x70' : '\u1e57',
-        b'\xE7\x72' : '\u1e59', b'\xE7\x73' : '\u1e61',
-        b'\xE7\x74' : '\u1e6b', b'\xE7\x77' : '\u1e87',
-        b'\xE7\x78' : '\u1e8b', b'\xE7\x79' : '\u1e8f',
-        b'\xE7\x7A' : '\u017c', b'\xE8\x41' : '\u00c4',
-        b'\xE8\x45' : '\u00cb', b'\xE8\x48' : '\u1e26',
-        b'\xE8\x49' : '\u00cf', b'\xE8\x4F' : '\u00d6',
-        b'\xE8\x55' : '\u00dc', b'\xE8\x57' : '\u1e84',
-        b'\xE8\x58' : '\u1e8c', b'\xE8\x59' : '\u0178',
-        b'\xE8\x61' : '\u00e4', b'\xE8\x65' : '\u00eb',
-        b'\xE8\x68' : '\u1e27', b'\xE8\x69' : '\u00ef',
-        b'\xE8\x6F' : '\u00f6', b'\xE8\x74' : '\u1e97',
-        b'\xE8\x75' : '\u00fc', b'\xE8\x77' : '\u1e85',
-        b'\xE8\x78' : '\u1e8d', b'\xE8\x79' : '\u00ff',
-        b'\xE9\x41' : '\u01cd', b'\xE9\x43' : '\u010c',
-        b'\xE9\x44' : '\u010e', b'\xE9\x45' : '\u011a',
-        b'\xE9\x47' : '\u01e6', b'\xE9\x49' : '\u01cf',
-        b'\xE9\x4B' : '\u01e8', b'\xE9\x4C' : '\u013d',
-        b'\xE9\x4E' : '\u0147', b'\xE9\x4F' : '\u01d1',
-        b'\xE9\x52' : '\u0158', b'\xE9\x53' : '\u0160',
-        b'\xE9\x54' : '\u0164', b'\xE9\x55' : '\u01d3',
-        b'\xE9\x5A' : '\u017d', b'\xE9\x61' : '\u01ce',
-        b'\xE9\x63' : '\u010d', b'\xE9\x64' : '\u010f',
-        b'\xE9\x65' : '\u011b', b'\xE9\x67' : '\u01e7',
-        b'\xE9\x69' : '\u01d0', b'\xE9\x6A' : '\u01f0',
-        b'\xE9\x6B' : '\u01e9', b'\xE9\x6C' : '\u013e',
-        b'\xE9\x6E' : '\u0148', b'\xE9\x6F' : '\u01d2',
-        b'\xE9\x72' : '\u0159', b'\xE9\x73' : '\u0161',
-        b'\xE9\x74' : '\u0165', b'\xE9\x75' : '\u01d4',
-        b'\xE9\x7A' : '\u017e', b'\xEA\x41' : '\u00c5',
-        b'\xEA\x61' : '\u00e5', b'\xEA\x75' : '\u016f',
-        b'\xEA\x77' : '\u1e98', b'\xEA\x79' : '\u1e99',
-        b'\xEA\xAD' : '\u016e', b'\xEE\x4F' : '\u0150',
-        b'\xEE\x55' : '\u0170', b'\xEE\x6F' : '\u0151',
-        b'\xEE\x75' : '\u0171', b'\xF0\x20' : '\u00b8',
-        b'\xF0\x43' : '\u00c7', b'\xF0\x44' : '\u1e10',
-        b'\xF0\x47' : '\u0122', b'\xF0\x48' : '\u1e28',
-        b'\xF0\x4B' : '\u0136', b'\xF0\x4C' : '\u013b',
-        b'\xF0\x4E' : '\u0145', b'\xF0\x52' : '\u0156',
-        b'\xF0\x53' : '\u015e', b'\xF0\x54' : '\u0162',
-        b'\xF0\x63' : '\u00e7', b'\xF0\x64' : '\u1e11',
-        b'\xF0\x67' : '\u0123', b'\xF0\x68' : '\u1e29',
-        b'\xF0\x6B' : '\u0137', b'\xF0\x6C' : '\u013c',
-        b'\xF0\x6E' : '\u0146', b'\xF0\x72' : '\u0157',
-        b'\xF0\x73' : '\u015f', b'\xF0\x74' : '\u0163',
-        b'\xF1\x41' : '\u0104', b'\xF1\x45' : '\u0118',
-        b'\xF1\x49' : '\u012e', b'\xF1\x4F' : '\u01ea',
-        b'\xF1\x55' : '\u0172', b'\xF1\x61' : '\u0105',
-        b'\xF1\x65' : '\u0119', b'\xF1\x69' : '\u012f',
-        b'\xF1\x6F' : '\u01eb', b'\xF1\x75' : '\u0173',
-        b'\xF2\x41' : '\u1ea0', b'\xF2\x42' : '\u1e04',
-        b'\xF2\x44' : '\u1e0c', b'\xF2\x45' : '\u1eb8',
-        b'\xF2\x48' : '\u1e24', b'\xF2\x49' : '\u1eca',
-        b'\xF2\x4B' : '\u1e32', b'\xF2\x4C' : '\u1e36',
-        b'\xF2\x4D' : '\u1e42', b'\xF2\x4E' : '\u1e46',
-        b'\xF2\x4F' : '\u1ecc', b'\xF2\x52' : '\u1e5a',
-        b'\xF2\x53' : '\u1e62', b'\xF2\x54' : '\u1e6c',
-        b'\xF2\x55' : '\u1ee4', b'\xF2\x56' : '\u1e7e',
-        b'\xF2\x57' : '\u1e88', b'\xF2\x59' : '\u1ef4',
-        b'\xF2\x5A' : '\u1e92', b'\xF2\x61' : '\u1ea1',
-        b'\xF2\x62' : '\u1e05', b'\xF2\x64' : '\u1e0d',
-        b'\xF2\x65' : '\u1eb9', b'\xF2\x68' : '\u1e25',
-        b'\xF2\x69' : '\u1ecb', b'\xF2\x6B' : '\u1e33',
-        b'\xF2\x6C' : '\u1e37', b'\xF2\x6D' : '\u1e43',
-        b'\xF2\x6E' : '\u1e47', b'\xF2\x6F' : '\u1ecd',
-        b'\xF2\x72' : '\u1e5b', b'\xF2\x73' : '\u1e63',
-        b'\xF2\x74' : '\u1e6d', b'\xF2\x75' : '\u1ee5',
-        b'\xF2\x76' : '\u1e7f', b'\xF2\x77' : '\u1e89',
-        b'\xF2\x79' : '\u1ef5', b'\xF2\x7A' : '\u1e93',
-        b'\xF3\x55' : '\u1e72', b'\xF3\x75' : '\u1e73',
-        b'\xF4\x41' : '\u1e00', b'\xF4\x61' : '\u1e01',
-        b'\xF9\x48' : '\u1e2a', b'\xF9\x68' : '\u1e2b', }
-
-    def __ansel_to_unicode(self, text):
-        """ Convert an ANSEL encoded text to unicode """
-
-        buff = StringIO()
-        error = ""
-        while text:
-            if text[0] < 128:
-                if chr(text[0]) in AnselReader.__use_ASCII:
-                    head = chr(text[0])
-                else:
-                    # substitute space for disallowed (control) chars
-                    error += " (%#X)" % text[0]
-                    head = ' '
-                text = text[1:]
-            else:
-                if text[0:2] in AnselReader.__twobyte:
-                    head = AnselReader.__twobyte[text[0:2]]
-                    text = text[2:]
-                elif bytes([text[0]]) in AnselReader.__onebyte:
-                    head = AnselReader.__onebyte[bytes([text[0]])]
-                    text = text[1:]
-                elif bytes([text[0]]) in AnselReader.__acombiners:
-                    cmb = AnselReader.__acombiners[bytes([text[0]])]
-                    # always consume the combiner
-                    text = text[1:]
-                    next_byte = text[0]
-                    if next_byte < 128 and chr(next_byte) in \
-                            AnselReader.__printable_ascii:
-                        # consume next as well
-                        text = text[1:]
-                        # unicode: combiner follows base-char
-                        head = chr(next_byte) + cmb
-                    else:
-                        # just drop the unexpected combiner
-                        error += " (%#X)" % text[0]
-                        continue
-                else:
-                    error += " (%#X)" % text[0]
-                    head = '\ufffd'  # "Replacement Char"
-                    text = text[1:]
-            buff.write(head)
-        ans = buff.getvalue()
-
-        if error:
-            # e.g. Illegal character (oxAB) (0xCB)... 1 NOTE xyz?pqr?lmn
-            self.report_error(_("Illegal character%s") % error, ans)
-        buff.close()
-        return ans
-
     def __init__(self, ifile, __add_msg):
         BaseReader.__init__(self, ifile, "ANSEL", __add_msg)
-        # In theory, we should have been able to skip the encode/decode from
-        # ascii.  But this way allows us to use pythons universal newline
-        self.ifile = TextIOWrapper(ifile, encoding='ascii',
-                                   errors='surrogateescape', newline=None)
+        self.__reset_buffer()
+
+    def __reset_buffer(self):
+        """ Empty the buffers """
+        self.__data = b''       # bytes not decoded yet
+        self.__text = ''        # decoded text
+        self.__pos = 0          # start of the next line in the text
+        self.__errors = []      # (offset, byte) of the illegal characters
+        self.__eof = False
+
+    def reset(self):
+        BaseReader.reset(self)
+        self.__reset_buffer()
+
+    def __read(self):
+        """ Decode the next buffer of the file """
+        data = self.ifile.read(ANSEL_BUFFER_SIZE)
+        self.__eof = not data
+        errors = []
+        text, consumed = ansel_decode(self.__data + data, final=self.__eof,
+                                      report=errors)
+        self.__data = (self.__data + data)[consumed:]
+        offset = len(self.__text) - self.__pos
+        self.__errors = [(pos - self.__pos, byte)
+                         for (pos, byte) in self.__errors]
+        self.__errors.extend((pos + offset, byte) for (pos, byte) in errors)
+        self.__text = self.__text[self.__pos:] + text
+        self.__pos = 0
 
     def readline(self):
-        line = self.ifile.readline()
-        linebytes = line.encode(encoding='ascii',
-                                errors='surrogateescape')
-        return self.__ansel_to_unicode(linebytes)
+        text = self.__text
+        while True:
+            match = LINE_END.search(text, self.__pos)
+            if (match and (match.end() < len(text) or
+                           match.group() != '\r')) or self.__eof:
+                break
+            self.__read()
+            text = self.__text
+        if match:
+            line = text[self.__pos:match.start()] + '\n'
+            end = match.end()
+        else:
+            line = text[self.__pos:]
+            end = len(text)
+        self.__pos = end
+
+        if self.__errors and self.__errors[0][0] < end:
+            index = bisect.bisect_left(self.__errors, (end, ))
+            error = "".join(" (%#X)" % byte
+                            for (pos, byte) in self.__errors[:index])
+            del self.__errors[:index]
+            # e.g. Illegal character (oxAB) (0xCB)... 1 NOTE xyz?pqr?lmn
+            self.report_error(_("Illegal character%s") % error, line)
+        return line
 
 
 #-------------------------------------------------------------------------
@@ -1761,13 +1663,14 @@ class IdMapper:
         self.find_next = find_next
         self.id2user_format = id2user_format
         self.swap = {}
+        self.used = set()   # the Gramps IDs in swap
 
     def __getitem__(self, gid):
         if gid == "":
             # We need to find the next gramps ID provided it is not already
             # the target of a swap
             new_val = self.find_next()
-            while new_val in list(self.swap.values()):
+            while new_val in self.used:
                 new_val = self.find_next()
         else:
             # remove any @ signs
@@ -1783,15 +1686,16 @@ class IdMapper:
                 # now looking for I1, it wouldn't be in self.swap, and we now
                 # find that I0001 is in use, so we have to create a new id.
                 if self.has_gid(formatted_gid) or \
-                        (formatted_gid in list(self.swap.values())):
+                        (formatted_gid in self.used):
                     new_val = self.find_next()
-                    while new_val in list(self.swap.values()):
+                    while new_val in self.used:
                         new_val = self.find_next()
                 else:
                     new_val = formatted_gid
             # we need to distinguish between I1 and I0001, so we record the map
             # from the original format
             self.swap[gid] = new_val
+            self.used.add(new_val)
         return new_val
 
     def clean(self, gid):
@@ -3955,7 +3859,7 @@ class GedcomParser(UpdateCallback):
         event = line.data
         event.set_gramps_id(self.emapper.find_next())
         event_ref = EventRef()
-        self.dbase.add_event(event, self.trans)
+        event.set_handle(create_id())
 
         sub_state = CurrentState()
         sub_state.person = state.person
@@ -3969,7 +3873,7 @@ class GedcomParser(UpdateCallback):
 
         self.__add_place(event, sub_state)
 
-        self.dbase.commit_event(event, self.trans)
+        self.dbase.add_event(event, self.trans)
         event_ref.ref = event.handle
         state.person.add_event_ref(event_ref)
 
@@ -5071,7 +4975,7 @@ class GedcomParser(UpdateCallback):
         event.set_gramps_id(self.emapper.find_next())
         event_ref = EventRef()
         event_ref.set_role(EventRoleType.FAMILY)
-        self.dbase.add_event(event, self.trans)
+        event.set_handle(create_id())
 
         sub_state = CurrentState()
         sub_state.person = state.person
@@ -5098,7 +5002,7 @@ class GedcomParser(UpdateCallback):
             if descr == "Y":
                 event.set_description('')
 
-        self.dbase.commit_event(event, self.trans)
+        self.dbase.add_event(event, self.trans)
         event_ref.ref = event.handle
         state.family.add_event_ref(event_ref)
 
@@ -5128,7 +5032,7 @@ class GedcomParser(UpdateCallback):
         # in case a description ever shows up
         if line.data and line.data != 'Y':
             event.set_description(str(line.data))
-        self.dbase.add_event(event, self.trans)
+        event.set_handle(create_id())
 
         sub_state = CurrentState()
         sub_state.person = state.person
@@ -5142,7 +5046,7 @@ class GedcomParser(UpdateCallback):
 
         self.__add_place(event, sub_state)
 
-        self.dbase.commit_event(event, self.trans)
+        self.dbase.add_event(event, self.trans)
         event_ref.ref = event.handle
         state.family.add_event_ref(event_ref)
 
@@ -7887,7 +7791,9 @@ class GedcomParser(UpdateCallback):
 
         if description and description != 'Y':
             event.set_description(description)
-        self.dbase.add_event(event, self.trans)
+        # The event is added once it is complete, but its handle may be
+        # needed before, by a witness
+        event.set_handle(create_id())
 
         sub_state = CurrentState()
         sub_state.level = state.level + 1
@@ -7904,7 +7810,7 @@ class GedcomParser(UpdateCallback):
 
         self.__add_place(event, sub_state)
 
-        self.dbase.commit_event(event, self.trans)
+        self.dbase.add_event(event, self.trans)
 
         event_ref.set_reference_handle(event.handle)
         return event_ref
@@ -7917,8 +7823,7 @@ class GedcomParser(UpdateCallback):
         event.set_type(event_type)
         if description and description != 'Y':
             event.set_description(description)
-
-        self.dbase.add_event(event, self.trans)
+        event.set_handle(create_id())
 
         sub_state = CurrentState()
         sub_state.family = state.family
@@ -7932,7 +7837,7 @@ class GedcomParser(UpdateCallback):
 
         self.__add_place(event, sub_state)
 
-        self.dbase.commit_event(event, self.trans)
+        self.dbase.add_event(event, self.trans)
         event_ref.set_reference_handle(event.handle)
         return event_ref
 
@@ -0,0 +1,110 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the ANSEL codec and the ANSEL reader of the GEDCOM import
+"""
+
+import unittest
+import codecs
+import io
+
+from gramps.plugins.lib.libansel import ansel_decode
+from gramps.plugins.lib import libgedcom
+
+
+class AnselCodecTest(unittest.TestCase):
+
+    def test_decode(self):
+        data = b'\xa1\xe2od\xe2z Zo\xe8e \xe2\xa5 \xe3x \xc5\n'
+        self.assertEqual(data.decode('ansel'),
+                         'Łódź Zoë Ǽ x̂ ¿\n')
+        self.assertEqual(ansel_decode(data), (data.decode('ansel'),
+                                              len(data)))
+
+    def test_errors(self):
+        with self.assertRaises(UnicodeDecodeError) as context:
+            b'ab\x09c'.decode('ansel')
+        self.assertEqual(context.exception.start, 2)
+        self.assertEqual(b'a\x09\xff\xe1'.decode('ansel', 'replace'),
+                         'a���')
+        self.assertEqual(b'a\x09\xff\xe1'.decode('ansel', 'ignore'), 'a')
+        report = []
+        self.assertEqual(ansel_decode(b'a\x09\xff\xe1\n', report=report),
+                         ('a �\n', 5))
+        self.assertEqual(report, [(1, 0x09), (2, 0xff), (3, 0xe1)])
+
+    def test_encode(self):
+        text = 'Łódź Zoë Ǽ x̂ ¿ Ḯ\n'
+        data = text.encode('ansel')
+        self.assertEqual(data, b'\xa1\xe2od\xe2z Zo\xe8e \xe2\xa5 \xe3x \xc5 '
+                               b'\xe8\xe2I\n')
+        self.assertEqual(data.decode('ansel'),
+                         text.replace('Ḯ', 'I\u0308\u0301'))
+        self.assertEqual('a一b'.encode('ansel', 'replace'), b'a?b')
+        with self.assertRaises(UnicodeEncodeError):
+            'a一b'.encode('ansel')
+
+    def test_incremental(self):
+        data = 'Łódź Zoë x̂\n'.encode('ansel') * 3
+        decoder = codecs.getincrementaldecoder('ansel')()
+        text = ''.join(decoder.decode(data[index:index + 1])
+                       for index in range(len(data)))
+        text += decoder.decode(b'', final=True)
+        self.assertEqual(text, data.decode('ansel'))
+
+
+class AnselReaderTest(unittest.TestCase):
+
+    def read(self, data):
+        messages = []
+        reader = libgedcom.AnselReader(io.BytesIO(data), messages.append)
+        lines = []
+        while True:
+            line = reader.readline()
+            if not line:
+                break
+            lines.append(line)
+        return lines, messages
+
+    def test_lines(self):
+        data = b'0 HEAD\r\n1 NOTE \xe2e\r1 CONC x\ny' + b'z' * 100
+        for size in (1, 2, 3, 5, 1 << 20):
+            libgedcom.ANSEL_BUFFER_SIZE = size
+            try:
+                lines, messages = self.read(data)
+            finally:
+                libgedcom.ANSEL_BUFFER_SIZE = 1 << 20
+            self.assertEqual(lines, ['0 HEAD\n', '1 NOTE é\n',
+                                     '1 CONC x\n', 'y' + 'z' * 100])
+            self.assertEqual(messages, [])
+
+    def test_errors(self):
+        lines, messages = self.read(b'0 HEAD\n1 NOTE a\x09b\xff\n1 CONC c\n')
+        self.assertEqual(lines, ['0 HEAD\n', '1 NOTE a b�\n',
+                                 '1 CONC c\n'])
+        self.assertEqual(len(messages), 1)
+        self.assertTrue(messages[0].startswith(
+            'Illegal character (0X9) (0XFF)'))
+        self.assertTrue(messages[0].endswith('1 NOTE a b�'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Unittest of the GEDCOM import
+"""
+
+import unittest
+import io
+import os
+
+from gramps.gen.const import DATA_DIR
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Date
+from gramps.gen.user import User
+from gramps.plugins.lib import libgedcom
+from gramps.plugins.lib.libmixin import DbMixin
+from gramps.plugins.lib.libgedcom import (
+    IdFinder, IdMapper, Lexer, UTF8Reader, TOKEN_HEAD, TOKEN_TRLR, TOKEN_ID,
+    TOKEN_NAME, TOKEN_BIRT, TOKEN_DEAT, TOKEN_RNOTE, TOKEN_DATE,
+    TOKEN_UNKNOWN)
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+
+DATA = '''0 HEAD
+0 @I1@ INDI
+1 NAME John /Doe@@/
+2 CONT second
+2 CONC  line
+1 BIRT
+2 DATE 1 JAN 1900
+1 NOTE @N1@
+1 DEAT
+2 DATE 1 JAN 1900
+0 @N1@ NOTE
+1 CONC text
+\t
+1 _FOO bar
+0 TRLR
+'''
+
+
+class LexerTest(unittest.TestCase):
+
+    def read(self, data):
+        messages = []
+        reader = UTF8Reader(io.BytesIO(data.encode('utf-8')),
+                            messages.append, 'UTF-8')
+        lexer = Lexer(reader, messages.append)
+        lines = []
+        while True:
+            line = lexer.readline()
+            if line is None:
+                break
+            lines.append(line)
+        return lines, messages
+
+    def test_lines(self):
+        for size in (1, 10, 1 << 16):
+            libgedcom.LEXER_BLOCK_SIZE = size
+            try:
+                lines, messages = self.read(DATA)
+            finally:
+                libgedcom.LEXER_BLOCK_SIZE = 1 << 16
+            self.assertEqual(
+                [(line.line, line.level, line.token, line.token_text)
+                 for line in lines],
+                [(1, 0, TOKEN_HEAD, 'HEAD'),
+                 (2, 0, TOKEN_ID, 'I1'),
+                 (3, 1, TOKEN_NAME, 'NAME'),
+                 (6, 1, TOKEN_BIRT, 'BIRT'),
+                 (7, 2, TOKEN_DATE, 'DATE'),
+                 (8, 1, TOKEN_RNOTE, 'NOTE'),
+                 (9, 1, TOKEN_DEAT, 'DEAT'),
+                 (10, 2, TOKEN_DATE, 'DATE'),
+                 (11, 0, TOKEN_ID, 'N1'),
+                 (14, 1, TOKEN_UNKNOWN, '_FOO'),
+                 (15, 0, TOKEN_TRLR, 'TRLR')])
+            self.assertEqual(lines[2].data, 'John /Doe@/\nsecond line')
+            self.assertEqual(lines[5].data, 'N1')
+            self.assertEqual(lines[8].data, 'NOTE text')
+            self.assertEqual(lines[9].data, 'bar')
+            self.assertEqual(len(messages), 1)
+            self.assertTrue(messages[0].startswith('Line ignored'))
+
+    def test_dates(self):
+        lines, messages = self.read(DATA)
+        first, second = lines[4].data, lines[7].data
+        self.assertIsInstance(first, Date)
+        self.assertEqual(first, Date(1900, 1, 1))
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+
+    def test_date_cache(self):
+        texts = ['1 JAN 1900', 'ABT 1850', 'BET 1900 AND 1910',
+                 'BET ABT 1900 AND 1910', 'FROM 1900 TO 1910', 'AFT 1700',
+                 '@#DJULIAN@ 1 JAN 1700', 'INT 1900 (about then)',
+                 '31 FEB 1900', '1900/01/01', '(unknown)', 'long ago', '']
+        data = ''.join('1 BIRT\n2 DATE %s\n' % text for text in texts)
+        lines, messages = self.read('0 HEAD\n0 @I1@ INDI\n%s%s0 TRLR\n'
+                                    % (data, data))
+        dates = [line.data for line in lines if line.token == TOKEN_DATE]
+        self.assertEqual(len(dates), 2 * len(texts))
+        for index, text in enumerate(texts * 2):
+            expected = libgedcom.GedLine._GedLine__extract_date(text)
+            self.assertEqual(vars(dates[index]), vars(expected), text)
+        # each line has a copy of the cached date
+        dates[0].set_yr_mon_day(1800, 1, 1)
+        lines, messages = self.read(DATA)
+        self.assertEqual(lines[4].data, Date(1900, 1, 1))
+
+
+class IdMapperTest(unittest.TestCase):
+
+    def test_map(self):
+        finder = IdFinder(['I0002'], 'I%04d')
+        mapper = IdMapper(lambda gid: gid == 'I0002', finder.find_next,
+                          lambda gid: 'I%04d' % int(gid[1:]))
+        self.assertEqual(mapper['@I1@'], 'I0001')
+        self.assertEqual(mapper['I0001'], 'I0000')
+        self.assertEqual(mapper['I2'], 'I0003')
+        self.assertEqual(mapper['I1'], 'I0001')
+        self.assertEqual(mapper.map(), {'I1': 'I0001', 'I0001': 'I0000',
+                                        'I2': 'I0003'})
+
+
+class ImportTest(unittest.TestCase):
+    """
+    Import GEDCOM files into a SQLite database.
+    """
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+        # As importgedcom.importData does
+        if DbMixin not in self.db.__class__.__bases__:
+            self.db.__class__.__bases__ = ((DbMixin,) +
+                                           self.db.__class__.__bases__)
+
+    def tearDown(self):
+        self.db.close()
+
+    def import_file(self, name):
+        filename = os.path.join(TEST_DIR, name)
+        with open(filename, "rb") as ifile:
+            stage_one = libgedcom.GedcomStageOne(ifile)
+            stage_one.parse()
+            ifile.seek(0)
+            parser = libgedcom.GedcomParser(
+                self.db, ifile, filename, User(), stage_one,
+                "Import from GEDCOM", "Imported %Y/%m/%d %H:%M:%S")
+            parser.parse_gedcom_file(False)
+
+    def test_references(self):
+        # Has a tag reference without a handle
+        self.import_file("imp_notetest_dfs.ged")
+        self.assertEqual(self.db.get_number_of_people(), 4)
+        backlinks = {}
+        for obj_class, objects in (('Person', self.db.iter_people()),
+                                   ('Family', self.db.iter_families()),
+                                   ('Event', self.db.iter_events()),
+                                   ('Source', self.db.iter_sources()),
+                                   ('Citation', self.db.iter_citations()),
+                                   ('Place', self.db.iter_places()),
+                                   ('Media', self.db.iter_media()),
+                                   ('Repository',
+                                    self.db.iter_repositories()),
+                                   ('Note', self.db.iter_notes())):
+            for obj in objects:
+                for (ref_class, ref_handle) in \
+                        obj.get_referenced_handles_recursively():
+                    if ref_handle:
+                        backlinks.setdefault(ref_handle, set()).add(
+                            (obj_class, obj.handle))
+        self.assertTrue(backlinks)
+        for ref_handle, expected in backlinks.items():
+            self.assertEqual(set(self.db.find_backlink_handles(ref_handle)),
+                             expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
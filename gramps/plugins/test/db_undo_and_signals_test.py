@@ -145,6 +145,11 @@ class DbTestClassBase(object):
         self.cm_sigs.append(("person-delete", args[0]))
 
     def test_one(self):
+        # The signals of a transaction, and of its undo and redo, are
+        # coalesced by SignalQueue: each handle is given once, with its net
+        # change.  Earlier versions emitted every change, so the objects
+        # that were added and then updated also got an update signal, and
+        # objects added and deleted in one transaction got a delete signal.
         self.__setup_callbacks()
         self.sigs = []
         with DbTxn('Add test objects', self.db) as trans:
@@ -156,12 +161,11 @@ class DbTestClassBase(object):
             family2 = self.__add_family(father2, mother2, trans)
         self.callman.register_obj(father2, directonly=True)
         self.callman.register_obj(father2, directonly=False)
+        # the people are added and updated, which is coalesced to an add
         sigs = [
             ('person-add', ['0000000100000001', '0000000200000002',
                             '0000000300000003', '0000000400000004']),
-            ('family-add', ['0000000500000005', '0000000600000006']),
-            ('person-update', ['0000000100000001', '0000000200000002',
-                               '0000000300000003', '0000000400000004'])]
+            ('family-add', ['0000000500000005', '0000000600000006'])]
         self.assertEqual(sigs, self.sigs, msg="make families")
         # save state for later undo/redo check
         step1 = (family1, father1, mother1, family2, father2, mother2)
@@ -179,9 +183,8 @@ class DbTestClassBase(object):
         sigs = [
             ('person-delete', ['0000000300000003', '0000000400000004']),
             ('family-delete', ['0000000600000006']),
-            ('person-update', ['0000000100000001', '0000000200000002',
-                               '0000000100000001', '0000000200000002']),
-            ('family-update', ['0000000500000005', '0000000500000005'])]
+            ('person-update', ['0000000100000001', '0000000200000002']),
+            ('family-update', ['0000000500000005'])]
         self.assertEqual(sigs, self.sigs, msg="merge families")
         fam_cnt = self.db.get_number_of_families()
         pers_cnt = self.db.get_number_of_people()
@@ -193,25 +196,22 @@ class DbTestClassBase(object):
         mother1 = self.db.get_person_from_handle(mother1.handle)
         step2 = (family1, father1, mother1)
 
-        # we check that update and add signals are not emitted if the same
-        # object is deleted in the same transation
+        # we check that no signals are emitted if the same object is added
+        # and deleted in the same transation
         self.sigs = []
         with DbTxn('Note add/update/delete', self.db) as trans:
             note = self.__add_note("some text", trans)
             note.set("some other text")
             self.db.commit_note(note, trans)
             self.db.remove_note(note.handle, trans)
-        sigs = [
-            ('note-delete', ['0000000700000007'])]
-        self.assertEqual(sigs, self.sigs, msg="note signals check")
+        self.assertEqual([], self.sigs, msg="note signals check")
         note_cnt = self.db.get_number_of_notes()
         self.assertEqual(note_cnt, 0, msg="note check")
 
         # Test some undos, start with the note undo
         self.sigs = []
         self.db.undo()
-        sigs = [('note-delete', ['0000000700000007'])]
-        self.assertEqual(sigs, self.sigs, msg="undo note signals check")
+        self.assertEqual([], self.sigs, msg="undo note signals check")
 
         # Test merge undo
         self.sigs = []
@@ -219,10 +219,8 @@ class DbTestClassBase(object):
         sigs = [
             ('person-add', ['0000000400000004', '0000000300000003']),
             ('family-add', ['0000000600000006']),
-            ('person-update', ['0000000200000002', '0000000100000001',
-                               '0000000200000002', '0000000100000001']),
-            ('family-update', ['0000000500000005', '0000000600000006',
-                               '0000000600000006', '0000000500000005'])]
+            ('person-update', ['0000000200000002', '0000000100000001']),
+            ('family-update', ['0000000500000005'])]
         self.assertEqual(sigs, self.sigs, msg="undo merge signals check")
         fam_cnt = self.db.get_number_of_families()
         pers_cnt = self.db.get_number_of_people()
@@ -264,12 +262,11 @@ class DbTestClassBase(object):
         # Test family build redo
         self.sigs = []
         self.db.redo()
+        # the people are added and updated, which is coalesced to an add
         sigs = [
             ('person-add', ['0000000100000001', '0000000200000002',
                             '0000000300000003', '0000000400000004']),
-            ('family-add', ['0000000500000005', '0000000600000006']),
-            ('person-update', ['0000000100000001', '0000000200000002',
-                               '0000000300000003', '0000000400000004'])]
+            ('family-add', ['0000000500000005', '0000000600000006'])]
         self.assertEqual(sigs, self.sigs, msg="redo family build signals check")
         fam_cnt = self.db.get_number_of_families()
         pers_cnt = self.db.get_number_of_people()
@@ -301,9 +298,8 @@ class DbTestClassBase(object):
         sigs = [
             ('person-delete', ['0000000300000003', '0000000400000004']),
             ('family-delete', ['0000000600000006']),
-            ('person-update', ['0000000100000001', '0000000200000002',
-                               '0000000100000001', '0000000200000002']),
-            ('family-update', ['0000000500000005', '0000000500000005'])]
+            ('person-update', ['0000000100000001', '0000000200000002']),
+            ('family-update', ['0000000500000005'])]
         self.assertEqual(sigs, self.sigs, msg="merge families")
         fam_cnt = self.db.get_number_of_families()
         pers_cnt = self.db.get_number_of_people()
@@ -323,19 +319,16 @@ class DbTestClassBase(object):
         # Test note redo
         self.sigs = []
         self.db.redo()
-        sigs = [('note-delete', ['0000000700000007'])]
-        self.assertEqual(sigs, self.sigs, msg="undo note signals check")
+        self.assertEqual([], self.sigs, msg="undo note signals check")
 
         # now lets see if the callback manager is doing its job
         # print(self.cm_sigs)
         sigs = [
             ('person-add', ['0000000300000003']),
-            ('person-update', ['0000000300000003']),
             ('person-delete', ['0000000300000003']),
             ('person-add', ['0000000300000003']),
             ('person-delete', ['0000000300000003']),
             ('person-add', ['0000000300000003']),
-            ('person-update', ['0000000300000003']),
             ('person-delete', ['0000000300000003'])]
 
         self.assertEqual(sigs, self.cm_sigs,
@@ -360,6 +353,91 @@ class DbTestClassBase(object):
         self.assertEqual(cm_padd_key, None,
                          msg="Callback Manager disconnect cb check")
 
+    def test_signal_hold(self):
+        # signals of several transactions are coalesced while they are held
+        sigs = []
+        keys = [self.db.connect(signal, lambda handles, signal=signal:
+                                sigs.append((signal, handles)))
+                for signal in ('note-add', 'note-update', 'note-delete')]
+        self.db.hold_signals()
+        self.db.hold_signals()
+        with DbTxn('Add note', self.db) as trans:
+            note1 = self.__add_note("first", trans)
+        with DbTxn('Add note', self.db) as trans:
+            note1.set("changed")
+            self.db.commit_note(note1, trans)
+            note2 = self.__add_note("second", trans)
+        with DbTxn('Remove note', self.db) as trans:
+            self.db.remove_note(note2.handle, trans)
+        self.db.release_signals()
+        self.assertEqual(sigs, [], msg="held signals check")
+        self.db.release_signals()
+        self.assertEqual(sigs, [('note-add', [note1.handle])],
+                         msg="released signals check")
+
+        # with an interval, the held signals are emitted as time passes
+        sigs[:] = []
+        self.db.hold_signals(interval=0)
+        with DbTxn('Update note', self.db) as trans:
+            self.db.commit_note(note1, trans)
+        self.assertEqual(sigs, [], msg="interval check")
+        with DbTxn('Add note', self.db) as trans:
+            note2 = self.__add_note("third", trans)
+        self.assertEqual(sigs, [('note-add', [note2.handle]),
+                                ('note-update', [note1.handle])],
+                         msg="interval emit check")
+        self.db.release_signals()
+
+        # the callback manager can hold the signals for a hidden view
+        cm_sigs = []
+        callman = CallbackManager(self.db)
+        callman.add_db_signal('note-update',
+                              lambda handles: cm_sigs.append(handles))
+        callman.hold()
+        for text in ("one", "two"):
+            with DbTxn('Update note', self.db) as trans:
+                note1.set(text)
+                self.db.commit_note(note1, trans)
+                note2.set(text)
+                self.db.commit_note(note2, trans)
+        self.assertEqual(cm_sigs, [], msg="callback manager hold check")
+        callman.release()
+        self.assertEqual(cm_sigs, [[note1.handle, note2.handle]],
+                         msg="callback manager release check")
+        callman.hold()
+        with DbTxn('Update note', self.db) as trans:
+            self.db.commit_note(note1, trans)
+        callman.release(deliver=False)
+        self.assertEqual(len(cm_sigs), 1, msg="callback manager drop check")
+        callman.disconnect_all()
+        list(map(self.db.disconnect, keys))
+
+    def test_signal_order(self):
+        # the net change of a handle follows the order of the changes
+        sigs = []
+        keys = [self.db.connect(signal, lambda handles, signal=signal:
+                                sigs.append((signal, handles)))
+                for signal in ('note-add', 'note-update', 'note-delete')]
+        with DbTxn('Add note', self.db) as trans:
+            note = self.__add_note("first", trans)
+        sigs[:] = []
+        with DbTxn('Replace note', self.db) as trans:
+            self.db.remove_note(note.handle, trans)
+            new_note = Note("second")
+            new_note.set_handle(note.handle)
+            self.db.add_note(new_note, trans)
+        self.assertEqual(sigs, [('note-update', [note.handle])],
+                         msg="delete and add check")
+        sigs[:] = []
+        self.db.undo()
+        self.assertEqual(sigs, [('note-update', [note.handle])],
+                         msg="undo delete and add check")
+        self.assertEqual(self.db.get_note_from_handle(note.handle).get(),
+                         "first", msg="undo delete and add data check")
+        with DbTxn('Remove note', self.db) as trans:
+            self.db.remove_note(note.handle, trans)
+        list(map(self.db.disconnect, keys))
+
 
 params = [('SQLite', 'sqlite')]
 
@@ -372,47 +372,52 @@ class TestcaseGenerator(tool.BatchTool):
             self.window = None
 
         self.transaction_count = 0
-
-        if self.options_dict['lowlevel']:
-            with self.progress(_('Generating testcases'),
-                               _('Generating low level database errors'),
-                               1) as step:
-                self.test_low_level()
-                step()
-
-        if self.options_dict['bugs'] or self.options_dict['persons']:
-            self.generate_tags()
-
-        if self.options_dict['bugs']:
-            with self.progress(_('Generating testcases'),
-                               _('Generating database errors'),
-                               20) as step:
-                self.generate_data_errors(step)
-
-        if self.options_dict['persons']:
-            with self.progress(_('Generating testcases'),
-                               _('Generating families'),
-                               self.max_person_count) \
-                               as self.progress_step:
-                self.person_count = 0
-
-                while True:
-                    if not self.persons_todo:
-                        pers_h = self.generate_person(0)
-                        self.persons_todo.append(pers_h)
-                        self.parents_todo.append(pers_h)
-                    person_h = self.persons_todo.pop(0)
-                    self.generate_family(person_h)
-                    if _randint(0, 3) == 0:
-                        self.generate_family(person_h)
-                    if _randint(0, 7) == 0:
+        # Each step is a transaction of its own; let the views catch up
+        # with the changes once a second instead of after each of them
+        self.db.hold_signals(interval=1.0)
+        try:
+            if self.options_dict['lowlevel']:
+                with self.progress(_('Generating testcases'),
+                                   _('Generating low level database errors'),
+                                   1) as step:
+                    self.test_low_level()
+                    step()
+
+            if self.options_dict['bugs'] or self.options_dict['persons']:
+                self.generate_tags()
+
+            if self.options_dict['bugs']:
+                with self.progress(_('Generating testcases'),
+                                   _('Generating database errors'),
+                                   20) as step:
+                    self.generate_data_errors(step)
+
+            if self.options_dict['persons']:
+                with self.progress(_('Generating testcases'),
+                                   _('Generating families'),
+                                   self.max_person_count) \
+                                   as self.progress_step:
+                    self.person_count = 0
+
+                    while True:
+                        if not self.persons_todo:
+                            pers_h = self.generate_person(0)
+                            self.persons_todo.append(pers_h)
+                            self.parents_todo.append(pers_h)
+                        person_h = self.persons_todo.pop(0)
                         self.generate_family(person_h)
-                    if self.person_count > self.max_person_count:
-                        break
-                    for child_h in self.parents_todo:
-                        self.generate_parents(child_h)
+                        if _randint(0, 3) == 0:
+                            self.generate_family(person_h)
+                        if _randint(0, 7) == 0:
+                            self.generate_family(person_h)
                         if self.person_count > self.max_person_count:
                             break
+                        for child_h in self.parents_todo:
+                            self.generate_parents(child_h)
+                            if self.person_count > self.max_person_count:
+                                break
+        finally:
+            self.db.release_signals()
 
         if not cli:
             self.top.destroy()
@@ -0,0 +1,104 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the ANSEL reader of the GEDCOM import.
+
+A GEDCOM file in ANSEL is generated with people whose notes have long
+CONC lines with accented letters, and is then read line by line, as the
+GEDCOM lexer does.  The throughput is reported for a number of sizes of
+the file, in MB.  Run from the root directory with:
+
+    python3 test/benchmarks/ansel_bench.py [megabytes ...]
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import sys
+import random
+import tempfile
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.plugins.lib.libgedcom import AnselReader
+
+WORDS = [b'Jos\xe2e', b'Fran\xf0cois', b'M\xe8uller', b'\xa1\xe2od\xe2z',
+         b'Bj\xb2rn', b'Nu\xe4nez', b'church', b'parish', b'the', b'of',
+         b'farmer', b'married', b'born', b'in', b'and', b'at']
+
+
+def make_file(size, line_length=240):
+    """
+    Write a GEDCOM file of about size bytes in ANSEL, and return its name.
+    """
+    rand = random.Random(1)
+    handle, name = tempfile.mkstemp(suffix='.ged')
+    with os.fdopen(handle, 'wb') as ged:
+        ged.write(b'0 HEAD\r\n1 CHAR ANSEL\r\n')
+        written = 0
+        index = 0
+        while written < size:
+            lines = [b'0 @I%d@ INDI' % index,
+                     b'1 NAME ' + rand.choice(WORDS) + b' /M\xe8uller/',
+                     b'1 NOTE ' + b' '.join(rand.choice(WORDS)
+                                            for word in range(10))]
+            for conc in range(rand.randint(1, 20)):
+                text = b' '.join(rand.choice(WORDS) for word in range(60))
+                lines.append(b'2 CONC ' + text[:line_length])
+            data = b'\r\n'.join(lines) + b'\r\n'
+            ged.write(data)
+            written += len(data)
+            index += 1
+        ged.write(b'0 TRLR\r\n')
+    return name
+
+
+def run(megabytes):
+    """
+    Read a generated file of a number of MB.
+    """
+    name = make_file(int(megabytes * 1024 * 1024))
+    try:
+        messages = []
+        start = perf_counter()
+        with open(name, 'rb') as ged:
+            reader = AnselReader(ged, messages.append)
+            lines = 0
+            while reader.readline():
+                lines += 1
+        seconds = perf_counter() - start
+        size = os.path.getsize(name) / (1024 * 1024)
+    finally:
+        os.remove(name)
+    print("%6.1f MB, %7d lines: %6.3f s, %6.1f MB/s, %d errors"
+          % (size, lines, seconds, size / seconds, len(messages)))
+
+
+if __name__ == "__main__":
+    for arg in (sys.argv[1:] or ['1', '8']):
+        run(float(arg))
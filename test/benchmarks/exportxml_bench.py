@@ -0,0 +1,136 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the Gramps XML export.
+
+An SQLite database is given families of people with events, places and
+notes, and is then exported to a compressed Gramps XML file.  The time
+and the number of objects per second are reported for a number of
+people.  Run from the root directory with:
+
+    python3 test/benchmarks/exportxml_bench.py [people ...]
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import sys
+import random
+import tempfile
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.cli.user import User
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import (Date, Event, EventRef, EventType, Family,
+                            ChildRef, Note, Person, Place, PlaceName,
+                            Surname)
+from gramps.plugins.export.exportxml import XmlWriter
+
+
+def make_db(count, directory):
+    """
+    Return a database with about count people, in families of four.
+    """
+    rand = random.Random(1)
+    db = make_database("sqlite")
+    db.load(directory)
+    with DbTxn("Add people", db, batch=True) as trans:
+        places = []
+        for index in range(100):
+            place = Place()
+            place.set_name(PlaceName(value="Place%03d" % index))
+            db.add_place(place, trans)
+            places.append(place.handle)
+        for index in range(count // 4):
+            family = Family()
+            db.add_family(family, trans)
+            members = []
+            for member in range(4):
+                person = Person()
+                surname = Surname()
+                surname.set_surname("Surname%06d" % index)
+                person.get_primary_name().set_surname_list([surname])
+                person.get_primary_name().set_first_name(
+                    "First%d" % member)
+                person.set_gender(member % 2)
+                event = Event()
+                event.set_type(EventType.BIRTH)
+                event.set_date_object(Date(rand.randint(1700, 1950),
+                                           rand.randint(1, 12),
+                                           rand.randint(1, 28)))
+                event.set_place_handle(rand.choice(places))
+                db.add_event(event, trans)
+                event_ref = EventRef()
+                event_ref.set_reference_handle(event.handle)
+                person.set_birth_ref(event_ref)
+                note = Note("A note about person %d of family %d"
+                            % (member, index))
+                db.add_note(note, trans)
+                person.add_note(note.handle)
+                db.add_person(person, trans)
+                members.append(person)
+            family.set_father_handle(members[0].handle)
+            family.set_mother_handle(members[1].handle)
+            for child in members[2:]:
+                child_ref = ChildRef()
+                child_ref.set_reference_handle(child.handle)
+                family.add_child_ref(child_ref)
+                child.add_parent_family_handle(family.handle)
+                db.commit_person(child, trans)
+            for parent in members[:2]:
+                parent.add_family_handle(family.handle)
+                db.commit_person(parent, trans)
+            db.commit_family(family, trans)
+    return db
+
+
+def run(count):
+    """
+    Export a database of a number of people.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db = make_db(count, directory)
+        objects = (db.get_number_of_people() + db.get_number_of_families() +
+                   db.get_number_of_events() + db.get_number_of_places() +
+                   db.get_number_of_notes())
+        filename = os.path.join(directory, "export.gramps")
+        writer = XmlWriter(db, User(quiet=True), 0, 1)
+        start = perf_counter()
+        writer.write(filename)
+        seconds = perf_counter() - start
+        size = os.path.getsize(filename) / (1024 * 1024)
+        db.close()
+    print("%7d people, %8d objects: %6.2f s, %6.0f objects/s, %5.1f MB"
+          % (count, objects, seconds, objects / seconds, size))
+
+
+if __name__ == "__main__":
+    for arg in (sys.argv[1:] or ['10000', '50000']):
+        run(int(arg))
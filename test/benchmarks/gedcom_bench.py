@@ -0,0 +1,185 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the GEDCOM import.
+
+A GEDCOM file in UTF-8 is generated with families of people with events,
+dates and notes with CONC and CONT lines.  The number of lines per second
+is reported for the lexer on its own, for the lexer when its lines are
+passed between processes, and for an import into an in-memory SQLite
+database, as done by the GEDCOM importer.  Run from the root directory
+with:
+
+    python3 test/benchmarks/gedcom_bench.py [lines [import lines]]
+
+The second figure is the cost of running the lexer in a worker process:
+each line is pickled and unpickled once, as a multiprocessing pipe does.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import pickle
+import sys
+import random
+import tempfile
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.cli.user import User
+from gramps.gen.db.utils import make_database
+from gramps.plugins.lib import libgedcom
+from gramps.plugins.lib.libmixin import DbMixin
+
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN',
+          'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+WORDS = ['the', 'of', 'parish', 'church', 'farmer', 'married', 'born',
+         'in', 'and', 'at', 'records', 'village', 'Jos\xe9', 'M\xfcller']
+
+
+def make_file(count):
+    """
+    Write a GEDCOM file of about count lines, and return its name.
+    """
+    rand = random.Random(1)
+    lines = ['0 HEAD', '1 SOUR Bench', '1 GEDC', '2 VERS 5.5.1',
+             '2 FORM LINEAGE-LINKED', '1 CHAR UTF-8']
+    people = 0
+    families = 0
+    while len(lines) < count:
+        family = families
+        families += 1
+        members = []
+        for index in range(rand.randint(3, 6)):
+            person = people
+            people += 1
+            members.append(person)
+            lines += ['0 @I%d@ INDI' % person,
+                      '1 NAME %s /Surname%d/' % (rand.choice(WORDS), family),
+                      '1 SEX %s' % rand.choice('MF'),
+                      '1 BIRT',
+                      '2 DATE ABT %d %s %d' % (rand.randint(1, 28),
+                                               rand.choice(MONTHS),
+                                               rand.randint(1700, 1950)),
+                      '2 PLAC Place%d, County, Country' % rand.randint(0, 99),
+                      '1 DEAT',
+                      '2 DATE %d' % rand.randint(1750, 2000),
+                      '1 OCCU %s' % rand.choice(WORDS),
+                      '1 NOTE ' + ' '.join(rand.choice(WORDS)
+                                           for word in range(12))]
+            for line in range(rand.randint(0, 4)):
+                lines.append('2 %s %s' % (rand.choice(['CONC', 'CONT']),
+                                          ' '.join(rand.choice(WORDS)
+                                                   for word in range(12))))
+            lines.append('1 %s @F%d@' % ('FAMC' if index > 1 else 'FAMS',
+                                         family))
+        lines += ['0 @F%d@ FAM' % family,
+                  '1 HUSB @I%d@' % members[0],
+                  '1 WIFE @I%d@' % members[1],
+                  '1 MARR',
+                  '2 DATE %d' % rand.randint(1720, 1970)]
+        lines += ['1 CHIL @I%d@' % child for child in members[2:]]
+    lines.append('0 TRLR')
+    handle, name = tempfile.mkstemp(suffix='.ged')
+    with os.fdopen(handle, 'w', encoding='utf-8') as ged:
+        ged.write('\n'.join(lines) + '\n')
+    return name, len(lines)
+
+
+def lex(name):
+    """
+    Read all the lines of a GEDCOM file with the lexer.
+    """
+    messages = []
+    with open(name, 'rb') as ifile:
+        reader = libgedcom.UTF8Reader(ifile, messages.append, 'UTF-8')
+        lexer = libgedcom.Lexer(reader, messages.append)
+        while lexer.readline():
+            pass
+
+
+def transfer(name, batch=1000):
+    """
+    Read all the lines of a GEDCOM file with the lexer, and pickle and
+    unpickle them in batches.
+    """
+    messages = []
+    with open(name, 'rb') as ifile:
+        reader = libgedcom.UTF8Reader(ifile, messages.append, 'UTF-8')
+        lexer = libgedcom.Lexer(reader, messages.append)
+        lines = []
+        while True:
+            line = lexer.readline()
+            if line is not None:
+                lines.append(line)
+            if line is None or len(lines) == batch:
+                pickle.loads(pickle.dumps(lines, pickle.HIGHEST_PROTOCOL))
+                lines = []
+            if line is None:
+                break
+
+
+def import_file(name):
+    """
+    Import a GEDCOM file into an in-memory database.
+    """
+    db = make_database("sqlite")
+    db.load(":memory:")
+    if DbMixin not in db.__class__.__bases__:
+        db.__class__.__bases__ = (DbMixin,) + db.__class__.__bases__
+    user = User(quiet=True)
+    with open(name, 'rb') as ifile:
+        stage_one = libgedcom.GedcomStageOne(ifile)
+        stage_one.parse()
+        ifile.seek(0)
+        parser = libgedcom.GedcomParser(db, ifile, name, user, stage_one,
+                                        None, None)
+        parser.parse_gedcom_file(False)
+    db.close()
+
+
+def run(func, count, what):
+    """
+    Run a function on a generated file of a number of lines.
+    """
+    name, lines = make_file(count)
+    try:
+        start = perf_counter()
+        func(name)
+        seconds = perf_counter() - start
+    finally:
+        os.remove(name)
+    print("%-6s %8d lines: %7.2f s, %7.0f lines/s"
+          % (what, lines, seconds, lines / seconds))
+
+
+if __name__ == "__main__":
+    ARGS = [int(arg) for arg in sys.argv[1:]]
+    run(lex, (ARGS[0:1] or [1000000])[0], "lexer")
+    run(transfer, (ARGS[0:1] or [1000000])[0], "pipe")
+    run(import_file, (ARGS[1:2] or [100000])[0], "import")
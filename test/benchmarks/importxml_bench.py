@@ -0,0 +1,78 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the Gramps XML import.
+
+A Gramps XML file, by default the example tree, is imported into a new
+SQLite database a number of times.  The best time and the number of
+objects per second are reported.  Run from the root directory with:
+
+    python3 test/benchmarks/importxml_bench.py [file [repeats]]
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+import tempfile
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.cli.user import User
+from gramps.gen.db.utils import make_database
+from gramps.plugins.importer.importxml import importData
+
+
+def import_file(filename):
+    """
+    Import a file into a new database, and return the time taken and the
+    number of objects imported.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        db = make_database("sqlite")
+        db.load(directory)
+        start = perf_counter()
+        importData(db, filename, User(quiet=True))
+        seconds = perf_counter() - start
+        objects = db.get_total()
+        db.close()
+    return seconds, objects
+
+
+def run(filename, repeats):
+    """
+    Run the benchmark for a file.
+    """
+    seconds, objects = min(import_file(filename) for dummy in range(repeats))
+    print("%s: %d objects, %6.2f s, %6.0f objects/s"
+          % (filename, objects, seconds, objects / seconds))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(args[0] if args else "example/gramps/example.gramps",
+        int(args[1]) if len(args) > 1 else 5)
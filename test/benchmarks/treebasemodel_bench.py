@@ -0,0 +1,151 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the node storage of TreeBaseModel.
+
+A tree shaped like the Person Tree view, with one group for every twenty
+rows, is built without a database.  The build time and memory per row are
+reported, followed by the time to compute paths and to delete and insert
+rows afterwards.  Run from the root directory with:
+
+    python3 test/benchmarks/treebasemodel_bench.py [rows ...]
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+import random
+import tracemalloc
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gui.views.treemodels.treebasemodel import TreeBaseModel
+
+# Number of rows that are deleted and inserted again, or looked up
+SAMPLE = 2000
+
+#-------------------------------------------------------------------------
+#
+# BenchModel class
+#
+#-------------------------------------------------------------------------
+class BenchModel(TreeBaseModel):
+    """
+    A tree of people grouped by surname, without a database.
+    """
+
+    def _set_base_data(self):
+        self.gen_cursor = None
+        self.number_items = None
+        self.map = None
+        self.smap = [None]
+        self.fmap = [None]
+
+    def rebuild_data(self, *args, **kwargs):
+        self.clear()
+
+    def add_row(self, handle, data):
+        surname, given = data
+        self.add_node(surname, handle, '%s, %s' % (surname, given), handle)
+
+    def row_inserted(self, path, iter):
+        pass
+
+    def row_deleted(self, path):
+        pass
+
+    def row_has_child_toggled(self, path, iter):
+        pass
+
+
+def make_rows(count):
+    """
+    Return (handle, (surname, given name)) tuples.
+    """
+    surnames = ['Surname%06d' % index for index in range(max(1, count // 20))]
+    return [('H%010d' % index,
+             (random.choice(surnames), 'Given%06d' % random.randrange(count)))
+            for index in range(count)]
+
+
+def build_model(rows):
+    """
+    Return a model holding the rows.
+    """
+    model = BenchModel(None, None)
+    model._in_build = True
+    for handle, data in rows:
+        model.add_row(handle, data)
+    model._in_build = False
+    return model
+
+
+def run(count):
+    """
+    Run the benchmark for a number of rows.
+    """
+    rows = make_rows(count)
+
+    # memory is traced in a separate build, tracing slows it down
+    tracemalloc.start()
+    build_model(rows)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = perf_counter()
+    model = build_model(rows)
+    build = perf_counter() - start
+
+    sample = random.sample(rows, SAMPLE)
+    start = perf_counter()
+    for handle, data in sample:
+        model.clear_path_cache()
+        model.do_get_path(model.get_iter_from_handle(handle))
+    paths = perf_counter() - start
+
+    start = perf_counter()
+    for handle, data in sample:
+        model.delete_row_by_handle(handle)
+    for handle, data in sample:
+        model.add_row(handle, data)
+    update = perf_counter() - start
+
+    start = perf_counter()
+    model.reverse_order()
+    reverse = perf_counter() - start
+
+    print("%8d rows: build %6.2f s, %5.0f bytes/row, %d paths %.3f s, "
+          "%d deletes and inserts %.3f s, reverse %.3f s"
+          % (count, build, memory / count, SAMPLE, paths, SAMPLE, update,
+             reverse))
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for arg in (sys.argv[1:] or ['100000', '500000']):
+        run(int(arg))
@@ -0,0 +1,114 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2026       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Benchmark the overhead of database transactions.
+
+An in-memory SQLite database is given a number of people.  The time per
+transaction is reported for empty transactions, for transactions that
+edit one person each, and the time per commit for a single transaction
+that edits every person, and the time to undo that transaction.  Run
+from the root directory with:
+
+    python3 test/benchmarks/txn_bench.py [transactions ...]
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+from time import perf_counter
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import Person, Surname
+
+
+def make_db(count):
+    """
+    Return an in-memory database with a number of people.
+    """
+    db = make_database("sqlite")
+    db.load(":memory:")
+    with DbTxn("Add people", db, batch=True) as trans:
+        for index in range(count):
+            person = Person()
+            surname = Surname()
+            surname.set_surname("Surname%06d" % index)
+            person.get_primary_name().set_surname_list([surname])
+            db.add_person(person, trans)
+    return db
+
+
+def edit(person, index):
+    """
+    Change the nickname of a person, which leaves the name indexes alone.
+    """
+    person.get_primary_name().set_nick_name("Nick%06d" % index)
+
+
+def run(count):
+    """
+    Run the benchmark for a number of transactions.
+    """
+    db = make_db(count)
+    people = list(db.iter_people())
+
+    start = perf_counter()
+    for index in range(count):
+        with DbTxn("Nothing", db):
+            pass
+    empty = perf_counter() - start
+
+    start = perf_counter()
+    for index, person in enumerate(people):
+        edit(person, index)
+        with DbTxn("Edit", db) as trans:
+            db.commit_person(person, trans)
+    single = perf_counter() - start
+
+    start = perf_counter()
+    with DbTxn("Edit all", db) as trans:
+        for index, person in enumerate(people):
+            edit(person, index + count)
+            db.commit_person(person, trans)
+    many = perf_counter() - start
+
+    start = perf_counter()
+    db.undo()
+    undo = perf_counter() - start
+    db.close()
+
+    print("%6d transactions: empty %5.0f us, one commit %5.0f us; "
+          "one transaction: %5.0f us/commit, undo %.3f s"
+          % (count, empty / count * 1e6, single / count * 1e6,
+             many / count * 1e6, undo))
+
+
+if __name__ == "__main__":
+    for arg in (sys.argv[1:] or ['2000', '20000']):
+        run(int(arg))